@@ -597,7 +597,7 @@ def delete_duplicate_accessions(db_path: Path, duplicates: Dict[str, List[Dict]]
     conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
     
-    deleted_count = 0
+    ids_to_delete = []
     
     for group_key, records in duplicates.items():
         # Records are already sorted by time_performed (oldest first) from find_duplicate_accessions
@@ -607,12 +607,15 @@ def delete_duplicate_accessions(db_path: Path, duplicates: Dict[str, List[Dict]]
         
         # Delete newer records
         for record in newer_records:
-            cursor.execute('DELETE FROM records WHERE id = ?', (record['id'],))
-            deleted_count += 1
+            ids_to_delete.append((record['id'],))
     
-    conn.commit()
+    # One executemany in a single transaction
+    with conn:
+        cursor.executemany('DELETE FROM records WHERE id = ?', ids_to_delete)
     conn.close()
     
+    deleted_count = len(ids_to_delete)
+    
     return deleted_count
 
 
@@ -625,24 +628,26 @@ def fix_database(db_path: Path, mismatches: List[Dict]) -> Tuple[int, float]:
     conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
     
-    updated_count = 0
     total_rvu_difference = 0.0
+    updates = []
     
     for m in mismatches:
         # Calculate RVU difference for this record
         rvu_diff = m['new_rvu'] - m['stored_rvu']
         total_rvu_difference += rvu_diff
-        
-        cursor.execute('''
+        updates.append((m['new_study_type'], m['new_rvu'], m['id']))
+    
+    # One executemany in a single transaction
+    with conn:
+        cursor.executemany('''
             UPDATE records
             SET study_type = ?, rvu = ?
             WHERE id = ?
-        ''', (m['new_study_type'], m['new_rvu'], m['id']))
-        updated_count += 1
-    
-    conn.commit()
+        ''', updates)
     conn.close()
     
+    updated_count = len(updates)
+    
     return updated_count, total_rvu_difference
 
 
@@ -4,6 +4,7 @@ from .config import *
 from .logging_config import setup_logging, logger
 from .platform_utils import get_all_monitor_bounds, get_primary_monitor_bounds, get_app_paths
 from .yaml_update_manager import YamlUpdateManager
+from .lru_cache import LRUCache
 
 __all__ = [
     'setup_logging',
@@ -12,4 +13,5 @@ __all__ = [
     'get_primary_monitor_bounds',
     'get_app_paths',
     'YamlUpdateManager',
+    'LRUCache',
 ]
@@ -1,5 +1,6 @@
 """Configuration constants and feature flags for RVU Counter."""
 
+import importlib.util
 import os
 import sys
 
@@ -28,6 +29,10 @@ except ImportError as e:
     HAS_MATPLOTLIB = False
     print(f"Warning: matplotlib not available: {e}")
 
+HAS_NUMPY = importlib.util.find_spec("numpy") is not None
+if not HAS_NUMPY:
+    print("Warning: numpy not available")
+
 # Logging configuration
 LOG_FOLDER = "logs"
 LOG_FILE_NAME = os.path.join(LOG_FOLDER, "rvu_counter.log")
@@ -72,6 +77,7 @@ __all__ = [
     'APP_NAME',
     'HAS_TKCALENDAR',
     'HAS_MATPLOTLIB',
+    'HAS_NUMPY',
     'LOG_FILE_NAME',
     'LOG_FOLDER',
     'LOG_MAX_BYTES',
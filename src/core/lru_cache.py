@@ -0,0 +1,79 @@
+"""Bounded least-recently-used cache shared by the in-memory caches of the app."""
+
+import threading
+from collections import OrderedDict
+from typing import Hashable, Optional
+
+
+class LRUCache:
+    """Bounded LRU cache with hit/miss counters.
+
+    Entries are evicted least-recently-used first when the entry count goes over
+    max_entries or, if max_weight is set, when the total weight of the entries
+    goes over it; a single entry heavier than max_weight is not cached at all.
+    get() returns None for a missing key, so None itself can't be cached.
+
+    Thread-safe.
+    """
+
+    def __init__(self, max_entries: int, max_weight: Optional[int] = None):
+        self.max_entries = max_entries
+        self.max_weight = max_weight
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()  # key -> (value, weight)
+        self._weight = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[object]:
+        """Cached value of key (marking it most recently used), or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value: object, weight: int = 1):
+        """Cache value under key, evicting the least recently used entries if over a limit."""
+        weight = max(1, int(weight))
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._weight -= old[1]
+            if self.max_weight is not None and weight > self.max_weight:
+                return
+            self._entries[key] = (value, weight)
+            self._weight += weight
+            while len(self._entries) > self.max_entries or (
+                    self.max_weight is not None and self._weight > self.max_weight):
+                _, (_, evicted_weight) = self._entries.popitem(last=False)
+                self._weight -= evicted_weight
+
+    def clear(self):
+        """Drop all entries (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+            self._weight = 0
+
+    def stats(self) -> dict:
+        """Return hit/miss counters and current size."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+                "weight": self._weight,
+                "max_entries": self.max_entries,
+                "max_weight": self.max_weight,
+                "hit_rate": (self.hits / total) if total else 0.0,
+            }
+
+
+__all__ = ['LRUCache']
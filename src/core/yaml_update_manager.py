@@ -155,6 +155,10 @@ class YamlUpdateManager:
                     f.write(yaml_content)
                 
                 logger.info(f"Successfully downloaded yaml to {self.local_yaml_path}")
+                
+                # Rules changed - drop compiled matcher and cached classifications
+                from ..logic.study_matcher import invalidate_classification_cache
+                invalidate_classification_cache()
                 return True
                 
         except Exception as e:
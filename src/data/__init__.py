@@ -1,7 +1,8 @@
 """Data access layer for RVU Counter - database, data manager, and backups."""
 
-from .database import RecordsDatabase
+from .database import RecordsDatabase, RollupRow
+from .shift_history import ShiftHistory, LazyShift
 from .data_manager import RVUData
 from .backup_manager import BackupManager
 
-__all__ = ['RecordsDatabase', 'RVUData', 'BackupManager']
+__all__ = ['RecordsDatabase', 'RollupRow', 'ShiftHistory', 'LazyShift', 'RVUData', 'BackupManager']
@@ -4,21 +4,36 @@ import os
 import sqlite3
 import shutil
 import logging
+import hashlib
+import json
+import threading
+import time
+import zlib
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
+# Incremental backup chain format version (stored in every manifest)
+CHAIN_FORMAT_VERSION = 1
+
 class BackupManager:
     """Manages automatic cloud backup of the database to OneDrive.
     
     Features:
     - Auto-detects OneDrive folder location
     - Creates safe backups using SQLite backup API
+    - Incremental backups: only database pages that changed since the previous
+      backup are uploaded (content-addressed, compressed), with a periodic
+      full snapshot to keep restore chains short
     - Verifies backup integrity
     - Cleans up old backups
     - Tracks backup status for UI display
+    - Background worker thread: queued/coalesced requests, hourly/daily
+      schedules, throttled I/O while a study is open, retry on a locked
+      database, and progress events for the UI
     
     Designed for novice users - minimal configuration, automatic operation.
     """
@@ -26,6 +41,20 @@ class BackupManager:
     # Backup subfolder within OneDrive
     BACKUP_SUBFOLDER = "Apps/RVU Counter/Backups"
     
+    # Incremental backups: one manifest per restore point, page contents in a
+    # content-addressed store (chunks/<first 2 hex digits>/<sha256>)
+    MANIFEST_EXTENSION = ".rvub"
+    CHUNK_SUBFOLDER = "chunks"
+    
+    # Catalog of restore points (timestamp, size, record count, checksum, shift range)
+    # so the history can be listed without opening - and hydrating - every backup
+    CATALOG_FILENAME = "backup_catalog.json"
+    
+    # Background worker
+    SCHEDULE_CHECK_INTERVAL = 60        # Seconds between hourly/daily schedule checks
+    LOCKED_RETRY_DELAYS = (5, 15, 45)   # Backoff (seconds) when the database is locked
+    THROTTLE_DELAY = 0.02               # Pause per uploaded page while a study is open
+    
     # Default settings
     DEFAULT_SETTINGS = {
         "cloud_backup_enabled": False,
@@ -35,6 +64,7 @@ class BackupManager:
         "last_backup_status": None,  # "success", "failed", "pending"
         "last_backup_error": None,
         "onedrive_path": None,  # Auto-detected or manually set
+        "backup_full_interval": 12,  # Incremental backups between full snapshots
         "github_backup_enabled": False,  # Developer only
     }
     
@@ -52,6 +82,22 @@ class BackupManager:
         self.backup_in_progress = False
         self._last_check_time = 0
         self._onedrive_path_cache = None
+        # Latest restore point of the incremental chain: (manifest filename, manifest, {page: digest})
+        self._chain_head = None
+        self._last_backup_name = None  # Last name issued by _new_backup_name
+        # Held while the chain is written or rewritten (backup, delete, chunk GC), so a
+        # delete never collects the chunks of a backup whose manifest isn't written yet
+        self._chain_lock = threading.RLock()
+        self._catalog_lock = threading.Lock()
+        self._catalog_rebuild_thread = None
+        
+        # Background worker state (see start_worker)
+        self._jobs = OrderedDict()  # job kind -> merged request, oldest first
+        self._jobs_cv = threading.Condition()
+        self._worker_thread = None
+        self._worker_stop = False
+        self._listeners = []
+        self._activity_probe = None
         
         # Initialize backup settings if not present
         self._ensure_settings()
@@ -167,16 +213,19 @@ class BackupManager:
             logger.error(f"Failed to create backup folder: {e}")
             return None
     
-    def create_backup(self, force: bool = False) -> dict:
+    def create_backup(self, force: bool = False, progress: Callable[[float], None] = None) -> dict:
         """Create a backup of the database to OneDrive and optionally GitHub.
         
+        Runs on the calling thread - UI code should use request_backup instead.
+        
         Args:
             force: If True, bypass schedule check and create backup immediately
+            progress: Optional callback receiving the upload fraction (0.0 - 1.0)
             
         Returns:
             Dict with OneDrive backup result
         """
-        onedrive_result = self._create_onedrive_backup(force)
+        onedrive_result = self._create_onedrive_backup(force, progress)
         
         # Also do GitHub backup if enabled (developer only)
         if self.settings["backup"].get("github_backup_enabled", False):
@@ -187,7 +236,7 @@ class BackupManager:
                 
         return onedrive_result
 
-    def _create_onedrive_backup(self, force: bool = False) -> dict:
+    def _create_onedrive_backup(self, force: bool = False, progress: Callable[[float], None] = None) -> dict:
         """Create a backup of the database to OneDrive.
         
         Uses SQLite's online backup API for a consistent copy even during writes.
@@ -223,60 +272,43 @@ class BackupManager:
             return result
         
         self.backup_in_progress = True
+        self._chain_lock.acquire()
+        
+        # Local snapshot - only the pages that changed are copied to OneDrive
+        snapshot_path = self.db_path + ".snapshot"
         
         try:
             # Generate backup filename with timestamp
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            backup_name = f"rvu_records_{timestamp}.db"
+            backup_name = self._new_backup_name(backup_folder)
             backup_path = os.path.join(backup_folder, backup_name)
-            temp_path = os.path.join(backup_folder, f".{backup_name}.tmp")
             
             logger.info(f"Starting backup to: {backup_path}")
             
             # Step 1: Use SQLite backup API for consistent copy
-            source_conn = None
-            dest_conn = None
+            self._snapshot_database(snapshot_path)
             
-            try:
-                source_conn = sqlite3.connect(self.db_path)
-                dest_conn = sqlite3.connect(temp_path)
-                source_conn.backup(dest_conn)
-                dest_conn.close()
-                dest_conn = None
-                source_conn.close()
-                source_conn = None
-            except sqlite3.OperationalError as e:
-                if "database is locked" in str(e).lower():
-                    raise Exception("Database is locked - will retry later")
-                raise
-            finally:
-                if dest_conn:
-                    try: dest_conn.close()
-                    except: pass
-                if source_conn:
-                    try: source_conn.close()
-                    except: pass
+            # Step 2: Verify snapshot integrity (full check only for full snapshots)
+            head = self._get_chain_head(backup_folder)
+            full_interval = self.settings["backup"].get("backup_full_interval", 12)
+            full = head is None or head[1].get("depth", 0) + 1 >= full_interval
             
-            # Step 2: Verify backup integrity
-            verify_conn = sqlite3.connect(temp_path)
-            cursor = verify_conn.execute("PRAGMA integrity_check")
+            verify_conn = sqlite3.connect(snapshot_path)
+            cursor = verify_conn.execute("PRAGMA integrity_check" if full else "PRAGMA quick_check")
             integrity_result = cursor.fetchone()[0]
             
-            try:
-                cursor = verify_conn.execute("SELECT COUNT(*) FROM records")
-                record_count = cursor.fetchone()[0]
-            except:
-                record_count = 0
+            record_count, shift_range = self._summarize_database(verify_conn)
             verify_conn.close()
             
             if integrity_result.lower() != "ok":
-                os.remove(temp_path)
                 raise Exception(f"Backup integrity check failed: {integrity_result}")
             
-            # Step 3: Atomic rename
-            if os.path.exists(backup_path):
-                os.remove(backup_path)
-            os.rename(temp_path, backup_path)
+            # Step 3: Upload changed pages, then the manifest (the manifest is written
+            # last and atomically, so a partial upload never becomes a restore point)
+            manifest = self._write_chain_backup(backup_folder, backup_name, snapshot_path,
+                                                None if full else head,
+                                                {"record_count": record_count, "shift_range": shift_range},
+                                                progress)
+            self._update_catalog(backup_folder, add={backup_name: self._manifest_catalog_entry(backup_name, manifest)})
             
             # Step 4: Cleanup old backups
             self._cleanup_old_backups(backup_folder)
@@ -285,21 +317,770 @@ class BackupManager:
             result["success"] = True
             result["path"] = backup_path
             result["record_count"] = record_count
+            result["kind"] = manifest["kind"]
+            result["uploaded_bytes"] = manifest["stored_bytes"]
             
             self._update_backup_status("success", None)
-            logger.info(f"Backup completed successfully: {backup_path} ({record_count} records)")
+            logger.info(f"Backup completed successfully: {backup_path} ({record_count} records, "
+                        f"{manifest['kind']}, {self._format_size(manifest['stored_bytes'])} uploaded)")
             
         except Exception as e:
             result["error"] = str(e)
             self._update_backup_status("failed", str(e))
             logger.error(f"Backup failed: {e}")
-            if 'temp_path' in locals() and os.path.exists(temp_path):
-                try: os.remove(temp_path)
-                except: pass
         finally:
+            if os.path.exists(snapshot_path):
+                try: os.remove(snapshot_path)
+                except: pass
+            self._chain_lock.release()
             self.backup_in_progress = False
         
         return result
+    
+    def _new_backup_name(self, backup_folder: str) -> str:
+        """Unused restore point filename for the current time.
+        
+        Backups within the same second get a numeric suffix one past the highest
+        already issued for that second (on disk or by this process), so a name
+        freed by retention is never reused and a new backup always sorts after
+        the ones before it (see _backup_sort_key).
+        """
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        prefix = f"rvu_records_{timestamp}"
+        sequence = 0
+        if self._last_backup_name and self._last_backup_name.startswith(prefix):
+            sequence = self._backup_sequence(self._last_backup_name)
+        for f in os.listdir(backup_folder):
+            if f.startswith(prefix) and self._is_backup_file(f):
+                sequence = max(sequence, self._backup_sequence(f))
+        if sequence == 0:
+            backup_name = f"{prefix}{self.MANIFEST_EXTENSION}"
+        else:
+            backup_name = f"{prefix}_{sequence + 1:02d}{self.MANIFEST_EXTENSION}"
+        self._last_backup_name = backup_name
+        return backup_name
+    
+    def _snapshot_database(self, dest_path: str):
+        """Copy the live database to dest_path with the SQLite backup API.
+        
+        The copy uses a rollback journal so it is a single self-contained file.
+        """
+        source_conn = None
+        dest_conn = None
+        try:
+            if os.path.exists(dest_path):
+                os.remove(dest_path)
+            db = getattr(self.data_manager, 'db', None) if self.data_manager else None
+            if db is not None and db.conn:
+                # Read through the app's read-only connection (doesn't block writes)
+                db.backup_to(dest_path)
+            else:
+                source_conn = sqlite3.connect(self.db_path)
+                dest_conn = sqlite3.connect(dest_path)
+                source_conn.backup(dest_conn)
+                dest_conn.execute("PRAGMA journal_mode = DELETE")
+        except sqlite3.OperationalError as e:
+            if "database is locked" in str(e).lower():
+                raise Exception("Database is locked - will retry later")
+            raise
+        finally:
+            if dest_conn:
+                try: dest_conn.close()
+                except: pass
+            if source_conn:
+                try: source_conn.close()
+                except: pass
+    
+    # =========================================================================
+    # Incremental backup chain
+    # =========================================================================
+    
+    @staticmethod
+    def _read_page_size(db_file: str) -> int:
+        """Page size from a SQLite database file header."""
+        with open(db_file, "rb") as f:
+            header = f.read(100)
+        if len(header) < 100 or not header.startswith(b"SQLite format 3\x00"):
+            raise Exception("Not a SQLite database file")
+        page_size = int.from_bytes(header[16:18], "big")
+        return 65536 if page_size == 1 else page_size
+    
+    @staticmethod
+    def _iter_pages(db_file: str, page_size: int):
+        """Yield every page of a SQLite database file."""
+        with open(db_file, "rb") as f:
+            while True:
+                page = f.read(page_size)
+                if not page:
+                    break
+                yield page
+    
+    def _chunk_path(self, backup_folder: str, digest: str) -> str:
+        return os.path.join(backup_folder, self.CHUNK_SUBFOLDER, digest[:2], digest)
+    
+    def _store_chunk(self, backup_folder: str, digest: str, data: bytes) -> int:
+        """Store a compressed page under its hash. Returns bytes written (0 if already stored)."""
+        path = self._chunk_path(backup_folder, digest)
+        if os.path.exists(path):
+            return 0
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        payload = zlib.compress(data, 6)
+        temp_path = path + ".tmp"
+        with open(temp_path, "wb") as f:
+            f.write(payload)
+        os.replace(temp_path, path)
+        return len(payload)
+    
+    def _read_chunk(self, backup_folder: str, digest: str) -> bytes:
+        """Read and verify a stored page."""
+        with open(self._chunk_path(backup_folder, digest), "rb") as f:
+            data = zlib.decompress(f.read())
+        if hashlib.sha256(data).hexdigest() != digest:
+            raise Exception(f"Backup chunk {digest[:12]} is corrupted")
+        return data
+    
+    @staticmethod
+    def _load_manifest(path: str) -> dict:
+        """Load an incremental backup manifest (zlib-compressed JSON)."""
+        with open(path, "rb") as f:
+            manifest = json.loads(zlib.decompress(f.read()).decode("utf-8"))
+        if manifest.get("format") != CHAIN_FORMAT_VERSION:
+            raise Exception(f"Unsupported backup format: {manifest.get('format')}")
+        return manifest
+    
+    @staticmethod
+    def _write_manifest(path: str, manifest: dict):
+        """Atomically write an incremental backup manifest."""
+        temp_path = path + ".tmp"
+        with open(temp_path, "wb") as f:
+            f.write(zlib.compress(json.dumps(manifest, separators=(",", ":")).encode("utf-8"), 9))
+        os.replace(temp_path, path)
+    
+    def _list_manifests(self, backup_folder: str) -> List[str]:
+        """Manifest filenames in the backup folder, oldest first."""
+        return sorted((f for f in os.listdir(backup_folder)
+                       if f.startswith("rvu_records_") and f.endswith(self.MANIFEST_EXTENSION)),
+                      key=lambda f: self._backup_sort_key(f, os.path.join(backup_folder, f)))
+    
+    def _resolve_pages(self, backup_folder: str, name: str) -> Tuple[dict, Dict[int, str]]:
+        """Walk a restore point's chain back to its full snapshot.
+        
+        Returns:
+            (manifest, {page number: digest}) describing the complete database
+        """
+        chain = []
+        visited = set()
+        while name:
+            if name in visited:
+                raise Exception(f"Backup chain is broken (loop at {name})")
+            visited.add(name)
+            manifest = self._load_manifest(os.path.join(backup_folder, name))
+            chain.append(manifest)
+            if manifest["kind"] == "full":
+                break
+            name = manifest.get("parent")
+            if not name or not os.path.exists(os.path.join(backup_folder, name)):
+                raise Exception(f"Backup chain is broken (missing {name})")
+        
+        pages = {}
+        for manifest in reversed(chain):
+            pages.update((int(page), digest) for page, digest in manifest["pages"].items())
+        target = chain[0]
+        return target, {page: digest for page, digest in pages.items() if page < target["page_count"]}
+    
+    def _get_chain_head(self, backup_folder: str):
+        """Latest restore point to diff against, or None if a full snapshot is needed."""
+        manifests = self._list_manifests(backup_folder)
+        if not manifests:
+            self._chain_head = None
+            return None
+        latest = manifests[-1]
+        if self._chain_head is not None and self._chain_head[0] == latest:
+            return self._chain_head
+        try:
+            manifest, pages = self._resolve_pages(backup_folder, latest)
+            self._chain_head = (latest, manifest, pages)
+        except Exception as e:
+            logger.warning(f"Cannot continue backup chain from {latest}, taking a full snapshot: {e}")
+            self._chain_head = None
+        return self._chain_head
+    
+    def _write_chain_backup(self, backup_folder: str, backup_name: str, snapshot_path: str,
+                            head, summary: dict, progress: Callable[[float], None] = None) -> dict:
+        """Store a snapshot as a new restore point.
+        
+        Args:
+            head: Chain head to diff against (from _get_chain_head), or None for a full snapshot
+            summary: record_count / shift_range of the snapshot, kept in the manifest
+            progress: Optional callback receiving the fraction of pages processed
+        
+        Returns:
+            The written manifest
+        """
+        page_size = self._read_page_size(snapshot_path)
+        if head is not None and head[1]["page_size"] != page_size:
+            # Page size changed - deltas are meaningless, store everything
+            head = None
+        if head is not None and head[0] == backup_name:
+            # Never overwrite the restore point we would be diffing against
+            raise Exception(f"Backup {backup_name} already exists")
+        
+        pages = {}
+        changed = {}
+        stored_bytes = 0
+        checksum = hashlib.sha256()
+        total_pages = max(1, os.path.getsize(snapshot_path) // page_size)
+        report_every = max(1, total_pages // 20)
+        for page_no, data in enumerate(self._iter_pages(snapshot_path, page_size)):
+            checksum.update(data)
+            digest = hashlib.sha256(data).hexdigest()
+            pages[page_no] = digest
+            if head is None or head[2].get(page_no) != digest:
+                changed[page_no] = digest
+                written = self._store_chunk(backup_folder, digest, data)
+                stored_bytes += written
+                if written and self._is_throttled():
+                    # Keep disk/sync traffic low while the user is reading a study
+                    time.sleep(self.THROTTLE_DELAY)
+            if progress and page_no % report_every == 0:
+                progress(page_no / total_pages)
+        if progress:
+            progress(1.0)
+        
+        manifest = {
+            "format": CHAIN_FORMAT_VERSION,
+            "kind": "full" if head is None else "incremental",
+            "parent": None if head is None else head[0],
+            "depth": 0 if head is None else head[1].get("depth", 0) + 1,
+            "created": datetime.now().isoformat(),
+            "page_size": page_size,
+            "page_count": len(pages),
+            "record_count": summary.get("record_count", 0),
+            "shift_range": summary.get("shift_range"),
+            "sha256": checksum.hexdigest(),
+            "stored_bytes": stored_bytes,
+            "pages": {str(page): digest for page, digest in changed.items()},
+        }
+        self._write_manifest(os.path.join(backup_folder, backup_name), manifest)
+        self._chain_head = (backup_name, manifest, pages)
+        return manifest
+    
+    def _materialize_backup(self, manifest_path: str, dest_path: str):
+        """Rebuild the database file for a restore point from its chain.
+        
+        Holds _chain_lock so retention cleanup can't rebase or delete the chain
+        (and collect its chunks) halfway through the rebuild.
+        """
+        backup_folder = os.path.dirname(manifest_path)
+        with self._chain_lock:
+            if not os.path.exists(manifest_path):
+                raise Exception("Backup file not found")
+            manifest, pages = self._resolve_pages(backup_folder, os.path.basename(manifest_path))
+            temp_path = dest_path + ".tmp"
+            checksum = hashlib.sha256()
+            with open(temp_path, "wb") as f:
+                for page_no in range(manifest["page_count"]):
+                    digest = pages.get(page_no)
+                    if digest is None:
+                        raise Exception(f"Backup chain is missing page {page_no}")
+                    data = self._read_chunk(backup_folder, digest)
+                    checksum.update(data)
+                    f.write(data)
+        if manifest.get("sha256") and checksum.hexdigest() != manifest["sha256"]:
+            os.remove(temp_path)
+            raise Exception("Rebuilt backup does not match its checksum")
+        os.replace(temp_path, dest_path)
+    
+    def delete_backup(self, backup_path: str):
+        """Delete a restore point.
+        
+        Restore points that build on an incremental backup get its pages folded in
+        so they stay restorable; chunks no longer referenced are removed.
+        
+        Runs on the calling thread - UI code should use request_delete instead.
+        """
+        with self._chain_lock:
+            self._delete_backup(backup_path)
+    
+    def _delete_backup(self, backup_path: str):
+        backup_folder = os.path.dirname(backup_path)
+        name = os.path.basename(backup_path)
+        if not backup_path.endswith(self.MANIFEST_EXTENSION):
+            os.remove(backup_path)
+            self._update_catalog(backup_folder, remove=[name])
+            return
+        
+        manifest = self._load_manifest(backup_path)
+        rebased = {}
+        for child_name in self._list_manifests(backup_folder):
+            child_path = os.path.join(backup_folder, child_name)
+            try:
+                child = self._load_manifest(child_path)
+            except Exception:
+                continue
+            if child.get("parent") != name:
+                continue
+            pages = dict(manifest["pages"])
+            pages.update(child["pages"])
+            child["pages"] = {page: digest for page, digest in pages.items()
+                              if int(page) < child["page_count"]}
+            child["kind"] = manifest["kind"]
+            child["parent"] = manifest.get("parent")
+            child["depth"] = manifest.get("depth", 0)
+            self._write_manifest(child_path, child)
+            rebased[child_name] = self._manifest_catalog_entry(child_name, child)
+        
+        os.remove(backup_path)
+        self._update_catalog(backup_folder, add=rebased, remove=[name])
+        self._chain_head = None
+        self._collect_garbage_chunks(backup_folder)
+    
+    # =========================================================================
+    # Backup catalog
+    # =========================================================================
+    
+    def _is_backup_file(self, filename: str) -> bool:
+        return filename.startswith("rvu_records_") and (
+            filename.endswith(".db") or filename.endswith(self.MANIFEST_EXTENSION))
+    
+    def _backup_timestamp(self, filename: str, full_path: str) -> datetime:
+        """Timestamp of a backup from its filename (file mtime if it has none)."""
+        try:
+            timestamp_str = filename.replace("rvu_records_", "").replace(".db", "").replace(self.MANIFEST_EXTENSION, "")
+            # Names may carry a _NN suffix when several backups ran in the same second
+            return datetime.strptime(timestamp_str[:15], "%Y%m%d_%H%M%S")
+        except:
+            return datetime.fromtimestamp(os.path.getmtime(full_path))
+    
+    def _backup_sequence(self, filename: str) -> int:
+        """Position of a backup among those taken in the same second (1 for an unsuffixed name)."""
+        stem = filename.replace("rvu_records_", "").replace(".db", "").replace(self.MANIFEST_EXTENSION, "")
+        suffix = stem[16:] if stem[15:16] == "_" else ""
+        return int(suffix) if suffix.isdigit() else 1
+    
+    def _backup_sort_key(self, filename: str, full_path: str) -> Tuple[datetime, int]:
+        """Creation order of a backup: filename timestamp, then same-second sequence.
+        
+        Plain name order is wrong within a second - "<ts>.rvub" sorts before
+        "<ts>_02.rvub" whichever was taken last.
+        """
+        return self._backup_timestamp(filename, full_path), self._backup_sequence(filename)
+    
+    @staticmethod
+    def _summarize_database(conn) -> Tuple[int, Optional[List[str]]]:
+        """Record count and [first shift start, last shift end] of a backup database."""
+        try:
+            record_count = conn.execute("SELECT COUNT(*) FROM records").fetchone()[0]
+        except:
+            record_count = 0
+        try:
+            first, last = conn.execute(
+                "SELECT MIN(shift_start), MAX(COALESCE(shift_end, shift_start)) FROM shifts"
+            ).fetchone()
+            shift_range = [first, last] if first else None
+        except:
+            shift_range = None
+        return record_count, shift_range
+    
+    def _manifest_catalog_entry(self, filename: str, manifest: dict) -> dict:
+        timestamp = self._backup_timestamp(filename, "")
+        return {
+            "timestamp": timestamp.isoformat(),
+            "size": manifest["page_size"] * manifest["page_count"],
+            "record_count": manifest.get("record_count", 0),
+            "checksum": manifest.get("sha256"),
+            "kind": manifest["kind"],
+            "shift_range": manifest.get("shift_range"),
+        }
+    
+    def _describe_backup(self, backup_folder: str, filename: str) -> dict:
+        """Build a catalog entry by reading the backup itself (slow on cloud folders)."""
+        full_path = os.path.join(backup_folder, filename)
+        if filename.endswith(self.MANIFEST_EXTENSION):
+            return self._manifest_catalog_entry(filename, self._load_manifest(full_path))
+        
+        checksum = hashlib.sha256()
+        with open(full_path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                checksum.update(block)
+        conn = sqlite3.connect(full_path)
+        try:
+            record_count, shift_range = self._summarize_database(conn)
+        finally:
+            conn.close()
+        return {
+            "timestamp": self._backup_timestamp(filename, full_path).isoformat(),
+            "size": os.path.getsize(full_path),
+            "record_count": record_count,
+            "checksum": checksum.hexdigest(),
+            "kind": "database",
+            "shift_range": shift_range,
+        }
+    
+    def _load_catalog(self, backup_folder: str) -> Dict[str, dict]:
+        """Catalog entries by backup filename ({} if missing or unreadable)."""
+        path = os.path.join(backup_folder, self.CATALOG_FILENAME)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f).get("backups", {})
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logger.warning(f"Backup catalog unreadable, it will be rebuilt: {e}")
+            return {}
+    
+    def _save_catalog(self, backup_folder: str, entries: Dict[str, dict]):
+        """Atomically replace the catalog."""
+        path = os.path.join(backup_folder, self.CATALOG_FILENAME)
+        temp_path = path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({"format": 1, "backups": entries}, f, indent=1, sort_keys=True)
+        os.replace(temp_path, path)
+    
+    def _update_catalog(self, backup_folder: str, add: Dict[str, dict] = None, remove: List[str] = None):
+        """Add and/or remove catalog entries (read-modify-write under the catalog lock)."""
+        try:
+            with self._catalog_lock:
+                entries = self._load_catalog(backup_folder)
+                for name in remove or ():
+                    entries.pop(name, None)
+                entries.update(add or {})
+                self._save_catalog(backup_folder, entries)
+        except Exception as e:
+            logger.warning(f"Failed to update backup catalog: {e}")
+    
+    def verify_backup_catalog(self, backup_folder: str = None, deep: bool = False) -> bool:
+        """Reconcile the catalog with the backup folder.
+        
+        Adds entries for uncataloged backups and drops entries whose file is gone.
+        With deep=True every backup is re-read and checksum mismatches are logged.
+        
+        Returns:
+            True if the catalog changed
+        """
+        backup_folder = backup_folder or self.get_backup_folder()
+        if not backup_folder:
+            return False
+        
+        files = {f for f in os.listdir(backup_folder) if self._is_backup_file(f)}
+        catalog = self._load_catalog(backup_folder)
+        added = {}
+        for name in sorted(files):
+            if name in catalog and not deep:
+                continue
+            try:
+                entry = self._describe_backup(backup_folder, name)
+            except Exception as e:
+                logger.warning(f"Cannot catalog backup {name}: {e}")
+                continue
+            old = catalog.get(name)
+            if old and old.get("checksum") and old["checksum"] != entry["checksum"]:
+                logger.error(f"Backup {name} does not match its catalog checksum")
+            if old != entry:
+                added[name] = entry
+        removed = [name for name in catalog if name not in files]
+        
+        if added or removed:
+            self._update_catalog(backup_folder, add=added, remove=removed)
+            logger.info(f"Backup catalog rebuilt: {len(added)} added/updated, {len(removed)} removed")
+            return True
+        return False
+    
+    def _start_catalog_rebuild(self, backup_folder: str):
+        """Reconcile the catalog on a background thread (one at a time)."""
+        if self._catalog_rebuild_thread and self._catalog_rebuild_thread.is_alive():
+            return
+        
+        def rebuild():
+            try:
+                self.verify_backup_catalog(backup_folder)
+            except Exception as e:
+                logger.error(f"Backup catalog rebuild failed: {e}")
+        
+        self._catalog_rebuild_thread = threading.Thread(target=rebuild, name="BackupCatalogRebuild", daemon=True)
+        self._catalog_rebuild_thread.start()
+    
+    def _collect_garbage_chunks(self, backup_folder: str):
+        """Remove stored pages that no restore point references (caller holds _chain_lock)."""
+        chunk_root = os.path.join(backup_folder, self.CHUNK_SUBFOLDER)
+        if not os.path.isdir(chunk_root):
+            return
+        referenced = set()
+        for name in self._list_manifests(backup_folder):
+            try:
+                referenced.update(self._load_manifest(os.path.join(backup_folder, name))["pages"].values())
+            except Exception as e:
+                # Can't tell what an unreadable manifest needs - keep everything
+                logger.warning(f"Skipping chunk cleanup, unreadable manifest {name}: {e}")
+                return
+        removed = 0
+        for prefix in os.listdir(chunk_root):
+            prefix_dir = os.path.join(chunk_root, prefix)
+            if not os.path.isdir(prefix_dir):
+                continue
+            for digest in os.listdir(prefix_dir):
+                if digest not in referenced:
+                    try:
+                        os.remove(os.path.join(prefix_dir, digest))
+                        removed += 1
+                    except OSError as e:
+                        logger.warning(f"Failed to remove backup chunk {digest}: {e}")
+        if removed:
+            logger.info(f"Removed {removed} unreferenced backup chunks")
+
+    # =========================================================================
+    # Background worker
+    # =========================================================================
+    
+    def start_worker(self):
+        """Start the background backup thread (idempotent)."""
+        with self._jobs_cv:
+            if self._worker_thread and self._worker_thread.is_alive():
+                return
+            self._worker_stop = False
+            self._worker_thread = threading.Thread(target=self._worker_loop, name="BackupWorker", daemon=True)
+            self._worker_thread.start()
+        logger.info("Backup worker started")
+    
+    def stop_worker(self, timeout: float = 30.0):
+        """Stop the background thread after it finishes already-queued jobs.
+        
+        Scheduled checks and locked-database retries stop immediately.
+        """
+        with self._jobs_cv:
+            self._worker_stop = True
+            self._jobs_cv.notify_all()
+            thread = self._worker_thread
+        if thread and thread.is_alive():
+            thread.join(timeout=timeout)
+            if thread.is_alive():
+                logger.warning("Backup worker did not finish in time")
+    
+    def subscribe(self, listener: Callable[[dict], None]) -> Callable[[], None]:
+        """Register a listener for backup events. Returns a function that unsubscribes it.
+        
+        Listeners are called on the worker thread with a dict containing "event"
+        ("queued", "started", "progress", "retrying", "finished") and "reason",
+        plus "percent" (progress), "retry_in" (retrying) or "result" (finished).
+        Tk code must hop back to the main loop (root.after) before touching widgets.
+        """
+        with self._jobs_cv:
+            self._listeners.append(listener)
+        
+        def unsubscribe():
+            with self._jobs_cv:
+                if listener in self._listeners:
+                    self._listeners.remove(listener)
+        return unsubscribe
+    
+    def set_activity_probe(self, probe: Optional[Callable[[], bool]]):
+        """Set a callable returning True while a study is open (backups are throttled)."""
+        self._activity_probe = probe
+    
+    def request_backup(self, reason: str = "manual", force: bool = True,
+                       callback: Callable[[dict], None] = None) -> bool:
+        """Queue a backup on the worker thread.
+        
+        Requests made while a backup is already queued are merged into it, so a
+        burst of requests produces one backup. The callback receives the result
+        dict on the worker thread.
+        
+        Returns:
+            True if the request was merged into an already-queued backup
+        """
+        return self._enqueue("backup", reason, force=force, callback=callback)
+    
+    def request_catalog_verify(self, deep: bool = False):
+        """Queue a backup catalog reconciliation on the worker thread."""
+        self._enqueue("verify_catalog", "verify", deep=deep)
+    
+    def request_delete(self, backup_path: str, callback: Callable[[dict], None] = None) -> bool:
+        """Queue deletion of a restore point on the worker thread.
+        
+        Deletes requested while one is already queued are merged into it. The
+        callback receives a result dict on the worker thread, with "deleted"
+        (paths removed) and "failed" ({path: error}).
+        
+        Returns:
+            True if the request was merged into an already-queued delete
+        """
+        return self._enqueue("delete", "delete", path=backup_path, callback=callback)
+    
+    def request_restore(self, backup_path: str, callback: Callable[[dict], None] = None) -> bool:
+        """Queue rebuilding a restore point on the worker thread.
+        
+        Incremental restore points are rebuilt from their chain into a local file
+        (reads every chunk from OneDrive). The callback receives a result dict on
+        the worker thread with "success", "error" and "source" - the local file to
+        pass to restore_from_backup, which removes it afterwards. Only the most
+        recently requested restore point is rebuilt.
+        
+        Returns:
+            True if the request was merged into an already-queued restore
+        """
+        return self._enqueue("restore", "restore", path=backup_path, callback=callback)
+    
+    def _enqueue(self, kind: str, reason: str, force: bool = False, deep: bool = False,
+                 path: str = None, callback: Callable[[dict], None] = None) -> bool:
+        with self._jobs_cv:
+            job = self._jobs.get(kind)
+            merged = job is not None
+            if not merged:
+                job = self._jobs[kind] = {"kind": kind, "reasons": [], "force": False,
+                                          "deep": False, "paths": [], "callbacks": []}
+            if reason not in job["reasons"]:
+                job["reasons"].append(reason)
+            job["force"] = job["force"] or force
+            job["deep"] = job["deep"] or deep
+            if path and path not in job["paths"]:
+                job["paths"].append(path)
+            if callback:
+                job["callbacks"].append(callback)
+            self._jobs_cv.notify_all()
+        
+        if merged:
+            logger.debug(f"Backup job '{kind}' already queued - merged request ({reason})")
+        else:
+            self._emit("queued", reason)
+        if not (self._worker_thread and self._worker_thread.is_alive()):
+            self.start_worker()
+        return merged
+    
+    def _emit(self, event: str, reason: str, **info):
+        with self._jobs_cv:
+            listeners = list(self._listeners)
+        payload = {"event": event, "reason": reason}
+        payload.update(info)
+        for listener in listeners:
+            try:
+                listener(payload)
+            except Exception as e:
+                logger.debug(f"Backup event listener failed: {e}")
+    
+    def _is_throttled(self) -> bool:
+        probe = self._activity_probe
+        if probe is None:
+            return False
+        try:
+            return bool(probe())
+        except Exception:
+            return False
+    
+    def _next_job(self) -> Optional[dict]:
+        """Block until a job is queued (or a scheduled backup is due). None means stop."""
+        with self._jobs_cv:
+            while not self._jobs:
+                if self._worker_stop:
+                    return None
+                self._jobs_cv.wait(timeout=self.SCHEDULE_CHECK_INTERVAL)
+                if self._jobs or self._worker_stop:
+                    continue
+                try:
+                    # Scheduled backups wait until no study is open (shift_end/manual
+                    # backups are requested explicitly)
+                    schedule = self.settings["backup"].get("backup_schedule", "shift_end")
+                    if schedule in ("hourly", "daily") and self.should_backup_now() and not self._is_throttled():
+                        self._jobs["backup"] = {"kind": "backup", "reasons": ["scheduled"], "force": False,
+                                                "deep": False, "paths": [], "callbacks": []}
+                except Exception as e:
+                    logger.debug(f"Backup schedule check failed: {e}")
+            _, job = self._jobs.popitem(last=False)
+            return job
+    
+    def _worker_loop(self):
+        while True:
+            job = self._next_job()
+            if job is None:
+                break
+            reason = ", ".join(job["reasons"])
+            try:
+                if job["kind"] == "verify_catalog":
+                    self.verify_backup_catalog(deep=job["deep"])
+                    result = {"success": True, "error": None}
+                elif job["kind"] == "delete":
+                    result = self._run_delete_job(job)
+                elif job["kind"] == "restore":
+                    result = self._run_restore_job(job)
+                else:
+                    result = self._run_backup_job(job, reason)
+            except Exception as e:
+                logger.error(f"Backup worker job '{job['kind']}' failed: {e}")
+                result = {"success": False, "error": str(e)}
+            
+            for callback in job["callbacks"]:
+                try:
+                    callback(result)
+                except Exception as e:
+                    logger.debug(f"Backup callback failed: {e}")
+            self._emit("finished", reason, kind=job["kind"], result=result)
+        logger.info("Backup worker stopped")
+    
+    def _run_delete_job(self, job: dict) -> dict:
+        """Delete the restore points of a queued delete job."""
+        result = {"success": True, "error": None, "deleted": [], "failed": {}}
+        for path in job["paths"]:
+            try:
+                if os.path.exists(path):
+                    self.delete_backup(path)
+                    logger.info(f"Backup deleted: {path}")
+                result["deleted"].append(path)
+            except Exception as e:
+                logger.error(f"Error deleting backup {path}: {e}")
+                result["failed"][path] = str(e)
+                result["success"] = False
+                result["error"] = result["error"] or str(e)
+        return result
+    
+    def _run_restore_job(self, job: dict) -> dict:
+        """Rebuild the restore point of a queued restore job into a local file."""
+        backup_path = job["paths"][-1]
+        result = {"success": False, "error": None, "path": backup_path, "source": None}
+        if not os.path.exists(backup_path):
+            result["error"] = "Backup file not found"
+            return result
+        if not backup_path.endswith(self.MANIFEST_EXTENSION):
+            # Full .db copies are restored as they are
+            result["success"] = True
+            result["source"] = backup_path
+            return result
+        
+        source = self._restore_source_path()
+        try:
+            self._materialize_backup(backup_path, source)
+            result["success"] = True
+            result["source"] = source
+        except Exception as e:
+            logger.error(f"Cannot rebuild backup {backup_path}: {e}")
+            result["error"] = f"Cannot rebuild backup: {e}"
+            if os.path.exists(source):
+                try: os.remove(source)
+                except: pass
+        return result
+    
+    def _run_backup_job(self, job: dict, reason: str) -> dict:
+        """Run one backup, retrying with backoff while the database is locked."""
+        self._emit("started", reason)
+        last_percent = [-1]
+        
+        def report(fraction):
+            percent = int(fraction * 100)
+            if percent != last_percent[0]:
+                last_percent[0] = percent
+                self._emit("progress", reason, percent=percent)
+        
+        delays = iter(self.LOCKED_RETRY_DELAYS)
+        while True:
+            result = self.create_backup(force=job["force"], progress=report)
+            if result["success"] or "locked" not in (result.get("error") or "").lower():
+                return result
+            delay = next(delays, None)
+            if delay is None:
+                return result
+            logger.info(f"Database locked during backup - retrying in {delay}s")
+            self._emit("retrying", reason, retry_in=delay)
+            with self._jobs_cv:
+                if self._jobs_cv.wait_for(lambda: self._worker_stop, timeout=delay):
+                    return result
 
     def create_github_backup(self):
         """Upload database backup to private GitHub repository.
@@ -365,20 +1146,22 @@ class BackupManager:
         retention = self.settings["backup"].get("backup_retention_count", 10)
         
         try:
-            # Get all backup files
+            # Get all backup files (full .db copies and incremental restore points)
             backup_files = []
             for f in os.listdir(backup_folder):
-                if f.startswith("rvu_records_") and f.endswith(".db"):
+                if f.startswith("rvu_records_") and (f.endswith(".db") or f.endswith(self.MANIFEST_EXTENSION)):
                     full_path = os.path.join(backup_folder, f)
-                    backup_files.append((full_path, os.path.getmtime(full_path)))
+                    backup_files.append((full_path, self._backup_sort_key(f, full_path)))
             
-            # Sort by modification time (newest first)
+            # Sort by the timestamp and sequence in the filename (newest first) - mtime
+            # changes when delete_backup rebases a child manifest onto a pruned parent
             backup_files.sort(key=lambda x: x[1], reverse=True)
             
-            # Remove files beyond retention limit
-            for old_file, _ in backup_files[retention:]:
+            # Remove files beyond retention limit (oldest first, so incremental
+            # restore points are folded forward into the ones that are kept)
+            for old_file, _ in reversed(backup_files[retention:]):
                 try:
-                    os.remove(old_file)
+                    self.delete_backup(old_file)
                     logger.info(f"Removed old backup: {old_file}")
                 except Exception as e:
                     logger.warning(f"Failed to remove old backup {old_file}: {e}")
@@ -389,6 +1172,10 @@ class BackupManager:
     def get_backup_history(self) -> List[dict]:
         """Get list of available backups.
         
+        Read from the backup catalog - only the folder listing is touched, no backup
+        is opened. Backups the catalog doesn't know yet are listed from their
+        filename and cataloged by a background rebuild.
+        
         Returns:
             List of dicts with backup info (path, timestamp, size, record_count)
         """
@@ -399,42 +1186,42 @@ class BackupManager:
         backups = []
         
         try:
-            for f in os.listdir(backup_folder):
-                if f.startswith("rvu_records_") and f.endswith(".db"):
-                    full_path = os.path.join(backup_folder, f)
-                    
-                    # Parse timestamp from filename
+            files = [f for f in os.listdir(backup_folder) if self._is_backup_file(f)]
+            catalog = self._load_catalog(backup_folder)
+            
+            for f in files:
+                full_path = os.path.join(backup_folder, f)
+                entry = catalog.get(f)
+                if entry:
                     try:
-                        timestamp_str = f.replace("rvu_records_", "").replace(".db", "")
-                        timestamp = datetime.strptime(timestamp_str, "%Y%m%d_%H%M%S")
+                        timestamp = datetime.fromisoformat(entry["timestamp"])
                     except:
-                        timestamp = datetime.fromtimestamp(os.path.getmtime(full_path))
-                    
-                    # Get file size
+                        timestamp = self._backup_timestamp(f, full_path)
+                    size = entry.get("size", 0)
+                else:
+                    # Not cataloged yet - stat only (doesn't download the file)
+                    entry = {}
+                    timestamp = self._backup_timestamp(f, full_path)
                     size = os.path.getsize(full_path)
-                    
-                    # Get record count (quick query)
-                    record_count = 0
-                    try:
-                        conn = sqlite3.connect(full_path)
-                        cursor = conn.execute("SELECT COUNT(*) FROM records")
-                        record_count = cursor.fetchone()[0]
-                        conn.close()
-                    except:
-                        pass
-                    
-                    backups.append({
-                        "path": full_path,
-                        "filename": f,
-                        "timestamp": timestamp,
-                        "size": size,
-                        "size_formatted": self._format_size(size),
-                        "record_count": record_count
-                    })
+                
+                backups.append({
+                    "path": full_path,
+                    "filename": f,
+                    "timestamp": timestamp,
+                    "size": size,
+                    "size_formatted": self._format_size(size),
+                    "record_count": entry.get("record_count", 0),
+                    "kind": entry.get("kind", "database"),
+                    "checksum": entry.get("checksum"),
+                    "shift_range": entry.get("shift_range"),
+                })
             
             # Sort by timestamp (newest first)
             backups.sort(key=lambda x: x["timestamp"], reverse=True)
             
+            if set(files) != set(catalog):
+                self._start_catalog_rebuild(backup_folder)
+            
         except Exception as e:
             logger.error(f"Error getting backup history: {e}")
         
@@ -455,7 +1242,9 @@ class BackupManager:
         Creates a pre-restore backup of current database first.
         
         Args:
-            backup_path: Path to the backup file to restore
+            backup_path: Path to the backup file to restore - a full .db copy, the
+                "source" rebuilt by request_restore, or an incremental restore point
+                (rebuilt from its chain on the calling thread)
             
         Returns:
             Dict with 'success', 'error', 'pre_restore_backup' keys
@@ -471,6 +1260,36 @@ class BackupManager:
             result["error"] = "Backup file not found"
             return result
         
+        # Rebuild incremental restore points into a local database file
+        materialized = None
+        if backup_path == self._restore_source_path():
+            # Already rebuilt by request_restore
+            materialized = backup_path
+        elif backup_path.endswith(self.MANIFEST_EXTENSION):
+            materialized = self._restore_source_path()
+            try:
+                self._materialize_backup(backup_path, materialized)
+            except Exception as e:
+                result["error"] = f"Cannot rebuild backup: {e}"
+                if os.path.exists(materialized):
+                    try: os.remove(materialized)
+                    except: pass
+                return result
+            backup_path = materialized
+        
+        try:
+            return self._restore_database_file(backup_path, result)
+        finally:
+            if materialized and os.path.exists(materialized):
+                try: os.remove(materialized)
+                except: pass
+    
+    def _restore_source_path(self) -> str:
+        """Local file an incremental restore point is rebuilt into."""
+        return self.db_path + ".restore_source"
+    
+    def _restore_database_file(self, backup_path: str, result: dict) -> dict:
+        """Replace the live database with a backup database file."""
         # Verify backup integrity
         try:
             conn = sqlite3.connect(backup_path)
@@ -497,8 +1316,11 @@ class BackupManager:
                 source_conn = sqlite3.connect(self.db_path)
                 dest_conn = sqlite3.connect(pre_restore_path)
                 source_conn.backup(dest_conn)
+                dest_conn.execute("PRAGMA journal_mode = DELETE")
                 dest_conn.close()
                 source_conn.close()
+                self._update_catalog(backup_folder, add={
+                    pre_restore_name: self._describe_backup(backup_folder, pre_restore_name)})
                 
                 result["pre_restore_backup"] = pre_restore_path
                 logger.info(f"Created pre-restore backup: {pre_restore_path}")
@@ -514,8 +1336,8 @@ class BackupManager:
             if self.data_manager and hasattr(self.data_manager, 'db') and self.data_manager.db:
                 try:
                     if self.data_manager.db.conn:
-                        self.data_manager.db.conn.close()
-                        self.data_manager.db.conn = None
+                        # Closes the writer and all per-thread readers (checkpoints the WAL)
+                        self.data_manager.db.close()
                         db_closed = True
                         logger.info("Closed database connection for restore")
                 except Exception as e:
@@ -549,12 +1371,24 @@ class BackupManager:
                         else:
                             raise
             
+            # Drop WAL sidecar files left from the old database so they aren't replayed
+            for suffix in ("-wal", "-shm"):
+                if os.path.exists(self.db_path + suffix):
+                    try:
+                        os.remove(self.db_path + suffix)
+                    except OSError as e:
+                        logger.warning(f"Could not remove {self.db_path + suffix}: {e}")
+            
             os.rename(temp_restore, self.db_path)
             
             # Reconnect database if we closed it
             if db_closed and self.data_manager and hasattr(self.data_manager, 'db'):
                 try:
                     self.data_manager.db._connect()
+                    # Backups from older versions lack the newer tables (hourly_rollup,
+                    # multi_accession_members, ...) - create and backfill them
+                    self.data_manager.db._create_tables()
+                    self.data_manager.db.invalidate_multi_accession_index()
                     logger.info("Reconnected to database after restore")
                 except Exception as e:
                     logger.warning(f"Error reconnecting to database: {e}")
@@ -4,6 +4,7 @@ import os
 import sys
 import json
 import yaml
+import hashlib
 import shutil
 import logging
 from datetime import datetime
@@ -28,6 +29,10 @@ from ..core.config import (
 )
 from .database import RecordsDatabase
 from .backup_manager import BackupManager
+from .shift_history import ShiftHistory
+from ..logic.study_matcher import rules_fingerprint, invalidate_classification_cache
+from ..logic.body_parts import build_body_part_mapping
+from ..models import as_study_record
 
 logger = logging.getLogger(__name__)
 
@@ -97,9 +102,40 @@ class RVUData:
             "shifts": self.records_data.get("shifts", [])
         }
         
+        # Fingerprints of what is on disk - YAML files are only rewritten when these change
+        self._rules_version = self._current_rules_version()
+        self._settings_version = self._fingerprint(self.settings_data)
+        self._sync_body_part_map()
+        
+        # (shift_start, db shift id) of the current shift, for write-through record persistence
+        self._db_current_shift = None
+        
         # Initialize cloud backup manager
         self.backup_manager = BackupManager(self.db_file, self.data, self)
     
+    @staticmethod
+    def _fingerprint(data) -> str:
+        """Content hash used for dirty tracking of the YAML files."""
+        payload = json.dumps(data, sort_keys=True, default=str)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+    
+    def _current_rules_version(self) -> str:
+        """Fingerprint of the in-memory RVU rules."""
+        return rules_fingerprint(
+            self.data.get("rvu_table", {}),
+            self.data.get("classification_rules", {}),
+            self.data.get("direct_lookups", {})
+        )
+    
+    def _sync_body_part_map(self):
+        """Compile the body part grouping from the current rules into the database."""
+        try:
+            mapping = build_body_part_mapping(self.data.get("rvu_table", {}).keys(),
+                                              self.rules_data.get("body_part_groups"))
+            self.db.replace_body_part_map(mapping)
+        except Exception as e:
+            logger.error(f"Error updating body part mapping: {e}")
+    
     def _migrate_json_to_sqlite(self):
         """Migrate data from JSON to SQLite if JSON exists and DB is empty."""
         # Check if JSON file exists and has data
@@ -138,9 +174,32 @@ class RVUData:
                 logger.error(f"Error during JSON to SQLite migration: {e}")
     
     def _load_records_from_db(self) -> dict:
-        """Load records from SQLite database into the legacy dict format."""
+        """Load records from SQLite database into the legacy dict format.
+        
+        Only the current shift's records are materialized. Historical shifts are a
+        ShiftHistory of headers whose records are read from SQLite on access, so
+        startup cost does not grow with the size of the history.
+        """
         try:
-            return self.db.export_to_json()
+            data = {
+                'records': self.db.get_legacy_records(),
+                'current_shift': {
+                    'shift_start': None,
+                    'shift_end': None,
+                    'records': []
+                },
+                'shifts': ShiftHistory(self.db)
+            }
+            current = self.db.get_current_shift()
+            if current:
+                data['current_shift'] = {
+                    'shift_start': current['shift_start'],
+                    'shift_end': current['shift_end'],
+                    'records': self.db.get_records_for_shift(current['id']),
+                    'effective_shift_start': current.get('effective_shift_start'),
+                    'projected_shift_end': current.get('projected_shift_end')
+                }
+            return data
         except Exception as e:
             logger.error(f"Error loading records from database: {e}")
             return {
@@ -497,21 +556,29 @@ class RVUData:
             if "shifts" in self.data:
                 self.records_data["shifts"] = self.data["shifts"]
         
-        # Save user settings file
-        try:
-            with open(self.user_settings_file, 'w', encoding='utf-8') as f:
-                yaml.safe_dump(self.settings_data, f, default_flow_style=False, sort_keys=False, allow_unicode=True)
-            logger.info(f"Saved user settings to {self.user_settings_file}")
-        except Exception as e:
-            logger.error(f"Error saving user settings: {e}")
-            
-        # Save rules file
-        try:
-            with open(self.rules_file, 'w', encoding='utf-8') as f:
-                yaml.safe_dump(self.rules_data, f, default_flow_style=False, sort_keys=False, allow_unicode=True)
-            logger.info(f"Saved rules to {self.rules_file}")
-        except Exception as e:
-            logger.error(f"Error saving rules: {e}")
+        # Save user settings file (only if changed since last load/save)
+        settings_version = self._fingerprint(self.settings_data)
+        if settings_version != self._settings_version:
+            try:
+                with open(self.user_settings_file, 'w', encoding='utf-8') as f:
+                    yaml.safe_dump(self.settings_data, f, default_flow_style=False, sort_keys=False, allow_unicode=True)
+                self._settings_version = settings_version
+                logger.info(f"Saved user settings to {self.user_settings_file}")
+            except Exception as e:
+                logger.error(f"Error saving user settings: {e}")
+        
+        # Save rules file (only if changed) and invalidate cached classifications
+        rules_version = self._current_rules_version()
+        if rules_version != self._rules_version:
+            try:
+                with open(self.rules_file, 'w', encoding='utf-8') as f:
+                    yaml.safe_dump(self.rules_data, f, default_flow_style=False, sort_keys=False, allow_unicode=True)
+                self._rules_version = rules_version
+                logger.info(f"Saved rules to {self.rules_file}")
+            except Exception as e:
+                logger.error(f"Error saving rules: {e}")
+            invalidate_classification_cache()
+            self._sync_body_part_map()
         
         # Save records to SQLite database (not JSON anymore)
         if save_records:
@@ -558,29 +625,107 @@ class RVUData:
             memory_records = current_shift_data.get("records", [])
             memory_accessions = set()
             
-            for record in memory_records:
-                accession = record.get('accession', '')
-                memory_accessions.add(accession)
+            # One transaction for the whole sync instead of a commit per record
+            with self.db.batch():
+                for record in memory_records:
+                    accession = record.get('accession', '')
+                    memory_accessions.add(accession)
+                    
+                    if accession in db_accessions:
+                        # Update existing record if needed
+                        db_rec = db_accessions[accession]
+                        # Check if duration changed (main update scenario)
+                        if record.get('duration_seconds', 0) != db_rec.get('duration_seconds', 0):
+                            self.db.update_record(db_rec['id'], record)
+                    else:
+                        # Add new record
+                        self.db.add_record(current_shift_id, record)
                 
-                if accession in db_accessions:
-                    # Update existing record if needed
-                    db_rec = db_accessions[accession]
-                    # Check if duration changed (main update scenario)
-                    if record.get('duration_seconds', 0) != db_rec.get('duration_seconds', 0):
-                        self.db.update_record(db_rec['id'], record)
-                else:
-                    # Add new record
-                    self.db.add_record(current_shift_id, record)
-            
-            # Delete records that were removed from memory
-            for accession, db_rec in db_accessions.items():
-                if accession not in memory_accessions:
-                    self.db.delete_record(db_rec['id'])
+                # Delete records that were removed from memory
+                removed_ids = [db_rec['id'] for accession, db_rec in db_accessions.items()
+                               if accession not in memory_accessions]
+                self.db.delete_records(removed_ids)
         
         elif db_current:
             # No shift in memory but DB has current shift - end it
             self.db.end_current_shift()
     
+    def _get_db_current_shift_id(self) -> Optional[int]:
+        """Return the database ID of the in-memory current shift, creating it if needed.
+        
+        Returns None when no shift is running (records are then kept in memory only,
+        matching _sync_to_database).
+        """
+        current_shift_data = self.data.get("current_shift", {})
+        shift_start = current_shift_data.get("shift_start")
+        if not shift_start:
+            return None
+        
+        if self._db_current_shift and self._db_current_shift[0] == shift_start:
+            return self._db_current_shift[1]
+        
+        db_current = self.db.get_current_shift()
+        if db_current:
+            shift_id = db_current['id']
+        else:
+            shift_id = self.db.start_shift(
+                shift_start=shift_start,
+                effective_shift_start=current_shift_data.get("effective_shift_start"),
+                projected_shift_end=current_shift_data.get("projected_shift_end")
+            )
+        self._db_current_shift = (shift_start, shift_id)
+        return shift_id
+    
+    def append_record(self, record: dict) -> Optional[int]:
+        """Add a new study to the current shift and write it through to SQLite.
+        
+        Costs a single INSERT - YAML files are not touched and the shift is not resynced.
+        
+        Returns:
+            The new record ID, or None if it was only kept in memory.
+        """
+        record = as_study_record(record)
+        self.data["current_shift"]["records"].append(record)
+        try:
+            shift_id = self._get_db_current_shift_id()
+            if shift_id is None or shift_id < 0:
+                return None
+            record_id = self.db.append_record(shift_id, record)
+            record["id"] = record_id
+            record["shift_id"] = shift_id
+            return record_id
+        except Exception as e:
+            logger.error(f"Error appending record to database: {e}")
+            return None
+    
+    def update_record_duration(self, record: dict):
+        """Write an updated duration (and re-read fields) of a current-shift record to SQLite."""
+        try:
+            shift_id = self._get_db_current_shift_id()
+            if shift_id is None or shift_id < 0:
+                return
+            record_id = record.get("id")
+            if record_id is None:
+                db_record = self.db.find_record_by_accession(shift_id, record.get("accession", ""))
+                if not db_record:
+                    # Not persisted yet - insert it instead
+                    record["id"] = self.db.append_record(shift_id, record)
+                    record["shift_id"] = shift_id
+                    return
+                record_id = db_record['id']
+                record["id"] = record_id
+            self.db.update_record_duration(
+                record_id,
+                record.get("duration_seconds", 0),
+                record.get("time_finished", ''),
+                procedure=record.get("procedure"),
+                patient_class=record.get("patient_class"),
+                study_type=record.get("study_type"),
+                rvu=record.get("rvu")
+            )
+        except Exception as e:
+            logger.error(f"Error updating record in database: {e}")
+    
     def end_current_shift(self):
         """End the current shift and move it to historical shifts."""
         if self.data["current_shift"]["shift_start"]:
@@ -590,6 +735,7 @@ class RVUData:
             
             # End in database as well
             self.db.end_current_shift(current_shift["shift_end"])
+            self._db_current_shift = None
             
             logger.info(f"Ended shift: {current_shift['shift_start']} to {current_shift['shift_end']}")
     
@@ -619,13 +765,16 @@ class RVUData:
         }
         self.records_data["shifts"] = []
         
-        # Clear the database completely
+        # Clear the database completely (one transaction under the writer lock, so it
+        # can't commit another thread's half-finished writes)
         try:
-            cursor = self.db.conn.cursor()
-            cursor.execute('DELETE FROM records')
-            cursor.execute('DELETE FROM shifts')
-            cursor.execute('DELETE FROM legacy_records')
-            self.db.conn.commit()
+            with self.db.batch() as conn:
+                cursor = conn.cursor()
+                cursor.execute('DELETE FROM records')
+                cursor.execute('DELETE FROM shifts')
+                cursor.execute('DELETE FROM legacy_records')
+                self.db.invalidate_multi_accession_index()
+            self._db_current_shift = None
             logger.info("Cleared all data from database")
         except Exception as e:
             logger.error(f"Error clearing database: {e}")
@@ -657,15 +806,17 @@ class RVUData:
             with open(filepath, 'r', encoding='utf-8') as f:
                 json_data = json.load(f)
             
-            # Clear current database
-            cursor = self.db.conn.cursor()
-            cursor.execute('DELETE FROM records')
-            cursor.execute('DELETE FROM shifts')
-            cursor.execute('DELETE FROM legacy_records')
-            self.db.conn.commit()
-            
-            # Import from JSON
-            self.db.migrate_from_json(json_data)
+            # Clear and re-import in one transaction - a failed import leaves the old data intact
+            with self.db.batch() as conn:
+                cursor = conn.cursor()
+                cursor.execute('DELETE FROM records')
+                cursor.execute('DELETE FROM shifts')
+                cursor.execute('DELETE FROM legacy_records')
+                self.db.invalidate_multi_accession_index()
+                
+                # Import from JSON
+                self.db.migrate_from_json(json_data)
+            self._db_current_shift = None
             
             # Reload into memory
             self.records_data = self._load_records_from_db()
@@ -686,27 +837,13 @@ class RVUData:
     def save_data(self, save_records=True):
         """Save user settings to file.
         
+        Goes through save() so the settings fingerprint stays in step with the file.
+        
         Args:
             save_records: Deprecated, kept for compatibility. Records are auto-saved to SQLite.
         """
-        try:
-            # Save user settings (preferences, window positions, compensation rates)
-            settings_to_save = {
-                "settings": self.data.get("settings", {}),
-                "window_positions": self.data.get("window_positions", {}),
-                "compensation_rates": self.data.get("compensation_rates", {}),
-                "backup": self.data.get("backup", {})
-            }
-            
-            with open(self.user_settings_file, 'w', encoding='utf-8') as f:
-                yaml.dump(settings_to_save, f, default_flow_style=False, allow_unicode=True)
-            
-            logger.info(f"Saved user settings to {self.user_settings_file}")
-            
-            # Records are automatically saved to SQLite database, no action needed here
-            
-        except Exception as e:
-            logger.error(f"Error saving user settings: {e}")
+        # Records are automatically saved to SQLite database, no action needed here
+        self.save(save_records=False)
     
     def close(self):
         """Close database connection. Call this when app exits."""
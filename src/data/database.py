@@ -3,20 +3,105 @@
 import sqlite3
 import json
 import logging
+import os
 import threading
-from datetime import datetime
-from typing import Dict, List, Optional
+from collections import namedtuple
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from itertools import chain, groupby, islice
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from ..models import StudyRecord
 
 logger = logging.getLogger(__name__)
 
+# Connection tuning (applied to the writer and every reader connection)
+SQLITE_BUSY_TIMEOUT_MS = 5000
+SQLITE_CACHE_SIZE_KB = 16 * 1024          # Page cache per connection
+SQLITE_MMAP_SIZE = 256 * 1024 * 1024      # Memory-mapped I/O window
+
+# Number of old multi-accession records rewritten per transaction during migration
+MIGRATION_BATCH_SIZE = 200
+
+# Most accessions kept in the Clario patient class cache (oldest lookups are dropped first)
+PATIENT_CLASS_CACHE_MAX_ENTRIES = 20000
+
+# One row of the hourly rollup: all records performed in the same clock hour (bucket,
+# "YYYY-MM-DDTHH") that share finish hour-of-day, study type and patient class.
+# finished_hour is -1 when time_finished can't be parsed.
+RollupRow = namedtuple('RollupRow', ['bucket', 'finished_hour', 'study_type', 'patient_class',
+                                     'count', 'rvu', 'duration', 'first_finished'])
+
+# SQL expressions that compute the rollup key from a records row ({r} = NEW / OLD / table alias)
+_ROLLUP_KEY_SQL = (
+    "substr(COALESCE({r}.time_performed, ''), 1, 13)",
+    "CASE WHEN {r}.time_finished GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9][T ][0-9][0-9]*' "
+    "THEN CAST(substr({r}.time_finished, 12, 2) AS INTEGER) ELSE -1 END",
+    "COALESCE({r}.study_type, '')",
+    "COALESCE({r}.patient_class, '')",
+)
+_ROLLUP_KEY_COLUMNS = ('bucket', 'finished_hour', 'study_type', 'patient_class')
+
+# Old-format multi-accession records (one row standing for several studies) that the
+# background migration hasn't split (yet). They are kept out of hourly_rollup so the
+# statistics can expand them per study ({r} = NEW / OLD / table alias)
+_OLD_MULTI_ACCESSION_SQL = (
+    "(COALESCE({r}.from_multi_accession, 0) = 0 AND ({r}.study_type LIKE 'Multiple %' "
+    "OR COALESCE({r}.individual_accessions, '') NOT IN ('', 'null', '[]') "
+    "OR COALESCE({r}.individual_study_types, '') NOT IN ('', 'null', '[]')))"
+)
+
+# Rollup triggers of databases created before old-format multi-accession records
+# were kept out of the rollup (dropped, and the rollup rebuilt, on open)
+_LEGACY_ROLLUP_TRIGGERS = ('trg_records_rollup_insert', 'trg_records_rollup_delete', 'trg_records_rollup_update')
+
+
+def _rollup_add_sql(r: str) -> str:
+    """Upsert adding one records row into hourly_rollup."""
+    key = [expr.format(r=r) for expr in _ROLLUP_KEY_SQL]
+    return f'''
+        INSERT INTO hourly_rollup (bucket, finished_hour, study_type, patient_class,
+                                   study_count, rvu_sum, duration_sum, first_finished)
+        VALUES ({", ".join(key)}, 1, COALESCE({r}.rvu, 0), COALESCE({r}.duration_seconds, 0), {r}.time_finished)
+        ON CONFLICT (bucket, finished_hour, study_type, patient_class) DO UPDATE SET
+            study_count = study_count + 1,
+            rvu_sum = rvu_sum + excluded.rvu_sum,
+            duration_sum = duration_sum + excluded.duration_sum,
+            first_finished = CASE WHEN first_finished IS NULL OR excluded.first_finished < first_finished
+                                  THEN excluded.first_finished ELSE first_finished END;
+    '''
+
+
+def _rollup_remove_sql(r: str) -> str:
+    """Statements removing one (already deleted/updated) records row from hourly_rollup."""
+    key = [expr.format(r=r) for expr in _ROLLUP_KEY_SQL]
+    match = " AND ".join(f"{col} = {expr}" for col, expr in zip(_ROLLUP_KEY_COLUMNS, key))
+    # Earliest finish among the rows still in the bucket (range scan on idx_records_time_performed)
+    same_key = " AND ".join(f"{expr.format(r='x')} = {k}" for expr, k in zip(_ROLLUP_KEY_SQL, key))
+    return f'''
+        UPDATE hourly_rollup SET
+            study_count = study_count - 1,
+            rvu_sum = rvu_sum - COALESCE({r}.rvu, 0),
+            duration_sum = duration_sum - COALESCE({r}.duration_seconds, 0),
+            first_finished = (SELECT MIN(x.time_finished) FROM records x
+                              WHERE x.time_performed >= {key[0]} AND x.time_performed < {key[0]} || '~'
+                              AND {same_key}
+                              AND NOT ({_OLD_MULTI_ACCESSION_SQL.format(r='x')}))
+        WHERE {match};
+        DELETE FROM hourly_rollup WHERE {match} AND study_count <= 0;
+    '''
+
+
 class RecordsDatabase:
     """SQLite database for storing study records and shifts.
     
     Provides fast querying and scales to hundreds of thousands of records.
     Replaces JSON file storage for records (settings remain in JSON).
     
-    Thread-safe: Uses a lock for all database operations since SQLite
-    connections are shared across threads (check_same_thread=False).
+    Thread-safe: the database runs in WAL mode with one writer connection
+    (self.conn, guarded by self._lock) and one read-only connection per thread,
+    so readers (statistics, backups, the poll loop) never wait on writes.
     """
     
     def __init__(self, db_path: str):
@@ -27,7 +112,19 @@ class RecordsDatabase:
         """
         self.db_path = db_path
         self.conn = None
-        self._lock = threading.Lock()  # Thread safety for database operations
+        # Serializes writes on the shared writer connection (re-entrant so write
+        # methods can be called inside batch())
+        self._lock = threading.RLock()
+        self._batch_depth = 0  # > 0 while inside batch(); commits are deferred
+        # Bumped after every commit on the writer connection. Readers use it as a
+        # data version, e.g. to key caches of query results (see mark_changed)
+        self.change_counter = 0
+        # Per-thread read-only connections, keyed by thread (see _read_connection)
+        self._readers: Dict[threading.Thread, sqlite3.Connection] = {}
+        self._readers_lock = threading.Lock()
+        # In-memory set of accessions recorded as part of a multi-accession study.
+        # Loaded from multi_accession_members on first use; None means "reload".
+        self._multi_accession_index: Optional[set] = None
         self._connect()
         self._create_tables()
         # Run migrations in background thread to avoid blocking startup
@@ -38,17 +135,87 @@ class RecordsDatabase:
         migration_thread.start()
     
     def _connect(self):
-        """Create database connection."""
+        """Create the writer connection and switch the database to WAL mode."""
         try:
-            self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self.conn = sqlite3.connect(self.db_path, check_same_thread=False,
+                                        timeout=SQLITE_BUSY_TIMEOUT_MS / 1000)
             self.conn.row_factory = sqlite3.Row  # Enable dict-like access
+            # WAL lets readers run concurrently with the writer; NORMAL sync is
+            # durable across application crashes and much cheaper than FULL
+            mode = self.conn.execute("PRAGMA journal_mode = WAL").fetchone()[0]
+            if str(mode).lower() != 'wal':
+                logger.warning(f"Could not enable WAL mode (journal_mode={mode})")
+            self.conn.execute("PRAGMA synchronous = NORMAL")
+            self._apply_pragmas(self.conn)
             # Enable foreign keys
             self.conn.execute("PRAGMA foreign_keys = ON")
+            # A reconnect may be to a different file (restore) - drop cached query results
+            self.change_counter += 1
             logger.info(f"Connected to SQLite database: {self.db_path}")
         except Exception as e:
             logger.error(f"Failed to connect to database: {e}")
             raise
     
+    @staticmethod
+    def _apply_pragmas(conn: sqlite3.Connection):
+        """Apply per-connection performance pragmas."""
+        conn.execute(f"PRAGMA busy_timeout = {SQLITE_BUSY_TIMEOUT_MS}")
+        conn.execute(f"PRAGMA cache_size = -{SQLITE_CACHE_SIZE_KB}")
+        conn.execute(f"PRAGMA mmap_size = {SQLITE_MMAP_SIZE}")
+        conn.execute("PRAGMA temp_store = MEMORY")
+    
+    def _read_connection(self) -> Optional[sqlite3.Connection]:
+        """Return the calling thread's read-only connection, opening it on first use.
+        
+        Falls back to the writer connection for in-memory databases (which can't
+        be shared between connections) or if a read-only connection can't be opened.
+        """
+        if not self.conn:
+            return None
+        if self.db_path == ':memory:':
+            return self.conn
+        
+        thread = threading.current_thread()
+        conn = self._readers.get(thread)
+        if conn is not None:
+            return conn
+        
+        try:
+            uri = Path(os.path.abspath(self.db_path)).as_uri() + '?mode=ro'
+            conn = sqlite3.connect(uri, uri=True, check_same_thread=False,
+                                   timeout=SQLITE_BUSY_TIMEOUT_MS / 1000)
+            conn.row_factory = sqlite3.Row
+            self._apply_pragmas(conn)
+            conn.execute("PRAGMA query_only = ON")
+        except Exception as e:
+            logger.warning(f"Could not open read-only connection, using writer: {e}")
+            return self.conn
+        
+        with self._readers_lock:
+            # Close connections left behind by threads that have exited
+            for dead in [t for t in self._readers if not t.is_alive()]:
+                try:
+                    self._readers.pop(dead).close()
+                except Exception:
+                    pass
+            self._readers[thread] = conn
+        return conn
+    
+    def read_cursor(self) -> sqlite3.Cursor:
+        """Cursor on the calling thread's read connection."""
+        return self._read_connection().cursor()
+    
+    def _close_readers(self):
+        """Close every per-thread read connection."""
+        with self._readers_lock:
+            readers = list(self._readers.values())
+            self._readers.clear()
+        for conn in readers:
+            try:
+                conn.close()
+            except Exception:
+                pass
+    
     def _create_tables(self):
         """Create database tables if they don't exist."""
         cursor = self.conn.cursor()
@@ -97,6 +264,104 @@ class RecordsDatabase:
             # Column already exists, ignore
             pass
         
+        # Add multi_accession_group column if it doesn't exist
+        try:
+            cursor.execute('ALTER TABLE records ADD COLUMN multi_accession_group TEXT')
+            logger.info("Added multi_accession_group column to records table")
+        except sqlite3.OperationalError:
+            # Column already exists, ignore
+            pass
+        
+        # Multi-accession membership index: one row per accession that was recorded as
+        # part of a multi-accession study (rows follow their record via ON DELETE CASCADE)
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'multi_accession_members'")
+        members_table_exists = cursor.fetchone() is not None
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS multi_accession_members (
+                record_id INTEGER NOT NULL,
+                accession TEXT NOT NULL,
+                group_id TEXT,
+                FOREIGN KEY (record_id) REFERENCES records(id) ON DELETE CASCADE
+            )
+        ''')
+        
+        # Hourly rollup of records for the statistics views, maintained by triggers
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'hourly_rollup'")
+        rollup_table_exists = cursor.fetchone() is not None
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS hourly_rollup (
+                bucket TEXT NOT NULL,
+                finished_hour INTEGER NOT NULL,
+                study_type TEXT NOT NULL,
+                patient_class TEXT NOT NULL,
+                study_count INTEGER NOT NULL DEFAULT 0,
+                rvu_sum REAL NOT NULL DEFAULT 0,
+                duration_sum REAL NOT NULL DEFAULT 0,
+                first_finished TEXT,
+                PRIMARY KEY (bucket, finished_hour, study_type, patient_class)
+            )
+        ''')
+        placeholders = ", ".join("?" * len(_LEGACY_ROLLUP_TRIGGERS))
+        cursor.execute(f"SELECT name FROM sqlite_master WHERE type = 'trigger' AND name IN ({placeholders})",
+                       _LEGACY_ROLLUP_TRIGGERS)
+        legacy_triggers = [row[0] for row in cursor.fetchall()]
+        for name in legacy_triggers:
+            cursor.execute(f'DROP TRIGGER {name}')
+        old_multi = {r: _OLD_MULTI_ACCESSION_SQL.format(r=r) for r in ('NEW', 'OLD')}
+        update_columns = ('time_performed, time_finished, study_type, patient_class, rvu, duration_seconds, '
+                          'individual_accessions, individual_study_types, from_multi_accession')
+        rollup_triggers = {
+            'trg_rollup_insert': f'''
+                CREATE TRIGGER IF NOT EXISTS trg_rollup_insert AFTER INSERT ON records
+                WHEN NOT {old_multi['NEW']}
+                BEGIN {_rollup_add_sql('NEW')} END
+            ''',
+            'trg_rollup_delete': f'''
+                CREATE TRIGGER IF NOT EXISTS trg_rollup_delete AFTER DELETE ON records
+                WHEN NOT {old_multi['OLD']}
+                BEGIN {_rollup_remove_sql('OLD')} END
+            ''',
+            'trg_rollup_update_old': f'''
+                CREATE TRIGGER IF NOT EXISTS trg_rollup_update_old AFTER UPDATE OF {update_columns} ON records
+                WHEN NOT {old_multi['OLD']}
+                BEGIN {_rollup_remove_sql('OLD')} END
+            ''',
+            'trg_rollup_update_new': f'''
+                CREATE TRIGGER IF NOT EXISTS trg_rollup_update_new AFTER UPDATE OF {update_columns} ON records
+                WHEN NOT {old_multi['NEW']}
+                BEGIN {_rollup_add_sql('NEW')} END
+            ''',
+        }
+        # Triggers created by an older version of this code are replaced (SQLite keeps
+        # the CREATE statement without "IF NOT EXISTS"), and the rollup rebuilt
+        stale_triggers = []
+        for name, sql in rollup_triggers.items():
+            cursor.execute("SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name = ?", (name,))
+            row = cursor.fetchone()
+            if row and row[0].strip() != sql.replace('IF NOT EXISTS ', '', 1).strip():
+                cursor.execute(f'DROP TRIGGER {name}')
+                stale_triggers.append(name)
+            cursor.execute(sql)
+        
+        # Body part group per study type, compiled from the RVU rules (see
+        # logic.body_parts); keyed by study type so views can look up or join on it
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS study_type_body_parts (
+                study_type TEXT PRIMARY KEY,
+                body_part TEXT NOT NULL
+            ) WITHOUT ROWID
+        ''')
+        
+        # Patient class read from Clario per accession, so a reopened or restarted
+        # study doesn't need another walk of the Clario page
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS clario_patient_class (
+                accession TEXT PRIMARY KEY,
+                patient_class TEXT NOT NULL,
+                updated_at TEXT NOT NULL
+            ) WITHOUT ROWID
+        ''')
+        
         # Legacy records table (records without a shift - for backwards compatibility)
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS legacy_records (
@@ -119,10 +384,113 @@ class RecordsDatabase:
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_records_time_performed ON records(time_performed)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_shifts_is_current ON shifts(is_current)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_shifts_shift_start ON shifts(shift_start)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_multi_accession_members_accession ON multi_accession_members(accession)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_multi_accession_members_record_id ON multi_accession_members(record_id)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_clario_patient_class_updated_at ON clario_patient_class(updated_at)')
+        # Partial index: the (few) old-format multi-accession records by time
+        cursor.execute(f'''
+            CREATE INDEX IF NOT EXISTS idx_records_old_multi_accession ON records(time_performed)
+            WHERE {_OLD_MULTI_ACCESSION_SQL.format(r='records')}
+        ''')
+        
+        if not members_table_exists:
+            self._backfill_multi_accession_members(cursor)
+        if not rollup_table_exists or legacy_triggers or stale_triggers:
+            self._rebuild_hourly_rollup(cursor)
         
-        self.conn.commit()
+        self._commit()
         logger.info("Database tables created/verified")
     
+    @staticmethod
+    def _multi_accession_members_for(record: dict) -> List[tuple]:
+        """Return (accession, group_id) pairs a record contributes to the multi-accession index.
+        
+        Handles both the new format (from_multi_accession on individual records) and the
+        old format (one record with individual_accessions / comma-separated accession).
+        """
+        group_id = record.get('multi_accession_group')
+        if record.get('from_multi_accession'):
+            accession = record.get('accession', '')
+            return [(accession, group_id)] if accession else []
+        
+        individual_accessions = record.get('individual_accessions') or []
+        accession_str = record.get('accession', '') or ''
+        if not individual_accessions and not record.get('is_multi_accession') and ',' not in accession_str:
+            return []
+        members = set(str(acc).strip() for acc in individual_accessions)
+        members.update(acc.strip() for acc in accession_str.split(','))
+        members.discard('')
+        return [(acc, group_id) for acc in sorted(members)]
+    
+    def _insert_multi_accession_members(self, cursor, record_id: int, record: dict):
+        """Add a record's multi-accession members to the index (caller holds the transaction)."""
+        members = self._multi_accession_members_for(record)
+        if not members:
+            return
+        cursor.executemany(
+            'INSERT INTO multi_accession_members (record_id, accession, group_id) VALUES (?, ?, ?)',
+            [(record_id, accession, group_id) for accession, group_id in members]
+        )
+        if self._multi_accession_index is not None:
+            self._multi_accession_index.update(accession for accession, _ in members)
+    
+    def _backfill_multi_accession_members(self, cursor):
+        """Populate multi_accession_members from existing records (runs once, when the table is created)."""
+        cursor.execute('''
+            SELECT id, accession, from_multi_accession, multi_accession_group, individual_accessions
+            FROM records
+            WHERE from_multi_accession = 1 OR individual_accessions IS NOT NULL OR accession LIKE '%,%'
+        ''')
+        count = 0
+        for row in cursor.fetchall():
+            record = {
+                'accession': row['accession'],
+                'from_multi_accession': bool(row['from_multi_accession']),
+                'multi_accession_group': row['multi_accession_group'],
+            }
+            if row['individual_accessions']:
+                try:
+                    record['individual_accessions'] = json.loads(row['individual_accessions'])
+                except:
+                    pass
+            members = self._multi_accession_members_for(record)
+            cursor.executemany(
+                'INSERT INTO multi_accession_members (record_id, accession, group_id) VALUES (?, ?, ?)',
+                [(row['id'], accession, group_id) for accession, group_id in members]
+            )
+            count += len(members)
+        logger.info(f"Built multi-accession index with {count} accessions")
+    
+    def invalidate_multi_accession_index(self):
+        """Drop the in-memory accession set so it is reloaded on next lookup.
+        
+        Deletes cascade through multi_accession_members, so after any delete the
+        in-memory copy is simply re-read from the (small, indexed) table.
+        """
+        with self._lock:
+            self._multi_accession_index = None
+    
+    def is_multi_accession_member(self, accession: str) -> bool:
+        """True if the accession was recorded as part of a multi-accession study (any shift).
+        
+        The set is (re)loaded under the writer lock from the writer connection, so
+        no insert can land between the load and publishing it, and rows written
+        inside an open batch() are included.
+        """
+        if not accession:
+            return False
+        index = self._multi_accession_index
+        if index is None:
+            with self._lock:
+                index = self._multi_accession_index
+                if index is None:
+                    if not self.conn:
+                        return False
+                    cursor = self.conn.execute('SELECT DISTINCT accession FROM multi_accession_members')
+                    index = set(row[0] for row in cursor.fetchall())
+                    self._multi_accession_index = index
+        return accession in index
+    
     def _migrate_multi_accession_records(self):
         """Migrate old multi-accession records to individual records.
         
@@ -130,169 +498,170 @@ class RecordsDatabase:
         into separate individual records, then deletes the old multi-accession record.
         """
         try:
-            with self._lock:
-                if not self.conn:
-                    return
-                
-                cursor = self.conn.cursor()
-                
-                # Find all records with individual data (old multi-accession format)
-                # Check for records that have individual_accessions populated (JSON string)
-                # OR records with study_type starting with "Multiple"
-                # EXCLUDE records that are already individual records (from_multi_accession = 1)
-                cursor.execute('''
-                    SELECT * FROM records 
-                    WHERE ((individual_accessions IS NOT NULL 
-                      AND individual_accessions != ''
-                      AND individual_accessions != 'null'
-                      AND individual_accessions != '[]')
-                    OR study_type LIKE 'Multiple %')
-                    AND (from_multi_accession IS NULL OR from_multi_accession = 0)
-                ''')
-                
-                multi_accession_records = cursor.fetchall()
-                
-                if not multi_accession_records:
-                    logger.debug("No multi-accession records found to migrate")
-                    return  # No migration needed
-                
-                logger.info(f"Found {len(multi_accession_records)} multi-accession records to migrate")
-                
-                # Pre-build a set of existing accessions for fast lookup (much faster than querying each time)
-                logger.info("Building existing accessions index for fast duplicate checking...")
-                cursor.execute('SELECT shift_id, accession FROM records')
-                existing_accessions = {}  # {(shift_id, accession): True}
-                for row in cursor.fetchall():
-                    existing_accessions[(row['shift_id'], row['accession'])] = True
-                logger.info(f"Indexed {len(existing_accessions)} existing records for duplicate checking")
-                
-                migrated_count = 0
-                processed_count = 0
-                for row_idx, row in enumerate(multi_accession_records):
-                    processed_count += 1
-                    if processed_count % 10 == 0:
-                        logger.info(f"Migration progress: {processed_count}/{len(multi_accession_records)} records processed...")
-                    
-                    record = self._record_row_to_dict(row)
-                    shift_id = row['shift_id']
-                    old_record_id = row['id']
-                    
-                    # Parse individual data (these are JSON strings in the database)
-                    individual_procedures = record.get('individual_procedures', [])
-                    individual_study_types = record.get('individual_study_types', [])
-                    individual_rvus = record.get('individual_rvus', [])
-                    individual_accessions = record.get('individual_accessions', [])
-                    
-                    # If no individual_accessions but study_type is "Multiple X", try to extract from accession field
-                    if not individual_accessions or len(individual_accessions) == 0:
-                        # Check if study_type indicates multiple (e.g., "Multiple XR")
-                        study_type = record.get('study_type', '')
-                        if study_type.startswith('Multiple '):
-                            # Try to parse accession field - might be comma-separated
-                            accession_str = record.get('accession', '')
-                            if accession_str and ',' in accession_str:
-                                individual_accessions = [acc.strip() for acc in accession_str.split(',')]
-                                logger.info(f"Extracted {len(individual_accessions)} accessions from comma-separated accession field for record {old_record_id}")
+            # Read phase runs on this thread's read connection so the scan doesn't
+            # hold the writer lock; each record's rewrite takes the lock briefly
+            read_conn = self._read_connection()
+            if read_conn is None:
+                return
+            cursor = read_conn.cursor()
+            
+            # Find all records with individual data (old multi-accession format)
+            # Check for records that have individual_accessions populated (JSON string)
+            # OR records with study_type starting with "Multiple"
+            # EXCLUDE records that are already individual records (from_multi_accession = 1)
+            cursor.execute('''
+                SELECT * FROM records 
+                WHERE ((individual_accessions IS NOT NULL 
+                  AND individual_accessions != ''
+                  AND individual_accessions != 'null'
+                  AND individual_accessions != '[]')
+                OR study_type LIKE 'Multiple %')
+                AND (from_multi_accession IS NULL OR from_multi_accession = 0)
+            ''')
+            
+            multi_accession_records = cursor.fetchall()
+            
+            if not multi_accession_records:
+                logger.debug("No multi-accession records found to migrate")
+                return  # No migration needed
+            
+            logger.info(f"Found {len(multi_accession_records)} multi-accession records to migrate")
+            
+            # Pre-build a set of existing accessions for fast lookup (much faster than querying each time)
+            logger.info("Building existing accessions index for fast duplicate checking...")
+            cursor.execute('SELECT shift_id, accession FROM records')
+            existing_accessions = {}  # {(shift_id, accession): True}
+            for row in cursor.fetchall():
+                existing_accessions[(row['shift_id'], row['accession'])] = True
+            logger.info(f"Indexed {len(existing_accessions)} existing records for duplicate checking")
+            
+            migrated_count = 0
+            processed_count = 0
+            for batch_start in range(0, len(multi_accession_records), MIGRATION_BATCH_SIZE):
+                # One transaction per batch; the writer lock is only held while a batch is written
+                with self.batch():
+                    cursor = self.conn.cursor()
+                    for row in multi_accession_records[batch_start:batch_start + MIGRATION_BATCH_SIZE]:
+                        processed_count += 1
+                        if processed_count % 10 == 0:
+                            logger.info(f"Migration progress: {processed_count}/{len(multi_accession_records)} records processed...")
+                        
+                        record = self._record_row_to_dict(row)
+                        shift_id = row['shift_id']
+                        old_record_id = row['id']
                         
+                        # Parse individual data (these are JSON strings in the database)
+                        individual_procedures = record.get('individual_procedures', [])
+                        individual_study_types = record.get('individual_study_types', [])
+                        individual_rvus = record.get('individual_rvus', [])
+                        individual_accessions = record.get('individual_accessions', [])
+                        
+                        # If no individual_accessions but study_type is "Multiple X", try to extract from accession field
                         if not individual_accessions or len(individual_accessions) == 0:
-                            # Can't migrate this record - delete it since it's a broken multi-accession record
-                            cursor.execute('DELETE FROM records WHERE id = ?', (old_record_id,))
-                            self.conn.commit()
-                            logger.info(f"Deleted unmigrateable multi-accession record {old_record_id} (study_type: {study_type}, no individual accessions)")
-                            continue
-                    
-                    logger.info(f"Processing multi-accession record {old_record_id} ({processed_count}/{len(multi_accession_records)}) with {len(individual_accessions)} accessions")
-                    
-                    # Calculate duration per study
-                    total_duration = record.get('duration_seconds', 0)
-                    num_studies = len(individual_accessions)
-                    duration_per_study = total_duration / num_studies if num_studies > 0 else 0
-                    
-                    # Batch insert individual records for better performance
-                    records_to_insert = []
-                    for i, accession in enumerate(individual_accessions):
-                        # Fast duplicate check using pre-built index
-                        if (shift_id, accession) in existing_accessions:
-                            logger.debug(f"Skipping {accession} - already exists as individual record")
-                            continue
+                            # Check if study_type indicates multiple (e.g., "Multiple XR")
+                            study_type = record.get('study_type', '')
+                            if study_type.startswith('Multiple '):
+                                # Try to parse accession field - might be comma-separated
+                                accession_str = record.get('accession', '')
+                                if accession_str and ',' in accession_str:
+                                    individual_accessions = [acc.strip() for acc in accession_str.split(',')]
+                                    logger.info(f"Extracted {len(individual_accessions)} accessions from comma-separated accession field for record {old_record_id}")
                         
-                        # Get corresponding data
-                        procedure = individual_procedures[i] if i < len(individual_procedures) else record.get('procedure', 'Unknown')
-                        study_type = individual_study_types[i] if i < len(individual_study_types) else record.get('study_type', 'Unknown')
-                        rvu = individual_rvus[i] if i < len(individual_rvus) else (record.get('rvu', 0) / num_studies if num_studies > 0 else 0)
+                            if not individual_accessions or len(individual_accessions) == 0:
+                                # Can't migrate this record - delete it since it's a broken multi-accession record
+                                cursor.execute('DELETE FROM records WHERE id = ?', (old_record_id,))
+                                logger.info(f"Deleted unmigrateable multi-accession record {old_record_id} (study_type: {study_type}, no individual accessions)")
+                                continue
                         
-                        # Create new individual record
-                        individual_record = {
-                            'accession': accession,
-                            'procedure': procedure,
-                            'patient_class': record.get('patient_class', ''),
-                            'study_type': study_type,
-                            'rvu': rvu,
-                            'time_performed': record.get('time_performed', ''),
-                            'time_finished': record.get('time_finished', ''),
-                            'duration_seconds': duration_per_study,
-                            'from_multi_accession': True,  # Mark as from multi-accession
-                        }
+                        logger.info(f"Processing multi-accession record {old_record_id} ({processed_count}/{len(multi_accession_records)}) with {len(individual_accessions)} accessions")
                         
-                        records_to_insert.append(individual_record)
-                        # Add to index so we don't create duplicates within this migration
-                        existing_accessions[(shift_id, accession)] = True
-                    
-                    # Batch insert all records for this multi-accession study using direct SQL (much faster)
-                    if records_to_insert:
-                        # Use direct SQL INSERT for batch operations (faster than add_record which commits each time)
-                        for individual_record in records_to_insert:
-                            cursor.execute('''
-                                INSERT INTO records (shift_id, accession, procedure, patient_class, study_type,
-                                                   rvu, time_performed, time_finished, duration_seconds,
-                                individual_procedures, individual_study_types, 
-                                individual_rvus, individual_accessions, from_multi_accession)
-                                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                            ''', (
-                                shift_id,
-                                individual_record.get('accession', ''),
-                                individual_record.get('procedure', ''),
-                                individual_record.get('patient_class', ''),
-                                individual_record.get('study_type', ''),
-                                individual_record.get('rvu', 0),
-                                individual_record.get('time_performed', ''),
-                                individual_record.get('time_finished', ''),
-                                individual_record.get('duration_seconds', 0),
-                                None,  # Don't set individual_* fields for migrated records
-                                None,
-                                None,
-                                None,
-                                1,  # Mark as from_multi_accession
-                            ))
+                        # Calculate duration per study
+                        total_duration = record.get('duration_seconds', 0)
+                        num_studies = len(individual_accessions)
+                        duration_per_study = total_duration / num_studies if num_studies > 0 else 0
                         
-                        created_count = len(records_to_insert)
+                        # Batch insert individual records for better performance
+                        records_to_insert = []
+                        for i, accession in enumerate(individual_accessions):
+                            # Fast duplicate check using pre-built index
+                            if (shift_id, accession) in existing_accessions:
+                                logger.debug(f"Skipping {accession} - already exists as individual record")
+                                continue
                         
-                        # Delete the old multi-accession record
-                        delete_result = cursor.execute('DELETE FROM records WHERE id = ?', (old_record_id,))
-                        deleted_rows = cursor.rowcount
-                        migrated_count += 1
+                            # Get corresponding data
+                            procedure = individual_procedures[i] if i < len(individual_procedures) else record.get('procedure', 'Unknown')
+                            study_type = individual_study_types[i] if i < len(individual_study_types) else record.get('study_type', 'Unknown')
+                            rvu = individual_rvus[i] if i < len(individual_rvus) else (record.get('rvu', 0) / num_studies if num_studies > 0 else 0)
                         
-                        # Commit after each multi-accession record (batch commit is faster than per-record commits)
-                        self.conn.commit()
-                        if deleted_rows > 0:
-                            logger.info(f"Migrated multi-accession record {old_record_id}: created {created_count} individual records, deleted old record (rows deleted: {deleted_rows})")
-                        else:
-                            logger.warning(f"Migrated multi-accession record {old_record_id}: created {created_count} individual records, but DELETE returned 0 rows (record may not exist)")
-                    else:
-                        # Even if no new records were created (all already exist), delete the old multi-accession record
-                        # The individual records already exist, so the multi-accession record is redundant
-                        delete_result = cursor.execute('DELETE FROM records WHERE id = ?', (old_record_id,))
-                        deleted_rows = cursor.rowcount
-                        self.conn.commit()
-                        if deleted_rows > 0:
-                            logger.info(f"Deleted multi-accession record {old_record_id}: all individual records already exist, no migration needed (rows deleted: {deleted_rows})")
+                            # Create new individual record
+                            individual_record = {
+                                'accession': accession,
+                                'procedure': procedure,
+                                'patient_class': record.get('patient_class', ''),
+                                'study_type': study_type,
+                                'rvu': rvu,
+                                'time_performed': record.get('time_performed', ''),
+                                'time_finished': record.get('time_finished', ''),
+                                'duration_seconds': duration_per_study,
+                                'from_multi_accession': True,  # Mark as from multi-accession
+                            }
+                        
+                            records_to_insert.append(individual_record)
+                            # Add to index so we don't create duplicates within this migration
+                            existing_accessions[(shift_id, accession)] = True
+                        
+                        # Batch insert all records for this multi-accession study using direct SQL (much faster)
+                        if records_to_insert:
+                            # Use direct SQL INSERT for batch operations (faster than add_record which commits each time)
+                            for individual_record in records_to_insert:
+                                cursor.execute('''
+                                    INSERT INTO records (shift_id, accession, procedure, patient_class, study_type,
+                                                       rvu, time_performed, time_finished, duration_seconds,
+                                    individual_procedures, individual_study_types, 
+                                    individual_rvus, individual_accessions, from_multi_accession)
+                                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                                ''', (
+                                    shift_id,
+                                    individual_record.get('accession', ''),
+                                    individual_record.get('procedure', ''),
+                                    individual_record.get('patient_class', ''),
+                                    individual_record.get('study_type', ''),
+                                    individual_record.get('rvu', 0),
+                                    individual_record.get('time_performed', ''),
+                                    individual_record.get('time_finished', ''),
+                                    individual_record.get('duration_seconds', 0),
+                                    None,  # Don't set individual_* fields for migrated records
+                                    None,
+                                    None,
+                                    None,
+                                    1,  # Mark as from_multi_accession
+                                ))
+                                self._insert_multi_accession_members(cursor, cursor.lastrowid, individual_record)
+                        
+                            created_count = len(records_to_insert)
+                        
+                            # Delete the old multi-accession record
+                            delete_result = cursor.execute('DELETE FROM records WHERE id = ?', (old_record_id,))
+                            deleted_rows = cursor.rowcount
+                            migrated_count += 1
+                            if deleted_rows > 0:
+                                logger.info(f"Migrated multi-accession record {old_record_id}: created {created_count} individual records, deleted old record (rows deleted: {deleted_rows})")
+                            else:
+                                logger.warning(f"Migrated multi-accession record {old_record_id}: created {created_count} individual records, but DELETE returned 0 rows (record may not exist)")
                         else:
-                            logger.warning(f"Attempted to delete multi-accession record {old_record_id} but DELETE returned 0 rows (record may not exist)")
-                
-                # Final commit
-                self.conn.commit()
-                logger.info(f"Migration complete: processed {len(multi_accession_records)} multi-accession records, migrated {migrated_count}")
-                
+                            # Even if no new records were created (all already exist), delete the old multi-accession record
+                            # The individual records already exist, so the multi-accession record is redundant
+                            delete_result = cursor.execute('DELETE FROM records WHERE id = ?', (old_record_id,))
+                            deleted_rows = cursor.rowcount
+                            if deleted_rows > 0:
+                                logger.info(f"Deleted multi-accession record {old_record_id}: all individual records already exist, no migration needed (rows deleted: {deleted_rows})")
+                            else:
+                                logger.warning(f"Attempted to delete multi-accession record {old_record_id} but DELETE returned 0 rows (record may not exist)")
+        
+            # Old records were deleted - their index rows went with them
+            self.invalidate_multi_accession_index()
+            logger.info(f"Migration complete: processed {len(multi_accession_records)} multi-accession records, migrated {migrated_count}")
+            
         except Exception as e:
             logger.error(f"Error migrating multi-accession records: {e}", exc_info=True)
     
@@ -343,7 +712,7 @@ class RecordsDatabase:
                                 logger.info(f"Fixed record {record_id}: XR Other -> XR Chest (procedure: {record.get('procedure', '')})")
                 
                 if fixed_count > 0:
-                    self.conn.commit()
+                    self._commit()
                     logger.info(f"Fixed {fixed_count} incorrectly categorized studies")
                 else:
                     logger.debug("No incorrectly categorized studies found")
@@ -352,28 +721,268 @@ class RecordsDatabase:
             logger.error(f"Error fixing incorrectly categorized studies: {e}", exc_info=True)
     
     def close(self):
-        """Close database connection."""
+        """Close the writer and all reader connections."""
+        self._close_readers()
         with self._lock:
             if self.conn:
                 self.conn.close()
                 self.conn = None
                 logger.info("Database connection closed")
     
+    def _commit(self):
+        """Commit the writer connection unless a batch() transaction is open."""
+        if self._batch_depth == 0:
+            self.conn.commit()
+            self.change_counter += 1
+    
+    def mark_changed(self):
+        """Bump change_counter after writing through the raw connection.
+        
+        Write methods on this class do this themselves; callers that commit their
+        own SQL on self.conn must call it so cached query results are dropped.
+        """
+        self.change_counter += 1
+    
+    @contextmanager
+    def batch(self):
+        """Group many writes into one transaction (one commit / fsync).
+        
+        Holds the writer lock for the duration. Write methods called inside the
+        block skip their own commit; the batch commits on exit, or rolls back
+        everything if an exception escapes. Batches may be nested.
+        
+        Usage:
+            with db.batch():
+                for record in records:
+                    db.add_record(shift_id, record)
+        """
+        with self._lock:
+            if not self.conn:
+                raise sqlite3.ProgrammingError("Database is closed")
+            self._batch_depth += 1
+            try:
+                yield self.conn
+            except BaseException:
+                self._batch_depth -= 1
+                if self._batch_depth == 0:
+                    self.conn.rollback()
+                    # Rolled-back inserts may already be in the in-memory index
+                    self.invalidate_multi_accession_index()
+                raise
+            else:
+                self._batch_depth -= 1
+                if self._batch_depth == 0:
+                    self.conn.commit()
+                    self.change_counter += 1
+    
+    def backup_to(self, dest_path: str):
+        """Copy the database to dest_path using SQLite's online backup API.
+        
+        Reads through this thread's read-only connection, so writers are not
+        blocked while the copy runs. The copy is switched out of WAL mode so it
+        is a single self-contained file.
+        """
+        source_conn = self._read_connection()
+        if source_conn is None:
+            raise sqlite3.OperationalError("Database is closed")
+        dest_conn = sqlite3.connect(dest_path)
+        try:
+            source_conn.backup(dest_conn)
+            dest_conn.execute("PRAGMA journal_mode = DELETE")
+        finally:
+            dest_conn.close()
+    
     # =========================================================================
-    # Shift Operations
+    # Hourly Rollup (pre-aggregated statistics)
     # =========================================================================
     
-    def get_current_shift(self) -> Optional[dict]:
-        """Get the current active shift."""
+    def _rebuild_hourly_rollup(self, cursor):
+        """Recompute hourly_rollup from the records table (caller commits)."""
+        key = ", ".join(expr.format(r='r') for expr in _ROLLUP_KEY_SQL)
+        cursor.execute('DELETE FROM hourly_rollup')
+        cursor.execute(f'''
+            INSERT INTO hourly_rollup (bucket, finished_hour, study_type, patient_class,
+                                       study_count, rvu_sum, duration_sum, first_finished)
+            SELECT {key}, COUNT(*), SUM(COALESCE(r.rvu, 0)), SUM(COALESCE(r.duration_seconds, 0)),
+                   MIN(r.time_finished)
+            FROM records r
+            WHERE NOT {_OLD_MULTI_ACCESSION_SQL.format(r='r')}
+            GROUP BY 1, 2, 3, 4
+        ''')
+        logger.info(f"Built hourly rollup ({cursor.rowcount} buckets)")
+    
+    def rebuild_hourly_rollup(self):
+        """Recompute the hourly rollup from scratch (it is normally maintained by triggers)."""
+        with self.batch():
+            self._rebuild_hourly_rollup(self.conn.cursor())
+    
+    def get_rollup_in_range(self, start_date: str, end_date: str) -> List[RollupRow]:
+        """Get aggregated RollupRows for records with start_date <= time_performed <= end_date.
+        
+        Whole hours inside the range come straight from hourly_rollup; only the
+        partial hours at either end are aggregated from raw records, so the cost
+        doesn't grow with the length of the range. Old-format multi-accession
+        records are left out (see get_old_multi_accession_records_in_range);
+        together the two match what get_records_in_date_range would give for
+        the same bounds.
+        """
+        try:
+            first_full = (datetime.fromisoformat(start_date).replace(minute=0, second=0, microsecond=0)
+                          + timedelta(hours=1)).strftime('%Y-%m-%dT%H')
+            last_partial = datetime.fromisoformat(end_date).strftime('%Y-%m-%dT%H')
+        except (TypeError, ValueError):
+            first_full = last_partial = None
+        
+        key = ", ".join(expr.format(r='r') for expr in _ROLLUP_KEY_SQL)
+        raw_sql = f'''
+            SELECT {key}, COUNT(*), SUM(COALESCE(r.rvu, 0)), SUM(COALESCE(r.duration_seconds, 0)),
+                   MIN(r.time_finished)
+            FROM records r
+            WHERE ({{where}}) AND NOT {_OLD_MULTI_ACCESSION_SQL.format(r='r')}
+            GROUP BY 1, 2, 3, 4
+        '''
+        cursor = self.read_cursor()
+        cursor.row_factory = None
+        if first_full is None or first_full >= last_partial:
+            # Short (or unparseable) range - aggregate the raw records
+            cursor.execute(raw_sql.format(where='r.time_performed >= ? AND r.time_performed <= ?'),
+                           (start_date, end_date))
+            return [RollupRow(*row) for row in cursor.fetchall()]
+        
+        # Partial hours at both ends from raw records...
+        cursor.execute(raw_sql.format(
+            where='(r.time_performed >= ? AND r.time_performed < ?) '
+                  'OR (r.time_performed >= ? AND r.time_performed <= ?)'),
+            (start_date, first_full, last_partial, end_date))
+        rows = [RollupRow(*row) for row in cursor.fetchall()]
+        # ...and every whole hour in between from the rollup
+        cursor.execute('''
+            SELECT bucket, finished_hour, study_type, patient_class,
+                   study_count, rvu_sum, duration_sum, first_finished
+            FROM hourly_rollup
+            WHERE bucket >= ? AND bucket < ?
+        ''', (first_full, last_partial))
+        rows.extend(RollupRow(*row) for row in cursor.fetchall())
+        return rows
+    
+    def get_old_multi_accession_records_in_range(self, start_date: str, end_date: str) -> List[StudyRecord]:
+        """Old-format multi-accession records with start_date <= time_performed <= end_date.
+        
+        These are not in the hourly rollup. Each is flagged is_multi_accession with
+        its accession_count, so the statistics can expand it into one study per
+        accession.
+        """
+        cursor = self.read_cursor()
+        cursor.execute(f'''
+            SELECT * FROM records
+            WHERE time_performed >= ? AND time_performed <= ?
+              AND {_OLD_MULTI_ACCESSION_SQL.format(r='records')}
+            ORDER BY time_performed ASC
+        ''', (start_date, end_date))
+        records = []
+        for row in cursor.fetchall():
+            record = self._record_row_to_dict(row)
+            accession_count = (len(record.get('individual_accessions') or [])
+                               or len(record.get('individual_study_types') or [])
+                               or len([acc for acc in (record.get('accession') or '').split(',') if acc.strip()]))
+            record['is_multi_accession'] = True
+            record['accession_count'] = max(accession_count, 1)
+            records.append(record)
+        return records
+    
+    # =========================================================================
+    # Body Part Mapping
+    # =========================================================================
+    
+    def get_body_part_map(self) -> Dict[str, str]:
+        """Get the stored study_type -> body part group mapping."""
+        cursor = self.read_cursor()
+        cursor.row_factory = None
+        cursor.execute('SELECT study_type, body_part FROM study_type_body_parts')
+        return dict(cursor.fetchall())
+    
+    def replace_body_part_map(self, mapping: Dict[str, str]) -> bool:
+        """Store a freshly compiled body part mapping, replacing the old one.
+        
+        Nothing is written when the stored mapping is already identical.
+        
+        Returns:
+            True if the table was rewritten
+        """
+        with self._lock:
+            cursor = self.conn.cursor()
+            cursor.execute('SELECT study_type, body_part FROM study_type_body_parts')
+            if {row[0]: row[1] for row in cursor.fetchall()} == mapping:
+                return False
+            cursor.execute('DELETE FROM study_type_body_parts')
+            cursor.executemany('INSERT INTO study_type_body_parts (study_type, body_part) VALUES (?, ?)',
+                               list(mapping.items()))
+            self._commit()
+        logger.info(f"Stored body part mapping for {len(mapping)} study types")
+        return True
+    
+    # =========================================================================
+    # Clario Patient Class Cache
+    # =========================================================================
+    
+    def get_patient_classes(self, accessions: List[str]) -> Dict[str, str]:
+        """Cached Clario patient class of each of accessions that has one."""
+        accessions = [acc for acc in accessions if acc]
+        if not accessions:
+            return {}
+        cursor = self.read_cursor()
+        cursor.row_factory = None
+        placeholders = ", ".join("?" * len(accessions))
+        cursor.execute(f'SELECT accession, patient_class FROM clario_patient_class WHERE accession IN ({placeholders})',
+                       accessions)
+        return dict(cursor.fetchall())
+    
+    def store_patient_class(self, accessions: List[str], patient_class: str):
+        """Cache the Clario patient class of a study's accessions.
+        
+        The table is trimmed to PATIENT_CLASS_CACHE_MAX_ENTRIES, dropping the
+        least recently stored accessions. Not record data, so change_counter
+        (and the statistics caches keyed on it) is left alone.
+        """
+        accessions = [acc for acc in accessions if acc]
+        if not accessions or not patient_class:
+            return
+        now = datetime.now().isoformat()
         with self._lock:
             if not self.conn:
-                return None
+                return
             cursor = self.conn.cursor()
-            cursor.execute('SELECT * FROM shifts WHERE is_current = 1 LIMIT 1')
-            row = cursor.fetchone()
-            if row:
-                return self._shift_row_to_dict(row)
+            cursor.executemany('''
+                INSERT INTO clario_patient_class (accession, patient_class, updated_at) VALUES (?, ?, ?)
+                ON CONFLICT (accession) DO UPDATE SET
+                    patient_class = excluded.patient_class,
+                    updated_at = excluded.updated_at
+            ''', [(acc, patient_class, now) for acc in accessions])
+            excess = cursor.execute('SELECT COUNT(*) FROM clario_patient_class').fetchone()[0] \
+                - PATIENT_CLASS_CACHE_MAX_ENTRIES
+            if excess > 0:
+                cursor.execute('''
+                    DELETE FROM clario_patient_class WHERE accession IN (
+                        SELECT accession FROM clario_patient_class ORDER BY updated_at LIMIT ?)
+                ''', (excess,))
+            if self._batch_depth == 0:
+                self.conn.commit()
+    
+    # =========================================================================
+    # Shift Operations
+    # =========================================================================
+    
+    def get_current_shift(self) -> Optional[dict]:
+        """Get the current active shift."""
+        conn = self._read_connection()
+        if conn is None:
             return None
+        cursor = conn.cursor()
+        cursor.execute('SELECT * FROM shifts WHERE is_current = 1 LIMIT 1')
+        row = cursor.fetchone()
+        if row:
+            return self._shift_row_to_dict(row)
+        return None
     
     def start_shift(self, shift_start: str, effective_shift_start: str = None, 
                    projected_shift_end: str = None) -> int:
@@ -389,7 +998,7 @@ class RecordsDatabase:
                 INSERT INTO shifts (shift_start, is_current, effective_shift_start, projected_shift_end)
                 VALUES (?, 1, ?, ?)
             ''', (shift_start, effective_shift_start, projected_shift_end))
-            self.conn.commit()
+            self._commit()
             
             shift_id = cursor.lastrowid
             logger.info(f"Started new shift: ID={shift_id}, start={shift_start}")
@@ -409,22 +1018,65 @@ class RecordsDatabase:
                 cursor.execute('''
                     UPDATE shifts SET shift_end = ?, is_current = 0 WHERE is_current = 1
                 ''', (shift_end,))
-                self.conn.commit()
+                self._commit()
             logger.info(f"Ended shift: ID={current['id']}, end={shift_end}")
             return current['id']
         return None
     
     def get_all_shifts(self) -> List[dict]:
         """Get all historical shifts (not including current)."""
-        cursor = self.conn.cursor()
+        cursor = self.read_cursor()
         cursor.execute('''
             SELECT * FROM shifts WHERE is_current = 0 ORDER BY shift_start DESC
         ''')
         return [self._shift_row_to_dict(row) for row in cursor.fetchall()]
     
+    def get_shift_headers(self) -> List[dict]:
+        """Get all historical shifts with record count and total RVU, without their records.
+        
+        Single aggregate query - used for the lazy in-memory shift history.
+        """
+        conn = self._read_connection()
+        if conn is None:
+            return []
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT s.*, COUNT(r.id) AS record_count, COALESCE(SUM(r.rvu), 0) AS total_rvu
+            FROM shifts s
+            LEFT JOIN records r ON r.shift_id = s.id
+            WHERE s.is_current = 0
+            GROUP BY s.id
+            ORDER BY s.shift_start DESC
+        ''')
+        headers = []
+        for row in cursor.fetchall():
+            header = self._shift_row_to_dict(row)
+            header['record_count'] = row['record_count']
+            header['total_rvu'] = row['total_rvu']
+            headers.append(header)
+        return headers
+    
+    def get_shift_totals(self, shift_id: int) -> Tuple[int, float]:
+        """(record count, total RVU) of one shift - refreshes a lazy shift header."""
+        cursor = self.read_cursor()
+        cursor.execute('SELECT COUNT(id), COALESCE(SUM(rvu), 0) FROM records WHERE shift_id = ?', (shift_id,))
+        record_count, total_rvu = cursor.fetchone()
+        return record_count, total_rvu
+    
+    def count_shifts_in_range(self, start_date: str, end_date: str) -> int:
+        """Number of historical shifts with at least one record performed within the range."""
+        cursor = self.read_cursor()
+        cursor.execute('''
+            SELECT COUNT(DISTINCT s.shift_start)
+            FROM records r
+            JOIN shifts s ON r.shift_id = s.id
+            WHERE s.is_current = 0 AND r.time_performed >= ? AND r.time_performed <= ?
+        ''', (start_date, end_date))
+        return cursor.fetchone()[0]
+    
     def get_shift_by_id(self, shift_id: int) -> Optional[dict]:
         """Get a specific shift by ID."""
-        cursor = self.conn.cursor()
+        cursor = self.read_cursor()
         cursor.execute('SELECT * FROM shifts WHERE id = ?', (shift_id,))
         row = cursor.fetchone()
         if row:
@@ -433,20 +1085,23 @@ class RecordsDatabase:
     
     def delete_shift(self, shift_id: int):
         """Delete a shift and all its records."""
-        cursor = self.conn.cursor()
-        cursor.execute('DELETE FROM shifts WHERE id = ?', (shift_id,))
-        self.conn.commit()
+        with self._lock:
+            cursor = self.conn.cursor()
+            cursor.execute('DELETE FROM shifts WHERE id = ?', (shift_id,))
+            self._commit()
+        self.invalidate_multi_accession_index()
         logger.info(f"Deleted shift: ID={shift_id}")
     
     def update_current_shift_times(self, effective_shift_start: str = None, 
                                    projected_shift_end: str = None):
         """Update the effective start and projected end times for current shift."""
-        cursor = self.conn.cursor()
-        cursor.execute('''
-            UPDATE shifts SET effective_shift_start = ?, projected_shift_end = ?
-            WHERE is_current = 1
-        ''', (effective_shift_start, projected_shift_end))
-        self.conn.commit()
+        with self._lock:
+            cursor = self.conn.cursor()
+            cursor.execute('''
+                UPDATE shifts SET effective_shift_start = ?, projected_shift_end = ?
+                WHERE is_current = 1
+            ''', (effective_shift_start, projected_shift_end))
+            self._commit()
     
     def _shift_row_to_dict(self, row) -> dict:
         """Convert a shift database row to a dictionary."""
@@ -463,21 +1118,114 @@ class RecordsDatabase:
     # Record Operations
     # =========================================================================
     
+    _INSERT_RECORD_SQL = '''
+        INSERT INTO records (shift_id, accession, procedure, patient_class, study_type,
+                           rvu, time_performed, time_finished, duration_seconds,
+                           individual_procedures, individual_study_types, 
+                           individual_rvus, individual_accessions,
+                           from_multi_accession, multi_accession_group)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    '''
+    
+    @staticmethod
+    def _record_insert_params(shift_id: int, record: dict) -> tuple:
+        """Parameters for _INSERT_RECORD_SQL."""
+        return (
+            shift_id,
+            record.get('accession', ''),
+            record.get('procedure', ''),
+            record.get('patient_class', ''),
+            record.get('study_type', ''),
+            record.get('rvu', 0),
+            record.get('time_performed', ''),
+            record.get('time_finished', ''),
+            record.get('duration_seconds', 0),
+            json.dumps(record.get('individual_procedures')) if record.get('individual_procedures') else None,
+            json.dumps(record.get('individual_study_types')) if record.get('individual_study_types') else None,
+            json.dumps(record.get('individual_rvus')) if record.get('individual_rvus') else None,
+            json.dumps(record.get('individual_accessions')) if record.get('individual_accessions') else None,
+            1 if record.get('from_multi_accession') else 0,
+            record.get('multi_accession_group'),
+        )
+    
     def add_record(self, shift_id: int, record: dict) -> int:
         """Add a record to a shift. Returns the record ID."""
         with self._lock:
             if not self.conn:
                 return -1
             cursor = self.conn.cursor()
+            cursor.execute(self._INSERT_RECORD_SQL, self._record_insert_params(shift_id, record))
+            record_id = cursor.lastrowid
+            self._insert_multi_accession_members(cursor, record_id, record)
+            self._commit()
+            return record_id
+    
+    def append_record(self, shift_id: int, record: dict) -> int:
+        """Insert a single new record in its own transaction. Returns the record ID.
+        
+        Write-through counterpart to the in-memory current shift: one INSERT,
+        one commit, no re-read of the shift.
+        """
+        return self.add_record(shift_id, record)
+    
+    def add_records(self, shift_id: int, records: List[dict]) -> int:
+        """Insert many records into a shift in one transaction. Returns the number inserted.
+        
+        Plain records go through a single executemany; records that belong to a
+        multi-accession study are inserted individually so their index rows can
+        reference the new record ID.
+        """
+        plain = []
+        grouped = []
+        for record in records:
+            (grouped if self._multi_accession_members_for(record) else plain).append(record)
+        
+        with self.batch():
+            cursor = self.conn.cursor()
+            if plain:
+                cursor.executemany(self._INSERT_RECORD_SQL,
+                                   [self._record_insert_params(shift_id, r) for r in plain])
+            for record in grouped:
+                cursor.execute(self._INSERT_RECORD_SQL, self._record_insert_params(shift_id, record))
+                self._insert_multi_accession_members(cursor, cursor.lastrowid, record)
+        return len(records)
+    
+    def update_record_duration(self, record_id: int, duration_seconds: float, time_finished: str,
+                               procedure: str = None, patient_class: str = None,
+                               study_type: str = None, rvu: float = None):
+        """Update the duration (and optionally re-read fields) of one record in one transaction.
+        
+        Used when a study is reopened and read for longer than before. Optional
+        fields are only written when provided.
+        """
+        assignments = ['duration_seconds = ?', 'time_finished = ?']
+        params = [duration_seconds, time_finished]
+        for column, value in (('procedure', procedure), ('patient_class', patient_class),
+                              ('study_type', study_type), ('rvu', rvu)):
+            if value is not None:
+                assignments.append(f'{column} = ?')
+                params.append(value)
+        params.append(record_id)
+        
+        with self._lock:
+            if not self.conn:
+                return
+            cursor = self.conn.cursor()
+            cursor.execute(f'UPDATE records SET {", ".join(assignments)} WHERE id = ?', params)
+            self._commit()
+    
+    def update_record(self, record_id: int, record: dict):
+        """Update an existing record."""
+        with self._lock:
+            cursor = self.conn.cursor()
             cursor.execute('''
-                INSERT INTO records (shift_id, accession, procedure, patient_class, study_type,
-                                   rvu, time_performed, time_finished, duration_seconds,
-                                   individual_procedures, individual_study_types, 
-                                   individual_rvus, individual_accessions)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                UPDATE records SET
+                    procedure = ?, patient_class = ?, study_type = ?, rvu = ?,
+                    time_performed = ?, time_finished = ?, duration_seconds = ?,
+                    individual_procedures = ?, individual_study_types = ?,
+                    individual_rvus = ?, individual_accessions = ?
+                WHERE id = ?
             ''', (
-                shift_id,
-                record.get('accession', ''),
                 record.get('procedure', ''),
                 record.get('patient_class', ''),
                 record.get('study_type', ''),
@@ -489,35 +1237,14 @@ class RecordsDatabase:
                 json.dumps(record.get('individual_study_types')) if record.get('individual_study_types') else None,
                 json.dumps(record.get('individual_rvus')) if record.get('individual_rvus') else None,
                 json.dumps(record.get('individual_accessions')) if record.get('individual_accessions') else None,
+                record_id
             ))
-            self.conn.commit()
-            return cursor.lastrowid
-    
-    def update_record(self, record_id: int, record: dict):
-        """Update an existing record."""
-        cursor = self.conn.cursor()
-        cursor.execute('''
-            UPDATE records SET
-                procedure = ?, patient_class = ?, study_type = ?, rvu = ?,
-                time_performed = ?, time_finished = ?, duration_seconds = ?,
-                individual_procedures = ?, individual_study_types = ?,
-                individual_rvus = ?, individual_accessions = ?
-            WHERE id = ?
-        ''', (
-            record.get('procedure', ''),
-            record.get('patient_class', ''),
-            record.get('study_type', ''),
-            record.get('rvu', 0),
-            record.get('time_performed', ''),
-            record.get('time_finished', ''),
-            record.get('duration_seconds', 0),
-            json.dumps(record.get('individual_procedures')) if record.get('individual_procedures') else None,
-            json.dumps(record.get('individual_study_types')) if record.get('individual_study_types') else None,
-            json.dumps(record.get('individual_rvus')) if record.get('individual_rvus') else None,
-            json.dumps(record.get('individual_accessions')) if record.get('individual_accessions') else None,
-            record_id
-        ))
-        self.conn.commit()
+            if self._multi_accession_members_for(record):
+                # Re-index in case the accession list changed
+                cursor.execute('DELETE FROM multi_accession_members WHERE record_id = ?', (record_id,))
+                self.invalidate_multi_accession_index()
+                self._insert_multi_accession_members(cursor, record_id, record)
+            self._commit()
     
     def delete_record(self, record_id: int):
         """Delete a record by ID."""
@@ -526,48 +1253,79 @@ class RecordsDatabase:
                 return
             cursor = self.conn.cursor()
             cursor.execute('DELETE FROM records WHERE id = ?', (record_id,))
-            self.conn.commit()
+            self._commit()
+        self.invalidate_multi_accession_index()
         logger.debug(f"Deleted record: ID={record_id}")
     
     def delete_record_by_accession(self, shift_id: int, accession: str):
         """Delete a record by accession within a shift."""
-        cursor = self.conn.cursor()
-        cursor.execute('DELETE FROM records WHERE shift_id = ? AND accession = ?', 
-                      (shift_id, accession))
-        self.conn.commit()
+        with self._lock:
+            cursor = self.conn.cursor()
+            cursor.execute('DELETE FROM records WHERE shift_id = ? AND accession = ?', 
+                          (shift_id, accession))
+            self._commit()
+        self.invalidate_multi_accession_index()
+    
+    def delete_records(self, record_ids: List[int]) -> int:
+        """Delete many records by ID in one transaction. Returns the number deleted."""
+        if not record_ids:
+            return 0
+        with self.batch():
+            cursor = self.conn.cursor()
+            cursor.executemany('DELETE FROM records WHERE id = ?', [(rid,) for rid in record_ids])
+        self.invalidate_multi_accession_index()
+        logger.debug(f"Deleted {len(record_ids)} records")
+        return len(record_ids)
+    
+    def update_classifications(self, updates: List[tuple]) -> int:
+        """Set study_type and rvu on many records in one transaction.
+        
+        Args:
+            updates: (record_id, study_type, rvu) tuples
+        
+        Returns:
+            Number of records updated
+        """
+        if not updates:
+            return 0
+        with self.batch():
+            cursor = self.conn.cursor()
+            cursor.executemany('UPDATE records SET study_type = ?, rvu = ? WHERE id = ?',
+                               [(study_type, rvu, record_id) for record_id, study_type, rvu in updates])
+        return len(updates)
     
-    def get_records_for_shift(self, shift_id: int) -> List[dict]:
+    def get_records_for_shift(self, shift_id: int) -> List[StudyRecord]:
         """Get all records for a specific shift."""
-        cursor = self.conn.cursor()
+        cursor = self.read_cursor()
         cursor.execute('''
             SELECT * FROM records WHERE shift_id = ? ORDER BY time_performed ASC
         ''', (shift_id,))
         return [self._record_row_to_dict(row) for row in cursor.fetchall()]
     
-    def get_current_shift_records(self) -> List[dict]:
+    def get_current_shift_records(self) -> List[StudyRecord]:
         """Get records for the current active shift."""
         current = self.get_current_shift()
         if current:
             return self.get_records_for_shift(current['id'])
         return []
     
-    def find_record_by_accession(self, shift_id: int, accession: str) -> Optional[dict]:
+    def find_record_by_accession(self, shift_id: int, accession: str) -> Optional[StudyRecord]:
         """Find a record by accession within a shift."""
-        with self._lock:
-            if not self.conn:
-                return None
-            cursor = self.conn.cursor()
-            cursor.execute('''
-                SELECT * FROM records WHERE shift_id = ? AND accession = ? LIMIT 1
-            ''', (shift_id, accession))
-            row = cursor.fetchone()
-            if row:
-                return self._record_row_to_dict(row)
+        conn = self._read_connection()
+        if conn is None:
             return None
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT * FROM records WHERE shift_id = ? AND accession = ? LIMIT 1
+        ''', (shift_id, accession))
+        row = cursor.fetchone()
+        if row:
+            return self._record_row_to_dict(row)
+        return None
     
-    def get_records_in_date_range(self, start_date: str, end_date: str) -> List[dict]:
+    def get_records_in_date_range(self, start_date: str, end_date: str) -> List[StudyRecord]:
         """Get all records within a date range."""
-        cursor = self.conn.cursor()
+        cursor = self.read_cursor()
         cursor.execute('''
             SELECT r.*, s.shift_start, s.shift_end 
             FROM records r
@@ -577,9 +1335,9 @@ class RecordsDatabase:
         ''', (start_date, end_date))
         return [self._record_row_to_dict(row) for row in cursor.fetchall()]
     
-    def get_all_records(self) -> List[dict]:
+    def get_all_records(self) -> List[StudyRecord]:
         """Get all records from all shifts."""
-        cursor = self.conn.cursor()
+        cursor = self.read_cursor()
         cursor.execute('''
             SELECT r.*, s.shift_start, s.shift_end
             FROM records r
@@ -588,9 +1346,9 @@ class RecordsDatabase:
         ''')
         return [self._record_row_to_dict(row) for row in cursor.fetchall()]
     
-    def _record_row_to_dict(self, row) -> dict:
-        """Convert a record database row to a dictionary."""
-        record = {
+    def _record_row_to_dict(self, row) -> StudyRecord:
+        """Convert a record database row to a StudyRecord (a dict with cached timestamps)."""
+        record = StudyRecord({
             'id': row['id'],
             'shift_id': row['shift_id'],
             'accession': row['accession'],
@@ -601,7 +1359,7 @@ class RecordsDatabase:
             'time_performed': row['time_performed'],
             'time_finished': row['time_finished'],
             'duration_seconds': row['duration_seconds'],
-        }
+        })
         
         # Parse JSON fields for multi-accession studies
         if row['individual_procedures']:
@@ -625,20 +1383,28 @@ class RecordsDatabase:
             except:
                 pass
         
+        # Multi-accession membership (only present on individual records from a group)
+        if row['from_multi_accession']:
+            record['from_multi_accession'] = True
+            if row['multi_accession_group']:
+                record['multi_accession_group'] = row['multi_accession_group']
+        
         return record
     
     # =========================================================================
     # Legacy Records (records without shifts - for backwards compatibility)
     # =========================================================================
     
-    def add_legacy_record(self, record: dict) -> int:
-        """Add a legacy record (not associated with a shift)."""
-        cursor = self.conn.cursor()
-        cursor.execute('''
-            INSERT INTO legacy_records (accession, procedure, patient_class, study_type,
-                                       rvu, time_performed, time_finished, duration_seconds)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
+    _INSERT_LEGACY_RECORD_SQL = '''
+        INSERT INTO legacy_records (accession, procedure, patient_class, study_type,
+                                   rvu, time_performed, time_finished, duration_seconds)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    '''
+    
+    @staticmethod
+    def _legacy_record_params(record: dict) -> tuple:
+        """Parameters for _INSERT_LEGACY_RECORD_SQL."""
+        return (
             record.get('accession', ''),
             record.get('procedure', ''),
             record.get('patient_class', ''),
@@ -647,13 +1413,28 @@ class RecordsDatabase:
             record.get('time_performed', ''),
             record.get('time_finished', ''),
             record.get('duration_seconds', 0),
-        ))
-        self.conn.commit()
-        return cursor.lastrowid
+        )
+    
+    def add_legacy_record(self, record: dict) -> int:
+        """Add a legacy record (not associated with a shift)."""
+        with self._lock:
+            cursor = self.conn.cursor()
+            cursor.execute(self._INSERT_LEGACY_RECORD_SQL, self._legacy_record_params(record))
+            self._commit()
+            return cursor.lastrowid
+    
+    def add_legacy_records(self, records: List[dict]) -> int:
+        """Insert many legacy records in one transaction. Returns the number inserted."""
+        if not records:
+            return 0
+        with self.batch():
+            self.conn.executemany(self._INSERT_LEGACY_RECORD_SQL,
+                                  [self._legacy_record_params(r) for r in records])
+        return len(records)
     
     def get_legacy_records(self) -> List[dict]:
         """Get all legacy records."""
-        cursor = self.conn.cursor()
+        cursor = self.read_cursor()
         cursor.execute('SELECT * FROM legacy_records ORDER BY time_performed DESC')
         return [dict(row) for row in cursor.fetchall()]
     
@@ -663,20 +1444,20 @@ class RecordsDatabase:
     
     def get_total_rvu_for_shift(self, shift_id: int) -> float:
         """Get total RVU for a shift."""
-        cursor = self.conn.cursor()
+        cursor = self.read_cursor()
         cursor.execute('SELECT SUM(rvu) FROM records WHERE shift_id = ?', (shift_id,))
         result = cursor.fetchone()[0]
         return result if result else 0.0
     
     def get_record_count_for_shift(self, shift_id: int) -> int:
         """Get total number of records for a shift."""
-        cursor = self.conn.cursor()
+        cursor = self.read_cursor()
         cursor.execute('SELECT COUNT(*) FROM records WHERE shift_id = ?', (shift_id,))
         return cursor.fetchone()[0]
     
     def get_stats_by_study_type(self, shift_id: int = None) -> dict:
         """Get RVU and count statistics grouped by study type."""
-        cursor = self.conn.cursor()
+        cursor = self.read_cursor()
         if shift_id:
             cursor.execute('''
                 SELECT study_type, SUM(rvu) as total_rvu, COUNT(*) as count
@@ -699,62 +1480,58 @@ class RecordsDatabase:
     def migrate_from_json(self, json_data: dict):
         """Migrate data from JSON format to SQLite.
         
+        Runs as a single transaction (one commit for the whole import), with
+        records inserted per shift through executemany.
+        
         Args:
             json_data: Dictionary containing 'records', 'current_shift', and 'shifts'
         """
         logger.info("Starting migration from JSON to SQLite...")
         
-        # Migrate legacy records
-        legacy_records = json_data.get('records', [])
-        for record in legacy_records:
-            self.add_legacy_record(record)
-        logger.info(f"Migrated {len(legacy_records)} legacy records")
-        
-        # Migrate historical shifts
-        shifts = json_data.get('shifts', [])
-        for shift_data in shifts:
-            cursor = self.conn.cursor()
-            cursor.execute('''
-                INSERT INTO shifts (shift_start, shift_end, is_current, 
-                                   effective_shift_start, projected_shift_end)
-                VALUES (?, ?, 0, ?, ?)
-            ''', (
-                shift_data.get('shift_start'),
-                shift_data.get('shift_end'),
-                shift_data.get('effective_shift_start'),
-                shift_data.get('projected_shift_end')
-            ))
-            shift_id = cursor.lastrowid
+        with self.batch():
+            # Migrate legacy records
+            legacy_records = json_data.get('records', [])
+            self.add_legacy_records(legacy_records)
+            logger.info(f"Migrated {len(legacy_records)} legacy records")
             
-            # Add records for this shift
-            for record in shift_data.get('records', []):
-                record_copy = record.copy()
-                self.add_record(shift_id, record_copy)
-            
-            self.conn.commit()
-        logger.info(f"Migrated {len(shifts)} historical shifts")
-        
-        # Migrate current shift
-        current_shift = json_data.get('current_shift', {})
-        if current_shift.get('shift_start') or current_shift.get('records'):
-            cursor = self.conn.cursor()
-            cursor.execute('''
-                INSERT INTO shifts (shift_start, shift_end, is_current,
-                                   effective_shift_start, projected_shift_end)
-                VALUES (?, ?, 1, ?, ?)
-            ''', (
-                current_shift.get('shift_start'),
-                current_shift.get('shift_end'),
-                current_shift.get('effective_shift_start'),
-                current_shift.get('projected_shift_end')
-            ))
-            shift_id = cursor.lastrowid
-            
-            for record in current_shift.get('records', []):
-                self.add_record(shift_id, record)
+            # Migrate historical shifts
+            shifts = json_data.get('shifts', [])
+            for shift_data in shifts:
+                cursor = self.conn.cursor()
+                cursor.execute('''
+                    INSERT INTO shifts (shift_start, shift_end, is_current, 
+                                       effective_shift_start, projected_shift_end)
+                    VALUES (?, ?, 0, ?, ?)
+                ''', (
+                    shift_data.get('shift_start'),
+                    shift_data.get('shift_end'),
+                    shift_data.get('effective_shift_start'),
+                    shift_data.get('projected_shift_end')
+                ))
+                shift_id = cursor.lastrowid
+                
+                # Add records for this shift
+                self.add_records(shift_id, shift_data.get('records', []))
+            logger.info(f"Migrated {len(shifts)} historical shifts")
             
-            self.conn.commit()
-            logger.info(f"Migrated current shift with {len(current_shift.get('records', []))} records")
+            # Migrate current shift
+            current_shift = json_data.get('current_shift', {})
+            if current_shift.get('shift_start') or current_shift.get('records'):
+                cursor = self.conn.cursor()
+                cursor.execute('''
+                    INSERT INTO shifts (shift_start, shift_end, is_current,
+                                       effective_shift_start, projected_shift_end)
+                    VALUES (?, ?, 1, ?, ?)
+                ''', (
+                    current_shift.get('shift_start'),
+                    current_shift.get('shift_end'),
+                    current_shift.get('effective_shift_start'),
+                    current_shift.get('projected_shift_end')
+                ))
+                shift_id = cursor.lastrowid
+                
+                self.add_records(shift_id, current_shift.get('records', []))
+                logger.info(f"Migrated current shift with {len(current_shift.get('records', []))} records")
         
         logger.info("JSON to SQLite migration complete!")
     
@@ -762,6 +1539,64 @@ class RecordsDatabase:
     # Export to JSON (for backups and compatibility)
     # =========================================================================
     
+    # Column order used by the streaming export query (after the six shift columns)
+    _EXPORT_RECORD_FIELDS = ('id', 'shift_id', 'accession', 'procedure', 'patient_class', 'study_type',
+                             'rvu', 'time_performed', 'time_finished', 'duration_seconds')
+    _EXPORT_JSON_FIELDS = ('individual_procedures', 'individual_study_types',
+                           'individual_rvus', 'individual_accessions')
+    
+    def _iter_export_shifts(self):
+        """Stream all shifts with their records using one ordered JOIN.
+        
+        Yields (shift_dict, records_iterator) pairs; the current shift comes first,
+        then historical shifts newest first. Records are converted as rows stream
+        from the cursor, so the whole database is never held in memory.
+        """
+        cursor = self.read_cursor()
+        cursor.row_factory = None  # Plain tuples - much faster than sqlite3.Row for bulk reads
+        cursor.execute('''
+            SELECT s.id, s.shift_start, s.shift_end, s.is_current,
+                   s.effective_shift_start, s.projected_shift_end,
+                   r.id, r.shift_id, r.accession, r.procedure, r.patient_class, r.study_type,
+                   r.rvu, r.time_performed, r.time_finished, r.duration_seconds,
+                   r.individual_procedures, r.individual_study_types,
+                   r.individual_rvus, r.individual_accessions,
+                   r.from_multi_accession, r.multi_accession_group
+            FROM shifts s
+            LEFT JOIN records r ON r.shift_id = s.id
+            ORDER BY s.is_current DESC, s.shift_start DESC, s.id, r.time_performed ASC
+        ''')
+        record_fields = self._EXPORT_RECORD_FIELDS
+        json_fields = self._EXPORT_JSON_FIELDS
+        
+        def to_record(row) -> dict:
+            record = dict(zip(record_fields, row[6:16]))
+            # Parse JSON fields for multi-accession studies (same rules as _record_row_to_dict)
+            for field, value in zip(json_fields, row[16:20]):
+                if value:
+                    try:
+                        record[field] = json.loads(value)
+                    except:
+                        pass
+            if row[20]:
+                record['from_multi_accession'] = True
+                if row[21]:
+                    record['multi_accession_group'] = row[21]
+            return record
+        
+        for _, group in groupby(cursor, key=lambda row: row[0]):
+            first = next(group)
+            shift = {
+                'shift_start': first[1],
+                'shift_end': first[2],
+                'is_current': bool(first[3]),
+                'effective_shift_start': first[4],
+                'projected_shift_end': first[5],
+            }
+            # LEFT JOIN yields one row with NULL record columns for empty shifts
+            records = (to_record(row) for row in chain((first,), group) if row[6] is not None)
+            yield shift, records
+    
     def export_to_json(self) -> dict:
         """Export all data to JSON format (for backups)."""
         data = {
@@ -774,36 +1609,81 @@ class RecordsDatabase:
             'shifts': []
         }
         
-        # Get current shift
-        current = self.get_current_shift()
-        if current:
-            data['current_shift'] = {
-                'shift_start': current['shift_start'],
-                'shift_end': current['shift_end'],
-                'records': self.get_records_for_shift(current['id']),
-                'effective_shift_start': current.get('effective_shift_start'),
-                'projected_shift_end': current.get('projected_shift_end')
-            }
-        
-        # Get historical shifts
-        for shift in self.get_all_shifts():
+        have_current = False
+        for shift, records in self._iter_export_shifts():
             shift_data = {
                 'shift_start': shift['shift_start'],
                 'shift_end': shift['shift_end'],
-                'records': self.get_records_for_shift(shift['id']),
-                'effective_shift_start': shift.get('effective_shift_start'),
-                'projected_shift_end': shift.get('projected_shift_end')
+                'records': list(records),
+                'effective_shift_start': shift['effective_shift_start'],
+                'projected_shift_end': shift['projected_shift_end']
             }
-            data['shifts'].append(shift_data)
+            if shift['is_current']:
+                # Only one current shift is exported (matches get_current_shift)
+                if not have_current:
+                    data['current_shift'] = shift_data
+                    have_current = True
+            else:
+                data['shifts'].append(shift_data)
         
         return data
     
     def export_to_json_file(self, filepath: str):
-        """Export all data to a JSON file."""
-        data = self.export_to_json()
+        """Export all data to a JSON file.
+        
+        Streams shifts and records straight to disk (one record per line) so memory
+        use stays constant regardless of database size. The output has the same
+        structure as export_to_json().
+        """
+        dumps = json.dumps
+        # Encoding records in chunks is ~2x faster than one json.dumps call per record
+        encode = json.JSONEncoder(check_circular=False).encode
+        chunk_size = 1000
+        record_count = 0
+        
+        def write_shift(f, shift, records):
+            nonlocal record_count
+            f.write('{"shift_start": %s, "shift_end": %s, "records": [' % (
+                dumps(shift['shift_start']), dumps(shift['shift_end'])))
+            first = True
+            while True:
+                chunk = list(islice(records, chunk_size))
+                if not chunk:
+                    break
+                f.write('\n      ' if first else ',\n      ')
+                f.write(encode(chunk)[1:-1])
+                first = False
+                record_count += len(chunk)
+            f.write('\n    ], "effective_shift_start": %s, "projected_shift_end": %s}' % (
+                dumps(shift['effective_shift_start']), dumps(shift['projected_shift_end'])))
+        
         with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2)
-        logger.info(f"Exported database to JSON: {filepath}")
+            legacy = self.get_legacy_records()
+            f.write('{\n  "records": [')
+            f.write(',\n    '.join(dumps(r) for r in legacy))
+            f.write('],\n  "current_shift": ')
+            
+            have_current = False
+            wrote_shift = False
+            for shift, records in self._iter_export_shifts():
+                if shift['is_current']:
+                    if have_current:
+                        continue
+                    write_shift(f, shift, records)
+                    have_current = True
+                    continue
+                if not have_current:
+                    f.write('{"shift_start": null, "shift_end": null, "records": []}')
+                    have_current = True
+                f.write(',\n  "shifts": [\n    ' if not wrote_shift else ',\n    ')
+                write_shift(f, shift, records)
+                wrote_shift = True
+            
+            if not have_current:
+                f.write('{"shift_start": null, "shift_end": null, "records": []}')
+            f.write('\n  ]\n}\n' if wrote_shift else ',\n  "shifts": []\n}\n')
+        
+        logger.info(f"Exported database to JSON: {filepath} ({record_count} records)")
 
 
-__all__ = ['RecordsDatabase']
+__all__ = ['RecordsDatabase', 'RollupRow']
@@ -0,0 +1,163 @@
+"""Lazy shift history - keeps shift headers in memory and reads records from SQLite on demand."""
+
+import logging
+import threading
+from collections import OrderedDict
+from typing import List
+
+logger = logging.getLogger(__name__)
+
+# Maximum number of historical shifts whose records are kept in memory at once
+MAX_LOADED_SHIFTS = 64
+
+
+class LazyShift(dict):
+    """Historical shift dict whose "records" list is loaded from SQLite on first access.
+
+    Behaves like the legacy shift dict ({shift_start, shift_end, records, ...}) so
+    existing code can keep calling shift.get("records", []). The header also carries
+    "record_count" and "total_rvu" so summaries don't need the records at all.
+    """
+
+    def __init__(self, header: dict, history: 'ShiftHistory' = None):
+        super().__init__(header)
+        self._history = history
+        self._loaded = False
+
+    @property
+    def records_loaded(self) -> bool:
+        """True if the records are currently held in memory."""
+        return self._loaded
+
+    def _ensure_records(self):
+        if not self._loaded:
+            records = []
+            if self._history is not None and self.get_header("id") is not None:
+                records = self._history.load_records(self)
+            dict.__setitem__(self, "records", records)
+            self._loaded = True
+
+    def unload(self):
+        """Drop the in-memory records (they are re-read from SQLite on next access)."""
+        if self._loaded and self._history is not None:
+            dict.pop(self, "records", None)
+            self._loaded = False
+
+    def get_header(self, key, default=None):
+        """Read a header field without loading records."""
+        return dict.get(self, key, default)
+
+    def __getitem__(self, key):
+        if key == "records":
+            self._ensure_records()
+        return dict.__getitem__(self, key)
+
+    def get(self, key, default=None):
+        if key == "records":
+            self._ensure_records()
+        return dict.get(self, key, default)
+
+    def __setitem__(self, key, value):
+        dict.__setitem__(self, key, value)
+        if key == "records":
+            self._loaded = True
+
+    def __contains__(self, key):
+        return key == "records" or dict.__contains__(self, key)
+
+    def __iter__(self):
+        self._ensure_records()
+        return dict.__iter__(self)
+
+    def keys(self):
+        self._ensure_records()
+        return dict.keys(self)
+
+    def items(self):
+        self._ensure_records()
+        return dict.items(self)
+
+    def values(self):
+        self._ensure_records()
+        return dict.values(self)
+
+    def copy(self) -> 'LazyShift':
+        """Shallow copy that shares the lazy loader (and the records list, if loaded)."""
+        clone = LazyShift(dict(dict.items(self)), self._history)
+        clone._loaded = self._loaded
+        return clone
+
+
+class ShiftHistory(list):
+    """List of LazyShift headers, newest first, backed by RecordsDatabase.
+
+    Only shift headers (one aggregate query) are read at startup. Records are paged
+    in per shift when accessed, and at most MAX_LOADED_SHIFTS shifts keep their
+    records in memory; the least recently loaded ones are released.
+    """
+
+    def __init__(self, db, max_loaded: int = MAX_LOADED_SHIFTS):
+        super().__init__()
+        self.db = db
+        self.max_loaded = max_loaded
+        self._loaded: "OrderedDict[int, LazyShift]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.reload()
+
+    def reload(self):
+        """Re-read shift headers from the database (records are loaded lazily)."""
+        headers = self.db.get_shift_headers()
+        with self._lock:
+            self._loaded.clear()
+        self[:] = [LazyShift(header, self) for header in headers]
+        logger.info(f"Loaded {len(headers)} historical shift headers")
+
+    def load_records(self, shift: LazyShift) -> List[dict]:
+        """Read one shift's records from SQLite and track it for eviction."""
+        shift_id = shift.get_header("id")
+        records = self.db.get_records_for_shift(shift_id)
+        evicted = []
+        with self._lock:
+            self._loaded[id(shift)] = shift
+            self._loaded.move_to_end(id(shift))
+            while len(self._loaded) > self.max_loaded:
+                _, old_shift = self._loaded.popitem(last=False)
+                evicted.append(old_shift)
+        for old_shift in evicted:
+            old_shift.unload()
+        return records
+
+    def invalidate_shift(self, shift_id: int) -> bool:
+        """Drop one shift's cached records and re-read its header totals after its records changed.
+
+        Returns:
+            False if no historical shift has that id
+        """
+        for shift in self:
+            if shift.get_header("id") != shift_id:
+                continue
+            with self._lock:
+                self._loaded.pop(id(shift), None)
+            shift.unload()
+            record_count, total_rvu = self.db.get_shift_totals(shift_id)
+            dict.__setitem__(shift, "record_count", record_count)
+            dict.__setitem__(shift, "total_rvu", total_rvu)
+            return True
+        return False
+
+
+def shift_record_count(shift: dict) -> int:
+    """Number of records in a shift without forcing lazy records to load."""
+    if isinstance(shift, LazyShift) and not shift.records_loaded:
+        return shift.get_header("record_count", 0) or 0
+    return len(shift.get("records", []))
+
+
+def shift_total_rvu(shift: dict) -> float:
+    """Total RVU of a shift without forcing lazy records to load."""
+    if isinstance(shift, LazyShift) and not shift.records_loaded:
+        return shift.get_header("total_rvu", 0.0) or 0.0
+    return sum(r.get("rvu", 0) for r in shift.get("records", []))
+
+
+__all__ = ['LazyShift', 'ShiftHistory', 'shift_record_count', 'shift_total_rvu']
@@ -1,6 +1,34 @@
 """Business logic for RVU Counter - study matching and tracking."""
 
-from .study_matcher import match_study_type
+from .study_matcher import (
+    match_study_type,
+    CompiledMatcher,
+    get_compiled_matcher,
+    invalidate_classification_cache,
+    get_classification_cache_stats,
+)
 from .study_tracker import StudyTracker
+from .analytics_frame import AnalyticsFrame
+from .statistics_cache import StatisticsCache, get_statistics_cache
+from .efficiency_matrix import EfficiencyMatrix
+from .body_parts import classify_body_part, build_body_part_mapping, BodyPartMap
+from .shift_state import MinuteAccumulator, ShiftStatsStore, CumulativeRVU
 
-__all__ = ['match_study_type', 'StudyTracker']
+__all__ = [
+    'match_study_type',
+    'CompiledMatcher',
+    'get_compiled_matcher',
+    'invalidate_classification_cache',
+    'get_classification_cache_stats',
+    'StudyTracker',
+    'AnalyticsFrame',
+    'StatisticsCache',
+    'get_statistics_cache',
+    'EfficiencyMatrix',
+    'classify_body_part',
+    'build_body_part_mapping',
+    'BodyPartMap',
+    'MinuteAccumulator',
+    'ShiftStatsStore',
+    'CumulativeRVU',
+]
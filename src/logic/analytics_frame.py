@@ -0,0 +1,179 @@
+"""Columnar analytics frame - shared, vectorized aggregation for the statistics views."""
+
+import logging
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from ..core.config import HAS_NUMPY
+
+if HAS_NUMPY:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class AnalyticsFrame:
+    """Study rows of one period selection, stored column-wise.
+    
+    Built once from RollupRows (each row stands for `count` studies that share an
+    hour bucket, finish hour, study type and patient class). Numeric columns are
+    NumPy arrays; study type and patient class are integer codes into label lists.
+    Derived categories (modality, body part, display groupings) are computed once
+    per distinct label, not once per study, and every group-by is a bincount.
+    
+    The frame is immutable once built, so group_totals / hour_crosstab results are
+    memoized per column and shared between callers (treat them as read-only).
+    
+    Without NumPy the same API runs on plain lists.
+    """
+    
+    def __init__(self, rows: Sequence):
+        self.size = len(rows)
+        self.count = self._column([row.count for row in rows], 'int64')
+        self.rvu = self._column([row.rvu or 0 for row in rows], 'float64')
+        self.duration = self._column([row.duration or 0 for row in rows], 'float64')
+        self.finished_hour = self._column([row.finished_hour for row in rows], 'int64')
+        self._first_finished = [row.first_finished for row in rows]
+        
+        # Categorical columns: name -> (codes, labels)
+        self._categories: Dict[str, Tuple[object, List[str]]] = {}
+        self._categories['study_type'] = self._encode([row.study_type or "" for row in rows])
+        self._categories['patient_class'] = self._encode([row.patient_class or "" for row in rows])
+        # (method, column name) -> aggregation result
+        self._results: Dict[Tuple[str, str], object] = {}
+    
+    @staticmethod
+    def _column(values: list, dtype: str):
+        if HAS_NUMPY:
+            return np.asarray(values, dtype=dtype)
+        return values
+    
+    def _encode(self, values: List[str]) -> Tuple[object, List[str]]:
+        """Dictionary-encode values; labels keep first-seen order."""
+        lookup = {}
+        codes = [lookup.setdefault(value, len(lookup)) for value in values]
+        return self._column(codes, 'int64'), list(lookup)
+    
+    # =========================================================================
+    # Categories
+    # =========================================================================
+    
+    def categories(self, name: str) -> Tuple[object, List[str]]:
+        """(codes, labels) of a categorical column."""
+        return self._categories[name]
+    
+    def derive(self, name: str, source: str, label_of: Callable[[str], str]) -> Tuple[object, List[str]]:
+        """Add (once) a categorical column computed from another column's labels.
+        
+        label_of is called once per distinct source label. Labels keep the order
+        in which they first occur in the rows.
+        """
+        if name in self._categories:
+            return self._categories[name]
+        source_codes, source_labels = self._categories[source]
+        lookup = {}
+        remap = [lookup.setdefault(label_of(label), len(lookup)) for label in source_labels]
+        if HAS_NUMPY:
+            codes = np.asarray(remap, dtype='int64')[source_codes] if remap else source_codes
+        else:
+            codes = [remap[code] for code in source_codes]
+        self._categories[name] = (codes, list(lookup))
+        return self._categories[name]
+    
+    # =========================================================================
+    # Aggregation
+    # =========================================================================
+    
+    @staticmethod
+    def _bincount(codes, weights, length: int):
+        if HAS_NUMPY:
+            if not len(codes):
+                return np.zeros(length)
+            return np.bincount(codes, weights=weights, minlength=length)
+        sums = [0] * length
+        for code, weight in zip(codes, weights):
+            sums[code] += weight
+        return sums
+    
+    def total_studies(self) -> int:
+        return int(sum(self.count)) if not HAS_NUMPY else int(self.count.sum())
+    
+    def total_rvu(self) -> float:
+        return float(sum(self.rvu)) if not HAS_NUMPY else float(self.rvu.sum())
+    
+    def group_totals(self, name: str) -> List[Tuple[str, int, float]]:
+        """(label, studies, rvu) per group of a categorical column, first-seen order.
+        
+        Groups without studies are left out.
+        """
+        key = ('group_totals', name)
+        if key not in self._results:
+            codes, labels = self._categories[name]
+            studies = self._bincount(codes, self.count, len(labels))
+            rvus = self._bincount(codes, self.rvu, len(labels))
+            self._results[key] = [(label, int(studies[i]), float(rvus[i]))
+                                  for i, label in enumerate(labels) if studies[i]]
+        return self._results[key]
+    
+    def hour_crosstab(self, name: str) -> Tuple[List[int], List[str], Dict[int, dict]]:
+        """Study counts and RVU per finish hour, split by a categorical column.
+        
+        Rows with an unknown finish hour are left out.
+        
+        Returns:
+            (hours present, labels present, {hour: {"studies", "rvu", "by_label": {label: count}}})
+        """
+        key = ('hour_crosstab', name)
+        if key not in self._results:
+            self._results[key] = self._hour_crosstab(name)
+        return self._results[key]
+    
+    def _hour_crosstab(self, name: str) -> Tuple[List[int], List[str], Dict[int, dict]]:
+        codes, labels = self._categories[name]
+        width = len(labels)
+        if HAS_NUMPY:
+            valid = self.finished_hour >= 0
+            hours = self.finished_hour[valid]
+            cells = np.bincount(hours * width + codes[valid], weights=self.count[valid],
+                                minlength=24 * width).reshape(24, width) if width else np.zeros((24, 0))
+            hour_studies = np.bincount(hours, weights=self.count[valid], minlength=24)
+            hour_rvu = np.bincount(hours, weights=self.rvu[valid], minlength=24)
+        else:
+            cells = [[0] * width for _ in range(24)]
+            hour_studies = [0] * 24
+            hour_rvu = [0.0] * 24
+            for hour, code, count, rvu in zip(self.finished_hour, codes, self.count, self.rvu):
+                if hour < 0:
+                    continue
+                cells[hour][code] += count
+                hour_studies[hour] += count
+                hour_rvu[hour] += rvu
+        
+        present_hours = [hour for hour in range(24) if hour_studies[hour]]
+        present_labels = [label for i, label in enumerate(labels)
+                          if any(cells[hour][i] for hour in present_hours)]
+        table = {}
+        for hour in present_hours:
+            table[hour] = {
+                "studies": int(hour_studies[hour]),
+                "rvu": float(hour_rvu[hour]),
+                "by_label": {label: int(cells[hour][i]) for i, label in enumerate(labels) if cells[hour][i]},
+            }
+        return present_hours, present_labels, table
+    
+    def earliest_finished(self) -> Optional[datetime]:
+        """Earliest finish time among rows with a known finish hour."""
+        earliest = None
+        for hour, value in zip(self.finished_hour, self._first_finished):
+            if hour < 0 or not value:
+                continue
+            try:
+                finished = datetime.fromisoformat(value)
+            except (TypeError, ValueError):
+                continue
+            if earliest is None or finished < earliest:
+                earliest = finished
+        return earliest
+
+
+__all__ = ['AnalyticsFrame']
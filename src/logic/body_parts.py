@@ -0,0 +1,213 @@
+"""Body-part grouping of study types for the statistics views.
+
+The grouping used to be a substring cascade evaluated for every study type each
+time the By Body Part view rendered. It is now compiled once into a plain
+study_type -> group mapping (built from the rvu_table in rvu_rules.yaml, plus any
+groups declared there under body_part_groups) that is stored in SQLite; consumers
+do a dictionary lookup or join against it.
+"""
+
+import logging
+from typing import Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def classify_body_part(study_type: str) -> str:
+    """Map a (display) study type to its modality-specific anatomical group.
+
+    This is the rule set the mapping is compiled from; consumers should use
+    BodyPartMap instead of calling it per record.
+    """
+    study_lower = study_type.lower()
+
+    # Determine modality first
+    if study_type.startswith('CT ') or study_type.startswith('CTA '):
+        # === CT STUDIES ===
+        is_cta = study_type.startswith('CTA')
+
+        # Check for body region combinations first
+        has_chest = ('chest' in study_lower or ' cap' in study_lower or ' ca ' in study_lower or study_lower.endswith(' ca'))
+        has_abdomen = ('abdomen' in study_lower or ' ap' in study_lower or ' cap' in study_lower or ' ca ' in study_lower or study_lower.endswith(' ca'))
+        has_pelvis = ('pelvis' in study_lower or ' ap' in study_lower or ' cap' in study_lower)
+
+        # CTA Runoff with Abdo/Pelvis - special case
+        if 'runoff' in study_lower and ('abdomen' in study_lower or 'pelvis' in study_lower or 'abdo' in study_lower):
+            return "CTA: Abdomen/Pelvis"
+
+        # CT/CTA Body (Chest+Abdomen combinations ± Pelvis)
+        elif has_chest and has_abdomen:
+            return "CTA: Body" if is_cta else "CT: Body"
+
+        # CT/CTA Abdomen/Pelvis (no chest)
+        elif has_abdomen and not has_chest:
+            return "CTA: Abdomen/Pelvis" if is_cta else "CT: Abdomen/Pelvis"
+
+        # CT/CTA Chest alone
+        elif has_chest and not has_abdomen:
+            return "CTA: Chest" if is_cta else "CT: Chest"
+
+        # CT/CTA Brain
+        elif any(kw in study_lower for kw in ['brain', 'head', 'face', 'sinus', 'orbit', 'temporal', 'maxillofacial']):
+            return "CTA: Brain" if is_cta else "CT: Brain"
+
+        # CT/CTA Neck (without brain/head)
+        elif 'neck' in study_lower:
+            return "CTA: Neck" if is_cta else "CT: Neck"
+
+        # CT/CTA Spine
+        elif any(kw in study_lower for kw in ['spine', 'cervical', 'thoracic', 'lumbar', 'sacrum', 'coccyx']):
+            return "CTA: Spine" if is_cta else "CT: Spine"
+
+        # CT/CTA MSK
+        elif any(kw in study_lower for kw in ['shoulder', 'arm', 'elbow', 'wrist', 'hand', 'hip', 'femur', 'knee', 'leg', 'ankle', 'foot', 'joint', 'bone']):
+            return "CTA: MSK" if is_cta else "CT: MSK"
+
+        # CT/CTA Pelvis alone (no abdomen) - MSK
+        elif has_pelvis and not has_abdomen:
+            return "CTA: MSK" if is_cta else "CT: MSK"
+
+        else:
+            return "CTA: Other" if is_cta else "CT: Other"
+
+    elif study_type.startswith('MR') or study_type.startswith('MRI'):
+        # === MRI STUDIES ===
+        # MRI Brain
+        if any(kw in study_lower for kw in ['brain', 'head', 'face', 'orbit', 'pituitary', 'iap', 'temporal']):
+            return "MRI: Brain"
+
+        # MRI Spine
+        elif any(kw in study_lower for kw in ['spine', 'cervical', 'thoracic', 'lumbar', 'sacrum', 'coccyx']):
+            return "MRI: Spine"
+
+        # MRI Abdomen/Pelvis
+        elif any(kw in study_lower for kw in ['abdomen', 'pelvis', 'liver', 'kidney', 'pancreas', 'mrcp', 'enterography']):
+            return "MRI: Abdomen/Pelvis"
+
+        # MRI MSK
+        elif any(kw in study_lower for kw in ['shoulder', 'arm', 'elbow', 'wrist', 'hand', 'hip', 'femur', 'knee', 'leg', 'ankle', 'foot', 'joint', 'extremity']):
+            return "MRI: MSK"
+
+        # MRI Neck
+        elif 'neck' in study_lower:
+            return "MRI: Neck"
+
+        # MRI Chest (rare but exists)
+        elif 'chest' in study_lower or 'thorax' in study_lower:
+            return "MRI: Chest"
+
+        else:
+            return "MRI: Other"
+
+    elif study_type.startswith('XR'):
+        # === X-RAY STUDIES ===
+        # XR Chest
+        if 'chest' in study_lower:
+            return "XR: Chest"
+
+        # XR Abdomen
+        elif 'abdomen' in study_lower:
+            return "XR: Abdomen"
+
+        # XR MSK
+        elif any(kw in study_lower for kw in ['msk', 'bone', 'shoulder', 'arm', 'elbow', 'wrist', 'hand', 'finger',
+                                                'hip', 'pelvis', 'femur', 'knee', 'leg', 'ankle', 'foot', 'toe',
+                                                'spine', 'cervical', 'thoracic', 'lumbar', 'sacrum', 'coccyx',
+                                                'rib', 'clavicle', 'scapula', 'joint', 'extremity']):
+            return "XR: MSK"
+
+        else:
+            return "XR: Other"
+
+    elif study_type.startswith('US'):
+        # === ULTRASOUND STUDIES ===
+        # US Abdomen/Pelvis
+        if any(kw in study_lower for kw in ['abdomen', 'pelvis', 'liver', 'kidney', 'gallbladder', 'spleen', 'pancreas', 'bladder', 'ovary', 'uterus', 'prostate']):
+            return "US: Abdomen/Pelvis"
+
+        # US Vascular
+        elif any(kw in study_lower for kw in ['vascular', 'doppler', 'artery', 'vein', 'vessel', 'dvt', 'carotid']):
+            return "US: Vascular"
+
+        # US MSK
+        elif any(kw in study_lower for kw in ['shoulder', 'elbow', 'wrist', 'hand', 'hip', 'knee', 'ankle', 'foot', 'tendon', 'joint']):
+            return "US: MSK"
+
+        # US Breast
+        elif 'breast' in study_lower:
+            return "US: Breast"
+
+        # US Thyroid/Neck
+        elif 'thyroid' in study_lower or 'neck' in study_lower:
+            return "US: Neck"
+
+        else:
+            return "US: Other"
+
+    elif study_type.startswith('NM'):
+        # === NUCLEAR MEDICINE STUDIES ===
+        # NM Cardiac
+        if any(kw in study_lower for kw in ['cardiac', 'heart', 'myocard', 'stress', 'viability']):
+            return "NM: Cardiac"
+
+        # NM Bone
+        elif 'bone' in study_lower:
+            return "NM: Bone"
+
+        # NM Other organs
+        else:
+            return "NM: Other"
+
+    else:
+        # === OTHER MODALITIES ===
+        return "Other"
+
+
+def build_body_part_mapping(study_types: Iterable[str], declared: Optional[Dict[str, list]] = None) -> Dict[str, str]:
+    """Compile study_type -> body part group for the given study types.
+
+    Args:
+        study_types: Known study types (normally the rvu_table keys)
+        declared: Optional body_part_groups section of rvu_rules.yaml,
+                  {group: [study types]}; these entries win over the classifier
+                  and may name study types that are not in the rvu_table.
+    """
+    mapping = {}
+    for study_type in study_types:
+        study_type = (study_type or "").strip()
+        if study_type:
+            mapping[study_type] = classify_body_part(study_type)
+
+    for group, members in (declared or {}).items():
+        if not isinstance(members, (list, tuple)):
+            logger.warning(f"Ignoring body_part_groups entry {group!r}: expected a list of study types")
+            continue
+        for study_type in members:
+            study_type = str(study_type).strip()
+            if study_type:
+                mapping[study_type] = str(group)
+    return mapping
+
+
+class BodyPartMap:
+    """Dictionary lookup of body part groups.
+
+    Study types missing from the compiled mapping (older records, types added
+    since the rules were loaded) are classified once and remembered.
+    """
+
+    def __init__(self, mapping: Optional[Dict[str, str]] = None):
+        self._mapping: Dict[str, str] = dict(mapping or {})
+
+    def __len__(self) -> int:
+        return len(self._mapping)
+
+    def group_of(self, study_type: str) -> str:
+        group = self._mapping.get(study_type)
+        if group is None:
+            group = classify_body_part(study_type)
+            self._mapping[study_type] = group
+        return group
+
+
+__all__ = ['classify_body_part', 'build_body_part_mapping', 'BodyPartMap']
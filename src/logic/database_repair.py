@@ -2,7 +2,7 @@
 
 import logging
 from typing import List, Dict, Tuple, Optional
-from .study_matcher import match_study_type
+from .study_matcher import get_compiled_matcher
 
 logger = logging.getLogger(__name__)
 
@@ -15,13 +15,14 @@ class DatabaseRepair:
         self.rvu_table = data_manager.data.get("rvu_table", {})
         self.classification_rules = data_manager.data.get("classification_rules", {})
         self.direct_lookups = data_manager.data.get("direct_lookups", {})
+        self.matcher = get_compiled_matcher(self.rvu_table, self.classification_rules, self.direct_lookups)
         
     def find_mismatches(self, progress_callback=None) -> List[dict]:
         """Scan all records in the database and find ones that don't match current rules."""
         mismatches = []
         try:
             # Get all records from database
-            cursor = self.db.conn.cursor()
+            cursor = self.db.read_cursor()
             cursor.execute('SELECT id, procedure, study_type, rvu FROM records')
             records = cursor.fetchall()
             
@@ -32,12 +33,7 @@ class DatabaseRepair:
                     
                 rec_id, proc_name, stored_type, stored_rvu = rec
                 
-                new_type, new_rvu = match_study_type(
-                    proc_name,
-                    self.rvu_table,
-                    self.classification_rules,
-                    self.direct_lookups
-                )
+                new_type, new_rvu = self.matcher.match(proc_name)
                 
                 # Check for mismatch (with small epsilon for float comparison)
                 if new_type != stored_type or abs(float(stored_rvu) - new_rvu) > 0.01:
@@ -64,21 +60,15 @@ class DatabaseRepair:
         """
         count = 0
         try:
-            cursor = self.db.conn.cursor()
             total = len(mismatches)
-            
+            updates = []
             for i, m in enumerate(mismatches):
                 if progress_callback:
                     progress_callback(i + 1, total)
-                    
-                cursor.execute('''
-                    UPDATE records 
-                    SET study_type = ?, rvu = ? 
-                    WHERE id = ?
-                ''', (m["new_type"], m["new_rvu"], m["id"]))
-                count += 1
-                
-            self.db.conn.commit()
+                updates.append((m["id"], m["new_type"], m["new_rvu"]))
+            
+            # Single executemany in one transaction
+            count = self.db.update_classifications(updates)
             logger.info(f"Database repair complete: updated {count} records")
             
             # Reload memory cache in data manager
@@ -90,8 +80,8 @@ class DatabaseRepair:
             return count
             
         except Exception as e:
+            # batch() already rolled the transaction back
             logger.error(f"Error fixing mismatches: {e}")
-            self.db.conn.rollback()
             return 0
 
 __all__ = ['DatabaseRepair']
@@ -0,0 +1,212 @@
+"""Efficiency heatmap data - modality x hour-of-day matrices for the efficiency view."""
+
+import logging
+from bisect import bisect_right
+from datetime import datetime
+from typing import Dict, List, Sequence, Tuple
+
+from ..core.config import HAS_NUMPY
+from ..models import record_finished_at
+
+if HAS_NUMPY:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class EfficiencyMatrix:
+    """Study counts, mean reading time and distinct shifts per modality and finish hour.
+
+    Records are flattened to one entry per study (old "Multiple ..." records are
+    split across their modalities) and every matrix is filled with a bincount over
+    (modality, hour) cells, so the cost is one pass over the records regardless of
+    how many shifts the period spans. Only durations > 0 count towards the mean.
+
+    The hour totals cover the modalities that have at least one duration, which
+    is what the Total row of the heatmap shows.
+
+    Attributes (all indexed [modality index][hour 0-23] or [hour]):
+        modalities: Sorted modality labels
+        counts, mean_duration (None where no durations), shift_counts
+        hour_counts, hour_mean_duration, hour_shift_counts
+        has_durations: Whether any study has a duration (the Total row is shown)
+    """
+
+    def __init__(self, records: Sequence[dict], shifts: Sequence[Tuple[str, datetime, datetime]]):
+        """
+        Args:
+            records: Study records of the period
+            shifts: (shift key, start, end) in priority order; a study belongs to the
+                    first shift whose [start, end] contains its finish time
+        """
+        modality_codes: Dict[str, int] = {}
+        mods: List[int] = []
+        hours: List[int] = []
+        durations: List[float] = []
+        times: List[datetime] = []
+
+        def add(modality, hour, duration, finished):
+            mods.append(modality_codes.setdefault(modality, len(modality_codes)))
+            hours.append(hour)
+            durations.append(duration)
+            times.append(finished)
+
+        for record in records:
+            finished = record_finished_at(record)
+            if finished is None:
+                continue
+            hour = finished.hour
+            study_type = record.get("study_type", "Unknown") or ""
+            words = study_type.split()
+            modality = words[0] if words else "Unknown"
+
+            if modality == "Multiple" or study_type.startswith("Multiple "):
+                individual_study_types = record.get("individual_study_types", [])
+                accession_count = record.get("accession_count", 1)
+                duration = record.get("duration_seconds", 0) or 0
+                if individual_study_types and len(individual_study_types) == accession_count:
+                    # Total duration is divided equally between the individual studies
+                    per_study = duration / accession_count if accession_count > 0 else 0
+                    for individual_st in individual_study_types:
+                        add(individual_st.split()[0] if individual_st and individual_st.split() else "Unknown",
+                            hour, per_study, finished)
+                elif study_type.startswith("Multiple "):
+                    # e.g. "Multiple CT, XR"
+                    modalities_list = [m.strip() for m in study_type.replace("Multiple ", "").strip().split(",")]
+                    for mod in modalities_list:
+                        add(mod, hour, duration / len(modalities_list), finished)
+                else:
+                    add(modality, hour, duration, finished)
+            else:
+                add(modality, hour, record.get("duration_seconds", 0) or 0, finished)
+
+        shift_of = self._assign_shifts(times, shifts)
+
+        self.modalities = sorted(modality_codes)
+        # Recode to the sorted order
+        rank = {code: self.modalities.index(label) for label, code in modality_codes.items()}
+        mods = [rank[code] for code in mods]
+
+        if HAS_NUMPY:
+            self._aggregate_numpy(mods, hours, durations, shift_of)
+        else:
+            self._aggregate_python(mods, hours, durations, shift_of)
+
+    # =========================================================================
+    # Shift assignment
+    # =========================================================================
+
+    @staticmethod
+    def _assign_shifts(times: List[datetime], shifts) -> List[int]:
+        """Index of the shift (by distinct key) each study belongs to, -1 for none."""
+        key_codes: Dict[str, int] = {}
+        intervals = []
+        for key, start, end in shifts:
+            intervals.append((start, end, key_codes.setdefault(key, len(key_codes))))
+        if not intervals:
+            return [-1] * len(times)
+
+        ordered = sorted(intervals, key=lambda interval: interval[0])
+        latest_end = None
+        overlapping = False
+        for start, end, _ in ordered:
+            if latest_end is not None and start <= latest_end:
+                overlapping = True
+                break
+            latest_end = end if latest_end is None else max(latest_end, end)
+
+        if overlapping:
+            # Priority order decides - check the shifts one by one
+            result = []
+            for finished in times:
+                result.append(next((code for start, end, code in intervals if start <= finished <= end), -1))
+            return result
+
+        # Disjoint shifts: the only candidate is the last one starting at or before the study
+        starts = [start for start, _, _ in ordered]
+        if HAS_NUMPY and times:
+            finished = np.asarray(times, dtype='datetime64[us]')
+            candidate = np.searchsorted(np.asarray(starts, dtype='datetime64[us]'), finished, side='right') - 1
+            ends = np.asarray([end for _, end, _ in ordered], dtype='datetime64[us]')
+            codes = np.asarray([code for _, _, code in ordered], dtype='int64')
+            clipped = np.maximum(candidate, 0)
+            inside = (candidate >= 0) & (finished <= ends[clipped])
+            return np.where(inside, codes[clipped], -1).tolist()
+        result = []
+        for finished in times:
+            i = bisect_right(starts, finished) - 1
+            result.append(ordered[i][2] if i >= 0 and finished <= ordered[i][1] else -1)
+        return result
+
+    # =========================================================================
+    # Aggregation
+    # =========================================================================
+
+    def _aggregate_numpy(self, mods, hours, durations, shift_of):
+        width = len(self.modalities)
+        cells = np.asarray(mods, dtype='int64') * 24 + np.asarray(hours, dtype='int64')
+        duration = np.asarray(durations, dtype='float64')
+        shift = np.asarray(shift_of, dtype='int64')
+        size = width * 24
+
+        counts = np.bincount(cells, minlength=size).reshape(width, 24)
+        timed = duration > 0
+        duration_sum = np.bincount(cells[timed], weights=duration[timed], minlength=size).reshape(width, 24)
+        duration_n = np.bincount(cells[timed], minlength=size).reshape(width, 24)
+
+        in_shift = shift >= 0
+        shift_span = int(shift.max()) + 1 if in_shift.any() else 1
+        pairs = np.unique(cells[in_shift] * shift_span + shift[in_shift])
+        shift_counts = np.bincount(pairs // shift_span, minlength=size).reshape(width, 24)
+
+        # Hour totals over modalities that have durations
+        timed_modality = duration_n.sum(axis=1) > 0
+        hour_counts = counts[timed_modality].sum(axis=0)
+        hour_duration_sum = duration_sum.sum(axis=0)
+        hour_duration_n = duration_n.sum(axis=0)
+        row_included = timed_modality[cells // 24] & in_shift
+        hour_pairs = np.unique((cells[row_included] % 24) * shift_span + shift[row_included])
+        hour_shift_counts = np.bincount(hour_pairs // shift_span, minlength=24)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = duration_sum / duration_n
+            hour_mean = hour_duration_sum / hour_duration_n
+        self.counts = counts.tolist()
+        self.mean_duration = [[float(value) if n else None for value, n in zip(row, row_n)]
+                              for row, row_n in zip(mean.tolist(), duration_n.tolist())]
+        self.shift_counts = shift_counts.tolist()
+        self.has_durations = bool(timed_modality.any())
+        self.hour_counts = hour_counts.tolist()
+        self.hour_mean_duration = [float(value) if n else None
+                                   for value, n in zip(hour_mean.tolist(), hour_duration_n.tolist())]
+        self.hour_shift_counts = hour_shift_counts.tolist()
+
+    def _aggregate_python(self, mods, hours, durations, shift_of):
+        width = len(self.modalities)
+        counts = [[0] * 24 for _ in range(width)]
+        duration_sum = [[0.0] * 24 for _ in range(width)]
+        duration_n = [[0] * 24 for _ in range(width)]
+        shift_sets = [[set() for _ in range(24)] for _ in range(width)]
+        for mod, hour, duration, shift in zip(mods, hours, durations, shift_of):
+            counts[mod][hour] += 1
+            if duration > 0:
+                duration_sum[mod][hour] += duration
+                duration_n[mod][hour] += 1
+            if shift >= 0:
+                shift_sets[mod][hour].add(shift)
+
+        timed_modality = [sum(row) > 0 for row in duration_n]
+        self.counts = counts
+        self.mean_duration = [[duration_sum[m][h] / duration_n[m][h] if duration_n[m][h] else None
+                               for h in range(24)] for m in range(width)]
+        self.shift_counts = [[len(cell) for cell in row] for row in shift_sets]
+        self.has_durations = any(timed_modality)
+        included = [m for m in range(width) if timed_modality[m]]
+        self.hour_counts = [sum(counts[m][h] for m in included) for h in range(24)]
+        hour_n = [sum(duration_n[m][h] for m in included) for h in range(24)]
+        self.hour_mean_duration = [sum(duration_sum[m][h] for m in included) / hour_n[h] if hour_n[h] else None
+                                   for h in range(24)]
+        self.hour_shift_counts = [len(set().union(*(shift_sets[m][h] for m in included))) for h in range(24)]
+
+
+__all__ = ['EfficiencyMatrix']
@@ -6,7 +6,7 @@ import openpyxl
 from typing import List, Dict, Tuple, Optional
 from datetime import datetime
 
-from .study_matcher import match_study_type
+from .study_matcher import get_compiled_matcher
 
 logger = logging.getLogger(__name__)
 
@@ -17,6 +17,8 @@ class ExcelChecker:
         self.rvu_table = rvu_table
         self.classification_rules = classification_rules
         self.direct_lookups = direct_lookups
+        # Compile rules once - payroll sheets can contain tens of thousands of rows
+        self.matcher = get_compiled_matcher(rvu_table, classification_rules, direct_lookups)
         
     def check_file(self, file_path: str, progress_callback=None) -> dict:
         """Process an Excel file and return a report of outliers.
@@ -61,12 +63,7 @@ class ExcelChecker:
                 if proc_text is None or excel_rvu is None:
                     continue
                     
-                matched_type, matched_rvu = match_study_type(
-                    str(proc_text), 
-                    self.rvu_table, 
-                    self.classification_rules, 
-                    self.direct_lookups
-                )
+                matched_type, matched_rvu = self.matcher.match(str(proc_text))
                 
                 # Compare (with small epsilon for float comparison)
                 if abs(float(excel_rvu) - matched_rvu) > 0.01:
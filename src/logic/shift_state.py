@@ -0,0 +1,364 @@
+"""Observable running totals for the current shift - fed by record events."""
+
+import logging
+from bisect import bisect_right
+from datetime import datetime, timedelta
+from itertools import count
+from typing import Callable, Dict, Hashable, List, Optional, Sequence
+
+from ..models import record_finished_at
+
+logger = logging.getLogger(__name__)
+
+# Sums closer to zero than this are shown as 0 (incremental add/subtract leaves float residue)
+_EPSILON = 1e-9
+
+# Minutes held by the per-minute accumulator - the last-hour window needs 61,
+# the rest leaves room for finish times slightly ahead of the clock
+RING_MINUTES = 120
+
+_MINUTE_EPOCH = datetime(2000, 1, 1)
+_ONE_MINUTE = timedelta(minutes=1)
+_ONE_HOUR = timedelta(hours=1)
+
+
+def _settle(value: float) -> float:
+    return 0.0 if abs(value) < _EPSILON else value
+
+
+def _minute_of(dt: datetime) -> int:
+    return (dt - _MINUTE_EPOCH) // _ONE_MINUTE
+
+
+def _hour_of(dt: datetime) -> datetime:
+    return dt.replace(minute=0, second=0, microsecond=0)
+
+
+class MinuteAccumulator:
+    """Ring buffer of per-minute RVU and compensation sums for the most recent minutes.
+
+    Slot i holds minute k where k % size == i; a slot whose minute is not the
+    one asked for is simply stale. Each slot also keeps its studies so a window
+    boundary falling inside a minute can be cut at the exact second.
+    """
+
+    def __init__(self, minutes: int = RING_MINUTES):
+        self.size = minutes
+        self._minutes: List[Optional[int]] = [None] * minutes
+        self._rvu = [0.0] * minutes
+        self._comp = [0.0] * minutes
+        self._items: List[list] = [[] for _ in range(minutes)]  # (finished, token, rvu, comp)
+        self.newest: Optional[int] = None
+
+    def add(self, finished: datetime, token: int, rvu: float, comp: float):
+        minute = _minute_of(finished)
+        slot = minute % self.size
+        held = self._minutes[slot]
+        if held != minute:
+            if held is not None and held > minute:
+                return  # Older than the ring reaches
+            self._minutes[slot] = minute
+            self._rvu[slot] = 0.0
+            self._comp[slot] = 0.0
+            self._items[slot] = []
+        self._items[slot].append((finished, token, rvu, comp))
+        self._rvu[slot] += rvu
+        self._comp[slot] += comp
+        if self.newest is None or minute > self.newest:
+            self.newest = minute
+
+    def remove(self, finished: datetime, token: int):
+        minute = _minute_of(finished)
+        slot = minute % self.size
+        if self._minutes[slot] != minute:
+            return
+        items = self._items[slot]
+        for i, item in enumerate(items):
+            if item[1] == token:
+                del items[i]
+                if items:
+                    self._rvu[slot] -= item[2]
+                    self._comp[slot] -= item[3]
+                else:
+                    self._rvu[slot] = 0.0
+                    self._comp[slot] = 0.0
+                return
+
+    def since(self, start: datetime) -> tuple:
+        """(RVU, compensation) finished at or after start (start must be within the ring)."""
+        first = _minute_of(start)
+        if self.newest is None or self.newest < first:
+            return 0.0, 0.0
+        rvu = comp = 0.0
+        slot = first % self.size
+        if self._minutes[slot] == first:
+            for finished, _, item_rvu, item_comp in self._items[slot]:
+                if finished >= start:
+                    rvu += item_rvu
+                    comp += item_comp
+        for minute in range(first + 1, min(self.newest, first + self.size - 1) + 1):
+            slot = minute % self.size
+            if self._minutes[slot] == minute:
+                rvu += self._rvu[slot]
+                comp += self._comp[slot]
+        return rvu, comp
+
+
+class ShiftStatsStore:
+    """Running RVU/compensation totals of the current shift's records.
+
+    The main window reports every change to the records list as an event
+    (record_added / record_updated / record_removed, or reset for a new list),
+    and the store adjusts its totals, per-clock-hour sums and a per-minute
+    accumulator of recent studies by just that record. Reading the counters is
+    then independent of shift length.
+
+    Code that replaces or edits the list without reporting it (restores,
+    settings dialogs, ...) is covered by sync(): it compares the bound list,
+    its length and last record with what the store has seen and rebuilds from
+    scratch when they differ. Calling it before every read is cheap.
+
+    Compensation uses the rate callable given at construction; pass a
+    rates_key to sync() that changes whenever the rates or role change.
+
+    Not thread-safe - owned by the Tk main loop.
+    """
+
+    def __init__(self, compensation_rate: Callable[[datetime], float]):
+        """
+        Args:
+            compensation_rate: Returns the $/RVU rate for a finish time
+        """
+        self._compensation_rate = compensation_rate
+        self._listeners: List[Callable[[str, Optional[dict]], None]] = []
+        self._seq = count()
+        self._records: Sequence[dict] = ()
+        self._rates_key: Hashable = None
+        self._dirty = True
+        self._clear()
+        # Bumped on every event / only when records are added, removed or reset
+        self.version = 0
+        self.membership_version = 0
+
+    def _clear(self):
+        self._entries: Dict[int, tuple] = {}  # id(record) -> (record, (finished or None, token, rvu, comp))
+        self._minutes = MinuteAccumulator()
+        self._hours: Dict[datetime, list] = {}  # hour start -> [count, rvu, comp]
+        self._latest_hour: Optional[datetime] = None
+        self._tail = None
+        self.count = 0
+        self.total_rvu = 0.0
+        self.total_comp = 0.0
+
+    # =========================================================================
+    # Listeners
+    # =========================================================================
+
+    def subscribe(self, listener: Callable[[str, Optional[dict]], None]) -> Callable[[], None]:
+        """Register a listener for store events. Returns a function that unsubscribes it.
+
+        Listeners are called with the event ("added", "updated", "removed",
+        "reset") and the record concerned (None for "reset").
+        """
+        self._listeners.append(listener)
+
+        def unsubscribe():
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+        return unsubscribe
+
+    def _emit(self, event: str, record: Optional[dict]):
+        self.version += 1
+        if event != "updated":
+            self.membership_version += 1
+        for listener in list(self._listeners):
+            try:
+                listener(event, record)
+            except Exception as e:
+                logger.error(f"Error in shift stats listener: {e}")
+
+    # =========================================================================
+    # Events
+    # =========================================================================
+
+    def sync(self, records: Sequence[dict], rates_key: Hashable = None) -> bool:
+        """Bind to records, rebuilding only if it changed behind the store's back.
+
+        Returns:
+            True if the totals were rebuilt
+        """
+        tail = records[-1] if records else None
+        if (self._dirty or records is not self._records or len(records) != self.count
+                or tail is not self._tail or rates_key != self._rates_key):
+            self.reset(records, rates_key)
+            return True
+        return False
+
+    def reset(self, records: Sequence[dict] = (), rates_key: Hashable = None):
+        """Rebuild all totals from records."""
+        self._clear()
+        self._records = records
+        self._rates_key = rates_key
+        self._dirty = False
+        for record in records:
+            self._add(record)
+        self._tail = records[-1] if records else None
+        self._emit("reset", None)
+
+    def invalidate(self):
+        """Force a rebuild on the next sync()."""
+        self._dirty = True
+
+    def record_added(self, record: dict):
+        """A record was appended to the bound list."""
+        if id(record) in self._entries:
+            self.record_updated(record)
+            return
+        self._add(record)
+        self._tail = record
+        self._emit("added", record)
+
+    def record_updated(self, record: dict):
+        """A record's RVU or finish time changed in place."""
+        if id(record) not in self._entries:
+            self._dirty = True
+            return
+        self._remove(record)
+        self._add(record)
+        self._emit("updated", record)
+
+    def record_removed(self, record: dict):
+        """A record was removed from the bound list."""
+        if id(record) not in self._entries:
+            self._dirty = True
+            return
+        self._remove(record)
+        self._tail = self._records[-1] if self._records else None
+        self._emit("removed", record)
+
+    def _add(self, record: dict):
+        rvu = record.get("rvu", 0) or 0
+        finished = record_finished_at(record)
+        comp = 0.0
+        if finished is not None:
+            try:
+                comp = rvu * self._compensation_rate(finished)
+            except (KeyError, ValueError, TypeError):
+                comp = 0.0
+        # Contributions are kept as added - the record may be edited in place before record_updated
+        item = (finished, next(self._seq), rvu, comp)
+        if finished is not None:
+            self._minutes.add(*item)
+            hour = _hour_of(finished)
+            bucket = self._hours.setdefault(hour, [0, 0.0, 0.0])
+            bucket[0] += 1
+            bucket[1] += rvu
+            bucket[2] += comp
+            if self._latest_hour is None or hour > self._latest_hour:
+                self._latest_hour = hour
+        self._entries[id(record)] = (record, item)
+        self.count += 1
+        self.total_rvu += rvu
+        self.total_comp += comp
+
+    def _remove(self, record: dict):
+        _, (finished, token, rvu, comp) = self._entries.pop(id(record))
+        self.count -= 1
+        if finished is not None:
+            self._minutes.remove(finished, token)
+            hour = _hour_of(finished)
+            bucket = self._hours[hour]
+            bucket[0] -= 1
+            bucket[1] -= rvu
+            bucket[2] -= comp
+            if bucket[0] == 0:
+                del self._hours[hour]
+        self.total_rvu -= rvu
+        self.total_comp -= comp
+        if not self._entries:
+            self.total_rvu = 0.0
+            self.total_comp = 0.0
+
+    # =========================================================================
+    # Queries
+    # =========================================================================
+
+    def last_hour(self, now: datetime) -> tuple:
+        """(RVU, compensation) of studies finished in the 60 minutes up to now (or later)."""
+        rvu, comp = self._minutes.since(now - _ONE_HOUR)
+        return _settle(rvu), _settle(comp)
+
+    def current_hour(self, now: datetime) -> tuple:
+        """(RVU, compensation) of studies finished in now's clock hour (or later)."""
+        hour = _hour_of(now)
+        rvu = comp = 0.0
+        while self._latest_hour is not None and hour <= self._latest_hour:
+            bucket = self._hours.get(hour)
+            if bucket is not None:
+                rvu += bucket[1]
+                comp += bucket[2]
+            hour += _ONE_HOUR
+        return _settle(rvu), _settle(comp)
+
+    def hour(self, hour_start: datetime) -> tuple:
+        """(RVU, compensation) of studies finished in the clock hour starting at hour_start."""
+        bucket = self._hours.get(hour_start)
+        if bucket is None:
+            return 0.0, 0.0
+        return _settle(bucket[1]), _settle(bucket[2])
+
+    def totals(self) -> tuple:
+        """(RVU, compensation) of the whole shift."""
+        return _settle(self.total_rvu), _settle(self.total_comp)
+
+    def window_sums(self, now: datetime) -> dict:
+        """Totals plus the last-hour, previous-clock-hour and current-hour sums at now."""
+        total_rvu, total_comp = self.totals()
+        last_hour_rvu, last_hour_comp = self.last_hour(now)
+        last_full_hour_rvu, last_full_hour_comp = self.hour(_hour_of(now) - _ONE_HOUR)
+        current_hour_rvu, current_hour_comp = self.current_hour(now)
+        return {
+            "total_rvu": total_rvu,
+            "total_comp": total_comp,
+            "last_hour_rvu": last_hour_rvu,
+            "last_hour_comp": last_hour_comp,
+            "last_full_hour_rvu": last_full_hour_rvu,
+            "last_full_hour_comp": last_full_hour_comp,
+            "current_hour_rvu": current_hour_rvu,
+            "current_hour_comp": current_hour_comp,
+        }
+
+
+class CumulativeRVU:
+    """RVU finished by any point in time for a fixed (historical) shift.
+
+    Built once per comparison shift - finish times sorted with running sums -
+    so the pace car's "prior at this time" is a binary search per refresh.
+    Records without a usable finish time count towards the total only.
+    """
+
+    def __init__(self, records: Sequence[dict]):
+        timed = []
+        self.total = 0.0
+        for record in records:
+            rvu = record.get("rvu", 0) or 0
+            self.total += rvu
+            finished = record_finished_at(record) if record.get("time_finished") else None
+            if finished is not None:
+                timed.append((finished, rvu))
+        timed.sort(key=lambda item: item[0])
+        self.count = len(records)
+        self._times = [finished for finished, _ in timed]
+        self._running = []
+        running = 0.0
+        for _, rvu in timed:
+            running += rvu
+            self._running.append(running)
+
+    def at(self, when: datetime) -> float:
+        """RVU of studies finished at or before when."""
+        index = bisect_right(self._times, when)
+        return self._running[index - 1] if index else 0.0
+
+
+__all__ = ['MinuteAccumulator', 'ShiftStatsStore', 'CumulativeRVU']
@@ -0,0 +1,38 @@
+"""Result cache for the statistics window - period queries and derived view data."""
+
+import logging
+
+from ..core.lru_cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+# Bounds for the shared cache. Weight is roughly "rows held" (records, RollupRows
+# or frame rows), so a few all-time selections can't pin the whole history in memory.
+STATISTICS_CACHE_MAX_ENTRIES = 24
+STATISTICS_CACHE_MAX_WEIGHT = 250_000
+
+
+class StatisticsCache(LRUCache):
+    """Bounded LRU cache of statistics results.
+
+    Callers build keys that include the database's change_counter, so anything
+    cached before a write is simply never looked up again and ages out. Entries
+    are weighted by the rows they hold (see LRUCache for the eviction rules).
+
+    Cached values are shared between callers and must be treated as read-only.
+    """
+
+    def __init__(self, max_entries: int = STATISTICS_CACHE_MAX_ENTRIES,
+                 max_weight: int = STATISTICS_CACHE_MAX_WEIGHT):
+        super().__init__(max_entries, max_weight)
+
+
+_statistics_cache = StatisticsCache()
+
+
+def get_statistics_cache() -> StatisticsCache:
+    """The process-wide cache shared by all statistics windows."""
+    return _statistics_cache
+
+
+__all__ = ['StatisticsCache', 'get_statistics_cache']
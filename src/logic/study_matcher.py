@@ -1,208 +1,408 @@
 """Study type matching logic - maps procedure text to study types and RVU values."""
 
+import json
+import hashlib
 import logging
-from typing import Tuple
+import threading
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from ..core.lru_cache import LRUCache
 
 logger = logging.getLogger(__name__)
 
 
+# Modality keywords used as a fallback before partial matching.
+# Order matters: longer keywords checked first (e.g., "ultrasound" before "us")
+# Note: "pet" intentionally excluded - PET CT must match both "pet" and "ct" together in partial matching
+KEYWORD_STUDY_TYPES = {
+    "ct cap": "CT CAP",
+    "ct ap": "CT AP",
+    "cta": "CTA Brain",  # Default CTA
+    "ultrasound": "US Other",  # Check "ultrasound" before "us"
+    "mri": "MRI Other",
+    "mr ": "MRI Other",
+    "us ": "US Other",
+    "x-ray": "XR Other",
+    "xr ": "XR Other",
+    "xr\t": "XR Other",  # XR with tab
+    "nuclear": "NM Other",
+    "nm ": "NM Other",
+}
+
+# Keywords sorted once - prioritize longer/more specific keywords first
+_SORTED_KEYWORDS = sorted(KEYWORD_STUDY_TYPES.keys(), key=len, reverse=True)
+
+# Two-character modality prefixes (procedure starts with...)
+# Note: "pe" prefix excluded - PET CT must match both "pet" and "ct" together in partial matching
+PREFIX_STUDY_TYPES = {
+    "xr": "XR Other",
+    "x-": "XR Other",
+    "ct": "CT Other",
+    "mr": "MRI Other",
+    "us": "US Other",
+    "nm": "NM Other",
+}
+
+# Indicators that allow "CTA Brain with Perfusion" to be picked up by partial matching
+_CTA_INDICATORS = ("cta", "angio", "angiography")
+
+# Maximum number of distinct procedure texts kept in the classification cache
+CLASSIFICATION_CACHE_SIZE = 4096
+
+
+def rules_fingerprint(rvu_table: dict, classification_rules: dict = None, direct_lookups: dict = None) -> str:
+    """Return a short hash identifying the content of the loaded RVU rules."""
+    payload = json.dumps(
+        [rvu_table or {}, classification_rules or {}, direct_lookups or {}],
+        sort_keys=True, default=str
+    )
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:16]
+
+
+class ClassificationCache(LRUCache):
+    """Bounded LRU cache of classification results.
+
+    Keys are (rules fingerprint, normalized procedure text), so results computed
+    under an older version of the rules are never returned for the new ones.
+    Thread-safe: the poll thread and the statistics window classify concurrently.
+    """
+
+    def __init__(self, maxsize: int = CLASSIFICATION_CACHE_SIZE):
+        super().__init__(maxsize)
+
+
+_classification_cache = ClassificationCache()
+
+
+class _KeywordAutomaton:
+    """Aho-Corasick automaton over a fixed set of lowercase keywords.
+
+    Finds every keyword that occurs anywhere in a text with a single pass over
+    the text, which is equivalent to running ``keyword in text`` for each keyword.
+    """
+
+    def __init__(self, keywords):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[Tuple[str, ...]] = [()]
+        self._always: FrozenSet[str] = frozenset()
+
+        always = set()
+        for keyword in keywords:
+            if not keyword:
+                # "" is a substring of every text
+                always.add(keyword)
+                continue
+            self._add(keyword)
+        self._always = frozenset(always)
+        self._build()
+
+    def _add(self, keyword: str):
+        state = 0
+        for ch in keyword:
+            next_state = self._goto[state].get(ch)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+                self._goto[state][ch] = next_state
+            state = next_state
+        if keyword not in self._out[state]:
+            self._out[state] = self._out[state] + (keyword,)
+
+    def _build(self):
+        """Compute failure links breadth-first and merge outputs along them."""
+        queue = list(self._goto[0].values())
+        head = 0
+        while head < len(queue):
+            state = queue[head]
+            head += 1
+            for ch, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(ch, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                if self._out[self._fail[next_state]]:
+                    self._out[next_state] = self._out[next_state] + self._out[self._fail[next_state]]
+
+    def find_all(self, text: str) -> set:
+        """Return the set of keywords occurring in text."""
+        goto = self._goto
+        fail = self._fail
+        out = self._out
+        found = set(self._always)
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                found.update(out[state])
+        return found
+
+
+class _CompiledRule:
+    """A classification rule with its keywords pre-lowercased."""
+
+    __slots__ = ("required", "excluded", "any_of", "exclude_only_if_all")
+
+    def __init__(self, rule: dict, exclude_only_if_all: bool):
+        self.required = frozenset(str(k).lower() for k in rule.get("required_keywords", []) or [])
+        self.excluded = frozenset(str(k).lower() for k in rule.get("excluded_keywords", []) or [])
+        self.any_of = frozenset(str(k).lower() for k in rule.get("any_of_keywords", []) or [])
+        self.exclude_only_if_all = exclude_only_if_all
+
+    def matches(self, found: set) -> bool:
+        if self.excluded:
+            if self.exclude_only_if_all:
+                # Special case for "CT Spine": exclude only if ALL excluded keywords are present
+                if self.excluded <= found:
+                    return False
+            elif not self.excluded.isdisjoint(found):
+                return False
+        if self.required and not self.required <= found:
+            return False
+        if self.any_of and self.any_of.isdisjoint(found):
+            return False
+        return True
+
+
+class CompiledMatcher:
+    """Pre-compiled study type matcher built once from the loaded RVU rules.
+
+    All keywords from the classification rules, the modality keyword fallbacks
+    and the RVU table study type names are compiled into a single keyword
+    automaton, so each procedure is scanned once. Precedence is identical to
+    the original rule evaluation: classification rules, exact match, modality
+    keywords, modality prefix, partial match, "Other" fallback, then PET CT.
+    """
+
+    def __init__(self, rvu_table: dict, classification_rules: dict = None, direct_lookups: dict = None):
+        self.rvu_table = rvu_table if rvu_table is not None else {}
+        self.classification_rules = classification_rules if classification_rules is not None else {}
+        self.direct_lookups = direct_lookups if direct_lookups is not None else {}
+        self.rules_version = rules_fingerprint(self.rvu_table, self.classification_rules, self.direct_lookups)
+
+        keywords = set(KEYWORD_STUDY_TYPES.keys())
+        keywords.update(("pet", "ct"))
+        keywords.update(_CTA_INDICATORS)
+
+        # Classification rules in priority order: [(study_type, [rules])]
+        self._rule_groups: List[Tuple[str, List[_CompiledRule]]] = []
+        for study_type, rules_list in self.classification_rules.items():
+            if not isinstance(rules_list, list):
+                continue
+            compiled = [_CompiledRule(rule, study_type == "CT Spine") for rule in rules_list]
+            for rule in compiled:
+                keywords.update(rule.required)
+                keywords.update(rule.excluded)
+                keywords.update(rule.any_of)
+            self._rule_groups.append((study_type, compiled))
+
+        # Exact match lookup (first study type in table order wins)
+        self._exact: Dict[str, Tuple[str, float]] = {}
+        # Partial match candidates: (study_lower, study_type, rvu, is_other)
+        self._candidates: List[Tuple[str, str, float, bool]] = []
+        # Candidate indices by lowercase name ("study type contained in procedure" direction)
+        self._names: Dict[str, List[int]] = {}
+        # Substring index for the "procedure contained in study type" direction
+        self._substrings: Dict[str, List[int]] = {}
+        self._pet_ct: Optional[Tuple[str, float]] = None
+        self._cta_perfusion: set = set()
+
+        for study_type, rvu in self.rvu_table.items():
+            study_lower = study_type.lower()
+            self._exact.setdefault(study_lower, (study_type, rvu))
+
+            if study_lower == "pet ct":
+                # Keep the last entry, matching the original loop's overwrite behaviour
+                self._pet_ct = (study_type, rvu)
+                continue
+
+            index = len(self._candidates)
+            self._candidates.append((study_lower, study_type, rvu, " other" in study_lower))
+            if study_lower == "cta brain with perfusion":
+                self._cta_perfusion.add(index)
+            keywords.add(study_lower)
+            self._names.setdefault(study_lower, []).append(index)
+            for start in range(len(study_lower) + 1):
+                for end in range(start, len(study_lower) + 1):
+                    indices = self._substrings.setdefault(study_lower[start:end], [])
+                    if not indices or indices[-1] != index:
+                        indices.append(index)
+
+        self._automaton = _KeywordAutomaton(keywords)
+        logger.debug(f"Compiled study matcher: {len(keywords)} keywords, "
+                     f"{sum(len(r) for _, r in self._rule_groups)} classification rules, "
+                     f"{len(self._candidates)} study types")
+
+    def match(self, procedure_text: str) -> Tuple[str, float]:
+        """Match procedure text to a study type.
+
+        Results are memoized in the shared classification cache, keyed by the
+        normalized procedure text and this matcher's rules version.
+
+        Returns:
+            Tuple of (study_type, rvu_value)
+        """
+        if not procedure_text:
+            return "Unknown", 0.0
+
+        procedure_lower = procedure_text.lower().strip()
+        key = (self.rules_version, procedure_lower)
+        result = _classification_cache.get(key)
+        if result is None:
+            result = self._match_uncached(procedure_text, procedure_lower)
+            _classification_cache.put(key, result)
+        return result
+
+    def _match_uncached(self, procedure_text: str, procedure_lower: str) -> Tuple[str, float]:
+        """Run the rule evaluation for one procedure (procedure_lower is its normalized form)."""
+        found = self._automaton.find_all(procedure_lower)
+
+        # FIRST: user-defined classification rules (highest priority)
+        for study_type, rules in self._rule_groups:
+            for rule in rules:
+                if rule.matches(found):
+                    rvu = self.rvu_table.get(study_type, 0.0)
+                    logger.debug(f"Matched classification rule: {procedure_text} -> {study_type} ({rvu} RVU)")
+                    return study_type, rvu
+
+        # Exact match
+        exact = self._exact.get(procedure_lower)
+        if exact is not None:
+            return exact
+
+        # Modality keywords - longer/more specific keywords first
+        for keyword in _SORTED_KEYWORDS:
+            if keyword in found:
+                study_type = KEYWORD_STUDY_TYPES[keyword]
+                rvu = self.rvu_table.get(study_type, 0.0)
+                logger.info(f"Matched keyword '{keyword}' to '{study_type}' for: {procedure_text}")
+                return study_type, rvu
+
+        # Modality prefix
+        # IMPORTANT: Check XA before CT (since "xa" starts with "x" which could match "xr")
+        if len(procedure_lower) >= 2:
+            first_three = procedure_lower[:3]
+            if first_three == "xa " or first_three == "xa\t":
+                # XA is fluoroscopy (XR modality)
+                return "XR Other", self.rvu_table.get("XR Other", 0.3)
+            study_type = PREFIX_STUDY_TYPES.get(procedure_lower[:2])
+            if study_type:
+                rvu = self.rvu_table.get(study_type, 0.0)
+                logger.info(f"Matched prefix '{procedure_lower[:2]}' to '{study_type}' for: {procedure_text}")
+                return study_type, rvu
+
+        # Partial matches (most specific first), "Other" types kept as fallbacks
+        has_cta_indicator = any(indicator in found for indicator in _CTA_INDICATORS)
+        candidate_indices = set(self._substrings.get(procedure_lower, ()))
+        for keyword in found:
+            candidate_indices.update(self._names.get(keyword, ()))
+
+        best = None
+        best_other = None
+        for index in candidate_indices:
+            if index in self._cta_perfusion and not has_cta_indicator:
+                continue
+            _, study_type, rvu, is_other = self._candidates[index]
+            entry = (len(study_type), study_type, rvu)
+            if is_other:
+                if best_other is None or entry > best_other:
+                    best_other = entry
+            elif best is None or entry > best:
+                best = entry
+
+        if best is not None:
+            return best[1], best[2]
+
+        if best_other is not None:
+            logger.info(f"Using 'Other' type fallback '{best_other[1]}' for: {procedure_text}")
+            return best_other[1], best_other[2]
+
+        # Absolute last resort: PET CT (only if both "pet" and "ct" appear together)
+        if self._pet_ct and "pet" in found and "ct" in found:
+            logger.info(f"Using PET CT as last resort match (both 'pet' and 'ct' found) for: {procedure_text}")
+            return self._pet_ct
+
+        return "Unknown", 0.0
+
+
+_matcher_lock = threading.Lock()
+_matcher_sources: Optional[Tuple[dict, dict, dict]] = None
+_matcher: Optional[CompiledMatcher] = None
+
+
+def get_compiled_matcher(rvu_table: dict, classification_rules: dict = None, direct_lookups: dict = None) -> CompiledMatcher:
+    """Return a CompiledMatcher for the given rules, reusing the last one if the rules are unchanged.
+
+    Object identity is checked first; when different dictionaries are passed the
+    rules fingerprint decides whether a recompile is needed. In-place edits of the
+    rule dictionaries must be followed by invalidate_classification_cache().
+    """
+    global _matcher_sources, _matcher
+    with _matcher_lock:
+        sources = _matcher_sources
+        if (_matcher is None or sources[0] is not rvu_table or sources[1] is not classification_rules
+                or sources[2] is not direct_lookups):
+            version = rules_fingerprint(rvu_table, classification_rules, direct_lookups)
+            if _matcher is None or _matcher.rules_version != version:
+                _matcher = CompiledMatcher(rvu_table, classification_rules, direct_lookups)
+                logger.info(f"Compiled study matcher for rules version {version}")
+            _matcher_sources = (rvu_table, classification_rules, direct_lookups)
+        return _matcher
+
+
+def invalidate_classification_cache():
+    """Discard the compiled matcher and all cached classifications.
+
+    Called whenever rvu_rules.yaml is rewritten (YAML auto-update, settings save).
+    """
+    global _matcher_sources, _matcher
+    with _matcher_lock:
+        _matcher = None
+        _matcher_sources = None
+    _classification_cache.clear()
+    logger.info(f"Classification cache invalidated (stats: {get_classification_cache_stats()})")
+
+
+def get_classification_cache_stats() -> dict:
+    """Return hit/miss counters of the classification cache."""
+    return _classification_cache.stats()
+
+
 def match_study_type(procedure_text: str, rvu_table: dict = None, classification_rules: dict = None, direct_lookups: dict = None) -> Tuple[str, float]:
     """Match procedure text to RVU table entry using best match.
-    
+
     Args:
         procedure_text: The procedure text to match
         rvu_table: RVU table dictionary (REQUIRED - must be provided from rvu_settings.yaml)
         classification_rules: Classification rules dictionary (optional)
         direct_lookups: Direct lookup dictionary (optional)
-    
+
     Returns:
         Tuple of (study_type, rvu_value)
     """
     if not procedure_text:
         return "Unknown", 0.0
-    
+
     # Require rvu_table - it must be provided from loaded settings
     if rvu_table is None:
         logger.error("match_study_type called without rvu_table parameter. RVU table must be loaded from rvu_settings.yaml")
         return "Unknown", 0.0
-    
-    if classification_rules is None:
-        classification_rules = {}
-    if direct_lookups is None:
-        direct_lookups = {}
-    
-    procedure_lower = procedure_text.lower().strip()
-    procedure_stripped = procedure_text.strip()
-    
-    # Check classification rules
-    classification_match_name = None
-    classification_match_rvu = None
-    
-    # FIRST: Check user-defined classification rules (highest priority)
-    # Rules are grouped by study_type, each group contains a list of rule definitions
-    for study_type, rules_list in classification_rules.items():
-        if not isinstance(rules_list, list):
-            continue
-        
-        for rule in rules_list:
-            required_keywords = rule.get("required_keywords", [])
-            excluded_keywords = rule.get("excluded_keywords", [])
-            any_of_keywords = rule.get("any_of_keywords", [])
-            
-            # Special case for "CT Spine": exclude only if ALL excluded keywords are present
-            if study_type == "CT Spine" and excluded_keywords:
-                all_excluded = all(keyword.lower() in procedure_lower for keyword in excluded_keywords)
-                if all_excluded:
-                    continue  # Skip this rule if all excluded keywords are present
-            # For other rules: exclude if any excluded keyword is present (case-insensitive, lowercase comparison)
-            elif excluded_keywords:
-                any_excluded = any(keyword.lower() in procedure_lower for keyword in excluded_keywords)
-                if any_excluded:
-                    continue  # Skip this rule if excluded keyword is present
-            
-            # Check if all required keywords are present (case-insensitive, lowercase comparison)
-            required_match = True
-            if required_keywords:
-                required_match = all(keyword.lower() in procedure_lower for keyword in required_keywords)
-            
-            # Check if at least one of any_of_keywords is present (if specified)
-            any_of_match = True
-            if any_of_keywords:
-                any_of_match = any(keyword.lower() in procedure_lower for keyword in any_of_keywords)
-            
-            # Match if all required keywords are present AND (any_of_keywords match OR no any_of_keywords specified)
-            if required_match and any_of_match:
-                # Get RVU from rvu_table
-                rvu = rvu_table.get(study_type, 0.0)
-                classification_match_name = study_type
-                classification_match_rvu = rvu
-                logger.debug(f"Matched classification rule for '{study_type}': {procedure_text} -> {study_type}")
-                break  # Found a classification match, stop searching rules for this study_type
-        
-        # If we found a classification match, stop searching other study_types
-        if classification_match_name:
-            break
-    
-    # If classification rule matched, return it immediately
-    if classification_match_name:
-        logger.debug(f"Matched classification rule: {procedure_text} -> {classification_match_name} ({classification_match_rvu} RVU)")
-        return classification_match_name, classification_match_rvu
-    
-    # Check for modality keywords and use "Other" types as fallback before partial matching
-    # BUT: Don't use fallback if a more specific match exists (e.g., "XR Chest" should match before "XR Other")
-    # This is handled by checking partial matches first, so we skip this fallback for now
-    # and let it fall through to partial matching which will find "XR Chest" before "XR Other"
-    
-    # Try exact match first
-    for study_type, rvu in rvu_table.items():
-        if study_type.lower() == procedure_lower:
-            return study_type, rvu
-    
-    # Try keyword matching FIRST (before partial matching) to correctly identify modality
-    # Order matters: longer keywords checked first (e.g., "ultrasound" before "us")
-    # Look up RVU values from rvu_table instead of hardcoding
-    keyword_study_types = {
-        "ct cap": "CT CAP",
-        "ct ap": "CT AP",
-        "cta": "CTA Brain",  # Default CTA
-        "ultrasound": "US Other",  # Check "ultrasound" before "us"
-        "mri": "MRI Other",
-        "mr ": "MRI Other",
-        "us ": "US Other",
-        "x-ray": "XR Other",
-        "xr ": "XR Other",
-        "xr\t": "XR Other",  # XR with tab
-        "nuclear": "NM Other",
-        "nm ": "NM Other",
-        # Note: "pet" intentionally excluded - PET CT must match both "pet" and "ct" together in partial matching
-    }
-    
-    # Check for keywords - prioritize longer/more specific keywords first
-    for keyword in sorted(keyword_study_types.keys(), key=len, reverse=True):
-        if keyword in procedure_lower:
-            study_type = keyword_study_types[keyword]
-            rvu = rvu_table.get(study_type, 0.0)
-            logger.info(f"Matched keyword '{keyword}' to '{study_type}' for: {procedure_text}")
-            return study_type, rvu
-    
-    # Also check if procedure starts with modality prefix (case-insensitive)
-    # Note: "pe" prefix excluded - PET CT must match both "pet" and "ct" together in partial matching
-    # IMPORTANT: Check XA before CT (since "xa" starts with "x" which could match "xr")
-    if len(procedure_lower) >= 2:
-        first_two = procedure_lower[:2]
-        # Check for 3-character prefixes first (XA, CTA) before 2-character
-        if len(procedure_lower) >= 3:
-            first_three = procedure_lower[:3]
-            if first_three == "xa " or first_three == "xa\t":
-                # XA is fluoroscopy (XR modality)
-                return "XR Other", rvu_table.get("XR Other", 0.3)
-            elif first_three == "cta":
-                # CTA - will be handled by classification rules or keyword matching
-                pass
-        
-        prefix_study_types = {
-            "xr": "XR Other",
-            "x-": "XR Other",
-            "ct": "CT Other",
-            "mr": "MRI Other",
-            "us": "US Other",
-            "nm": "NM Other",
-        }
-        if first_two in prefix_study_types:
-            study_type = prefix_study_types[first_two]
-            rvu = rvu_table.get(study_type, 0.0)
-            logger.info(f"Matched prefix '{first_two}' to '{study_type}' for: {procedure_text}")
-            return study_type, rvu
-    
-    # Try partial matches (most specific first), but exclude "Other" types initially
-    # PET CT is handled separately as it requires both "pet" and "ct" together
-    matches = []
-    other_matches = []
-    pet_ct_match = None
-    
-    for study_type, rvu in rvu_table.items():
-        study_lower = study_type.lower()
-        
-        # Special handling for PET CT - only match if both "pet" and "ct" appear together
-        if study_lower == "pet ct":
-            if "pet" in procedure_lower and "ct" in procedure_lower:
-                pet_ct_match = (study_type, rvu)
-            continue  # Skip adding to matches - will handle separately at the very end
-        
-        # Special handling for "CTA Brain with Perfusion" - don't match via partial matching
-        # unless it has CTA/angio indicators (classification rules should handle it if it does)
-        if study_lower == "cta brain with perfusion":
-            # Only match if it has CTA/angio indicators (otherwise classification rules would have matched it)
-            has_cta_indicator = ("cta" in procedure_lower or "angio" in procedure_lower or "angiography" in procedure_lower)
-            if not has_cta_indicator:
-                continue  # Skip partial matching for this study type if no CTA indicators
-        
-        if study_lower in procedure_lower or procedure_lower in study_lower:
-            # Score by length (longer = more specific)
-            score = len(study_type)
-            if " other" in study_lower or study_lower.endswith(" other"):
-                # Store "Other" types separately as fallbacks
-                other_matches.append((score, study_type, rvu))
-            else:
-                matches.append((score, study_type, rvu))
-    
-    # Return most specific non-"Other" match if found
-    if matches:
-        matches.sort(reverse=True)  # Highest score first
-        return matches[0][1], matches[0][2]
-    
-    # If no specific match, try "Other" types as fallback
-    if other_matches:
-        other_matches.sort(reverse=True)  # Highest score first
-        logger.info(f"Using 'Other' type fallback '{other_matches[0][1]}' for: {procedure_text}")
-        return other_matches[0][1], other_matches[0][2]
-    
-    # Absolute last resort: PET CT (only if both "pet" and "ct" appear together)
-    if pet_ct_match:
-        logger.info(f"Using PET CT as last resort match (both 'pet' and 'ct' found) for: {procedure_text}")
-        return pet_ct_match
-    
-    return "Unknown", 0.0
-
-
-__all__ = ['match_study_type']
+
+    return get_compiled_matcher(rvu_table, classification_rules, direct_lookups).match(procedure_text)
+
+
+__all__ = [
+    'match_study_type',
+    'CompiledMatcher',
+    'ClassificationCache',
+    'get_compiled_matcher',
+    'invalidate_classification_cache',
+    'get_classification_cache_stats',
+    'rules_fingerprint',
+]
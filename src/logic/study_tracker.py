@@ -185,50 +185,54 @@ class StudyTracker:
         
         Handles both old format (is_multi_accession with individual_accessions) and 
         new format (from_multi_accession on individual records).
+        
+        Uses the database's multi-accession index (a set lookup) instead of scanning
+        shift history; only records that exist purely in memory are scanned.
         """
         try:
-            # Check current shift records
-            current_shift_records = data_manager.data.get("current_shift", {}).get("records", [])
-            for record in current_shift_records:
-                # New format: from_multi_accession flag on individual records
-                if record.get("from_multi_accession", False):
-                    if record.get("accession") == accession:
-                        return True
-                
-                # Old format: is_multi_accession with individual_accessions array
-                if record.get("is_multi_accession", False):
-                    individual_accessions = record.get("individual_accessions", [])
-                    if accession in individual_accessions:
-                        return True
-                    accession_str = record.get("accession", "")
-                    if accession_str:
-                        accession_list = [acc.strip() for acc in accession_str.split(",")]
-                        if accession in accession_list:
-                            return True
+            current_shift = data_manager.data.get("current_shift", {})
+            db = getattr(data_manager, "db", None)
+            if db is not None:
+                if db.is_multi_accession_member(accession):
+                    return True
+                # Current shift records are written through to the database (and so
+                # indexed) while a shift is running; otherwise they only live in memory
+                if current_shift.get("shift_start"):
+                    return False
+                return self._records_contain_multi_accession(accession, current_shift.get("records", []))
             
-            # Check historical shifts
-            shifts = data_manager.data.get("shifts", [])
-            for shift in shifts:
-                shift_records = shift.get("records", [])
-                for record in shift_records:
-                    # New format
-                    if record.get("from_multi_accession", False):
-                        if record.get("accession") == accession:
-                            return True
-                    
-                    # Old format
-                    if record.get("is_multi_accession", False):
-                        individual_accessions = record.get("individual_accessions", [])
-                        if accession in individual_accessions:
-                            return True
-                        accession_str = record.get("accession", "")
-                        if accession_str and accession in accession_str.split(", "):
-                            return True
+            # No database - scan the in-memory history
+            if self._records_contain_multi_accession(accession, current_shift.get("records", [])):
+                return True
+            for shift in data_manager.data.get("shifts", []):
+                if self._records_contain_multi_accession(accession, shift.get("records", [])):
+                    return True
         except Exception as e:
             logger.debug(f"Error checking if accession was part of multi-accession: {e}")
         
         return False
     
+    @staticmethod
+    def _records_contain_multi_accession(accession: str, records: List[dict]) -> bool:
+        """Scan records for an accession recorded as part of a multi-accession study."""
+        for record in records:
+            # New format: from_multi_accession flag on individual records
+            if record.get("from_multi_accession", False):
+                if record.get("accession") == accession:
+                    return True
+            
+            # Old format: is_multi_accession with individual_accessions array
+            if record.get("is_multi_accession", False):
+                individual_accessions = record.get("individual_accessions", [])
+                if accession in individual_accessions:
+                    return True
+                accession_str = record.get("accession", "")
+                if accession_str:
+                    accession_list = [acc.strip() for acc in accession_str.split(",")]
+                    if accession in accession_list:
+                        return True
+        return False
+    
     def mark_seen(self, accession: str):
         """Mark accession as seen."""
         if accession:
@@ -1,3 +1,5 @@
 """Data models for RVU Counter."""
 
-# Models will be extracted in next phase
+from .study_record import StudyRecord, as_study_record, record_performed_at, record_finished_at
+
+__all__ = ['StudyRecord', 'as_study_record', 'record_performed_at', 'record_finished_at']
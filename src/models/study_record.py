@@ -0,0 +1,89 @@
+"""Study record model - a dict that parses its timestamps once."""
+
+from datetime import datetime
+from typing import Optional
+
+# Marks a timestamp slot that hasn't been parsed yet (None is a valid parse result)
+_UNPARSED = object()
+
+
+def _parse_iso(value) -> Optional[datetime]:
+    """Parse an ISO timestamp, returning None if it is missing or malformed."""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class StudyRecord(dict):
+    """A recorded study.
+
+    Behaves like the plain dicts the rest of the app uses (record["rvu"],
+    record.get(...), json.dumps), but caches the parsed time_performed /
+    time_finished datetimes. The cache is tied to the string it was parsed
+    from, so assigning a new timestamp is picked up on next access.
+    yaml.safe_dump rejects dict subclasses - dump dict(record) instead.
+    """
+
+    __slots__ = ('_performed_src', '_performed_dt', '_finished_src', '_finished_dt')
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._performed_src = _UNPARSED
+        self._performed_dt = None
+        self._finished_src = _UNPARSED
+        self._finished_dt = None
+
+    @property
+    def performed_at(self) -> Optional[datetime]:
+        """time_performed as a datetime (None if missing or invalid)."""
+        value = self.get('time_performed')
+        if value is not self._performed_src:
+            self._performed_dt = _parse_iso(value)
+            self._performed_src = value
+        return self._performed_dt
+
+    @property
+    def finished_at(self) -> Optional[datetime]:
+        """time_finished as a datetime (None if missing or invalid)."""
+        value = self.get('time_finished')
+        if value is not self._finished_src:
+            self._finished_dt = _parse_iso(value)
+            self._finished_src = value
+        return self._finished_dt
+
+    def copy(self) -> 'StudyRecord':
+        return StudyRecord(self)
+
+    def __reduce__(self):
+        # Pickle/deepcopy as a plain mapping; the timestamp cache is rebuilt lazily
+        return (StudyRecord, (dict(self),))
+
+    def __repr__(self) -> str:
+        return f"StudyRecord({dict.__repr__(self)})"
+
+
+def as_study_record(record: dict) -> StudyRecord:
+    """Return record as a StudyRecord (unchanged if it already is one)."""
+    if isinstance(record, StudyRecord):
+        return record
+    return StudyRecord(record)
+
+
+def record_performed_at(record: dict) -> Optional[datetime]:
+    """time_performed of any record dict, using the cached value when available."""
+    if isinstance(record, StudyRecord):
+        return record.performed_at
+    return _parse_iso(record.get('time_performed'))
+
+
+def record_finished_at(record: dict) -> Optional[datetime]:
+    """time_finished of any record dict, using the cached value when available."""
+    if isinstance(record, StudyRecord):
+        return record.finished_at
+    return _parse_iso(record.get('time_finished'))
+
+
+__all__ = ['StudyRecord', 'as_study_record', 'record_performed_at', 'record_finished_at']
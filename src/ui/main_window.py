@@ -8,11 +8,7 @@ from datetime import datetime, timedelta
 from typing import Optional, TYPE_CHECKING
 import threading
 import time
-
-try:
-    from pywinauto import Desktop
-except ImportError:
-    Desktop = None  # Will handle this gracefully
+import queue
 
 from ..core.config import APP_VERSION, DEFAULT_SHIFT_LENGTH_HOURS, DEFAULT_MIN_STUDY_SECONDS
 from ..core.platform_utils import (
@@ -22,22 +18,29 @@ from ..core.platform_utils import (
     find_nearest_monitor_for_window
 )
 from ..data import RVUData
-from ..logic import StudyTracker
-from ..logic.study_matcher import match_study_type
+from ..data.shift_history import shift_record_count, shift_total_rvu
+from ..logic import StudyTracker, ShiftStatsStore, CumulativeRVU
+from ..logic.study_matcher import match_study_type, get_classification_cache_stats
+from ..models import record_finished_at
 
 # Import extraction utilities
 from ..utils.window_extraction import (
     _window_text_with_timeout,
     find_elements_by_automation_id
 )
+from ..utils.uia_executor import get_uia_stats
+from ..utils.window_registry import get_window_registry, POWERSCRIBE, MOSAIC, CLARIO
+from ..utils.source_polling import SourcePoller, merge_snapshots
 from ..utils.powerscribe_extraction import find_powerscribe_window
 from ..utils.mosaic_extraction import (
     find_mosaic_window,
     find_mosaic_webview_element,
     extract_mosaic_data_v2,
-    extract_mosaic_data
+    extract_mosaic_data,
+    invalidate_mosaic_locator,
+    get_mosaic_locator_stats
 )
-from ..utils.clario_extraction import extract_clario_patient_class
+from ..utils.clario_resolver import ClarioResolver
 
 # Lazy imports to avoid circular dependencies
 if TYPE_CHECKING:
@@ -46,11 +49,6 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger(__name__)
 
-# Module-level globals for PowerScribe/Mosaic detection
-_cached_desktop = None
-_timeout_thread_count = 0
-
-
 def _extract_accession_number(entry: str) -> str:
     """Extract pure accession number from entry string.
     
@@ -70,61 +68,13 @@ def _extract_accession_number(entry: str) -> str:
 
 
 def quick_check_powerscribe() -> bool:
-    """Quick check if PowerScribe window exists (fast, no deep inspection)."""
-    global _cached_desktop
-    
-    if Desktop is None:
-        return False
-    
-    if _cached_desktop is None:
-        _cached_desktop = Desktop(backend="uia")
-    desktop = _cached_desktop
-    
-    # Just check if window with PowerScribe title exists
-    for title in ["PowerScribe 360 | Reporting", "PowerScribe 360", "PowerScribe 360 - Reporting", 
-                  "Nuance PowerScribe 360", "Powerscribe 360"]:
-        try:
-            windows = desktop.windows(title=title, visible_only=True)
-            if windows:
-                return True
-        except Exception as e:
-            logger.debug(f"Error checking PowerScribe window '{title}': {e}")
-            continue
-    return False
+    """Quick check if PowerScribe window exists (cached handle, no deep inspection)."""
+    return get_window_registry().is_available(POWERSCRIBE)
 
 
 def quick_check_mosaic() -> bool:
-    """Quick check if Mosaic window exists (fast, no deep inspection)."""
-    global _cached_desktop
-    
-    if Desktop is None:
-        return False
-    
-    if _cached_desktop is None:
-        _cached_desktop = Desktop(backend="uia")
-    desktop = _cached_desktop
-    
-    try:
-        all_windows = desktop.windows(visible_only=True)
-        for window in all_windows:
-            try:
-                # Quick title check without deep inspection
-                title = window.window_text()
-                title_lower = title.lower()
-                # Check for MosaicInfoHub variations and Mosaic Reporting
-                if ("mosaicinfohub" in title_lower or 
-                    "mosaic info hub" in title_lower or 
-                    "mosaic infohub" in title_lower or
-                    ("mosaic" in title_lower and "reporting" in title_lower)):
-                    # Exclude test windows
-                    if not any(x in title_lower for x in ["rvu counter", "test", "viewer", "diagnostic"]):
-                        return True
-            except Exception as e:
-                logger.debug(f"Error checking Mosaic window: {e}")
-                continue
-    except Exception as e:
-        logger.debug(f"Error iterating windows for Mosaic check: {e}")
-    return False
+    """Quick check if Mosaic window exists (cached handle, no deep inspection)."""
+    return get_window_registry().is_available(MOSAIC)
 
 class RVUCounterApp:
     """Main application class."""
@@ -202,12 +152,6 @@ class RVUCounterApp:
         # Check if this is first run after update (show What's New)
         self._check_version_and_show_whats_new()
         
-        # Adaptive polling variables for PowerScribe worker thread
-        import time
-        self._last_accession_seen = ""
-        self._last_data_change_time = time.time()  # Initialize to current time
-        self._current_poll_interval = 1.0  # Start with moderate polling
-        
         # Current detected data (must be initialized before create_ui)
         self.current_accession = ""
         self.current_procedure = ""
@@ -226,28 +170,34 @@ class RVUCounterApp:
         self.cached_window = None
         self.cached_elements = {}  # automation_id -> element reference
         self.last_record_count = 0  # Track when to rebuild widgets
+        
+        # Running totals of the current shift, kept up to date by record events
+        self.shift_stats = ShiftStatsStore(self._get_compensation_rate)
+        self._recent_version = None  # shift_stats.membership_version shown in the recent list
+        self._label_texts = {}  # widget -> text last set by _set_label
+        self._grid_shown = {}  # widget -> last visibility set by _set_shown
+        self._pace_curve = None  # (comparison shift, CumulativeRVU) for the pace car
         self.no_report_skip_count = 0  # Skip expensive searches when no report is open
         
-        # Background thread for PowerScribe operations
+        # Background threads for PowerScribe/Mosaic/Clario operations
         self._ps_lock = threading.Lock()
-        self._ps_data = {}  # Data from PowerScribe (updated by background thread)
+        self._ps_data = {}  # Merged data of the sources (updated by the merge thread)
+        self._source_snapshots = {}  # source -> latest PollSnapshot (merge thread only)
         self._last_clario_accession = ""  # Track last accession we queried Clario for
-        self._clario_patient_class_cache = {}  # Cache Clario patient class by accession
+        # Clario lookups (run by the Clario poller) and the persistent accession -> patient class cache
+        self.clario_resolver = ClarioResolver(store=self.data_manager.db)
         self._pending_studies = {}  # Track accession -> procedure for studies detected but not yet added
         
         # Auto-switch data source detection
         self._active_source = None  # "PowerScribe" or "Mosaic" - currently active source
-        self._primary_source = "PowerScribe"  # Which source to check first
-        self._last_secondary_check = 0  # Timestamp of last secondary source check
-        self._secondary_check_interval = 5.0  # How often to check secondary when primary is idle (seconds)
+        self._primary_source = "PowerScribe"  # Which source wins ties between open studies
+        self._primary_since = 0.0  # When the primary source was last chosen manually
         
         # Inactivity auto-end shift tracker
         self.last_activity_time = datetime.now()
         self._auto_end_prompt_shown = False
         
-        self._ps_thread_running = True
-        self._ps_thread = threading.Thread(target=self._powerscribe_worker, daemon=True)
-        self._ps_thread.start()
+        self._start_source_workers()
         
         # Create UI
         self.create_ui()
@@ -392,6 +342,12 @@ class RVUCounterApp:
         # Update backup status display
         self._update_backup_status_display()
         
+        # Backups run on the backup manager's worker thread; it reports back through events
+        backup_mgr = self.data_manager.backup_manager
+        backup_mgr.set_activity_probe(lambda: bool(self.tracker.active_studies))
+        backup_mgr.subscribe(self._on_backup_event)
+        backup_mgr.start_worker()
+        
         version_text = f"v{APP_VERSION}"
         self.version_label = ttk.Label(version_frame, text=version_text, font=("Arial", 7), foreground="gray")
         self.version_label.pack(side=tk.LEFT)
@@ -785,22 +741,24 @@ class RVUCounterApp:
         self.root.after(5000, self.setup_time_sensitive_update)  # 5 seconds
     
     def update_time_sensitive_stats(self):
-        """Lightweight update for time-based metrics only (avg/hour, projections).
+        """Lightweight update for time-based metrics only (avg/hour, hour windows, projections).
         
         This runs on a slower timer (5s) and only recalculates values that change
-        with time, avoiding expensive full recalculation of all stats.
+        with time; the sums come from the shift stats store's accumulators, so
+        the cost does not grow with the number of studies in the shift.
         """
         if not self.shift_start:
             return
         
         try:
-            records = self.data_manager.data["current_shift"]["records"]
             current_time = datetime.now()
             settings = self.data_manager.data["settings"]
             
-            # Calculate values that change with time
-            total_rvu = sum(r["rvu"] for r in records)
-            total_comp = sum(self._calculate_study_compensation(r) for r in records)
+            # Totals and hour windows come from the shift stats store - only the time-based values are recalculated
+            self._sync_shift_stats()
+            sums = self.shift_stats.window_sums(current_time)
+            total_rvu = sums["total_rvu"]
+            total_comp = sums["total_comp"]
             
             # Average per hour (changes as time passes even with no new studies)
             hours_elapsed = (current_time - self.shift_start).total_seconds() / 3600
@@ -809,15 +767,27 @@ class RVUCounterApp:
             
             # Update avg labels if visible
             if settings.get("show_avg", True):
-                self.avg_label.config(text=f"{avg_per_hour:.1f}")
+                self._set_label(self.avg_label, f"{avg_per_hour:.1f}")
                 if settings.get("show_comp_avg", False):
-                    self.avg_comp_label.config(text=f"(${avg_comp_per_hour:,.0f})")
+                    self._set_label(self.avg_comp_label, f"(${avg_comp_per_hour:,.0f})")
             
-            # Projected for current hour (changes as time passes)
+            # Last hour / last full hour (studies age out of these as time passes)
             current_hour_start = current_time.replace(minute=0, second=0, microsecond=0)
-            current_hour_records = [r for r in records if datetime.fromisoformat(r["time_finished"]) >= current_hour_start]
-            current_hour_rvu = sum(r["rvu"] for r in current_hour_records)
-            current_hour_comp = sum(self._calculate_study_compensation(r) for r in current_hour_records)
+            if settings.get("show_last_hour", True):
+                self._set_label(self.last_hour_label, f"{sums['last_hour_rvu']:.1f}")
+                if settings.get("show_comp_last_hour", False):
+                    self._set_label(self.last_hour_comp_label, f"(${sums['last_hour_comp']:,.0f})")
+            if settings.get("show_last_full_hour", True):
+                last_full_hour_start = current_hour_start - timedelta(hours=1)
+                self._set_label(self.last_full_hour_label, f"{sums['last_full_hour_rvu']:.1f}")
+                self._set_label(self.last_full_hour_range_label,
+                                f"{self._format_hour_label(last_full_hour_start)}-{self._format_hour_label(current_hour_start)}")
+                if settings.get("show_comp_last_full_hour", False):
+                    self._set_label(self.last_full_hour_comp_label, f"(${sums['last_full_hour_comp']:,.0f})")
+            
+            # Projected for current hour (changes as time passes)
+            current_hour_rvu = sums["current_hour_rvu"]
+            current_hour_comp = sums["current_hour_comp"]
             
             minutes_into_hour = (current_time - current_hour_start).total_seconds() / 60
             if minutes_into_hour > 0:
@@ -829,9 +799,9 @@ class RVUCounterApp:
             
             # Update projected labels if visible
             if settings.get("show_projected", True):
-                self.projected_label.config(text=f"{projected:.1f}")
+                self._set_label(self.projected_label, f"{projected:.1f}")
                 if settings.get("show_comp_projected", False):
-                    self.projected_comp_label.config(text=f"(${projected_comp:,.0f})")
+                    self._set_label(self.projected_comp_label, f"(${projected_comp:,.0f})")
             
             # Projected shift total (changes as time passes)
             projected_shift_rvu = total_rvu
@@ -856,9 +826,9 @@ class RVUCounterApp:
             
             # Update projected shift labels if visible
             if settings.get("show_projected_shift", True):
-                self.projected_shift_label.config(text=f"{projected_shift_rvu:.1f}")
+                self._set_label(self.projected_shift_label, f"{projected_shift_rvu:.1f}")
                 if settings.get("show_comp_projected_shift", False):
-                    self.projected_shift_comp_label.config(text=f"(${projected_shift_comp:,.0f})")
+                    self._set_label(self.projected_shift_comp_label, f"(${projected_shift_comp:,.0f})")
             
             # Update pace car if visible
             if settings.get("show_pace_car", False):
@@ -1435,7 +1405,7 @@ class RVUCounterApp:
                 
                 # Add each shift as a clickable entry
                 for shift in sorted_shifts:
-                    if not shift.get("records"):
+                    if not shift_record_count(shift):
                         continue  # Skip shifts with no records
                     
                     # Calculate shift info
@@ -1447,8 +1417,8 @@ class RVUCounterApp:
                         date_str = "Unknown date"
                         time_str = ""
                     
-                    total_rvu = sum(r.get('rvu', 0) for r in shift.get('records', []))
-                    record_count = len(shift.get('records', []))
+                    total_rvu = shift_total_rvu(shift)
+                    record_count = shift_record_count(shift)
                     
                     # Create shift button
                     shift_text = f"{date_str} {time_str}\n  ({record_count}, {total_rvu:.1f} RVU)"
@@ -1525,12 +1495,12 @@ class RVUCounterApp:
         best_ever_rvu = 0
         
         for shift in historical_shifts:
-            if not shift.get("shift_start") or not shift.get("records"):
+            if not shift.get("shift_start") or not shift_record_count(shift):
                 continue
             
             try:
                 shift_start = datetime.fromisoformat(shift["shift_start"])
-                total_rvu = sum(r.get('rvu', 0) for r in shift.get('records', []))
+                total_rvu = shift_total_rvu(shift)
                 
                 # Calculate shift duration for best_ever eligibility
                 shift_end_str = shift.get("shift_end")
@@ -1741,10 +1711,10 @@ class RVUCounterApp:
                             shift_start = datetime.fromisoformat(shift["shift_start"])
                             if self._is_valid_shift_hour(shift_start.hour):
                                 # Verify shift has records
-                                records = shift.get("records", [])
-                                if records:
+                                record_count = shift_record_count(shift)
+                                if record_count:
                                     comparison_shift = shift
-                                    logger.debug(f"Found comparison shift: start={shift_start.isoformat()}, records={len(records)}")
+                                    logger.debug(f"Found comparison shift: start={shift_start.isoformat()}, records={record_count}")
                                     break
                                 else:
                                     logger.debug(f"Skipping shift with no records: start={shift_start.isoformat()}")
@@ -1784,46 +1754,22 @@ class RVUCounterApp:
                            f"reference_11pm={prior_reference.strftime('%Y-%m-%d %H:%M:%S')}, "
                            f"target={target_time.strftime('%Y-%m-%d %H:%M:%S')}")
             
-            # Sum RVU for all records finished before target_time
-            rvu_at_elapsed = 0.0
-            total_rvu = 0.0
+            # RVU finished by target_time - the comparison shift's cumulative curve is built once
             records = comparison_shift.get("records", [])
             
             if not records:
                 logger.warning(f"Comparison shift has no records. Shift start: {comparison_shift.get('shift_start')}")
                 return None
             
-            records_before_target = 0
-            records_after_target = 0
-            
-            for record in records:
-                rvu = record.get("rvu", 0) or 0
-                total_rvu += rvu  # Always add to total
-                
-                time_finished_str = record.get("time_finished", "")
-                if not time_finished_str:
-                    # Skip records without time_finished, but still count toward total
-                    logger.debug(f"Record missing time_finished: accession={record.get('accession')}, rvu={rvu}")
-                    continue
-                
-                try:
-                    time_finished = datetime.fromisoformat(time_finished_str)
-                    if time_finished <= target_time:
-                        rvu_at_elapsed += rvu
-                        records_before_target += 1
-                        logger.info(f"[PACE]   ✓ BEFORE: finished={time_finished.strftime('%H:%M:%S')}, rvu={rvu:.1f}, proc={record.get('procedure', 'N/A')[:40]}")
-                    else:
-                        records_after_target += 1
-                        if records_after_target <= 3:  # Only log first 3 after-target records to avoid spam
-                            logger.info(f"[PACE]   ✗ AFTER: finished={time_finished.strftime('%H:%M:%S')}, rvu={rvu:.1f}, proc={record.get('procedure', 'N/A')[:40]}")
-                except (ValueError, TypeError) as e:
-                    # Skip records with invalid time_finished format
-                    logger.debug(f"Failed to parse time_finished '{time_finished_str}': {e}")
-                    continue
+            curve = self._pace_curve
+            if curve is None or curve[0] is not comparison_shift or curve[1].count != len(records):
+                curve = (comparison_shift, CumulativeRVU(records))
+                self._pace_curve = curve
+            rvu_at_elapsed = curve[1].at(target_time)
+            total_rvu = curve[1].total
             
             logger.info(f"[PACE] ═══ RESULT ═══ Elapsed: {elapsed_minutes:.1f}min | Target: {target_time.strftime('%H:%M:%S')} | "
-                       f"RVU at elapsed: {rvu_at_elapsed:.1f} | Total RVU: {total_rvu:.1f} | "
-                       f"Records before/after: {records_before_target}/{records_after_target}")
+                       f"RVU at elapsed: {rvu_at_elapsed:.1f} | Total RVU: {total_rvu:.1f}")
             
             return (rvu_at_elapsed, total_rvu)
             
@@ -1841,6 +1787,7 @@ class RVUCounterApp:
             return
         
         records = self.data_manager.data["current_shift"]["records"]
+        self._sync_shift_stats()
         
         # Find existing record with same accession
         existing_index = None
@@ -1869,14 +1816,15 @@ class RVUCounterApp:
                     records[existing_index]["study_type"] = study_record["study_type"]
                 if study_record.get("rvu") is not None:
                     records[existing_index]["rvu"] = study_record["rvu"]
-                self.data_manager.save()
+                self.data_manager.update_record_duration(records[existing_index])
+                self.shift_stats.record_updated(records[existing_index])
                 logger.info(f"Updated study duration for {accession}: {existing_duration:.1f}s -> {new_duration:.1f}s (kept higher duration)")
             else:
                 logger.debug(f"Study {accession} already recorded with higher duration ({existing_duration:.1f}s >= {new_duration:.1f}s), skipping")
         else:
-            # New study - record it
-            records.append(study_record)
-            self.data_manager.save()
+            # New study - record it (single INSERT, no YAML rewrite or shift resync)
+            self.data_manager.append_record(study_record)
+            self.shift_stats.record_added(records[-1])
             
             # Reset inactivity timer on new study
             self.last_activity_time = datetime.now()
@@ -2067,7 +2015,8 @@ class RVUCounterApp:
         if window:
             # Validate window still exists
             try:
-                _window_text_with_timeout(window, timeout=0.5, element_name="PowerScribe window validation")
+                _window_text_with_timeout(window, timeout=0.5, element_name="PowerScribe window validation",
+                                          source=POWERSCRIBE)
                 self.cached_window = window
             except:
                 self.cached_window = None
@@ -2081,7 +2030,8 @@ class RVUCounterApp:
             elements = find_elements_by_automation_id(
                 window,
                 ["labelProcDescription", "labelAccessionTitle", "labelAccession", "labelPatientClass", "listBoxAccessions"],
-                self.cached_elements
+                self.cached_elements,
+                source=POWERSCRIBE
             )
             
             data['elements'] = elements
@@ -2102,7 +2052,8 @@ class RVUCounterApp:
                     elements = find_elements_by_automation_id(
                         window,
                         ["labelProcDescription", "labelAccessionTitle", "labelAccession", "labelPatientClass", "listBoxAccessions"],
-                        {}
+                        {},
+                        source=POWERSCRIBE
                     )
                     data['accession'] = elements.get("labelAccession", {}).get("text", "").strip()
                     if data['accession']:
@@ -2136,7 +2087,8 @@ class RVUCounterApp:
                     
                     for child in listbox_children:
                         try:
-                            item_text = _window_text_with_timeout(child, timeout=0.3, element_name="listbox child").strip()
+                            item_text = _window_text_with_timeout(child, timeout=0.3, element_name="listbox child",
+                                                                  source=POWERSCRIBE).strip()
                             if item_text:
                                 data['multiple_accessions'].append(item_text)
                         except:
@@ -2187,7 +2139,8 @@ class RVUCounterApp:
         if main_window:
             try:
                 # Validate window still exists
-                _window_text_with_timeout(main_window, timeout=1.0, element_name="Mosaic window validation")
+                _window_text_with_timeout(main_window, timeout=1.0, element_name="Mosaic window validation",
+                                          source=MOSAIC)
                 data['found'] = True
                 
                 # =========================================================
@@ -2275,12 +2228,18 @@ class RVUCounterApp:
             else:
                 new_source = "PowerScribe"
             
-            self._primary_source = new_source
+            with self._ps_lock:
+                self._primary_source = new_source
+                self._primary_since = time.time()
             self._active_source = new_source
             
             # Update the indicator immediately
             self._update_source_indicator(new_source)
             
+            # Re-merge with fresh snapshots
+            for source in (POWERSCRIBE, MOSAIC):
+                self._source_pollers[source].wake()
+            
             logger.info(f"Manually switched data source to: {new_source}")
         except Exception as e:
             logger.error(f"Error toggling data source: {e}")
@@ -2329,25 +2288,41 @@ class RVUCounterApp:
             if schedule != "shift_end":
                 return
             
-            logger.info("Performing automatic backup at shift end...")
-            
-            # Perform backup (runs synchronously - quick operation)
-            result = backup_mgr.create_backup(force=True)
+            logger.info("Queueing automatic backup at shift end...")
             
-            if result["success"]:
-                logger.info(f"Shift-end backup completed: {result['path']}")
-            else:
-                logger.warning(f"Shift-end backup failed: {result['error']}")
-            
-            # Save updated backup status
-            self.data_manager.save()
-            
-            # Update UI
-            self._update_backup_status_display()
+            # Runs on the backup worker; status is saved/displayed by _handle_backup_event
+            backup_mgr.request_backup("shift_end")
             
         except Exception as e:
             logger.error(f"Error performing shift-end backup: {e}")
     
+    def _on_backup_event(self, event: dict):
+        """Backup worker event listener (worker thread) - hand off to the Tk main loop."""
+        try:
+            self.root.after(0, lambda: self._handle_backup_event(event))
+        except:
+            pass
+    
+    def _handle_backup_event(self, event: dict):
+        """Reflect backup progress in the status indicator."""
+        try:
+            name = event["event"]
+            if name == "progress":
+                self.backup_status_label.config(text=f"⏳ {event['percent']}%", fg="gray")
+            elif name == "retrying":
+                self.backup_status_label.config(text="⏳ Waiting...", fg="orange")
+            elif name == "finished" and event.get("kind") == "backup":
+                result = event.get("result", {})
+                if result.get("success"):
+                    logger.info(f"Backup ({event['reason']}) completed: {result.get('path')}")
+                else:
+                    logger.warning(f"Backup ({event['reason']}) failed: {result.get('error')}")
+                # Save updated backup status
+                self.data_manager.save()
+                self._update_backup_status_display()
+        except Exception as e:
+            logger.debug(f"Error handling backup event: {e}")
+    
     def _check_first_time_backup_prompt(self):
         """Check if we should prompt user to enable cloud backup on first run."""
         try:
@@ -2477,256 +2452,69 @@ class RVUCounterApp:
         except Exception as e:
             logger.error(f"Error showing backup setup prompt: {e}")
     
-    def _powerscribe_worker(self):
-        """Background thread: Continuously poll PowerScribe or Mosaic for data with auto-switching."""
-        import time
+    # =========================================================================
+    # Source polling
+    # =========================================================================
+    
+    def _start_source_workers(self):
+        """Start one poller per source (PowerScribe, Mosaic, Clario) and the merge thread."""
+        self._snapshot_queue = queue.Queue()
+        self._source_pollers = {
+            POWERSCRIBE: SourcePoller(POWERSCRIBE, self._extract_powerscribe_data, self._snapshot_queue.put,
+                                      on_overrun=self._on_powerscribe_overrun),
+            MOSAIC: SourcePoller(MOSAIC, self._extract_mosaic_data, self._snapshot_queue.put,
+                                 on_overrun=self._on_mosaic_overrun),
+            # Clario is only looked at when a new study appears - it is woken by _request_clario_lookup
+            CLARIO: SourcePoller(CLARIO, self._poll_clario, self._snapshot_queue.put, interval=5.0),
+        }
+        self._ps_thread_running = True
+        self._ps_thread = threading.Thread(target=self._merge_worker, name="poll-merge", daemon=True)
+        self._ps_thread.start()
+        for poller in self._source_pollers.values():
+            poller.start()
+    
+    def _on_powerscribe_overrun(self, duration: float):
+        """PowerScribe poll ran over its budget (poller thread) - force fresh detection."""
+        self.cached_window = None
+        self.cached_elements = {}
+        get_window_registry().invalidate(POWERSCRIBE)
+        logger.info("Cleared cached PowerScribe window due to slow polling - will re-detect next poll")
+    
+    def _on_mosaic_overrun(self, duration: float):
+        """Mosaic poll ran over its budget (poller thread) - force fresh detection."""
+        get_window_registry().invalidate(MOSAIC)
+        invalidate_mosaic_locator()
+        logger.info("Cleared cached Mosaic window due to slow polling - will re-detect next poll")
+    
+    def _merge_worker(self):
+        """Background thread: reconcile the pollers' snapshots into _ps_data.
         
+        Each source poller hands over its results as they come, so a slow source
+        never delays another. Only the newest snapshot of each source is kept;
+        merge_snapshots() decides which one is shown.
+        """
         while self._ps_thread_running:
-            poll_start_time = time.time()
             try:
-                data = {
-                    'found': False,
-                    'procedure': '',
-                    'accession': '',
-                    'patient_class': '',
-                    'accession_title': '',
-                    'multiple_accessions': [],
-                    'elements': {},
-                    'source': None
-                }
-                
-                # Auto-switch logic: Check primary source first, then secondary if primary is idle
-                primary_data = None
-                secondary_data = None
-                current_time = time.time()
-                
-                # Determine which sources are available (quick check)
-                ps_available = quick_check_powerscribe()
-                mosaic_available = quick_check_mosaic()
-                
-                # If only one source is available, use it
-                if ps_available and not mosaic_available:
-                    data = self._extract_powerscribe_data()
-                    # Always set source when window is available (even if no study is open)
-                    self._active_source = "PowerScribe"
-                    if data.get('accession'):
-                        self._primary_source = "PowerScribe"
-                elif mosaic_available and not ps_available:
-                    data = self._extract_mosaic_data()
-                    # Always set source when window is available (even if no study is open)
-                    self._active_source = "Mosaic"
-                    if data.get('accession'):
-                        self._primary_source = "Mosaic"
-                elif ps_available and mosaic_available:
-                    # Both available - use tiered polling
-                    # Check primary source first
-                    if self._primary_source == "PowerScribe":
-                        primary_data = self._extract_powerscribe_data()
-                    else:
-                        primary_data = self._extract_mosaic_data()
-                    
-                    if primary_data.get('accession'):
-                        # Primary has active study - use it, skip secondary
-                        data = primary_data
-                        self._active_source = self._primary_source
-                    else:
-                        # Primary is idle - check secondary
-                        # But not too frequently (every 5 seconds when primary is idle)
-                        if current_time - self._last_secondary_check >= self._secondary_check_interval:
-                            self._last_secondary_check = current_time
-                            
-                            if self._primary_source == "PowerScribe":
-                                secondary_data = self._extract_mosaic_data()
-                            else:
-                                secondary_data = self._extract_powerscribe_data()
-                            
-                            if secondary_data.get('accession'):
-                                # Secondary has active study - SWITCH!
-                                data = secondary_data
-                                old_primary = self._primary_source
-                                self._primary_source = secondary_data.get('source', self._primary_source)
-                                self._active_source = self._primary_source
-                                logger.info(f"Auto-switched data source: {old_primary} → {self._active_source}")
-                            else:
-                                # Neither has active study - use primary's data (still shows window found)
-                                data = primary_data
-                                self._active_source = self._primary_source
-                        else:
-                            # Not time to check secondary yet - use primary data
-                            data = primary_data
-                            self._active_source = self._primary_source
-                else:
-                    # Neither available
-                    self._active_source = None
-                
-                # Update source indicator
-                self._update_source_indicator(self._active_source)
-                
-                # Update shared data IMMEDIATELY with PowerScribe/Mosaic data (before Clario query)
-                # This ensures the display shows data immediately even if Clario is slow
-                current_accession = data.get('accession', '').strip()
-                current_procedure = data.get('procedure', '').strip()
-                is_na_procedure = current_procedure.lower() in ["n/a", "na", "none", ""]
-                
-                with self._ps_lock:
-                    self._ps_data = data.copy()  # Store copy immediately
-                    
-                    # If we have a valid accession and procedure, store it as pending
-                    # This ensures we don't lose studies if procedure changes to N/A before refresh_data
-                    if current_accession and current_procedure and not is_na_procedure:
-                        self._pending_studies[current_accession] = {
-                            'procedure': current_procedure,
-                            'patient_class': data.get('patient_class', ''),
-                            'detected_at': time.time()
-                        }
-                        logger.debug(f"Stored pending study: {current_accession} - {current_procedure}")
-                
-                # Query Clario for patient class only when a new study is detected (accession changed)
-                # Do this AFTER storing initial data so display isn't blocked
-                multiple_accessions_list = data.get('multiple_accessions', [])
-                
-                # For multi-accession studies, extract all accession numbers
-                all_accessions = set()
-                if current_accession:
-                    all_accessions.add(current_accession)
-                if multiple_accessions_list:
-                    for acc_entry in multiple_accessions_list:
-                        # Format: "ACC (PROC)" or just "ACC"
-                        if '(' in acc_entry and ')' in acc_entry:
-                            acc_match = re.match(r'^([^(]+)', acc_entry)
-                            if acc_match:
-                                all_accessions.add(acc_match.group(1).strip())
-                            else:
-                                all_accessions.add(acc_entry.strip())
-                
-                if data.get('found') and all_accessions:
-                    # Check if this is a new study (accession changed)
-                    # For multi-accession, check if any accession is new
-                    with self._ps_lock:
-                        is_new_study = not any(acc == self._last_clario_accession for acc in all_accessions)
-                        last_accession = self._last_clario_accession
-                    
-                    logger.debug(f"Checking Clario: current_accession='{current_accession}', all_accessions={list(all_accessions)}, last_clario_accession='{last_accession}', is_new_study={is_new_study}")
-                    
-                    if is_new_study:
-                        # New study detected - query Clario (don't pass target_accession for multi-accession, let it match any)
-                        # Query Clario in a separate try block so it doesn't block data display
-                        logger.info(f"New study detected, querying Clario. Multi-accession: {len(all_accessions) > 1}, accessions: {list(all_accessions)}")
-                        try:
-                            # Query Clario without target_accession for multi-accession studies
-                            # This allows Clario to match any of the accessions
-                            if len(all_accessions) > 1:
-                                # Multi-accession: query without target, then check if result matches any
-                                clario_data = extract_clario_patient_class(target_accession=None)
-                            else:
-                                # Single accession: query with target
-                                clario_data = extract_clario_patient_class(target_accession=current_accession)
-                            
-                            if clario_data and clario_data.get('patient_class'):
-                                # Verify accession matches (for multi-accession, match any accession)
-                                clario_accession = clario_data.get('accession', '').strip()
-                                logger.info(f"Clario returned: patient_class='{clario_data.get('patient_class')}', accession='{clario_accession}'")
-                                
-                                # Check if Clario accession matches any of our accessions
-                                accession_matches = clario_accession in all_accessions if clario_accession else False
-                                
-                                if accession_matches:
-                                    # Accession matches - update data with Clario's patient class
-                                    with self._ps_lock:
-                                        # Update the stored data with Clario patient class
-                                        self._ps_data['patient_class'] = clario_data['patient_class']
-                                        self._last_clario_accession = clario_accession
-                                        # Cache patient class for all accessions in this multi-accession study
-                                        for acc in all_accessions:
-                                            self._clario_patient_class_cache[acc] = clario_data['patient_class']
-                                    logger.info(f"Clario patient class OVERRIDES: {clario_data['patient_class']} for study (matched accession: {clario_accession})")
-                                    # Trigger immediate UI refresh to display Clario patient class
-                                    self.root.after(0, self.refresh_data)
-                            else:
-                                # Clario didn't return data - keep existing patient_class from PowerScribe/Mosaic
-                                # But still mark this study as seen to prevent repeated queries
-                                with self._ps_lock:
-                                    if current_accession:
-                                        self._last_clario_accession = current_accession
-                                if clario_data:
-                                    logger.info(f"Clario returned data but no patient_class. Accession='{clario_data.get('accession', '')}'")
-                                else:
-                                    logger.info(f"Clario did not return any data")
-                        except Exception as e:
-                            logger.info(f"Clario query error: {e}", exc_info=True)
-                            # On error, keep existing patient_class (already stored in _ps_data)
-                            # Mark study as seen to prevent repeated queries
-                            with self._ps_lock:
-                                if current_accession:
-                                    self._last_clario_accession = current_accession
-                    else:
-                        # Same study - check if we have cached Clario patient class for any accession
-                        with self._ps_lock:
-                            cached_clario_class = None
-                            for acc in all_accessions:
-                                cached = self._clario_patient_class_cache.get(acc)
-                                if cached:
-                                    cached_clario_class = cached
-                                    break
-                        
-                        if cached_clario_class:
-                            # Update stored data with cached Clario patient class
-                            with self._ps_lock:
-                                self._ps_data['patient_class'] = cached_clario_class
-                            logger.debug(f"Same study (accessions={list(all_accessions)}), using cached Clario patient class: {cached_clario_class}")
-                            # Trigger immediate UI refresh to display cached Clario patient class
-                            self.root.after(0, self.refresh_data)
-                elif data.get('found') and not all_accessions:
-                    # No accession - study is closed
-                    # Clear last Clario accession so if the same study reopens, it queries Clario again
-                    with self._ps_lock:
-                        if self._last_clario_accession:
-                            logger.debug(f"Study closed - clearing _last_clario_accession (was: {self._last_clario_accession})")
-                            self._last_clario_accession = ""
-                        # For Mosaic, ensure patient_class is set to 'Unknown' if missing
-                        current_source = data.get('source') or self._active_source
-                        if current_source == "Mosaic":
-                            if not self._ps_data.get('patient_class'):
-                                self._ps_data['patient_class'] = 'Unknown'
-                    logger.debug(f"No accession found, cannot query Clario")
-                
-                # Adaptive polling: adjust interval based on activity state
-                # Use the stored data from _ps_data for consistency
-                with self._ps_lock:
-                    current_accession_check = self._ps_data.get('accession', '').strip()
-                
-                # Detect if accession changed (including going from something to empty)
-                accession_changed = current_accession_check != self._last_accession_seen
-                study_just_closed = accession_changed and self._last_accession_seen and not current_accession_check
+                snapshot = self._snapshot_queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            try:
+                batch = [snapshot]
+                while True:
+                    try:
+                        batch.append(self._snapshot_queue.get_nowait())
+                    except queue.Empty:
+                        break
                 
-                if accession_changed:
-                    # Accession changed - use fast polling
-                    self._last_accession_seen = current_accession_check
-                    self._last_data_change_time = time.time()
-                    if study_just_closed:
-                        # Study just closed - use very fast polling (300ms) to confirm closure quickly
-                        self._current_poll_interval = 0.3
-                        logger.debug(f"Study closed - fast polling at 0.3s")
-                    else:
-                        # New study appeared - use fast polling (500ms)
-                        self._current_poll_interval = 0.5
-                else:
-                    # Check how long since last change
-                    time_since_change = time.time() - self._last_data_change_time
-                    if current_accession_check:
-                        # Active study but no change - moderate polling (1000ms)
-                        if time_since_change > 1.0:
-                            self._current_poll_interval = 1.0
-                        else:
-                            self._current_poll_interval = 0.5
+                sources_changed = False
+                for snapshot in batch:
+                    if snapshot.source == CLARIO:
+                        self._apply_clario_result(snapshot.data)
                     else:
-                        # No active study - keep fast polling for 2 seconds after closure
-                        # This ensures quick detection and prevents false re-detection
-                        if time_since_change < 2.0:
-                            self._current_poll_interval = 0.3
-                        else:
-                            # After 2 seconds of no study, slow down to 1.5s (not 2.0s)
-                            self._current_poll_interval = 1.5
+                        self._source_snapshots[snapshot.source] = snapshot
+                        sources_changed = True
+                if sources_changed:
+                    self._publish_merged_data()
                 
                 # Clean up stale pending studies (older than 30 seconds)
                 current_time_cleanup = time.time()
@@ -2741,18 +2529,176 @@ class RVUCounterApp:
                 
             except Exception as e:
                 logger.error(f"Worker error: {e}", exc_info=True)
+    
+    @staticmethod
+    def _study_accessions(data: dict) -> set:
+        """All accession numbers of a poll result (multi-accession listbox entries included)."""
+        all_accessions = set()
+        current_accession = data.get('accession', '').strip()
+        if current_accession:
+            all_accessions.add(current_accession)
+        for acc_entry in data.get('multiple_accessions', []) or []:
+            # Format: "ACC (PROC)" or just "ACC"
+            if '(' in acc_entry and ')' in acc_entry:
+                acc_match = re.match(r'^([^(]+)', acc_entry)
+                if acc_match:
+                    all_accessions.add(acc_match.group(1).strip())
+                else:
+                    all_accessions.add(acc_entry.strip())
+        return all_accessions
+    
+    def _publish_merged_data(self):
+        """Pick the data to show from the sources' latest snapshots and store it in _ps_data."""
+        with self._ps_lock:
+            primary_source = self._primary_source
+            primary_since = self._primary_since
+        chosen = merge_snapshots(self._source_snapshots, primary_source, primary_since)
+        
+        previous_source = self._active_source
+        if chosen is None:
+            # Neither available
+            data = {
+                'found': False,
+                'procedure': '',
+                'accession': '',
+                'patient_class': '',
+                'accession_title': '',
+                'multiple_accessions': [],
+                'elements': {},
+                'source': None
+            }
+            self._active_source = None
+        else:
+            data = chosen.data
+            if chosen.accession and chosen.source != primary_source:
+                # The other source has the newest study - SWITCH!
+                with self._ps_lock:
+                    self._primary_source = chosen.source
+                if previous_source is not None:
+                    logger.info(f"Auto-switched data source: {primary_source} → {chosen.source}")
+            # Always set source when window is available (even if no study is open)
+            self._active_source = chosen.source
+        
+        # Update source indicator
+        if self._active_source != previous_source:
+            self._update_source_indicator(self._active_source)
+        
+        # Update shared data IMMEDIATELY with PowerScribe/Mosaic data (Clario answers later)
+        current_accession = data.get('accession', '').strip()
+        current_procedure = data.get('procedure', '').strip()
+        is_na_procedure = current_procedure.lower() in ["n/a", "na", "none", ""]
+        
+        with self._ps_lock:
+            self._ps_data = data.copy()  # Store copy immediately
+            
+            # If we have a valid accession and procedure, store it as pending
+            # This ensures we don't lose studies if procedure changes to N/A before refresh_data
+            if current_accession and current_procedure and not is_na_procedure:
+                self._pending_studies[current_accession] = {
+                    'procedure': current_procedure,
+                    'patient_class': data.get('patient_class', ''),
+                    'detected_at': time.time()
+                }
+                logger.debug(f"Stored pending study: {current_accession} - {current_procedure}")
+        
+        # Query Clario for patient class only when a new study is detected (accession changed)
+        all_accessions = self._study_accessions(data)
+        
+        if data.get('found') and all_accessions:
+            # Check if this is a new study (accession changed)
+            # For multi-accession, check if any accession is new
+            with self._ps_lock:
+                is_new_study = not any(acc == self._last_clario_accession for acc in all_accessions)
             
-            # Watchdog: detect if polling loop took too long
-            poll_duration = time.time() - poll_start_time
-            if poll_duration > 5.0:
-                logger.warning(f"⚠️  Polling loop took {poll_duration:.1f}s (expected <1s) - UI automation may be hanging")
-                # Clear cached windows/elements to force fresh detection next time
-                self.cached_window = None
-                self.cached_elements = {}
-                logger.info("Cleared cached windows due to slow polling - will re-detect next cycle")
+            # Cached from an earlier lookup (this session or a previous one) - no Clario walk needed
+            cached_clario_class = self.clario_resolver.cached_class(all_accessions)
+            if cached_clario_class:
+                # Update stored data with cached Clario patient class
+                with self._ps_lock:
+                    self._ps_data['patient_class'] = cached_clario_class
+                    if is_new_study:
+                        self._last_clario_accession = current_accession
+                logger.debug(f"Accessions={list(all_accessions)}, using cached Clario patient class: {cached_clario_class}")
+                # Trigger immediate UI refresh to display cached Clario patient class
+                self.root.after(0, self.refresh_data)
+            elif is_new_study:
+                self._request_clario_lookup(all_accessions, current_accession)
+        elif data.get('found') and not all_accessions:
+            # No accession - study is closed
+            # Clear last Clario accession so if the same study reopens, it queries Clario again
+            with self._ps_lock:
+                if self._last_clario_accession:
+                    logger.debug(f"Study closed - clearing _last_clario_accession (was: {self._last_clario_accession})")
+                    self._last_clario_accession = ""
+                self.clario_resolver.forget_resolved()
+                # For Mosaic, ensure patient_class is set to 'Unknown' if missing
+                current_source = data.get('source') or self._active_source
+                if current_source == "Mosaic":
+                    if not self._ps_data.get('patient_class'):
+                        self._ps_data['patient_class'] = 'Unknown'
+            logger.debug(f"No accession found, cannot query Clario")
+    
+    def _request_clario_lookup(self, all_accessions: set, current_accession: str):
+        """Queue a new study for the Clario poller (once per study; a newer study replaces a waiting one)."""
+        if not self.clario_resolver.request(all_accessions, current_accession):
+            return  # Already queued, in flight or just resolved
+        logger.info(f"New study detected, querying Clario. Multi-accession: {len(all_accessions) > 1}, accessions: {list(all_accessions)}")
+        self._source_pollers[CLARIO].wake()
+    
+    def _poll_clario(self) -> Optional[dict]:
+        """Clario poller: look up the patient class of the requested study (None if nothing is requested)."""
+        request = self.clario_resolver.next_request()
+        if request is None:
+            return None
+        try:
+            clario_data = self.clario_resolver.resolve(request)
+            return {'found': bool(clario_data), 'request': request, 'result': clario_data, 'error': None}
+        except Exception as e:
+            return {'found': False, 'request': request, 'result': None, 'error': e}
+    
+    def _apply_clario_result(self, lookup: dict):
+        """Merge a Clario lookup into the stored data (merge thread)."""
+        all_accessions, current_accession = lookup['request']
+        clario_data = lookup.get('result')
+        if lookup.get('error') is not None:
+            logger.info(f"Clario query error: {lookup['error']}")
+            # On error, keep existing patient_class (already stored in _ps_data)
+            # Mark study as seen to prevent repeated queries
+            with self._ps_lock:
+                if current_accession:
+                    self._last_clario_accession = current_accession
+            return
+        
+        if clario_data and clario_data.get('patient_class'):
+            # Verify accession matches (for multi-accession, match any accession)
+            clario_accession = clario_data.get('accession', '').strip()
+            logger.info(f"Clario returned: patient_class='{clario_data.get('patient_class')}', accession='{clario_accession}'")
+            
+            # Check if Clario accession matches any of our accessions
+            accession_matches = clario_accession in all_accessions if clario_accession else False
             
-            # Use adaptive polling interval
-            time.sleep(self._current_poll_interval)
+            if accession_matches:
+                # (The resolver has cached it for all accessions in this multi-accession study)
+                with self._ps_lock:
+                    self._last_clario_accession = clario_accession
+                    # The study may have changed while Clario was being read
+                    still_open = clario_accession in self._study_accessions(self._ps_data)
+                    if still_open:
+                        self._ps_data['patient_class'] = clario_data['patient_class']
+                logger.info(f"Clario patient class OVERRIDES: {clario_data['patient_class']} for study (matched accession: {clario_accession})")
+                if still_open:
+                    # Trigger immediate UI refresh to display Clario patient class
+                    self.root.after(0, self.refresh_data)
+        else:
+            # Clario didn't return data - keep existing patient_class from PowerScribe/Mosaic
+            # But still mark this study as seen to prevent repeated queries
+            with self._ps_lock:
+                if current_accession:
+                    self._last_clario_accession = current_accession
+            if clario_data:
+                logger.info(f"Clario returned data but no patient_class. Accession='{clario_data.get('accession', '')}'")
+            else:
+                logger.info(f"Clario did not return any data")
     
     def refresh_data(self):
         """Refresh data from PowerScribe - reads from background thread data."""
@@ -3623,10 +3569,7 @@ class RVUCounterApp:
             if records:
                 # Find the most recent study's time_finished
                 try:
-                    last_study_times = []
-                    for r in records:
-                        if r.get("time_finished"):
-                            last_study_times.append(datetime.fromisoformat(r["time_finished"]))
+                    last_study_times = [t for t in map(record_finished_at, records) if t is not None]
                     
                     if last_study_times:
                         last_study_time = max(last_study_times)
@@ -3800,7 +3743,9 @@ class RVUCounterApp:
         """Undo the last completed study (only works once per study)."""
         records = self.data_manager.data["current_shift"]["records"]
         if records and not self.undo_used:
+            self._sync_shift_stats()
             removed = records.pop()
+            self.shift_stats.record_removed(removed)
             self.data_manager.save()
             self.undo_used = True
             self.undo_btn.config(state=tk.DISABLED)
@@ -3849,7 +3794,9 @@ class RVUCounterApp:
                         logger.warning("No current shift found in database, will delete from memory only")
                 
                 # Remove from memory
+                self._sync_shift_stats()
                 records.pop(index)
+                self.shift_stats.record_removed(removed)
                 logger.info(f"Removed study from memory: {accession}, remaining records: {len(records)}")
                 
                 # Remove from seen_accessions to allow retracking if reopened
@@ -3965,7 +3912,9 @@ class RVUCounterApp:
     def _calculate_study_compensation(self, record: dict) -> float:
         """Calculate compensation for a single study based on when it was finished."""
         try:
-            time_finished = datetime.fromisoformat(record["time_finished"])
+            time_finished = record_finished_at(record)
+            if time_finished is None:
+                return 0.0
             rate = self._get_compensation_rate(time_finished)
             return record["rvu"] * rate
         except (KeyError, ValueError):
@@ -4024,10 +3973,7 @@ class RVUCounterApp:
             
             if records:
                 try:
-                    last_study_times = []
-                    for r in records:
-                        if r.get("time_finished"):
-                            last_study_times.append(datetime.fromisoformat(r["time_finished"]))
+                    last_study_times = [t for t in map(record_finished_at, records) if t is not None]
                     
                     if last_study_times:
                         shift_end_time = max(last_study_times)
@@ -4065,6 +4011,28 @@ class RVUCounterApp:
             self.last_activity_time = datetime.now()
             self._auto_end_prompt_shown = False
 
+    def _sync_shift_stats(self):
+        """Bind the shift stats store to the current records (rebuilds only if they changed unreported)."""
+        data = self.data_manager.data
+        rates_key = (data["settings"].get("role", "Partner"), id(data.get("compensation_rates")))
+        self.shift_stats.sync(data["current_shift"]["records"], rates_key)
+    
+    def _set_label(self, label, text: str):
+        """Configure a label's text only if it differs from what was last set."""
+        if self._label_texts.get(label) != text:
+            label.config(text=text)
+            self._label_texts[label] = text
+    
+    def _set_shown(self, visible: bool, *widgets):
+        """grid()/grid_remove() widgets only when their visibility changes."""
+        for widget in widgets:
+            if self._grid_shown.get(widget) != visible:
+                if visible:
+                    widget.grid()
+                else:
+                    widget.grid_remove()
+                self._grid_shown[widget] = visible
+    
     def calculate_stats(self) -> dict:
         """Calculate statistics."""
         if not self.shift_start:
@@ -4084,39 +4052,34 @@ class RVUCounterApp:
                 "comp_projected_shift": 0.0,
             }
         
-        records = self.data_manager.data["current_shift"]["records"]
         current_time = datetime.now()
         
-        # Total RVU and compensation
-        total_rvu = sum(r["rvu"] for r in records)
-        total_comp = sum(self._calculate_study_compensation(r) for r in records)
+        # Totals and hour windows are maintained incrementally by the shift stats store
+        self._sync_shift_stats()
+        sums = self.shift_stats.window_sums(current_time)
+        total_rvu = sums["total_rvu"]
+        total_comp = sums["total_comp"]
         
         # Average per hour
         hours_elapsed = (current_time - self.shift_start).total_seconds() / 3600
         avg_per_hour = total_rvu / hours_elapsed if hours_elapsed > 0 else 0.0
         avg_comp_per_hour = total_comp / hours_elapsed if hours_elapsed > 0 else 0.0
         
-        # Last hour - filter records and calculate both RVU and compensation
-        one_hour_ago = current_time - timedelta(hours=1)
-        last_hour_records = [r for r in records if datetime.fromisoformat(r["time_finished"]) >= one_hour_ago]
-        last_hour_rvu = sum(r["rvu"] for r in last_hour_records)
-        last_hour_comp = sum(self._calculate_study_compensation(r) for r in last_hour_records)
+        # Last hour
+        last_hour_rvu = sums["last_hour_rvu"]
+        last_hour_comp = sums["last_hour_comp"]
         
         # Last full hour (e.g., 2am to 3am)
         current_hour_start = current_time.replace(minute=0, second=0, microsecond=0)
         last_full_hour_start = current_hour_start - timedelta(hours=1)
         last_full_hour_end = current_hour_start
-        
-        last_full_hour_records = [r for r in records 
-                                   if last_full_hour_start <= datetime.fromisoformat(r["time_finished"]) < last_full_hour_end]
-        last_full_hour_rvu = sum(r["rvu"] for r in last_full_hour_records)
-        last_full_hour_comp = sum(self._calculate_study_compensation(r) for r in last_full_hour_records)
+        last_full_hour_rvu = sums["last_full_hour_rvu"]
+        last_full_hour_comp = sums["last_full_hour_comp"]
         last_full_hour_range = f"{self._format_hour_label(last_full_hour_start)}-{self._format_hour_label(last_full_hour_end)}"
         
         # Projected for current hour - use current hour's rate for projection
-        current_hour_records = [r for r in records if datetime.fromisoformat(r["time_finished"]) >= current_hour_start]
-        current_hour_rvu = sum(r["rvu"] for r in current_hour_records)
-        current_hour_comp = sum(self._calculate_study_compensation(r) for r in current_hour_records)
+        current_hour_rvu = sums["current_hour_rvu"]
+        current_hour_comp = sums["current_hour_comp"]
         
         minutes_into_hour = (current_time - current_hour_start).total_seconds() / 60
         if minutes_into_hour > 0:
@@ -4209,10 +4172,13 @@ class RVUCounterApp:
             # Count recent studies
             recent_count = len(current_shift.get("records", []))
             # Normal text color
-            self.recent_frame.config(text=f"Recent Studies ({recent_count})", fg=default_fg)
+            title = (f"Recent Studies ({recent_count})", default_fg)
         else:
             # Red text to indicate no active shift
-            self.recent_frame.config(text="Temporary Recent - No shift started", fg="red")
+            title = ("Temporary Recent - No shift started", "red")
+        if self._label_texts.get(self.recent_frame) != title:
+            self.recent_frame.config(text=title[0], fg=title[1])
+            self._label_texts[self.recent_frame] = title
     
     def _update_counters_only(self):
         """Update just the counter displays to zero (used when shift ends)."""
@@ -4221,40 +4187,40 @@ class RVUCounterApp:
         
         # Set all counters to 0
         if settings.get("show_total", True):
-            self.total_label.config(text="0.0")
-            self.total_comp_label.config(text="")
+            self._set_label(self.total_label, "0.0")
+            self._set_label(self.total_comp_label, "")
         if settings.get("show_avg", True):
-            self.avg_label.config(text="0.0")
-            self.avg_comp_label.config(text="")
+            self._set_label(self.avg_label, "0.0")
+            self._set_label(self.avg_comp_label, "")
         if settings.get("show_last_hour", True):
-            self.last_hour_label.config(text="0.0")
-            self.last_hour_comp_label.config(text="")
+            self._set_label(self.last_hour_label, "0.0")
+            self._set_label(self.last_hour_comp_label, "")
         if settings.get("show_last_full_hour", True):
-            self.last_full_hour_label.config(text="0.0")
-            self.last_full_hour_range_label.config(text="")
-            self.last_full_hour_label_text.config(text="hour:")
-            self.last_full_hour_comp_label.config(text="")
+            self._set_label(self.last_full_hour_label, "0.0")
+            self._set_label(self.last_full_hour_range_label, "")
+            self._set_label(self.last_full_hour_label_text, "hour:")
+            self._set_label(self.last_full_hour_comp_label, "")
         if settings.get("show_projected", True):
-            self.projected_label.config(text="0.0")
-            self.projected_comp_label.config(text="")
+            self._set_label(self.projected_label, "0.0")
+            self._set_label(self.projected_comp_label, "")
         if settings.get("show_projected_shift", True):
-            self.projected_shift_label.config(text="0.0")
-            self.projected_shift_comp_label.config(text="")
+            self._set_label(self.projected_shift_label, "0.0")
+            self._set_label(self.projected_shift_comp_label, "")
     
     def update_display(self):
         """Update the display with current statistics."""
         # Update recent studies label based on shift status
         self.update_recent_studies_label()
         
-        # Only rebuild widgets if record count changed or if last_record_count is -1 (forced rebuild)
+        # Only rebuild widgets if records were added/removed or if last_record_count is -1 (forced rebuild).
+        # calculate_stats syncs the store first so unreported changes count as well.
+        stats = self.calculate_stats()
         current_count = len(self.data_manager.data["current_shift"]["records"])
-        rebuild_widgets = (current_count != self.last_record_count) or (self.last_record_count == -1)
-        if self.last_record_count != -1:  # Only update if not forcing rebuild
-            self.last_record_count = current_count
-        else:
-            self.last_record_count = current_count  # Reset after forced rebuild
+        rebuild_widgets = ((current_count != self.last_record_count) or (self.last_record_count == -1)
+                           or (self.shift_stats.membership_version != self._recent_version))
+        self.last_record_count = current_count
+        self._recent_version = self.shift_stats.membership_version
         
-        stats = self.calculate_stats()
         settings = self.data_manager.data["settings"]
         
         # Check for inactivity if shift is running
@@ -4267,83 +4233,71 @@ class RVUCounterApp:
                 self.root.after(1, self._handle_inactivity_prompt)
         
         if settings.get("show_total", True):
-            self.total_label_text.grid()
-            self.total_value_frame.grid()
-            self.total_label.config(text=f"{stats['total']:.1f}")
+            self._set_shown(True, self.total_label_text, self.total_value_frame)
+            self._set_label(self.total_label, f"{stats['total']:.1f}")
             if settings.get("show_comp_total", False):
-                self.total_comp_label.config(text=f"(${stats['comp_total']:,.0f})")
+                self._set_label(self.total_comp_label, f"(${stats['comp_total']:,.0f})")
             else:
-                self.total_comp_label.config(text="")
+                self._set_label(self.total_comp_label, "")
         else:
-            self.total_label_text.grid_remove()
-            self.total_value_frame.grid_remove()
+            self._set_shown(False, self.total_label_text, self.total_value_frame)
         
         if settings.get("show_avg", True):
-            self.avg_label_text.grid()
-            self.avg_value_frame.grid()
-            self.avg_label.config(text=f"{stats['avg_per_hour']:.1f}")
+            self._set_shown(True, self.avg_label_text, self.avg_value_frame)
+            self._set_label(self.avg_label, f"{stats['avg_per_hour']:.1f}")
             if settings.get("show_comp_avg", False):
-                self.avg_comp_label.config(text=f"(${stats['comp_avg']:,.0f})")
+                self._set_label(self.avg_comp_label, f"(${stats['comp_avg']:,.0f})")
             else:
-                self.avg_comp_label.config(text="")
+                self._set_label(self.avg_comp_label, "")
         else:
-            self.avg_label_text.grid_remove()
-            self.avg_value_frame.grid_remove()
+            self._set_shown(False, self.avg_label_text, self.avg_value_frame)
         
         if settings.get("show_last_hour", True):
-            self.last_hour_label_text.grid()
-            self.last_hour_value_frame.grid()
-            self.last_hour_label.config(text=f"{stats['last_hour']:.1f}")
+            self._set_shown(True, self.last_hour_label_text, self.last_hour_value_frame)
+            self._set_label(self.last_hour_label, f"{stats['last_hour']:.1f}")
             if settings.get("show_comp_last_hour", False):
-                self.last_hour_comp_label.config(text=f"(${stats['comp_last_hour']:,.0f})")
+                self._set_label(self.last_hour_comp_label, f"(${stats['comp_last_hour']:,.0f})")
             else:
-                self.last_hour_comp_label.config(text="")
+                self._set_label(self.last_hour_comp_label, "")
         else:
-            self.last_hour_label_text.grid_remove()
-            self.last_hour_value_frame.grid_remove()
+            self._set_shown(False, self.last_hour_label_text, self.last_hour_value_frame)
         
         if settings.get("show_last_full_hour", True):
-            self.last_full_hour_label_frame.grid()
-            self.last_full_hour_value_frame.grid()
-            self.last_full_hour_label.config(text=f"{stats['last_full_hour']:.1f}")
+            self._set_shown(True, self.last_full_hour_label_frame, self.last_full_hour_value_frame)
+            self._set_label(self.last_full_hour_label, f"{stats['last_full_hour']:.1f}")
             range_text = stats.get("last_full_hour_range", "")
             if range_text:
-                self.last_full_hour_range_label.config(text=range_text)
-                self.last_full_hour_label_text.config(text="hour:")
+                self._set_label(self.last_full_hour_range_label, range_text)
+                self._set_label(self.last_full_hour_label_text, "hour:")
             else:
-                self.last_full_hour_range_label.config(text="")
-                self.last_full_hour_label_text.config(text="hour:")
+                self._set_label(self.last_full_hour_range_label, "")
+                self._set_label(self.last_full_hour_label_text, "hour:")
             if settings.get("show_comp_last_full_hour", False):
-                self.last_full_hour_comp_label.config(text=f"(${stats['comp_last_full_hour']:,.0f})")
+                self._set_label(self.last_full_hour_comp_label, f"(${stats['comp_last_full_hour']:,.0f})")
             else:
-                self.last_full_hour_comp_label.config(text="")
+                self._set_label(self.last_full_hour_comp_label, "")
         else:
-            self.last_full_hour_label_frame.grid_remove()
-            self.last_full_hour_value_frame.grid_remove()
+            self._set_shown(False, self.last_full_hour_label_frame, self.last_full_hour_value_frame)
         
         if settings.get("show_projected", True):
-            self.projected_label_text.grid()
-            self.projected_value_frame.grid()
-            self.projected_label.config(text=f"{stats['projected']:.1f}")
+            self._set_shown(True, self.projected_label_text, self.projected_value_frame)
+            self._set_label(self.projected_label, f"{stats['projected']:.1f}")
             if settings.get("show_comp_projected", False):
-                self.projected_comp_label.config(text=f"(${stats['comp_projected']:,.0f})")
+                self._set_label(self.projected_comp_label, f"(${stats['comp_projected']:,.0f})")
             else:
-                self.projected_comp_label.config(text="")
+                self._set_label(self.projected_comp_label, "")
         else:
-            self.projected_label_text.grid_remove()
-            self.projected_value_frame.grid_remove()
+            self._set_shown(False, self.projected_label_text, self.projected_value_frame)
         
         if settings.get("show_projected_shift", True):
-            self.projected_shift_label_text.grid()
-            self.projected_shift_value_frame.grid()
-            self.projected_shift_label.config(text=f"{stats['projected_shift']:.1f}")
+            self._set_shown(True, self.projected_shift_label_text, self.projected_shift_value_frame)
+            self._set_label(self.projected_shift_label, f"{stats['projected_shift']:.1f}")
             if settings.get("show_comp_projected_shift", False):
-                self.projected_shift_comp_label.config(text=f"(${stats['comp_projected_shift']:,.0f})")
+                self._set_label(self.projected_shift_comp_label, f"(${stats['comp_projected_shift']:,.0f})")
             else:
-                self.projected_shift_comp_label.config(text="")
+                self._set_label(self.projected_shift_comp_label, "")
         else:
-            self.projected_shift_label_text.grid_remove()
-            self.projected_shift_value_frame.grid_remove()
+            self._set_shown(False, self.projected_shift_label_text, self.projected_shift_value_frame)
         
         # Only rebuild widgets if records changed
         if rebuild_widgets:
@@ -4990,6 +4944,7 @@ class RVUCounterApp:
         recent_frame = getattr(self, 'recent_frame', None)
         if recent_frame:
             recent_frame.configure(bg=bg_color, fg=fg_color)
+            self._label_texts.pop(recent_frame, None)  # Title color is re-applied on next update
         
         # Update debug/current study frame (tk.LabelFrame)
         debug_frame = getattr(self, 'debug_frame', None)
@@ -5313,19 +5268,34 @@ class RVUCounterApp:
         """Handle window closing - properly cleanup resources."""
         logger.info("Application closing - starting cleanup...")
         
-        # Stop the background thread first
+        # Stop the background threads first
+        pollers = getattr(self, '_source_pollers', {})
+        for poller in pollers.values():
+            poller.stop()
         if hasattr(self, '_ps_thread_running'):
             self._ps_thread_running = False
-            logger.info("Signaled background thread to stop")
+            logger.info("Signaled background threads to stop")
         
-        # Wait for thread to terminate (with timeout to prevent hanging)
+        # Wait for threads to terminate (with timeout to prevent hanging)
         if hasattr(self, '_ps_thread') and self._ps_thread.is_alive():
-            logger.info("Waiting for background thread to terminate...")
+            logger.info("Waiting for background threads to terminate...")
             self._ps_thread.join(timeout=2.0)
-            if self._ps_thread.is_alive():
-                logger.warning("Background thread did not terminate in time (daemon will be killed on exit)")
-            else:
-                logger.info("Background thread terminated cleanly")
+        stuck = [poller.source for poller in pollers.values() if not poller.join(timeout=1.0)]
+        if stuck or (hasattr(self, '_ps_thread') and self._ps_thread.is_alive()):
+            logger.warning(f"Background threads did not terminate in time: {stuck or ['merge']} (daemons will be killed on exit)")
+        else:
+            logger.info("Background threads terminated cleanly")
+        for poller in pollers.values():
+            poll_stats = poller.stats()
+            logger.info(f"{poll_stats['source']} poller: {poll_stats['polls']} polls, "
+                        f"{poll_stats['mean_duration']:.2f}s mean, {poll_stats['max_duration']:.1f}s max, "
+                        f"{poll_stats['overruns']} over budget")
+        
+        # Let a queued backup (e.g. from ending the shift) finish before closing the database
+        try:
+            self.data_manager.backup_manager.stop_worker()
+        except Exception as e:
+            logger.error(f"Error stopping backup worker: {e}")
         
         # Save window position and data
         self.save_window_position()
@@ -5339,6 +5309,22 @@ class RVUCounterApp:
             except Exception as e:
                 logger.error(f"Error closing database: {e}")
         
+        cache_stats = get_classification_cache_stats()
+        logger.info(f"Classification cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses "
+                    f"({cache_stats['hit_rate']:.1%} hit rate, {cache_stats['size']} entries)")
+        
+        uia_stats = get_uia_stats()
+        logger.info(f"UIA executor: {uia_stats['completed']} reads, {uia_stats['timeouts']} timeouts, "
+                    f"{uia_stats['rejected']} refused by circuit breaker, {uia_stats['orphaned']} workers still blocked")
+        
+        clario_stats = self.clario_resolver.stats()
+        logger.info(f"Clario patient class: {clario_stats['hits']} cache hits, {clario_stats['lookups']} page lookups, "
+                    f"{clario_stats['superseded']} superseded requests")
+        
+        locator_stats = get_mosaic_locator_stats()
+        logger.info(f"Mosaic locator: {locator_stats['hits']} cached reads, {locator_stats['misses']} misses, "
+                    f"{locator_stats['full_scans']} full scans")
+        
         logger.info("Application cleanup complete")
         self.root.destroy()
 
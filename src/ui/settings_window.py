@@ -491,10 +491,23 @@ class SettingsWindow:
         
         # Show progress
         self.backup_status_label.config(text="⏳ Backing up...")
-        self.window.update()
         
-        # Perform backup
-        result = backup_mgr.create_backup(force=True)
+        # Runs on the backup worker thread; the result comes back on the Tk main loop
+        def on_done(result):
+            try:
+                self.window.after(0, lambda: self._on_manual_backup_done(result))
+            except:
+                pass
+        
+        backup_mgr.request_backup("manual", callback=on_done)
+    
+    def _on_manual_backup_done(self, result: dict):
+        """Report the result of a manual backup."""
+        try:
+            if not self.window.winfo_exists():
+                return
+        except:
+            return
         
         if result["success"]:
             self.backup_status_label.config(text=f"☁️ Backup complete ({result.get('record_count', 0)} records)")
@@ -776,24 +789,35 @@ class SettingsWindow:
             )
             
             if response:
-                try:
-                    if os.path.exists(backup_path):
-                        os.remove(backup_path)
-                        logger.info(f"Backup deleted: {backup_path}")
-                        
+                if not os.path.exists(backup_path):
+                    messagebox.showwarning("File Not Found", f"Backup file not found:\n{backup_path}")
+                    refresh_backup_list()
+                    return
+                
+                # Deleting rewrites the backup chain, so it runs on the backup worker
+                # (never alongside a backup); the result comes back on the Tk main loop
+                def on_done(result):
+                    try:
+                        dialog.after(0, lambda: on_deleted(result))
+                    except:
+                        pass
+                
+                def on_deleted(result):
+                    try:
+                        if not dialog.winfo_exists():
+                            return
+                    except:
+                        return
+                    error = result.get("failed", {}).get(backup_path)
+                    if error:
+                        messagebox.showerror("Delete Failed", f"Error deleting backup: {error}", parent=dialog)
+                    elif dialog.selected_backup and dialog.selected_backup["path"] == backup_path:
                         # Clear selection if deleted backup was selected
-                        if dialog.selected_backup and dialog.selected_backup["path"] == backup_path:
-                            dialog.selected_backup = None
-                        
-                        # Refresh the list
-                        refresh_backup_list()
-                    else:
-                        messagebox.showwarning("File Not Found", f"Backup file not found:\n{backup_path}")
-                        refresh_backup_list()
-                except Exception as e:
-                    error_msg = f"Error deleting backup: {str(e)}"
-                    messagebox.showerror("Delete Failed", error_msg)
-                    logger.error(error_msg)
+                        dialog.selected_backup = None
+                    refresh_backup_list()
+                
+                btn.config(text="…", cursor="watch")
+                backup_mgr.request_delete(backup_path, callback=on_done)
         
         def on_load():
             """Restore selected backup."""
@@ -855,7 +879,7 @@ class SettingsWindow:
         
         # Get current database info for comparison - count from database directly
         try:
-            cursor = self.data_manager.db.conn.cursor()
+            cursor = self.data_manager.db.read_cursor()
             cursor.execute("SELECT COUNT(*) FROM records")
             current_count = cursor.fetchone()[0]
         except:
@@ -874,8 +898,26 @@ class SettingsWindow:
         if not messagebox.askyesno("Confirm Restore", msg, icon="warning"):
             return
         
+        # Rebuilding an incremental restore point reads its whole chain from OneDrive
+        # and must not overlap backup cleanup, so it runs on the backup worker; the
+        # database swap and reload then happen back on the Tk main loop
+        def on_rebuilt(rebuild_result):
+            try:
+                self.app.root.after(0, lambda: self._finish_restore(backup, rebuild_result))
+            except:
+                pass
+        
+        backup_mgr.request_restore(backup["path"], callback=on_rebuilt)
+    
+    def _finish_restore(self, backup: dict, rebuild_result: dict):
+        """Swap in a restore point rebuilt by the backup worker and reload the data."""
+        backup_mgr = self.data_manager.backup_manager
+        if not rebuild_result["success"]:
+            messagebox.showerror("Restore Failed", f"Restore failed: {rebuild_result['error']}")
+            return
+        
         # Perform restore
-        result = backup_mgr.restore_from_backup(backup["path"])
+        result = backup_mgr.restore_from_backup(rebuild_result["source"])
         
         if result["success"]:
             # Reload data from the restored database
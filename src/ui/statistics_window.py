@@ -10,6 +10,14 @@ from typing import TYPE_CHECKING, Dict, List, Optional
 
 from ..core.config import HAS_MATPLOTLIB, HAS_TKCALENDAR
 from ..core.platform_utils import is_point_on_any_monitor, find_nearest_monitor_for_window
+from ..logic.study_matcher import match_study_type, get_compiled_matcher
+from ..logic.analytics_frame import AnalyticsFrame
+from ..logic.statistics_cache import get_statistics_cache
+from ..logic.body_parts import BodyPartMap
+from ..logic.efficiency_matrix import EfficiencyMatrix
+from ..data.shift_history import LazyShift, ShiftHistory, shift_record_count, shift_total_rvu
+from ..data.database import RollupRow
+from ..models import record_performed_at, record_finished_at
 from .widgets import CanvasTable
 
 if HAS_MATPLOTLIB:
@@ -32,10 +40,21 @@ logger = logging.getLogger(__name__)
 class StatisticsWindow:
     """Statistics modal window for detailed stats."""
     
+    # Views that only need counts/RVU per study type, patient class and finish hour -
+    # they are fed aggregated RollupRows (from the hourly rollup) instead of raw records.
+    # summary and compensation stay on records on purpose: they attribute each study to
+    # the shift containing its exact finish time, and compensation rates depend on the
+    # weekday and hour of that time, neither of which survives aggregation
+    ROLLUP_VIEWS = ("by_hour", "by_modality", "by_patient_class", "by_study_type", "by_body_part")
+    
     def __init__(self, parent, data_manager: 'RVUData', app: 'RVUCounterApp'):
         self.parent = parent
         self.data_manager = data_manager
         self.app = app
+        # Cache key of the last database range query (see _get_records_in_range)
+        self._range_key = None
+        self._body_part_map: Optional[BodyPartMap] = None  # loaded on first use
+        self._body_part_map_version = None  # database change_counter it was loaded at
         
         # Create modal window
         self.window = tk.Toplevel(parent)
@@ -513,7 +532,14 @@ class StatisticsWindow:
         # Get historical shifts from the "shifts" array
         historical_shifts = self.data_manager.data.get("shifts", [])
         for shift in historical_shifts:
-            shift_copy = shift.copy()
+            if isinstance(shift, LazyShift):
+                # Shared, so records loaded through one call stay loaded for the next
+                if shift.get_header("date") is not None:
+                    shifts.append(shift)
+                    continue
+                shift_copy = shift
+            else:
+                shift_copy = shift.copy()
             # Extract date from shift_start for display
             try:
                 start = datetime.fromisoformat(shift.get("shift_start", ""))
@@ -587,10 +613,9 @@ class StatisticsWindow:
                 except:
                     label_text = shift.get("date", "Unknown")
             
-            # Study count and RVU
-            records = shift.get("records", [])
-            count = len(records)
-            total_rvu = sum(r.get("rvu", 0) for r in records)
+            # Study count and RVU (from shift header - doesn't load historical records)
+            count = shift_record_count(shift)
+            total_rvu = shift_total_rvu(shift)
             
             # Shift button (clickable frame with left-justified name and right-justified count/RVU)
             btn_frame = ttk.Frame(shift_frame)
@@ -679,7 +704,7 @@ class StatisticsWindow:
         
         # Delete from database first (find by shift_start)
         try:
-            cursor = self.data_manager.db.conn.cursor()
+            cursor = self.data_manager.db.read_cursor()
             cursor.execute('SELECT id FROM shifts WHERE shift_start = ? AND is_current = 0', (shift_start,))
             row = cursor.fetchone()
             if row:
@@ -711,8 +736,12 @@ class StatisticsWindow:
         end_str = end.strftime("%m/%d/%Y")
         return f"{start_str} - {end_str}"
     
-    def get_records_for_period(self) -> Tuple[List[dict], str]:
-        """Get records for the selected period. Returns (records, period_description)."""
+    def get_records_for_period(self, summary_rows: bool = False) -> Tuple[List[dict], str]:
+        """Get records for the selected period. Returns (records, period_description).
+        
+        With summary_rows=True, date-range periods return aggregated RollupRows from
+        the database instead of individual records (shift periods still return records).
+        """
         period = self.selected_period.get()
         now = datetime.now()
         
@@ -782,21 +811,21 @@ class StatisticsWindow:
         elif period == "this_work_week":
             # Current work week: Monday at typical shift start to next Monday at shift end
             start, end = self._get_work_week_range(now, "this")
-            records = self._get_records_in_range(start, end)
+            records = self._get_records_in_range(start, end, summary_rows)
             date_range = self._format_date_range(start, end)
             return records, f"This Work Week - {date_range}"
         
         elif period == "last_work_week":
             # Previous work week: Monday at typical shift start to next Monday at shift end
             start, end = self._get_work_week_range(now, "last")
-            records = self._get_records_in_range(start, end)
+            records = self._get_records_in_range(start, end, summary_rows)
             date_range = self._format_date_range(start, end)
             return records, f"Last Work Week - {date_range}"
         
         elif period == "all_time":
             # All records from all time
             start = datetime.min.replace(year=2000)
-            records = self._get_records_in_range(start, now)
+            records = self._get_records_in_range(start, now, summary_rows)
             date_range = self._format_date_range(start, now)
             return records, f"All Time - {date_range}"
         
@@ -820,7 +849,7 @@ class StatisticsWindow:
                 if start > end:
                     return [], f"Custom Date Range - Invalid (start date must be before end date)"
                 
-                records = self._get_records_in_range(start, end)
+                records = self._get_records_in_range(start, end, summary_rows)
                 date_range = self._format_date_range(start, end)
                 return records, f"Custom Date Range - {date_range}"
             except ValueError as e:
@@ -837,7 +866,7 @@ class StatisticsWindow:
             else:
                 next_month = now.replace(month=now.month + 1, day=1)
             end = (next_month - timedelta(days=1)).replace(hour=23, minute=59, second=59, microsecond=999999)
-            records = self._get_records_in_range(start, end)
+            records = self._get_records_in_range(start, end, summary_rows)
             date_range = self._format_date_range(start, end)
             return records, f"This Month - {date_range}"
         
@@ -855,7 +884,7 @@ class StatisticsWindow:
                 end = now.replace(day=1) - timedelta(days=1)
             # Set end to last moment of the last day
             end = end.replace(hour=23, minute=59, second=59, microsecond=999999)
-            records = self._get_records_in_range(start, end)
+            records = self._get_records_in_range(start, end, summary_rows)
             date_range = self._format_date_range(start, end)
             return records, f"Last Month - {date_range}"
         
@@ -882,13 +911,14 @@ class StatisticsWindow:
                 next_month = now.replace(month=now.month + 1, day=1)
             end = (next_month - timedelta(days=1)).replace(hour=23, minute=59, second=59, microsecond=999999)
             
-            records = self._get_records_in_range(start, end)
+            records = self._get_records_in_range(start, end, summary_rows)
             date_range = self._format_date_range(start, end)
             return records, f"Last 3 Months - {date_range}"
         
         elif period == "last_year":
-            start = now - timedelta(days=365)
-            records = self._get_records_in_range(start, now)
+            # From the start of the day a year ago - a fixed start keeps the range cacheable
+            start = (now - timedelta(days=365)).replace(hour=0, minute=0, second=0, microsecond=0)
+            records = self._get_records_in_range(start, now, summary_rows)
             date_range = self._format_date_range(start, now)
             return records, f"Last Year - {date_range}"
         
@@ -939,14 +969,99 @@ class StatisticsWindow:
         
         return work_week_start, work_week_end
     
-    def _get_records_in_range(self, start: datetime, end: datetime) -> List[dict]:
-        """Get all records within a date range from the database."""
+    def _get_records_in_range(self, start: datetime, end: datetime, summary_rows: bool = False) -> List[dict]:
+        """Get all records within a date range from the database.
+        
+        With summary_rows=True, returns pre-aggregated RollupRows instead (cost
+        independent of how many records the range covers), plus any old-format
+        multi-accession records in the range.
+        
+        Results are cached per (range, data version); the key is left in
+        self._range_key so data derived from the result can be cached with it.
+        """
+        db = self.data_manager.db
+        # Read the version before querying: a write that lands mid-query then
+        # only makes this entry stale, never a newer key hold older data
+        version = db.change_counter
+        # Ranges that run up to "now" (as computed by the caller a moment ago)
+        # differ on every call; nothing newer than the last write exists, so
+        # they are all the same open-ended query for a given data version
+        end_key = None if end >= datetime.now() - timedelta(minutes=1) else end
+        key = (id(db), start, end_key, summary_rows, version)
+        self._range_key = key
+        cache = get_statistics_cache()
+        cached = cache.get(("range",) + key)
+        if cached is not None:
+            return cached
+        
         # Use database query for accurate results
         start_str = start.isoformat()
         end_str = end.isoformat()
-        records = self.data_manager.db.get_records_in_date_range(start_str, end_str)
+        if summary_rows:
+            # Old-format multi-accession records aren't in the rollup - they come back as
+            # records, which _as_rollup_rows expands into one row per study
+            records = db.get_rollup_in_range(start_str, end_str)
+            records.extend(db.get_old_multi_accession_records_in_range(start_str, end_str))
+        else:
+            records = db.get_records_in_date_range(start_str, end_str)
+        cache.put(("range",) + key, records, len(records))
         return records
     
+    def _prepare_records(self, records: list, use_rollup: bool, range_key: Optional[tuple]) -> list:
+        """RollupRows (rollup views) or expanded records for display, cached with the period data."""
+        cache = get_statistics_cache()
+        kind = "rollup_rows" if use_rollup else "expanded"
+        if range_key is not None:
+            cached = cache.get((kind,) + range_key)
+            if cached is not None:
+                return cached
+        if use_rollup:
+            prepared = self._as_rollup_rows(records)
+        else:
+            prepared = self._expand_multi_accession_records(records)
+        if range_key is not None:
+            cache.put((kind,) + range_key, prepared, len(prepared))
+        return prepared
+    
+    def _analytics_frame(self, rows: list, range_key: Optional[tuple]) -> AnalyticsFrame:
+        """AnalyticsFrame over rows; shared (with its memoized view tables) per period data."""
+        if range_key is None:
+            return AnalyticsFrame(rows)
+        cache = get_statistics_cache()
+        frame = cache.get(("frame",) + range_key)
+        if frame is None:
+            frame = AnalyticsFrame(rows)
+            cache.put(("frame",) + range_key, frame, frame.size)
+        return frame
+    
+    def _as_rollup_rows(self, records: list) -> List[RollupRow]:
+        """Convert records to RollupRows (one per record); RollupRows pass through unchanged."""
+        rows = []
+        dict_records = []
+        for record in records:
+            if isinstance(record, RollupRow):
+                rows.append(record)
+            else:
+                dict_records.append(record)
+        
+        for record in self._expand_multi_accession_records(dict_records):
+            time_finished = record.get("time_finished", "") or ""
+            try:
+                finished_hour = datetime.fromisoformat(time_finished).hour
+            except:
+                finished_hour = -1
+            rows.append(RollupRow(
+                (record.get("time_performed", "") or "")[:13],
+                finished_hour,
+                record.get("study_type", "") or "",
+                record.get("patient_class", "") or "",
+                1,
+                record.get("rvu", 0) or 0,
+                record.get("duration_seconds", 0) or 0,
+                time_finished or None,
+            ))
+        return rows
+    
     def _expand_multi_accession_records(self, records: List[dict]) -> List[dict]:
         """Expand multi-accession records into individual modality records.
         
@@ -954,6 +1069,7 @@ class StatisticsWindow:
         multiple XR records based on accession_count.
         """
         expanded_records = []
+        matcher = None  # Compiled lazily - only needed for records without stored individual data
         for record in records:
             study_type = record.get("study_type", "Unknown")
             
@@ -996,17 +1112,20 @@ class StatisticsWindow:
                         # Fallback: try to classify individual procedures to get study types and RVUs
                         if individual_procedures and i < len(individual_procedures):
                             # Classify the individual procedure to get its study type and RVU
-                            # match_study_type is defined at module level in this same file
                             rvu_table = self.data_manager.data.get("rvu_table", {})
-                            classification_rules = self.data_manager.data.get("classification_rules", {})
-                            direct_lookups = self.data_manager.data.get("direct_lookups", {})
                             
                             if not rvu_table:
                                 logger.warning(f"Cannot classify procedure '{individual_procedures[i]}' - no RVU table loaded")
                             
+                            if matcher is None:
+                                matcher = get_compiled_matcher(
+                                    rvu_table,
+                                    self.data_manager.data.get("classification_rules", {}),
+                                    self.data_manager.data.get("direct_lookups", {})
+                                )
+                            
                             procedure = individual_procedures[i]
-                            # Call match_study_type which is defined at module level
-                            study_type, rvu = match_study_type(procedure, rvu_table, classification_rules, direct_lookups)
+                            study_type, rvu = matcher.match(procedure)
                             
                             expanded_record["study_type"] = study_type
                             expanded_record["rvu"] = rvu
@@ -1136,8 +1255,8 @@ class StatisticsWindow:
                 # Check if shift has any records in the range
                 for record in current_shift.get("records", []):
                     try:
-                        rec_time = datetime.fromisoformat(record.get("time_performed", ""))
-                        if start <= rec_time <= end:
+                        rec_time = record_performed_at(record)
+                        if rec_time is not None and start <= rec_time <= end:
                             shift_ids.add("current")
                             break
                     except:
@@ -1145,27 +1264,14 @@ class StatisticsWindow:
             except:
                 pass
         
-        # Check historical shifts
-        for shift in self.data_manager.data.get("shifts", []):
-            try:
-                shift_start_str = shift.get("shift_start", "")
-                if not shift_start_str:
-                    continue
-                shift_start = datetime.fromisoformat(shift_start_str)
-                # Check if shift has any records in the range
-                for record in shift.get("records", []):
-                    try:
-                        rec_time = datetime.fromisoformat(record.get("time_performed", ""))
-                        if start <= rec_time <= end:
-                            # Use shift_start as unique identifier
-                            shift_ids.add(shift_start_str)
-                            break
-                    except:
-                        pass
-            except:
-                pass
+        # Historical shifts - one query instead of loading every shift's records
+        try:
+            historical_count = self.data_manager.db.count_shifts_in_range(start.isoformat(), end.isoformat())
+        except Exception as e:
+            logger.error(f"Error counting shifts in range: {e}")
+            historical_count = 0
         
-        return len(shift_ids)
+        return len(shift_ids) + historical_count
     
     def refresh_data(self):
         """Refresh the data display based on current selections."""
@@ -1179,7 +1285,11 @@ class StatisticsWindow:
         else:
             self.custom_date_frame.pack_forget()
         
-        records, period_desc = self.get_records_for_period()
+        use_rollup = self.view_mode.get() in self.ROLLUP_VIEWS
+        # Set by _get_records_in_range; stays None for shift periods (in-memory records)
+        self._range_key = None
+        records, period_desc = self.get_records_for_period(summary_rows=use_rollup)
+        range_key = self._range_key
         
         # For efficiency view, add shift count in parentheses after date range
         if self.view_mode.get() == "efficiency":
@@ -1198,7 +1308,8 @@ class StatisticsWindow:
         self.period_label.config(text=period_desc)
         
         # Expand multi-accession records into individual modality records for statistics
-        records = self._expand_multi_accession_records(records)
+        # (rollup views get aggregated rows; _as_rollup_rows expands any records itself)
+        records = self._prepare_records(records, use_rollup, range_key)
         
         view_mode = self.view_mode.get()
         
@@ -1268,7 +1379,11 @@ class StatisticsWindow:
                     # If projection was selected, switch to a default period
                     if current_period == "projection":
                         self.selected_period.set("current_shift")
-                        records, period_desc = self.get_records_for_period()
+                        self._range_key = None
+                        records, period_desc = self.get_records_for_period(summary_rows=use_rollup)
+                        range_key = self._range_key
+                        if use_rollup:
+                            records = self._prepare_records(records, use_rollup, range_key)
                 except:
                     pass
         
@@ -1361,8 +1476,9 @@ class StatisticsWindow:
                             except Exception as e:
                                 logger.debug(f"Error calling redraw function: {e}")
                                 pass
-                    # Always do a full refresh to ensure everything is updated
-                    self.refresh_data()
+                    else:
+                        # Fallback to full refresh if redraw functions not available
+                        self.refresh_data()
                 
                 # Create radio buttons for study count display mode
                 ttk.Label(self.study_count_mode_frame, text="Study Count:", font=('Arial', 9)).pack(side=tk.LEFT, padx=(0, 5))
@@ -1440,20 +1556,21 @@ class StatisticsWindow:
             if hasattr(self, 'study_count_mode_frame'):
                 self.study_count_mode_frame.pack_forget()
         
+        frame = self._analytics_frame(records, range_key) if use_rollup else None
         if view_mode == "by_hour":
-            self._display_by_hour(records)
+            self._display_by_hour(frame)
         elif view_mode == "by_modality":
-            self._display_by_modality(records)
+            self._display_by_modality(frame)
         elif view_mode == "by_patient_class":
-            self._display_by_patient_class(records)
+            self._display_by_patient_class(frame)
         elif view_mode == "by_study_type":
-            self._display_by_study_type(records)
+            self._display_by_study_type(frame)
         elif view_mode == "by_body_part":
-            self._display_by_body_part(records)
+            self._display_by_body_part(frame)
         elif view_mode == "all_studies":
             self._display_all_studies(records)
         elif view_mode == "efficiency":
-            self._display_efficiency(records)
+            self._display_efficiency(records, range_key)
         elif view_mode == "compensation":
             if self.selected_period.get() == "projection":
                 self._display_projection(records)
@@ -1467,40 +1584,74 @@ class StatisticsWindow:
             return
         
         # Update summary
-        total_studies = len(records)
-        total_rvu = sum(r.get("rvu", 0) for r in records)
+        if use_rollup:
+            total_studies = frame.total_studies()
+            total_rvu = frame.total_rvu()
+        else:
+            total_studies = len(records)
+            total_rvu = sum(r.get("rvu", 0) for r in records)
         avg_rvu = total_rvu / total_studies if total_studies > 0 else 0
         
         self.summary_label.config(
             text=f"Total: {total_studies} studies  |  {total_rvu:.1f} RVU  |  Avg: {avg_rvu:.2f} RVU/study"
         )
     
-    def _display_by_hour(self, records: List[dict]):
+    # Category labels derived from study type / patient class (applied once per
+    # distinct value through AnalyticsFrame.derive)
+    
+    @staticmethod
+    def _first_word_label(study_type: str) -> str:
+        return study_type.split()[0] if study_type else "Unknown"
+    
+    @staticmethod
+    def _modality_label(study_type: str) -> str:
+        modality = study_type.split()[0] if study_type else "Unknown"
+        # Handle any remaining "Multiple" modality from old records
+        # Extract the actual modality (e.g., "XR" from "Multiple XR")
+        if modality == "Multiple" and len(study_type.split()) > 1:
+            modality = study_type.split()[1]
+        return modality
+    
+    @staticmethod
+    def _patient_class_label(patient_class: str) -> str:
+        # Handle missing patient_class (historical data may not have it)
+        return patient_class.strip() or "(Unknown)"
+    
+    @staticmethod
+    def _display_study_type_label(study_type: str) -> str:
+        # Handle missing study_type (historical data may not have it)
+        study_type = study_type.strip()
+        if not study_type:
+            return "(Unknown)"
+        # Handle any remaining "Multiple ..." study types from old records
+        # Convert "Multiple XR" -> "XR Other", etc.
+        if study_type.startswith("Multiple "):
+            modality = study_type.replace("Multiple ", "").strip()
+            study_type = f"{modality} Other" if modality else "(Unknown)"
+        return study_type
+    
+    @classmethod
+    def _study_type_group_label(cls, study_type: str) -> str:
+        study_type = cls._display_study_type_label(study_type)
+        # Group "CT Spine Lumbar" and "CT Spine Lumbar Recon" with "CT Spine" for display purposes
+        # Group "CT CAP Angio", "CT CAP Trauma", and "CT CA" with "CT CAP" for display purposes
+        # Keep the original RVU value, but group them together
+        if study_type == "CT Spine Lumbar" or study_type == "CT Spine Lumbar Recon":
+            return "CT Spine"
+        elif study_type == "CT CAP Angio" or study_type == "CT CAP Angio Combined" or study_type == "CT CAP Trauma" or study_type == "CT CA":
+            return "CT CAP"
+        return study_type
+    
+    def _display_by_hour(self, frame: AnalyticsFrame):
         """Display data broken down by hour using Canvas table."""
-        # Group by hour and collect all modalities first
-        hour_data = {}
-        all_modalities = {}
-        for record in records:
-            try:
-                rec_time = datetime.fromisoformat(record.get("time_finished", ""))
-                hour = rec_time.hour
-            except:
-                continue
-                
-            if hour not in hour_data:
-                hour_data[hour] = {"studies": 0, "rvu": 0, "modalities": {}}
-            
-            hour_data[hour]["studies"] += 1
-            hour_data[hour]["rvu"] += record.get("rvu", 0)
-            
-            # Track modality
-            study_type = record.get("study_type", "Unknown")
-            modality = study_type.split()[0] if study_type else "Unknown"
-            hour_data[hour]["modalities"][modality] = hour_data[hour]["modalities"].get(modality, 0) + 1
-            all_modalities[modality] = all_modalities.get(modality, 0) + 1
+        # Group by hour and modality in one pass over the frame
+        frame.derive("first_word", "study_type", self._first_word_label)
+        hours, modalities, hour_data = frame.hour_crosstab("first_word")
         
         # Sort modalities by name for consistent column order
-        sorted_modalities = sorted(all_modalities.keys())
+        sorted_modalities = sorted(modalities)
+        all_modalities = {modality: sum(data["by_label"].get(modality, 0) for data in hour_data.values())
+                          for modality in sorted_modalities}
         
         # Build dynamic columns: Hour, Studies, RVU, Avg/Study, then one column per modality
         columns = [
@@ -1532,17 +1683,9 @@ class StatisticsWindow:
         
         # Find the earliest time_finished to determine shift start hour
         start_hour = None
-        if records:
-            earliest_time = None
-            for record in records:
-                try:
-                    rec_time = datetime.fromisoformat(record.get("time_finished", ""))
-                    if earliest_time is None or rec_time < earliest_time:
-                        earliest_time = rec_time
-                except:
-                    continue
-            if earliest_time:
-                start_hour = earliest_time.hour
+        earliest_time = frame.earliest_finished()
+        if earliest_time:
+            start_hour = earliest_time.hour
         
         # Sort hours starting from shift start hour, wrapping around at 24
         if start_hour is not None and hour_data:
@@ -1579,7 +1722,7 @@ class StatisticsWindow:
             
             # Add count for each modality
             for modality in sorted_modalities:
-                count = data["modalities"].get(modality, 0)
+                count = data["by_label"].get(modality, 0)
                 row_cells[modality] = str(count) if count > 0 else ""
             
             self._by_hour_table.add_row(row_cells)
@@ -1602,7 +1745,7 @@ class StatisticsWindow:
         # Update display once after all rows are added
         self._by_hour_table.update_data()
     
-    def _display_by_modality(self, records: List[dict]):
+    def _display_by_modality(self, frame: AnalyticsFrame):
         """Display data broken down by modality using Canvas table."""
         # Clear/create Canvas table
         if hasattr(self, '_by_modality_table'):
@@ -1631,27 +1774,11 @@ class StatisticsWindow:
         self._by_modality_table.clear()
         
         # Group by modality
-        modality_data = {}
-        total_studies = 0
-        total_rvu = 0
-        
-        for record in records:
-            study_type = record.get("study_type", "Unknown")
-            modality = study_type.split()[0] if study_type else "Unknown"
-            rvu = record.get("rvu", 0)
-            
-            # Handle any remaining "Multiple" modality from old records
-            # Extract the actual modality (e.g., "XR" from "Multiple XR")
-            if modality == "Multiple" and len(study_type.split()) > 1:
-                modality = study_type.split()[1]
-            
-            if modality not in modality_data:
-                modality_data[modality] = {"studies": 0, "rvu": 0}
-            
-            modality_data[modality]["studies"] += 1
-            modality_data[modality]["rvu"] += rvu
-            total_studies += 1
-            total_rvu += rvu
+        frame.derive("modality", "study_type", self._modality_label)
+        modality_data = {modality: {"studies": studies, "rvu": rvu}
+                         for modality, studies, rvu in frame.group_totals("modality")}
+        total_studies = frame.total_studies()
+        total_rvu = frame.total_rvu()
         
         # Sort by RVU (highest first) and display
         for modality in sorted(modality_data.keys(), key=lambda k: modality_data[k]["rvu"], reverse=True):
@@ -1684,7 +1811,7 @@ class StatisticsWindow:
         # Update display once after all rows are added
         self._by_modality_table.update_data()
     
-    def _display_by_patient_class(self, records: List[dict]):
+    def _display_by_patient_class(self, frame: AnalyticsFrame):
         """Display data broken down by patient class using Canvas table."""
         # Clear/create Canvas table
         if hasattr(self, '_by_patient_class_table'):
@@ -1713,24 +1840,11 @@ class StatisticsWindow:
         self._by_patient_class_table.clear()
         
         # Group by patient class
-        class_data = {}
-        total_studies = 0
-        total_rvu = 0
-        
-        for record in records:
-            # Handle missing patient_class (historical data may not have it)
-            patient_class = record.get("patient_class", "").strip()
-            if not patient_class:
-                patient_class = "(Unknown)"
-            rvu = record.get("rvu", 0)
-            
-            if patient_class not in class_data:
-                class_data[patient_class] = {"studies": 0, "rvu": 0}
-            
-            class_data[patient_class]["studies"] += 1
-            class_data[patient_class]["rvu"] += rvu
-            total_studies += 1
-            total_rvu += rvu
+        frame.derive("patient_class_label", "patient_class", self._patient_class_label)
+        class_data = {patient_class: {"studies": studies, "rvu": rvu}
+                      for patient_class, studies, rvu in frame.group_totals("patient_class_label")}
+        total_studies = frame.total_studies()
+        total_rvu = frame.total_rvu()
         
         # Sort by RVU (highest first) and display
         for patient_class in sorted(class_data.keys(), key=lambda k: class_data[k]["rvu"], reverse=True):
@@ -1763,7 +1877,7 @@ class StatisticsWindow:
         # Update display once after all rows are added
         self._by_patient_class_table.update_data()
     
-    def _display_by_study_type(self, records: List[dict]):
+    def _display_by_study_type(self, frame: AnalyticsFrame):
         """Display data broken down by study type using Canvas table."""
         # Clear/create Canvas table
         if hasattr(self, '_by_study_type_table'):
@@ -1791,41 +1905,12 @@ class StatisticsWindow:
         self._by_study_type_table.pack(fill=tk.BOTH, expand=True)
         self._by_study_type_table.clear()
         
-        # Group by study type
-        type_data = {}
-        total_studies = 0
-        total_rvu = 0
-        
-        for record in records:
-            # Handle missing study_type (historical data may not have it)
-            study_type = record.get("study_type", "").strip()
-            if not study_type:
-                study_type = "(Unknown)"
-            
-            # Handle any remaining "Multiple ..." study types from old records
-            # Convert "Multiple XR" -> "XR Other", etc.
-            if study_type.startswith("Multiple "):
-                modality = study_type.replace("Multiple ", "").strip()
-                study_type = f"{modality} Other" if modality else "(Unknown)"
-            
-            # Group "CT Spine Lumbar" and "CT Spine Lumbar Recon" with "CT Spine" for display purposes
-            # Group "CT CAP Angio", "CT CAP Trauma", and "CT CA" with "CT CAP" for display purposes
-            # Keep the original RVU value, but group them together
-            grouping_key = study_type
-            if study_type == "CT Spine Lumbar" or study_type == "CT Spine Lumbar Recon":
-                grouping_key = "CT Spine"
-            elif study_type == "CT CAP Angio" or study_type == "CT CAP Angio Combined" or study_type == "CT CAP Trauma" or study_type == "CT CA":
-                grouping_key = "CT CAP"
-            
-            rvu = record.get("rvu", 0)
-            
-            if grouping_key not in type_data:
-                type_data[grouping_key] = {"studies": 0, "rvu": 0}
-            
-            type_data[grouping_key]["studies"] += 1
-            type_data[grouping_key]["rvu"] += rvu
-            total_studies += 1
-            total_rvu += rvu
+        # Group by study type (with display groupings)
+        frame.derive("study_type_group", "study_type", self._study_type_group_label)
+        type_data = {study_type: {"studies": studies, "rvu": rvu}
+                     for study_type, studies, rvu in frame.group_totals("study_type_group")}
+        total_studies = frame.total_studies()
+        total_rvu = frame.total_rvu()
         
         # Sort by RVU (highest first) and display
         for study_type in sorted(type_data.keys(), key=lambda k: type_data[k]["rvu"], reverse=True):
@@ -1858,154 +1943,28 @@ class StatisticsWindow:
         # Update display once after all rows are added
         self._by_study_type_table.update_data()
     
-    def _get_body_part_group(self, study_type: str) -> str:
-        """Map study types to modality-specific anatomical groups for hierarchical display."""
-        study_lower = study_type.lower()
-        
-        # Determine modality first
-        if study_type.startswith('CT ') or study_type.startswith('CTA '):
-            # === CT STUDIES ===
-            is_cta = study_type.startswith('CTA')
-            
-            # Check for body region combinations first
-            has_chest = ('chest' in study_lower or ' cap' in study_lower or ' ca ' in study_lower or study_lower.endswith(' ca'))
-            has_abdomen = ('abdomen' in study_lower or ' ap' in study_lower or ' cap' in study_lower or ' ca ' in study_lower or study_lower.endswith(' ca'))
-            has_pelvis = ('pelvis' in study_lower or ' ap' in study_lower or ' cap' in study_lower)
-            
-            # CTA Runoff with Abdo/Pelvis - special case
-            if 'runoff' in study_lower and ('abdomen' in study_lower or 'pelvis' in study_lower or 'abdo' in study_lower):
-                return "CTA: Abdomen/Pelvis"
-            
-            # CT/CTA Body (Chest+Abdomen combinations ± Pelvis)
-            elif has_chest and has_abdomen:
-                return "CTA: Body" if is_cta else "CT: Body"
-            
-            # CT/CTA Abdomen/Pelvis (no chest)
-            elif has_abdomen and not has_chest:
-                return "CTA: Abdomen/Pelvis" if is_cta else "CT: Abdomen/Pelvis"
-            
-            # CT/CTA Chest alone
-            elif has_chest and not has_abdomen:
-                return "CTA: Chest" if is_cta else "CT: Chest"
-            
-            # CT/CTA Brain
-            elif any(kw in study_lower for kw in ['brain', 'head', 'face', 'sinus', 'orbit', 'temporal', 'maxillofacial']):
-                return "CTA: Brain" if is_cta else "CT: Brain"
-            
-            # CT/CTA Neck (without brain/head)
-            elif 'neck' in study_lower:
-                return "CTA: Neck" if is_cta else "CT: Neck"
-            
-            # CT/CTA Spine
-            elif any(kw in study_lower for kw in ['spine', 'cervical', 'thoracic', 'lumbar', 'sacrum', 'coccyx']):
-                return "CTA: Spine" if is_cta else "CT: Spine"
-            
-            # CT/CTA MSK
-            elif any(kw in study_lower for kw in ['shoulder', 'arm', 'elbow', 'wrist', 'hand', 'hip', 'femur', 'knee', 'leg', 'ankle', 'foot', 'joint', 'bone']):
-                return "CTA: MSK" if is_cta else "CT: MSK"
-            
-            # CT/CTA Pelvis alone (no abdomen) - MSK
-            elif has_pelvis and not has_abdomen:
-                return "CTA: MSK" if is_cta else "CT: MSK"
-            
-            else:
-                return "CTA: Other" if is_cta else "CT: Other"
+    def _get_body_part_map(self) -> BodyPartMap:
+        """Body part lookup backed by the mapping the data manager stored in the database.
         
-        elif study_type.startswith('MR') or study_type.startswith('MRI'):
-            # === MRI STUDIES ===
-            # MRI Brain
-            if any(kw in study_lower for kw in ['brain', 'head', 'face', 'orbit', 'pituitary', 'iap', 'temporal']):
-                return "MRI: Brain"
-            
-            # MRI Spine
-            elif any(kw in study_lower for kw in ['spine', 'cervical', 'thoracic', 'lumbar', 'sacrum', 'coccyx']):
-                return "MRI: Spine"
-            
-            # MRI Abdomen/Pelvis
-            elif any(kw in study_lower for kw in ['abdomen', 'pelvis', 'liver', 'kidney', 'pancreas', 'mrcp', 'enterography']):
-                return "MRI: Abdomen/Pelvis"
-            
-            # MRI MSK
-            elif any(kw in study_lower for kw in ['shoulder', 'arm', 'elbow', 'wrist', 'hand', 'hip', 'femur', 'knee', 'leg', 'ankle', 'foot', 'joint', 'extremity']):
-                return "MRI: MSK"
-            
-            # MRI Neck
-            elif 'neck' in study_lower:
-                return "MRI: Neck"
-            
-            # MRI Chest (rare but exists)
-            elif 'chest' in study_lower or 'thorax' in study_lower:
-                return "MRI: Chest"
-            
-            else:
-                return "MRI: Other"
-        
-        elif study_type.startswith('XR'):
-            # === X-RAY STUDIES ===
-            # XR Chest
-            if 'chest' in study_lower:
-                return "XR: Chest"
-            
-            # XR Abdomen
-            elif 'abdomen' in study_lower:
-                return "XR: Abdomen"
-            
-            # XR MSK
-            elif any(kw in study_lower for kw in ['msk', 'bone', 'shoulder', 'arm', 'elbow', 'wrist', 'hand', 'finger', 
-                                                    'hip', 'pelvis', 'femur', 'knee', 'leg', 'ankle', 'foot', 'toe',
-                                                    'spine', 'cervical', 'thoracic', 'lumbar', 'sacrum', 'coccyx',
-                                                    'rib', 'clavicle', 'scapula', 'joint', 'extremity']):
-                return "XR: MSK"
-            
-            else:
-                return "XR: Other"
-        
-        elif study_type.startswith('US'):
-            # === ULTRASOUND STUDIES ===
-            # US Abdomen/Pelvis
-            if any(kw in study_lower for kw in ['abdomen', 'pelvis', 'liver', 'kidney', 'gallbladder', 'spleen', 'pancreas', 'bladder', 'ovary', 'uterus', 'prostate']):
-                return "US: Abdomen/Pelvis"
-            
-            # US Vascular
-            elif any(kw in study_lower for kw in ['vascular', 'doppler', 'artery', 'vein', 'vessel', 'dvt', 'carotid']):
-                return "US: Vascular"
-            
-            # US MSK
-            elif any(kw in study_lower for kw in ['shoulder', 'elbow', 'wrist', 'hand', 'hip', 'knee', 'ankle', 'foot', 'tendon', 'joint']):
-                return "US: MSK"
-            
-            # US Breast
-            elif 'breast' in study_lower:
-                return "US: Breast"
-            
-            # US Thyroid/Neck
-            elif 'thyroid' in study_lower or 'neck' in study_lower:
-                return "US: Neck"
-            
-            else:
-                return "US: Other"
-        
-        elif study_type.startswith('NM'):
-            # === NUCLEAR MEDICINE STUDIES ===
-            # NM Cardiac
-            if any(kw in study_lower for kw in ['cardiac', 'heart', 'myocard', 'stress', 'viability']):
-                return "NM: Cardiac"
-            
-            # NM Bone
-            elif 'bone' in study_lower:
-                return "NM: Bone"
-            
-            # NM Other organs
-            else:
-                return "NM: Other"
-        
-        else:
-            # === OTHER MODALITIES ===
-            return "Other"
+        Reloaded whenever the database has changed since it was loaded, so a rules
+        change (RVUData.save() rewrites the mapping) shows up in an open window.
+        """
+        db = self.data_manager.db
+        # Read the version before loading, like _get_records_in_range
+        version = db.change_counter
+        if self._body_part_map is None or self._body_part_map_version != version:
+            try:
+                mapping = db.get_body_part_map()
+            except Exception as e:
+                logger.error(f"Error loading body part mapping: {e}")
+                mapping = {}
+            self._body_part_map = BodyPartMap(mapping)
+            self._body_part_map_version = version
+        return self._body_part_map
     
-    def _display_by_body_part(self, records: List[dict]):
+    def _display_by_body_part(self, frame: AnalyticsFrame):
         """Display data grouped by anatomical body part with hierarchical organization."""
-        logger.debug(f"_display_by_body_part called with {len(records)} records")
+        logger.debug(f"_display_by_body_part called with {frame.size} rows")
         
         # Clear/create Canvas table (force recreation to pick up any column changes)
         if hasattr(self, '_by_body_part_table'):
@@ -2035,34 +1994,17 @@ class StatisticsWindow:
         self._by_body_part_table.clear()
         
         # Group by study type first, then by body part
-        type_data = {}
-        total_studies = 0
-        total_rvu = 0
-        
-        for record in records:
-            study_type = record.get("study_type", "").strip()
-            if not study_type:
-                study_type = "(Unknown)"
-            
-            # Handle any remaining "Multiple ..." study types
-            if study_type.startswith("Multiple "):
-                modality = study_type.replace("Multiple ", "").strip()
-                study_type = f"{modality} Other" if modality else "(Unknown)"
-            
-            rvu = record.get("rvu", 0)
-            
-            if study_type not in type_data:
-                type_data[study_type] = {"studies": 0, "rvu": 0}
-            
-            type_data[study_type]["studies"] += 1
-            type_data[study_type]["rvu"] += rvu
-            total_studies += 1
-            total_rvu += rvu
+        frame.derive("display_study_type", "study_type", self._display_study_type_label)
+        type_data = {study_type: {"studies": studies, "rvu": rvu}
+                     for study_type, studies, rvu in frame.group_totals("display_study_type")}
+        total_studies = frame.total_studies()
+        total_rvu = frame.total_rvu()
         
         # Group study types by body part
+        body_parts = self._get_body_part_map()
         body_part_groups = {}
         for study_type, data in type_data.items():
-            body_part = self._get_body_part_group(study_type)
+            body_part = body_parts.group_of(study_type)
             if body_part not in body_part_groups:
                 body_part_groups[body_part] = {"studies": 0, "rvu": 0, "types": {}}
             
@@ -2752,10 +2694,12 @@ class StatisticsWindow:
             
             # Delete from database first
             deleted_from_db = False
+            deleted_shift_id = None  # Shift the record was deleted from (its cached records go stale)
             if record_id:
                 try:
                     self.data_manager.db.delete_record(record_id)
                     deleted_from_db = True
+                    deleted_shift_id = record.get("shift_id")
                     logger.info(f"Deleted study from database: {accession} (ID: {record_id})")
                 except Exception as e:
                     logger.error(f"Error deleting study from database: {e}", exc_info=True)
@@ -2771,6 +2715,7 @@ class StatisticsWindow:
                         if db_record:
                             self.data_manager.db.delete_record(db_record['id'])
                             deleted_from_db = True
+                            deleted_shift_id = current_shift['id']
                             logger.info(f"Deleted study from database by accession: {accession} (ID: {db_record['id']})")
                 except Exception as e:
                     logger.error(f"Error finding/deleting study in database (current shift): {e}", exc_info=True)
@@ -2788,6 +2733,7 @@ class StatisticsWindow:
                             if db_record:
                                 self.data_manager.db.delete_record(db_record['id'])
                                 deleted_from_db = True
+                                deleted_shift_id = shift['id']
                                 logger.info(f"Deleted study from database by accession (historical shift): {accession} (ID: {db_record['id']})")
                                 break
                     except Exception as e:
@@ -2804,9 +2750,15 @@ class StatisticsWindow:
                     found_in_memory = True
                     break
             
-            # If not found in current shift, check historical shifts
-            if not found_in_memory:
-                for shift in self.data_manager.data.get("shifts", []):
+            # If not found in current shift, check historical shifts. Lazy historical shifts
+            # read their records from the database, so after a database delete only the
+            # affected shift's cached records (and header totals) need refreshing.
+            historical_shifts = self.data_manager.data.get("shifts", [])
+            if not found_in_memory and deleted_from_db and isinstance(historical_shifts, ShiftHistory):
+                if deleted_shift_id is not None:
+                    historical_shifts.invalidate_shift(deleted_shift_id)
+            elif not found_in_memory:
+                for shift in historical_shifts:
                     shift_records = shift.get("records", [])
                     for i, r in enumerate(shift_records):
                         if r.get("accession") == accession and r.get("time_performed") == time_performed:
@@ -2943,7 +2895,36 @@ class StatisticsWindow:
                 self.tree.heading(column, text=heading_text,
                                  command=lambda c=column: self._sort_column(c))
     
-    def _display_efficiency(self, records: List[dict]):
+    def _efficiency_shifts(self) -> list:
+        """(shift key, start, end) of every shift, current shift first, for EfficiencyMatrix."""
+        shifts = []
+        current_shift = self.data_manager.data.get("current_shift", {})
+        candidates = [("current", current_shift)] if current_shift.get("shift_start") else []
+        candidates.extend((shift.get("shift_start"), shift)
+                          for shift in self.data_manager.data.get("shifts", []) if shift.get("shift_start"))
+        for key, shift in candidates:
+            try:
+                start = datetime.fromisoformat(shift["shift_start"])
+                end_str = shift.get("shift_end")
+                # No end time, assume 9 hour shift
+                end = datetime.fromisoformat(end_str) if end_str else start + timedelta(hours=9)
+            except (TypeError, ValueError):
+                continue
+            shifts.append((key, start, end))
+        return shifts
+    
+    def _get_efficiency_matrix(self, records: List[dict], range_key: Optional[tuple]) -> EfficiencyMatrix:
+        """EfficiencyMatrix for the period, cached with the period data when it came from the database."""
+        if range_key is None:
+            return EfficiencyMatrix(records, self._efficiency_shifts())
+        cache = get_statistics_cache()
+        matrix = cache.get(("efficiency",) + range_key)
+        if matrix is None:
+            matrix = EfficiencyMatrix(records, self._efficiency_shifts())
+            cache.put(("efficiency",) + range_key, matrix, len(matrix.modalities) * 24)
+        return matrix
+    
+    def _display_efficiency(self, records: List[dict], range_key: Optional[tuple] = None):
         """Display efficiency view with Canvas-based spreadsheet showing per-cell color coding.
         Two sections: 11pm-10am (night) and 11am-10pm (day), each with Modality + 12 hour columns.
         """
@@ -2975,160 +2956,10 @@ class StatisticsWindow:
         night_hours = list(range(23, 24)) + list(range(0, 11))  # 11pm-10am (12 hours)
         day_hours = list(range(11, 23))  # 11am-10pm (12 hours)
         
-        # Build data structure: modality -> hour -> list of durations and counts
-        efficiency_data = {}
-        study_count_data = {}  # modality -> hour -> count
-        shifts_per_hour = {}  # modality -> hour -> set of shift identifiers (for average calculation)
-        
-        # Build a mapping of time_performed to shift_id by checking all shifts
-        # This helps us calculate averages (studies per hour / number of shifts with data in that hour)
-        shift_time_map = {}  # time_performed -> shift_id
-        all_shifts = []
-        current_shift = self.data_manager.data.get("current_shift", {})
-        if current_shift.get("shift_start"):
-            all_shifts.append(("current", current_shift))
-        for shift in self.data_manager.data.get("shifts", []):
-            if shift.get("shift_start"):
-                all_shifts.append((shift.get("shift_start"), shift))
-        
-        # Helper function to track which shift a record belongs to
-        def track_shift_for_record(modality, hour, record_time_str):
-            """Track which shift this record belongs to for average calculation."""
-            if not record_time_str:
-                return
-            try:
-                record_time = datetime.fromisoformat(record_time_str)
-                # Find which shift this record belongs to
-                for shift_id, shift_data in all_shifts:
-                    shift_start_str = shift_data.get("shift_start") if isinstance(shift_data, dict) else None
-                    if shift_start_str:
-                        try:
-                            shift_start = datetime.fromisoformat(shift_start_str)
-                            shift_end_str = shift_data.get("shift_end") if isinstance(shift_data, dict) else None
-                            if shift_end_str:
-                                shift_end = datetime.fromisoformat(shift_end_str)
-                            else:
-                                # No end time, assume 9 hour shift
-                                shift_end = shift_start + timedelta(hours=9)
-                            
-                            if shift_start <= record_time <= shift_end:
-                                # This record belongs to this shift
-                                if modality not in shifts_per_hour:
-                                    shifts_per_hour[modality] = {}
-                                if hour not in shifts_per_hour[modality]:
-                                    shifts_per_hour[modality][hour] = set()
-                                shifts_per_hour[modality][hour].add(shift_id)
-                                break
-                        except:
-                            pass
-            except:
-                pass
-        
-        for record in records:
-            study_type = record.get("study_type", "Unknown")
-            modality = study_type.split()[0] if study_type else "Unknown"
-            
-            try:
-                rec_time = datetime.fromisoformat(record.get("time_finished", ""))
-                hour = rec_time.hour
-                record_time_str = record.get("time_finished", "")
-            except:
-                continue
-            
-            # Check if this is a "Multiple" modality record that should be expanded
-            if modality == "Multiple" or study_type.startswith("Multiple "):
-                # Expand into individual studies
-                individual_study_types = record.get("individual_study_types", [])
-                accession_count = record.get("accession_count", 1)
-                duration = record.get("duration_seconds", 0)
-                duration_per_study = duration / accession_count if accession_count > 0 else 0
-                
-                # Check if we have individual data stored
-                has_individual_data = individual_study_types and len(individual_study_types) == accession_count
-                
-                if has_individual_data:
-                    # We have individual study types - process each one
-                    for i, individual_st in enumerate(individual_study_types):
-                        expanded_mod = individual_st.split()[0] if individual_st else "Unknown"
-                        
-                        # Track duration data (divide total duration equally)
-                        if duration_per_study and duration_per_study > 0:
-                            if expanded_mod not in efficiency_data:
-                                efficiency_data[expanded_mod] = {}
-                            if hour not in efficiency_data[expanded_mod]:
-                                efficiency_data[expanded_mod][hour] = []
-                            efficiency_data[expanded_mod][hour].append(duration_per_study)
-                        
-                        # Track study count data
-                        if expanded_mod not in study_count_data:
-                            study_count_data[expanded_mod] = {}
-                        if hour not in study_count_data[expanded_mod]:
-                            study_count_data[expanded_mod][hour] = 0
-                        study_count_data[expanded_mod][hour] += 1
-                        track_shift_for_record(expanded_mod, hour, record_time_str)
-                else:
-                    # No individual data - try to parse from study_type (e.g., "Multiple CT, XR")
-                    # Extract modalities after "Multiple "
-                    if study_type.startswith("Multiple "):
-                        modality_str = study_type.replace("Multiple ", "").strip()
-                        modalities_list = [m.strip() for m in modality_str.split(",")]
-                        count = len(modalities_list)
-                        
-                        for mod in modalities_list:
-                            # Track duration data (divide total duration equally)
-                            if duration and duration > 0:
-                                per_study_duration = duration / count
-                                if mod not in efficiency_data:
-                                    efficiency_data[mod] = {}
-                                if hour not in efficiency_data[mod]:
-                                    efficiency_data[mod][hour] = []
-                                efficiency_data[mod][hour].append(per_study_duration)
-                            
-                            # Track study count data
-                            if mod not in study_count_data:
-                                study_count_data[mod] = {}
-                            if hour not in study_count_data[mod]:
-                                study_count_data[mod][hour] = 0
-                            study_count_data[mod][hour] += 1
-                            track_shift_for_record(mod, hour, record_time_str)
-                    else:
-                        # Can't expand - treat as single "Multiple" entry
-                        # Track duration data
-                        if duration and duration > 0:
-                            if modality not in efficiency_data:
-                                efficiency_data[modality] = {}
-                            if hour not in efficiency_data[modality]:
-                                efficiency_data[modality][hour] = []
-                            efficiency_data[modality][hour].append(duration)
-                        
-                        # Track study count data
-                        if modality not in study_count_data:
-                            study_count_data[modality] = {}
-                        if hour not in study_count_data[modality]:
-                            study_count_data[modality][hour] = 0
-                        study_count_data[modality][hour] += 1
-                        track_shift_for_record(modality, hour, record_time_str)
-            else:
-                # Regular single study - process normally
-                # Track duration data
-                duration = record.get("duration_seconds", 0)
-                if duration and duration > 0:
-                    if modality not in efficiency_data:
-                        efficiency_data[modality] = {}
-                    if hour not in efficiency_data[modality]:
-                        efficiency_data[modality][hour] = []
-                    efficiency_data[modality][hour].append(duration)
-                
-                # Track study count data (all studies, not just those with duration)
-                if modality not in study_count_data:
-                    study_count_data[modality] = {}
-                if hour not in study_count_data[modality]:
-                    study_count_data[modality][hour] = 0
-                study_count_data[modality][hour] += 1
-                track_shift_for_record(modality, hour, record_time_str)
-        
-        # Combine modalities from both data sources
-        all_modalities = sorted(set(list(efficiency_data.keys()) + list(study_count_data.keys())))
+        # Modality x hour matrices (counts, mean duration, shifts with data), computed
+        # once per period data; the mode radio buttons only redraw from them
+        matrix = self._get_efficiency_matrix(records, range_key)
+        all_modalities = matrix.modalities
         
         # Helper function to get color coding (blue=low, red=high by default)
         # Get theme colors for efficiency view
@@ -3451,27 +3282,20 @@ class StatisticsWindow:
             study_count_mode = self.study_count_mode.get() if hasattr(self, 'study_count_mode') else "average"
             
             # Build row data for all modalities
-            for modality in all_modalities:
+            for modality_index, modality in enumerate(all_modalities):
                 modality_durations = []
                 modality_counts_row = []  # Total counts
                 modality_avg_counts_row = []  # Average counts (total / num_shifts)
                 row_cell_data = []
                 
                 for hour in hours_list:
-                    # Get duration data
-                    avg_duration = None
-                    duration_count = 0
-                    if modality in efficiency_data and hour in efficiency_data[modality]:
-                        durations = efficiency_data[modality][hour]
-                        avg_duration = sum(durations) / len(durations)
-                        duration_count = len(durations)
-                    
-                    # Get study count data
-                    study_count = study_count_data.get(modality, {}).get(hour, 0) if modality in study_count_data else 0
+                    # Get duration and study count data
+                    avg_duration = matrix.mean_duration[modality_index][hour]
+                    study_count = matrix.counts[modality_index][hour]
                     modality_counts_row.append(study_count)
                     
                     # Calculate average: total studies / number of shifts with data in this hour
-                    num_shifts_with_data = len(shifts_per_hour.get(modality, {}).get(hour, set())) if modality in shifts_per_hour else 0
+                    num_shifts_with_data = matrix.shift_counts[modality_index][hour]
                     if num_shifts_with_data == 0:
                         num_shifts_with_data = 1  # Avoid division by zero, assume at least 1 shift
                     avg_studies = round(study_count / num_shifts_with_data) if study_count > 0 else 0
@@ -3532,7 +3356,7 @@ class StatisticsWindow:
                 })
             
             # Build TOTAL row data with color coding support
-            if efficiency_data:
+            if matrix.has_durations:
                 total_hour_cells = []
                 total_hour_durations = []
                 total_hour_counts = []  # Total counts
@@ -3540,24 +3364,11 @@ class StatisticsWindow:
                 total_shifts_per_hour = []  # Number of shifts with data in each hour
                 
                 for hour in hours_list:
-                    hour_durations = []
-                    hour_count = 0
-                    hour_duration_count = 0
-                    # Track unique shifts for this hour across all modalities
-                    hour_shift_ids = set()
+                    # Studies and unique shifts for this hour across all modalities
+                    hour_count = matrix.hour_counts[hour]
+                    avg_duration = matrix.hour_mean_duration[hour]
                     
-                    for mod in efficiency_data.keys():
-                        if hour in efficiency_data[mod]:
-                            hour_durations.extend(efficiency_data[mod][hour])
-                            hour_duration_count += len(efficiency_data[mod][hour])
-                        # Count all studies for this hour across all modalities
-                        if mod in study_count_data and hour in study_count_data[mod]:
-                            hour_count += study_count_data[mod][hour]
-                        # Collect shift IDs for this hour
-                        if mod in shifts_per_hour and hour in shifts_per_hour[mod]:
-                            hour_shift_ids.update(shifts_per_hour[mod][hour])
-                    
-                    num_shifts = len(hour_shift_ids) if hour_shift_ids else 0
+                    num_shifts = matrix.hour_shift_counts[hour]
                     if num_shifts == 0:
                         num_shifts = 1  # Avoid division by zero
                     avg_count = round(hour_count / num_shifts) if hour_count > 0 else 0
@@ -3567,8 +3378,7 @@ class StatisticsWindow:
                     total_shifts_per_hour.append(num_shifts)
                     
                     # Build cell text based on study count mode (will be rebuilt in draw_rows)
-                    if hour_durations:
-                        avg_duration = sum(hour_durations) / len(hour_durations)
+                    if avg_duration is not None:
                         duration_str = self._format_duration(avg_duration)
                         if study_count_mode == "average":
                             cell_text = f"{duration_str} ({avg_count})"
@@ -3845,7 +3655,6 @@ class StatisticsWindow:
                         classification_rules = self.data_manager.data.get("classification_rules", {})
                         direct_lookups = self.data_manager.data.get("direct_lookups", {})
                         
-                        # match_study_type is defined at module level in this file
                         for i in range(accession_count):
                             procedure = individual_procedures[i] if i < len(individual_procedures) else ""
                             study_type, _ = match_study_type(procedure, rvu_table, classification_rules, direct_lookups)
@@ -3920,7 +3729,9 @@ class StatisticsWindow:
                     
                     for r in records:
                         try:
-                            record_time = datetime.fromisoformat(r.get("time_performed", ""))
+                            record_time = record_performed_at(r)
+                            if record_time is None:
+                                continue
                             if shift_end_str:
                                 shift_end = datetime.fromisoformat(shift_end_str)
                                 if shift_start <= record_time <= shift_end:
@@ -3952,12 +3763,7 @@ class StatisticsWindow:
                         shift_duration = (shift_end - shift_start).total_seconds() / 3600
                     else:
                         # Current shift - estimate from records
-                        shift_record_times = []
-                        for r in shift_records:
-                            try:
-                                shift_record_times.append(datetime.fromisoformat(r.get("time_performed", "")))
-                            except:
-                                pass
+                        shift_record_times = [t for t in map(record_performed_at, shift_records) if t is not None]
                         if shift_record_times:
                             latest_time = max(shift_record_times)
                             shift_duration = (latest_time - shift_start).total_seconds() / 3600
@@ -4011,10 +3817,8 @@ class StatisticsWindow:
         records_by_shift = {}
         for r in records:
             # Find which shift this record belongs to
-            record_time = None
-            try:
-                record_time = datetime.fromisoformat(r.get("time_performed", ""))
-            except:
+            record_time = record_performed_at(r)
+            if record_time is None:
                 continue
             
             # Find the shift this record belongs to
@@ -4047,7 +3851,9 @@ class StatisticsWindow:
             hourly_stats_per_shift[shift_start_str] = {}
             for r in shift_records:
                 try:
-                    time_finished = datetime.fromisoformat(r.get("time_finished", ""))
+                    time_finished = record_finished_at(r)
+                    if time_finished is None:
+                        continue
                     hour = time_finished.hour
                     
                     if hour not in hourly_stats_per_shift[shift_start_str]:
@@ -4417,7 +4223,9 @@ class StatisticsWindow:
     def _calculate_study_compensation(self, record: dict) -> float:
         """Calculate compensation for a single study based on when it was finished."""
         try:
-            time_finished = datetime.fromisoformat(record.get("time_finished", record.get("time_performed", "")))
+            time_finished = record_finished_at(record) if "time_finished" in record else record_performed_at(record)
+            if time_finished is None:
+                return 0.0
             rate = self.app._get_compensation_rate(time_finished)
             return record.get("rvu", 0) * rate
         except (KeyError, ValueError, AttributeError):
@@ -4668,8 +4476,6 @@ class StatisticsWindow:
                     classification_rules = self.data_manager.data.get("classification_rules", {})
                     direct_lookups = self.data_manager.data.get("direct_lookups", {})
                     
-                    # match_study_type is defined at module level in this file
-                    
                     rvu_per_study = total_rvu / accession_count if accession_count > 0 else 0
                     comp_per_study = original_comp / accession_count if accession_count > 0 else 0
                     
@@ -4937,7 +4743,9 @@ class StatisticsWindow:
         shifts_with_records = {}
         for r in records:
             try:
-                record_time = datetime.fromisoformat(r.get("time_performed", ""))
+                record_time = record_performed_at(r)
+                if record_time is None:
+                    continue
                 for shift in all_shifts:
                     shift_start_str = shift.get("shift_start")
                     if not shift_start_str:
@@ -7129,7 +6937,7 @@ class StatisticsWindow:
         for shift in shifts:
             shift_start = shift.get("shift_start")
             try:
-                cursor = self.data_manager.db.conn.cursor()
+                cursor = self.data_manager.db.read_cursor()
                 cursor.execute('SELECT id FROM shifts WHERE shift_start = ? AND is_current = 0', (shift_start,))
                 row = cursor.fetchone()
                 if row:
@@ -7150,19 +6958,18 @@ class StatisticsWindow:
                         self.data_manager.records_data["shifts"].pop(i)
                         break
         
-        # Create the combined shift in database
+        # Create the combined shift in database (shift and records in one transaction)
         try:
-            cursor = self.data_manager.db.conn.cursor()
-            cursor.execute('''
-                INSERT INTO shifts (shift_start, shift_end, is_current)
-                VALUES (?, ?, 0)
-            ''', (combined_start, combined_end))
-            self.data_manager.db.conn.commit()
-            combined_shift_id = cursor.lastrowid
-            
-            # Add all records to the combined shift
-            for record in combined_records:
-                self.data_manager.db.add_record(combined_shift_id, record)
+            with self.data_manager.db.batch() as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    INSERT INTO shifts (shift_start, shift_end, is_current)
+                    VALUES (?, ?, 0)
+                ''', (combined_start, combined_end))
+                combined_shift_id = cursor.lastrowid
+                
+                # Add all records to the combined shift
+                self.data_manager.db.add_records(combined_shift_id, combined_records)
             
             logger.info(f"Created combined shift in database: ID={combined_shift_id}")
         except Exception as e:
@@ -1,10 +1,55 @@
 ﻿"""Custom canvas-based sortable table widget for RVU Counter."""
 
+import re
 import tkinter as tk
 from tkinter import ttk
 
+# Columns whose text is left-aligned (names/categories); all others are centered
+LEFT_ALIGNED_COLUMNS = frozenset({'body_part', 'study_type', 'procedure', 'metric', 'modality',
+                                  'patient_class', 'category'})
+
+# Extra rows drawn above and below the visible area so small scrolls never show gaps
+OVERSCAN_ROWS = 5
+# Rows drawn before the table has been laid out and its visible height is known
+INITIAL_RENDER_ROWS = 40
+
+_COUNT_SUFFIX_RE = re.compile(r'\s*\(\d+\)$')
+_NUMBER_RE = re.compile(r'^\$?(-?(?:\d[\d,]*)?\.?\d+)%?$')
+_DURATION_RE = re.compile(r'^(?:(\d+)h)?\s*(?:(\d+)m)?\s*(?:(\d+)s)?$')
+
+
+def sort_key(value):
+    """Typed sort key for a cell value.
+    
+    Numbers, numeric text ("12.5", "$1,234.56", "45%") and durations ("1h 5m",
+    "3m 20s", with an optional trailing "(count)") sort numerically ahead of
+    other text, which sorts case-insensitively.
+    """
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return (0, float(value))
+    text = _COUNT_SUFFIX_RE.sub('', str(value)).strip()
+    number = _NUMBER_RE.match(text)
+    if number:
+        return (0, float(number.group(1).replace(',', '')))
+    duration = _DURATION_RE.match(text) if text else None
+    if duration and any(duration.groups()):
+        hours, minutes, seconds = (int(part or 0) for part in duration.groups())
+        return (0, float(hours * 3600 + minutes * 60 + seconds))
+    return (1, text.lower())
+
+
 class CanvasTable:
-    """Reusable Canvas-based sortable table widget."""
+    """Reusable Canvas-based sortable table widget.
+    
+    Rendering is virtualized: the scrolled canvas itself is the data surface.
+    Its scrollregion covers every row, but only the rows inside the scrolled-to
+    area (plus a few either side) are drawn, at their canvas coordinates below
+    the embedded header. No widget grows with the row count, so Tk's 32767px
+    window size limit doesn't cap the table. The canvas items of the drawn rows
+    are kept in a pool of row slots and moved / reconfigured on scroll instead
+    of being deleted and recreated. Sort keys are computed once per column (see
+    sort_key) and reused until the rows change.
+    """
     
     def _get_theme_colors(self, widget):
         """Get theme colors by traversing widget hierarchy to find app instance."""
@@ -74,6 +119,17 @@ class CanvasTable:
         self.sort_column = None
         self.sort_reverse = False
         
+        # Virtual rendering state
+        self._column_x = []  # left edge of each column
+        x = 0
+        for col_info in self.columns:
+            self._column_x.append(x)
+            x += col_info['width']
+        self._sort_keys = {}  # column name -> sort key per row of rows_data
+        self._ordered_rows = None  # rows_data in display order (None = recompute)
+        self._slots = []  # per drawn row: [(rect id, text id) per column]
+        self._render_pending = False
+        
         # Get theme colors - use app if provided, otherwise try to find it
         if self.app and hasattr(self.app, 'theme_colors'):
             theme_colors = self.app.theme_colors
@@ -81,7 +137,6 @@ class CanvasTable:
             theme_colors = self._get_theme_colors(parent)
         canvas_bg = theme_colors.get("canvas_bg", "#f0f0f0")
         header_bg = theme_colors.get("button_bg", "#e1e1e1")
-        data_bg = theme_colors.get("entry_bg", "white")
         text_fg = theme_colors.get("fg", "black")
         border_color = theme_colors.get("border_color", "#cccccc")  # Light grey for canvas borders
         
@@ -93,31 +148,26 @@ class CanvasTable:
         self.canvas = tk.Canvas(self.frame, bg=canvas_bg, highlightthickness=1, highlightbackground=border_color)
         self.scrollbar = ttk.Scrollbar(self.frame, orient="vertical", command=self.canvas.yview)
         
-        # Inner frame for content
-        self.inner_frame = ttk.Frame(self.canvas)
-        self.canvas_window = self.canvas.create_window((0, 0), window=self.inner_frame, anchor="nw")
+        # Header canvas embedded at the top of the scrolled area (scrolls away with the rows)
+        self.header_canvas = tk.Canvas(self.canvas, width=self.table_width, height=header_height,
+                                      bg=header_bg, highlightthickness=0)
+        self.header_window = self.canvas.create_window((0, 0), window=self.header_canvas, anchor="nw")
         
-        # Configure scrolling
-        def configure_scroll_region(event):
-            self.canvas.configure(scrollregion=self.canvas.bbox("all"))
+        # Rows are drawn directly on the scrolled canvas, below the header
+        self.data_canvas = self.canvas
+        self._set_scroll_height(0)
         
         def configure_canvas_width(event):
-            canvas_width = event.width
-            self.canvas.itemconfig(self.canvas_window, width=canvas_width)
+            self.canvas.itemconfig(self.header_window, width=max(event.width, self.table_width))
+            self._schedule_render()  # visible height may have changed
         
-        self.inner_frame.bind("<Configure>", configure_scroll_region)
-        self.canvas.bind("<Configure>", configure_canvas_width)
-        self.canvas.configure(yscrollcommand=self.scrollbar.set)
-        
-        # Create header canvas
-        self.header_canvas = tk.Canvas(self.inner_frame, width=self.table_width, height=header_height,
-                                      bg=header_bg, highlightthickness=0)
-        self.header_canvas.pack(fill=tk.X)
+        def on_yscroll(first, last):
+            self.scrollbar.set(first, last)
+            self._schedule_render()
         
-        # Create data canvas
-        self.data_canvas = tk.Canvas(self.inner_frame, width=self.table_width,
-                                    bg=data_bg, highlightthickness=0)
-        self.data_canvas.pack(fill=tk.BOTH, expand=True)
+        self.canvas.bind("<Configure>", configure_canvas_width)
+        self.canvas.bind("<Map>", lambda e: self._schedule_render())
+        self.canvas.configure(yscrollcommand=on_yscroll)
         
         # Bind mouse wheel scrolling
         def on_mousewheel(event):
@@ -139,9 +189,7 @@ class CanvasTable:
         # Bind to all components for comprehensive scrolling
         bind_mousewheel_to_canvas(self.frame)
         bind_mousewheel_to_canvas(self.canvas)
-        bind_mousewheel_to_canvas(self.inner_frame)
         bind_mousewheel_to_canvas(self.header_canvas)
-        bind_mousewheel_to_canvas(self.data_canvas)
         
         # Draw headers
         self._draw_headers()
@@ -178,7 +226,7 @@ class CanvasTable:
                 display_text = text + indicator
             
             # Draw text - left-align text columns, center numeric columns
-            if col_name == 'body_part' or col_name == 'study_type' or col_name == 'procedure' or col_name == 'metric' or col_name == 'modality' or col_name == 'patient_class' or col_name == 'category':
+            if col_name in LEFT_ALIGNED_COLUMNS:
                 text_anchor = 'w'
                 text_x = x + 4  # Small left padding
             else:
@@ -215,164 +263,193 @@ class CanvasTable:
         # Redraw data with new sort order
         self._draw_data()
     
+    def _sort_keys_for(self, col_name):
+        """Sort keys of a column for every row, computed once until the rows change."""
+        keys = self._sort_keys.get(col_name)
+        if keys is None:
+            keys = [sort_key(row['cells'].get(col_name, "")) for row in self.rows_data]
+            self._sort_keys[col_name] = keys
+        return keys
+    
+    def _display_rows(self):
+        """rows_data in display order: sorted regular rows, totals at the bottom."""
+        if self._ordered_rows is None:
+            regular = [i for i, row in enumerate(self.rows_data) if not row.get('is_total', False)]
+            totals = [i for i, row in enumerate(self.rows_data) if row.get('is_total', False)]
+            if self.sort_column and self.sort_column in self.sortable:
+                keys = self._sort_keys_for(self.sort_column)
+                regular.sort(key=keys.__getitem__, reverse=self.sort_reverse)
+            self._ordered_rows = [self.rows_data[i] for i in regular + totals]
+        return self._ordered_rows
+    
+    def _set_scroll_height(self, row_count):
+        """Make the scrollregion cover the header and row_count rows."""
+        self.canvas.configure(scrollregion=(0, 0, self.table_width,
+                                            self.header_height + row_count * self.row_height))
+    
     def _draw_data(self):
-        """Draw data rows."""
-        self.data_canvas.delete("all")
-        
-        # Sort rows if needed
-        rows_to_draw = list(self.rows_data)
-        if self.sort_column and self.sort_column in self.sortable:
-            # Separate totals from regular rows
-            regular_rows = [r for r in rows_to_draw if not r.get('is_total', False)]
-            total_rows = [r for r in rows_to_draw if r.get('is_total', False)]
+        """Size the scrollregion for all rows and draw the visible ones."""
+        self._ordered_rows = None
+        rows = self._display_rows()
+        # Scrollregion covers all rows (only the visible ones get drawn)
+        self._set_scroll_height(len(rows))
+        self._render_visible()
+    
+    def _schedule_render(self):
+        """Redraw the visible rows once the current burst of scroll/resize events is handled."""
+        if self._render_pending:
+            return
+        self._render_pending = True
+        
+        def render():
+            self._render_pending = False
+            self._render_visible()
+        
+        try:
+            self.data_canvas.after_idle(render)
+        except tk.TclError:
+            self._render_pending = False  # widget destroyed
+    
+    def _visible_range(self, row_count):
+        """(first, last) display row indices to draw for the current scroll position."""
+        try:
+            # Rows start below the header on the scrolled canvas
+            top = self.canvas.canvasy(0) - self.header_height
+            height = self.canvas.winfo_height()
+        except tk.TclError:
+            top, height = 0, 1
+        if height <= 1:
+            # Not laid out yet
+            height = INITIAL_RENDER_ROWS * self.row_height
+        first = max(0, int(top // self.row_height) - OVERSCAN_ROWS)
+        last = min(row_count, int((top + height) // self.row_height) + 1 + OVERSCAN_ROWS)
+        return first, max(first, last)
+    
+    def _new_slot(self):
+        """Create the canvas items for one drawn row (hidden until filled)."""
+        slot = []
+        for _ in self.columns:
+            rect_id = self.data_canvas.create_rectangle(0, 0, 0, 0, width=1, state='hidden', tags="row")
+            text_id = self.data_canvas.create_text(0, 0, text="", state='hidden', tags="row")
+            slot.append((rect_id, text_id))
+        return slot
+    
+    def _render_visible(self):
+        """Draw the rows in view, reusing the pooled row slots."""
+        try:
+            rows = self._display_rows()
+            first, last = self._visible_range(len(rows))
             
-            # Sort regular rows
-            def get_sort_value(row):
-                val = row['cells'].get(self.sort_column, "")
-                # Try numeric sort first
-                try:
-                    if isinstance(val, str):
-                        # Remove parentheses content for duration strings
-                        val_clean = re.sub(r'\s*\(\d+\)$', '', val).strip()
-                        if val_clean and val_clean != "-":
-                            # Try parsing as duration (Xh Ym Zs)
-                            total_seconds = 0
-                            hours = re.search(r'(\d+)h', val_clean)
-                            minutes = re.search(r'(\d+)m', val_clean)
-                            seconds = re.search(r'(\d+)s', val_clean)
-                            if hours:
-                                total_seconds += int(hours.group(1)) * 3600
-                            if minutes:
-                                total_seconds += int(minutes.group(1)) * 60
-                            if seconds:
-                                total_seconds += int(seconds.group(1))
-                            return total_seconds if total_seconds > 0 else float('inf')
-                    return float(val)
-                except:
-                    pass
-                return str(val).lower()
+            # Get theme colors once (cache for performance)
+            colors = {
+                'data_bg': self.theme_colors.get("entry_bg", "white"),
+                'data_fg': self.theme_colors.get("fg", "black"),
+                'border_color': self.theme_colors.get("border_color", "#acacac"),
+                'total_bg': self.theme_colors.get("button_bg", "#e1e1e1"),
+            }
             
-            regular_rows.sort(key=get_sort_value, reverse=self.sort_reverse)
-            rows_to_draw = regular_rows + total_rows
-        else:
-            # Keep totals at bottom
-            regular_rows = [r for r in rows_to_draw if not r.get('is_total', False)]
-            total_rows = [r for r in rows_to_draw if r.get('is_total', False)]
-            rows_to_draw = regular_rows + total_rows
-        
-        # Get theme colors once (cache for performance)
-        data_bg = self.theme_colors.get("entry_bg", "white")
-        data_fg = self.theme_colors.get("fg", "black")
-        border_color = self.theme_colors.get("border_color", "#acacac")
-        total_bg = self.theme_colors.get("button_bg", "#e1e1e1")
-        
-            # Draw rows - draw all rows (for now, optimization can be added later if needed)
-        y = 0
-        for row in rows_to_draw:
-            cells = row['cells']
-            is_total = row.get('is_total', False)
-            cell_colors = row.get('cell_colors', {})  # Optional per-cell background colors
-            cell_text_colors = row.get('cell_text_colors', {})  # Optional per-cell text colors
+            # Multi-colored cells are drawn as extra items and rebuilt every time
+            self.data_canvas.delete("rich_text")
+            
+            while len(self._slots) < last - first:
+                self._slots.append(self._new_slot())
             
-            x = 0
-            for col_info in self.columns:
-                col_name = col_info['name']
-                width = col_info['width']
-                value = cells.get(col_name, "")
-                
-                # Get cell color (for color coding) - use theme colors if not specified
-                if col_name not in cell_colors:
-                    cell_color = total_bg if is_total else data_bg
-                else:
-                    cell_color = cell_colors.get(col_name)
-                
-                # Get text color - use cell_text_colors if specified, otherwise use theme default
-                text_color = cell_text_colors.get(col_name, data_fg)
-                
-                # Draw cell
-                self.data_canvas.create_rectangle(x, y, x + width, y + self.row_height,
-                                                 fill=cell_color, outline=border_color, width=1)
-                
-                # Draw text - support partial coloring for dollar amounts
-                font = ('Arial', 9, 'bold') if is_total else ('Arial', 9)
-                value_str = str(value)
-                
-                # Check if we need partial coloring (when text_color is specified and value contains $)
-                if col_name in cell_text_colors and '$' in value_str:
-                    # Parse out the dollar amount and render separately
-                    import re
-                    # Find dollar amount pattern ($number with optional commas)
-                    dollar_match = re.search(r'(\$\d[\d,]*\.?\d*)', value_str)
-                    if dollar_match:
-                        dollar_amount = dollar_match.group(1)
-                        dollar_start = dollar_match.start()
-                        dollar_end = dollar_match.end()
-                        
-                        # Split text into parts
-                        before_dollar = value_str[:dollar_start]
-                        after_dollar = value_str[dollar_end:]
-                        
-                        # Get text metrics for positioning
-                        test_text = self.data_canvas.create_text(0, 0, text=before_dollar, font=font, anchor='w')
-                        before_bbox = self.data_canvas.bbox(test_text)
-                        before_width = before_bbox[2] - before_bbox[0] if before_bbox else 0
-                        self.data_canvas.delete(test_text)
-                        
-                        test_text = self.data_canvas.create_text(0, 0, text=dollar_amount, font=font, anchor='w')
-                        dollar_bbox = self.data_canvas.bbox(test_text)
-                        dollar_width = dollar_bbox[2] - dollar_bbox[0] if dollar_bbox else 0
-                        self.data_canvas.delete(test_text)
-                        
-                        # Calculate starting x position (center alignment)
-                        total_width = before_width + dollar_width
-                        if after_dollar:
-                            test_text = self.data_canvas.create_text(0, 0, text=after_dollar, font=font, anchor='w')
-                            after_bbox = self.data_canvas.bbox(test_text)
-                            after_width = after_bbox[2] - after_bbox[0] if after_bbox else 0
-                            self.data_canvas.delete(test_text)
-                            total_width += after_width
-                        
-                        start_x = x + (width - total_width) // 2
-                        text_y = y + self.row_height // 2
-                        
-                        # Draw text parts
-                        if before_dollar:
-                            self.data_canvas.create_text(start_x, text_y, text=before_dollar, font=font, anchor='w', fill=data_fg)
-                            start_x += before_width
-                        
-                        self.data_canvas.create_text(start_x, text_y, text=dollar_amount, font=font, anchor='w', fill=text_color)
-                        start_x += dollar_width
-                        
-                        if after_dollar:
-                            self.data_canvas.create_text(start_x, text_y, text=after_dollar, font=font, anchor='w', fill=data_fg)
-                    else:
-                        # No dollar match, render normally
-                        # Left-align first column (typically names/categories), center others
-                        if col_name == 'body_part' or col_name == 'study_type' or col_name == 'procedure' or col_name == 'metric' or col_name == 'modality' or col_name == 'patient_class' or col_name == 'category':
-                            anchor = 'w'
-                            text_x = x + 4
-                        else:
-                            anchor = 'center'
-                            text_x = x + width//2
-                        self.data_canvas.create_text(text_x, y + self.row_height//2,
-                                                   text=value_str, font=font, anchor=anchor, fill=text_color)
-                else:
-                    # Normal rendering - entire text in one color
-                    # Left-align first column (typically names/categories), center others
-                    if col_name == 'body_part' or col_name == 'study_type' or col_name == 'procedure' or col_name == 'metric' or col_name == 'modality' or col_name == 'patient_class' or col_name == 'category':
-                        anchor = 'w'
-                        text_x = x + 4  # Small left padding
-                    else:
-                        anchor = 'center'
-                        text_x = x + width//2
-                    self.data_canvas.create_text(text_x, y + self.row_height//2,
-                                               text=value_str, font=font, anchor=anchor, fill=text_color)
-                x += width
+            for slot, row_index in zip(self._slots, range(first, last)):
+                self._fill_slot(slot, rows[row_index], self.header_height + row_index * self.row_height, colors)
+            for slot in self._slots[last - first:]:
+                for rect_id, text_id in slot:
+                    self.data_canvas.itemconfigure(rect_id, state='hidden')
+                    self.data_canvas.itemconfigure(text_id, state='hidden')
+        except tk.TclError:
+            pass  # widget destroyed while a render was pending
+    
+    def _fill_slot(self, slot, row, y, colors):
+        """Move a row slot to y and show row in it."""
+        canvas = self.data_canvas
+        cells = row['cells']
+        is_total = row.get('is_total', False)
+        cell_colors = row.get('cell_colors', {})  # Optional per-cell background colors
+        cell_text_colors = row.get('cell_text_colors', {})  # Optional per-cell text colors
+        font = ('Arial', 9, 'bold') if is_total else ('Arial', 9)
+        
+        for (rect_id, text_id), col_info, x in zip(slot, self.columns, self._column_x):
+            col_name = col_info['name']
+            width = col_info['width']
+            value_str = str(cells.get(col_name, ""))
+            
+            # Get cell color (for color coding) - use theme colors if not specified
+            if col_name not in cell_colors:
+                cell_color = colors['total_bg'] if is_total else colors['data_bg']
+            else:
+                cell_color = cell_colors.get(col_name)
             
-            y += self.row_height
+            # Get text color - use cell_text_colors if specified, otherwise use theme default
+            text_color = cell_text_colors.get(col_name, colors['data_fg'])
+            
+            canvas.coords(rect_id, x, y, x + width, y + self.row_height)
+            canvas.itemconfigure(rect_id, fill=cell_color, outline=colors['border_color'], state='normal')
+            
+            # Partial coloring for dollar amounts when a text color is specified
+            if col_name in cell_text_colors and '$' in value_str:
+                if self._draw_dollar_text(x, y, width, value_str, font, text_color, colors['data_fg']):
+                    canvas.itemconfigure(text_id, state='hidden')
+                    continue
+            
+            # Normal rendering - entire text in one color
+            # Left-align first column (typically names/categories), center others
+            if col_name in LEFT_ALIGNED_COLUMNS:
+                anchor = 'w'
+                text_x = x + 4  # Small left padding
+            else:
+                anchor = 'center'
+                text_x = x + width//2
+            canvas.coords(text_id, text_x, y + self.row_height//2)
+            canvas.itemconfigure(text_id, text=value_str, font=font, anchor=anchor, fill=text_color, state='normal')
+    
+    def _draw_dollar_text(self, x, y, width, value_str, font, text_color, data_fg):
+        """Draw a cell's text with only its dollar amount in text_color.
         
-        # Set canvas height to accommodate all rows
-        self.data_canvas.config(height=y)
+        Returns False (nothing drawn) if the text has no dollar amount.
+        """
+        # Find dollar amount pattern ($number with optional commas)
+        dollar_match = re.search(r'(\$\d[\d,]*\.?\d*)', value_str)
+        if not dollar_match:
+            return False
+        canvas = self.data_canvas
+        dollar_amount = dollar_match.group(1)
+        
+        # Split text into parts
+        before_dollar = value_str[:dollar_match.start()]
+        after_dollar = value_str[dollar_match.end():]
+        
+        def text_width(text):
+            test_text = canvas.create_text(0, 0, text=text, font=font, anchor='w')
+            bbox = canvas.bbox(test_text)
+            canvas.delete(test_text)
+            return bbox[2] - bbox[0] if bbox else 0
+        
+        # Get text metrics for positioning (center alignment)
+        before_width = text_width(before_dollar) if before_dollar else 0
+        dollar_width = text_width(dollar_amount)
+        total_width = before_width + dollar_width
+        if after_dollar:
+            total_width += text_width(after_dollar)
+        
+        start_x = x + (width - total_width) // 2
+        text_y = y + self.row_height // 2
+        
+        # Draw text parts
+        if before_dollar:
+            canvas.create_text(start_x, text_y, text=before_dollar, font=font, anchor='w', fill=data_fg,
+                               tags=("row", "rich_text"))
+            start_x += before_width
+        canvas.create_text(start_x, text_y, text=dollar_amount, font=font, anchor='w', fill=text_color,
+                           tags=("row", "rich_text"))
+        start_x += dollar_width
+        if after_dollar:
+            canvas.create_text(start_x, text_y, text=after_dollar, font=font, anchor='w', fill=data_fg,
+                               tags=("row", "rich_text"))
+        return True
     
     def add_row(self, cells, is_total=False, cell_colors=None, cell_text_colors=None):
         """Add a row of data (doesn't redraw - call update_data() or _draw_data() when done adding all rows)."""
@@ -382,6 +459,8 @@ class CanvasTable:
             'cell_colors': cell_colors or {},
             'cell_text_colors': cell_text_colors or {}
         })
+        self._sort_keys.clear()
+        self._ordered_rows = None
     
     def update_data(self):
         """Update the display after adding rows - this triggers a single redraw."""
@@ -392,8 +471,12 @@ class CanvasTable:
         self.rows_data = []
         self.sort_column = None
         self.sort_reverse = False
-        # Clear only data canvas, keep headers
-        self.data_canvas.delete("all")
+        self._sort_keys.clear()
+        self._ordered_rows = None
+        # Clear only the rows, keep headers
+        self.data_canvas.delete("row")
+        self._slots = []
+        self._set_scroll_height(0)
         # Redraw headers to ensure they're visible
         self._draw_headers()
     
@@ -408,34 +491,10 @@ class CanvasTable:
         # Update canvas backgrounds
         canvas_bg = self.theme_colors.get("canvas_bg", "#f0f0f0")
         header_bg = self.theme_colors.get("button_bg", "#e1e1e1")
-        data_bg = self.theme_colors.get("entry_bg", "white")
-        border_color = self.theme_colors.get("border_color", "#acacac")
-        
-        self.canvas.config(bg=canvas_bg, highlightbackground=border_color)
-        self.header_canvas.config(bg=header_bg)
-        self.data_canvas.config(bg=data_bg)
-        
-        # Redraw with new colors
-        self._draw_headers()
-        self._draw_data()
-    
-    def update_theme(self):
-        """Update theme colors and redraw."""
-        # Get fresh theme colors
-        if self.app and hasattr(self.app, 'theme_colors'):
-            self.theme_colors = self.app.theme_colors
-        else:
-            self.theme_colors = self._get_theme_colors(self.parent)
-        
-        # Update canvas backgrounds
-        canvas_bg = self.theme_colors.get("canvas_bg", "#f0f0f0")
-        header_bg = self.theme_colors.get("button_bg", "#e1e1e1")
-        data_bg = self.theme_colors.get("entry_bg", "white")
         border_color = self.theme_colors.get("border_color", "#acacac")
         
         self.canvas.config(bg=canvas_bg, highlightbackground=border_color)
         self.header_canvas.config(bg=header_bg)
-        self.data_canvas.config(bg=data_bg)
         
         # Redraw with new colors
         self._draw_headers()
@@ -450,6 +509,4 @@ class CanvasTable:
         self.frame.pack_forget()
 
 
-
-
-__all__ = ['CanvasTable']
+__all__ = ['CanvasTable', 'sort_key']
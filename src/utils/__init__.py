@@ -5,6 +5,9 @@ from .window_extraction import (
     find_elements_by_automation_id,
     get_cached_desktop
 )
+from .uia_executor import UIAExecutor, UIATimeout, UIACircuitOpen, get_uia_executor, get_uia_stats
+from .window_registry import WindowRegistry, get_window_registry
+from .source_polling import AdaptivePollInterval, PollSnapshot, SourcePoller, merge_snapshots
 from .powerscribe_extraction import find_powerscribe_window
 from .mosaic_extraction import (
     find_mosaic_window,
@@ -12,6 +15,8 @@ from .mosaic_extraction import (
     extract_mosaic_data_v2,
     extract_mosaic_data,
     get_mosaic_elements_via_descendants,
+    invalidate_mosaic_locator,
+    get_mosaic_locator_stats,
     _is_mosaic_accession_like
 )
 from .clario_extraction import (
@@ -19,12 +24,27 @@ from .clario_extraction import (
     find_clario_content_area,
     extract_clario_patient_class
 )
+from .clario_resolver import ClarioResolver
 
 __all__ = [
     # Window extraction
     '_window_text_with_timeout',
     'find_elements_by_automation_id',
     'get_cached_desktop',
+    # UIA executor
+    'UIAExecutor',
+    'UIATimeout',
+    'UIACircuitOpen',
+    'get_uia_executor',
+    'get_uia_stats',
+    # Window registry
+    'WindowRegistry',
+    'get_window_registry',
+    # Source polling
+    'AdaptivePollInterval',
+    'PollSnapshot',
+    'SourcePoller',
+    'merge_snapshots',
     # PowerScribe
     'find_powerscribe_window',
     # Mosaic
@@ -33,9 +53,12 @@ __all__ = [
     'extract_mosaic_data_v2',
     'extract_mosaic_data',
     'get_mosaic_elements_via_descendants',
+    'invalidate_mosaic_locator',
+    'get_mosaic_locator_stats',
     '_is_mosaic_accession_like',
     # Clario
     'find_clario_chrome_window',
     'find_clario_content_area',
     'extract_clario_patient_class',
+    'ClarioResolver',
 ]
@@ -3,12 +3,8 @@
 import logging
 from typing import Optional, Any, Dict, List
 
-try:
-    from pywinauto import Desktop
-except ImportError:
-    Desktop = None
-
 from .window_extraction import _window_text_with_timeout
+from .window_registry import get_window_registry, CLARIO
 
 logger = logging.getLogger(__name__)
 
@@ -22,58 +18,20 @@ _clario_cache = {
 def find_clario_chrome_window(use_cache=True) -> Optional[Any]:
     """Find Chrome window with 'Clario - Worklist' tab.
     
-    Uses cache if available and valid, only searches if cache is invalid or missing.
+    Comes from the shared window registry (one desktop enumeration for all
+    sources); use_cache=False forces a fresh search.
     """
     global _clario_cache
     
-    # Check cache first
-    if use_cache and _clario_cache['chrome_window']:
-        try:
-            _ = _window_text_with_timeout(_clario_cache['chrome_window'], timeout=1.0, element_name="Clario cache validation")
-            return _clario_cache['chrome_window']
-        except Exception as e:
-            logger.debug(f"Clario cache validation failed, clearing cache: {e}")
-            _clario_cache['chrome_window'] = None
-            _clario_cache['content_area'] = None
-    
-    # Search for window
-    if Desktop is None:
-        return None
-    
-    desktop = Desktop(backend="uia")
-    
-    try:
-        all_windows = desktop.windows(visible_only=True)
-        for window in all_windows:
-            try:
-                window_text = _window_text_with_timeout(window, timeout=1.0, element_name="Clario window check").lower()
-                # Exclude test/viewer windows and RVU Counter
-                if ("rvu counter" in window_text or 
-                    "test" in window_text or 
-                    "viewer" in window_text or 
-                    "ui elements" in window_text or
-                    "diagnostic" in window_text):
-                    continue
-                
-                # Look for Chrome window with "clario" and "worklist" in title
-                if "clario" in window_text and "worklist" in window_text:
-                    try:
-                        class_name = window.element_info.class_name.lower()
-                        if "chrome" in class_name:
-                            _clario_cache['chrome_window'] = window
-                            return window
-                    except Exception as e:
-                        # If we can't check class name, still return it if title matches
-                        logger.debug(f"Couldn't check Clario class name: {e}")
-                        _clario_cache['chrome_window'] = window
-                        return window
-            except Exception as e:
-                logger.debug(f"Error checking window for Clario: {e}")
-                continue
-    except Exception as e:
-        logger.debug(f"Error iterating windows for Clario: {e}")
-    
-    return None
+    registry = get_window_registry()
+    if not use_cache:
+        registry.invalidate(CLARIO)
+    window = registry.get(CLARIO)
+    if window is not _clario_cache['chrome_window']:
+        # Different (or no) window - the content area belongs to the old one
+        _clario_cache['chrome_window'] = window
+        _clario_cache['content_area'] = None
+    return window
 
 
 def find_clario_content_area(chrome_window, use_cache=True) -> Optional[Any]:
@@ -215,6 +173,157 @@ def _combine_priority_and_class_clario(data: Dict) -> None:
     data['patient_class'] = ' '.join(combined_parts).strip()
 
 
+def _extract_clario_fields(element_data: List[Dict]) -> Dict:
+    """Extract priority, class, and accession from element data (in tree order)."""
+    data = {'priority': '', 'class': '', 'accession': '', 'patient_class': ''}
+
+    # Log all automation_ids that contain "class" to debug
+    class_automation_ids = [e.get('automation_id', '') for e in element_data if 'class' in e.get('automation_id', '').lower()]
+    if class_automation_ids:
+        logger.debug(f"Clario: Found {len(class_automation_ids)} elements with 'class' in automation_id: {class_automation_ids[:5]}")
+
+    for i, elem in enumerate(element_data):
+        if data['priority'] and data['class'] and data['accession']:
+            break
+
+        name = elem['name']
+        text = elem['text']
+        automation_id = elem['automation_id']
+
+        # Log when we find a Class automation_id
+        if automation_id and 'class' in automation_id.lower() and 'priority' not in automation_id.lower():
+            logger.debug(f"Clario: Found Class automation_id='{automation_id}' at index {i}, name='{name}', text='{text}'")
+
+        # PRIORITY
+        if not data['priority']:
+            if automation_id and 'priority' in automation_id.lower():
+                for j in range(i+1, min(i+10, len(element_data))):
+                    next_elem = element_data[j]
+                    next_name = next_elem['name']
+                    next_text = next_elem['text']
+                    if next_name and ':' not in next_name and next_name.lower() not in ['priority', 'class', 'accession']:
+                        data['priority'] = next_name
+                        break
+                    elif next_text and ':' not in next_text and next_text.lower() not in ['priority', 'class', 'accession']:
+                        data['priority'] = next_text
+                        break
+            elif name and 'priority' in name.lower() and ':' in name:
+                for j in range(i+1, min(i+10, len(element_data))):
+                    next_elem = element_data[j]
+                    next_name = next_elem['name']
+                    if next_name and ':' not in next_name and next_name.lower() not in ['priority', 'class', 'accession']:
+                        data['priority'] = next_name
+                        break
+
+        # CLASS - EXACT COPY from testClario.py
+        if not data['class']:
+            if automation_id and 'class' in automation_id.lower() and 'priority' not in automation_id.lower():
+                for j in range(i+1, min(i+10, len(element_data))):
+                    next_elem = element_data[j]
+                    next_name = next_elem['name']
+                    next_text = next_elem['text']
+                    if next_name and ':' not in next_name and next_name.lower() not in ['priority', 'class', 'accession']:
+                        data['class'] = next_name
+                        break
+                    elif next_text and ':' not in next_text and next_text.lower() not in ['priority', 'class', 'accession']:
+                        data['class'] = next_text
+                        break
+            elif name and 'class' in name.lower() and ':' in name and 'priority' not in name.lower():
+                for j in range(i+1, min(i+10, len(element_data))):
+                    next_elem = element_data[j]
+                    next_name = next_elem['name']
+                    if next_name and ':' not in next_name and next_name.lower() not in ['priority', 'class', 'accession']:
+                        data['class'] = next_name
+                        break
+
+        # ACCESSION
+        if not data['accession']:
+            if automation_id and 'accession' in automation_id.lower():
+                for j in range(i+1, min(i+10, len(element_data))):
+                    next_elem = element_data[j]
+                    next_name = next_elem['name']
+                    next_text = next_elem['text']
+                    if next_name and ':' not in next_name and len(next_name) > 5 and ' ' not in next_name:
+                        data['accession'] = next_name
+                        break
+                    elif next_text and ':' not in next_text and len(next_text) > 5 and ' ' not in next_text:
+                        data['accession'] = next_text
+                        break
+            elif name and 'accession' in name.lower() and ':' in name:
+                for j in range(i+1, min(i+10, len(element_data))):
+                    next_elem = element_data[j]
+                    next_name = next_elem['name']
+                    if next_name and ':' not in next_name and len(next_name) > 5 and ' ' not in next_name:
+                        data['accession'] = next_name
+                        break
+
+    return data
+
+
+# Depths at which the walked tree is searched for Priority/Class/Accession; the
+# walk stops at the first one where all three are found
+CLARIO_SEARCH_DEPTHS = (12, 18, 25)
+
+
+def _read_clario_element(element, depth: int) -> Optional[Dict]:
+    """Name/text/automation ID of one element, or None if it has none of them."""
+    try:
+        automation_id = element.element_info.automation_id or ""
+    except:
+        automation_id = ""
+    try:
+        name = element.element_info.name or ""
+    except:
+        name = ""
+    try:
+        # Clario extraction runs in a separate thread, so allow a longer read than the poll loop does
+        text = _window_text_with_timeout(element, timeout=2.0, element_name="clario element",
+                                         source=CLARIO) or ""
+    except:
+        text = ""
+    entry = {
+        'name': name.strip(),
+        'text': text[:100].strip() if text else "",  # Limit text length like testClario
+        'automation_id': automation_id.strip(),
+        'depth': depth,
+    }
+    if not (entry['name'] or entry['text'] or entry['automation_id']):
+        return None
+    return entry
+
+
+def _walk_clario_tree(root, depths=CLARIO_SEARCH_DEPTHS):
+    """Walk the tree under root breadth-first, one level at a time.
+    
+    After the last level of each depth in depths (or when the tree ends) yields
+    (depth, elements): every element down to that depth, in depth-first
+    document order, which is what the label/value lookups expect. Each element
+    is read once however many depths are searched, and the caller stops the
+    walk by not asking for more.
+    """
+    max_depth = depths[-1]
+    collected = []  # (child index path, element data)
+    level = [((), root)]
+    depth = 0
+    while level:
+        next_level = []
+        for path, element in level:
+            entry = _read_clario_element(element, depth)
+            if entry is not None:
+                collected.append((path, entry))
+            if depth < max_depth:
+                try:
+                    for i, child in enumerate(element.children()):
+                        next_level.append((path + (i,), child))
+                except:
+                    pass
+        if depth in depths or not next_level:
+            collected.sort(key=lambda item: item[0])
+            yield depth, [entry for _, entry in collected]
+        level = next_level
+        depth += 1
+
+
 def extract_clario_patient_class(target_accession=None) -> Optional[Dict]:
     """Extract patient class from Clario - Worklist.
     
@@ -237,159 +346,14 @@ def extract_clario_patient_class(target_accession=None) -> Optional[Dict]:
             logger.info("Clario: Content area not found")
             return None
         
-        # Staggered depth search: try 12, then 18, then 25, stopping if data is found
-        # Use a helper function to get elements (similar to get_mosaic_elements)
-        def get_all_elements_clario(element, depth=0, max_depth=15):
-            """Recursively get all UI elements from a window. EXACT COPY from testClario.py."""
-            elements = []
-            if depth > max_depth:
-                return elements
-            try:
-                # Get element info - EXACT COPY from testClario.py
-                try:
-                    automation_id = element.element_info.automation_id or ""
-                except:
-                    automation_id = ""
-                try:
-                    name = element.element_info.name or ""
-                except:
-                    name = ""
-                try:
-                    # Use direct window_text() like testClario.py - Clario extraction runs in separate thread
-                    text = element.window_text() or ""
-                except:
-                    text = ""
-                
-                # Only include elements with some meaningful content
-                if automation_id or name or text:
-                    elements.append({
-                        'depth': depth,
-                        'automation_id': automation_id,
-                        'name': name,
-                        'text': text[:100] if text else "",  # Limit text length like testClario
-                    })
-                
-                # Recursively get children - EXACT COPY from testClario.py
-                try:
-                    children = element.children()
-                    for child in children:
-                        elements.extend(get_all_elements_clario(child, depth + 1, max_depth))
-                except:
-                    pass
-            except:
-                pass
-            return elements
-        
-        def extract_data_from_elements(element_data):
-            """Extract priority, class, and accession from element data."""
-            data = {'priority': '', 'class': '', 'accession': '', 'patient_class': ''}
-            
-            # Log all automation_ids that contain "class" to debug
-            class_automation_ids = [e.get('automation_id', '') for e in element_data if 'class' in e.get('automation_id', '').lower()]
-            if class_automation_ids:
-                logger.debug(f"Clario: Found {len(class_automation_ids)} elements with 'class' in automation_id: {class_automation_ids[:5]}")
-            
-            for i, elem in enumerate(element_data):
-                if data['priority'] and data['class'] and data['accession']:
-                    break
-                    
-                name = elem['name']
-                text = elem['text']
-                automation_id = elem['automation_id']
-                
-                # Log when we find a Class automation_id
-                if automation_id and 'class' in automation_id.lower() and 'priority' not in automation_id.lower():
-                    logger.debug(f"Clario: Found Class automation_id='{automation_id}' at index {i}, name='{name}', text='{text}'")
-                
-                # PRIORITY
-                if not data['priority']:
-                    if automation_id and 'priority' in automation_id.lower():
-                        for j in range(i+1, min(i+10, len(element_data))):
-                            next_elem = element_data[j]
-                            next_name = next_elem['name']
-                            next_text = next_elem['text']
-                            if next_name and ':' not in next_name and next_name.lower() not in ['priority', 'class', 'accession']:
-                                data['priority'] = next_name
-                                break
-                            elif next_text and ':' not in next_text and next_text.lower() not in ['priority', 'class', 'accession']:
-                                data['priority'] = next_text
-                                break
-                    elif name and 'priority' in name.lower() and ':' in name:
-                        for j in range(i+1, min(i+10, len(element_data))):
-                            next_elem = element_data[j]
-                            next_name = next_elem['name']
-                            if next_name and ':' not in next_name and next_name.lower() not in ['priority', 'class', 'accession']:
-                                data['priority'] = next_name
-                                break
-                
-                # CLASS - EXACT COPY from testClario.py
-                if not data['class']:
-                    if automation_id and 'class' in automation_id.lower() and 'priority' not in automation_id.lower():
-                        for j in range(i+1, min(i+10, len(element_data))):
-                            next_elem = element_data[j]
-                            next_name = next_elem['name']
-                            next_text = next_elem['text']
-                            if next_name and ':' not in next_name and next_name.lower() not in ['priority', 'class', 'accession']:
-                                data['class'] = next_name
-                                break
-                            elif next_text and ':' not in next_text and next_text.lower() not in ['priority', 'class', 'accession']:
-                                data['class'] = next_text
-                                break
-                    elif name and 'class' in name.lower() and ':' in name and 'priority' not in name.lower():
-                        for j in range(i+1, min(i+10, len(element_data))):
-                            next_elem = element_data[j]
-                            next_name = next_elem['name']
-                            if next_name and ':' not in next_name and next_name.lower() not in ['priority', 'class', 'accession']:
-                                data['class'] = next_name
-                                break
-                
-                # ACCESSION
-                if not data['accession']:
-                    if automation_id and 'accession' in automation_id.lower():
-                        for j in range(i+1, min(i+10, len(element_data))):
-                            next_elem = element_data[j]
-                            next_name = next_elem['name']
-                            next_text = next_elem['text']
-                            if next_name and ':' not in next_name and len(next_name) > 5 and ' ' not in next_name:
-                                data['accession'] = next_name
-                                break
-                            elif next_text and ':' not in next_text and len(next_text) > 5 and ' ' not in next_text:
-                                data['accession'] = next_text
-                                break
-                    elif name and 'accession' in name.lower() and ':' in name:
-                        for j in range(i+1, min(i+10, len(element_data))):
-                            next_elem = element_data[j]
-                            next_name = next_elem['name']
-                            if next_name and ':' not in next_name and len(next_name) > 5 and ' ' not in next_name:
-                                data['accession'] = next_name
-                                break
-            
-            return data
-        
-        # Staggered depth search: try 12, then 18, then 25, stopping if all three are found
+        # Depth-limited search: stop at the first of depths 12, 18, 25 where all three are found
         data = {'priority': '', 'class': '', 'accession': '', 'patient_class': ''}
-        search_depths = [12, 18, 25]
         
-        for max_depth in search_depths:
-            logger.debug(f"Clario: Searching at depth {max_depth}")
-            all_elements = get_all_elements_clario(content_area, max_depth=max_depth)
-            
-            # Convert to list - EXACT COPY from testClario.py
-            element_data = []
-            for elem in all_elements:
-                name = elem.get('name', '').strip()
-                text = elem.get('text', '').strip()
-                automation_id = elem.get('automation_id', '').strip()
-                if name or text or automation_id:
-                    element_data.append({
-                        'name': name,
-                        'text': text,
-                        'automation_id': automation_id,
-                        'depth': elem.get('depth', 0)
-                    })
+        for max_depth, element_data in _walk_clario_tree(content_area):
+            logger.debug(f"Clario: Searching at depth {max_depth} ({len(element_data)} elements)")
             
             # Extract data from elements at this depth
-            extracted_data = extract_data_from_elements(element_data)
+            extracted_data = _extract_clario_fields(element_data)
             
             # Update data with any newly found values
             if not data['priority'] and extracted_data['priority']:
@@ -441,14 +405,3 @@ def extract_clario_patient_class(target_accession=None) -> Optional[Dict]:
     except Exception as e:
         logger.info(f"Clario extraction error: {e}", exc_info=True)
         return None
-
-
-
-
-
-
-
-
-
-
-
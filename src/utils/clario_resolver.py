@@ -0,0 +1,166 @@
+"""Background Clario patient class lookups with a persistent accession -> class cache."""
+
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Optional, Tuple
+
+from ..core.lru_cache import LRUCache
+from .clario_extraction import extract_clario_patient_class
+
+logger = logging.getLogger(__name__)
+
+# Accessions whose cache lookup result (class, or known to be absent) is kept in memory
+PATIENT_CLASS_MEMORY_ENTRIES = 2000
+
+# (all accessions of the study, the study's primary accession)
+ClarioRequest = Tuple[FrozenSet[str], str]
+
+_ABSENT = object()  # Checked the store, no class cached
+
+
+class ClarioResolver:
+    """Request queue and cache in front of extract_clario_patient_class().
+
+    The poll merge asks cached_class() first - memory, then the persistent
+    store - so a study seen before (in this session or an earlier one) gets
+    its patient class within one poll and without walking the Clario page.
+    Otherwise it calls request(); the Clario poller thread takes requests with
+    next_request() and runs resolve() on them.
+
+    Requests are deduplicated: one already queued, being resolved or just
+    resolved is not queued again. Clario only shows the currently open study,
+    so when several are queued only the newest is resolved and the older ones
+    are dropped.
+
+    store is anything with get_patient_classes(accessions) -> {accession: class}
+    and store_patient_class(accessions, patient_class), e.g. RecordsDatabase;
+    without one the cache lasts for the session.
+    """
+
+    def __init__(self, store: Any = None, lookup: Callable[..., Optional[Dict]] = None):
+        self._store = store
+        self._lookup = lookup or extract_clario_patient_class
+        self._lock = threading.Lock()
+        self._memory = LRUCache(PATIENT_CLASS_MEMORY_ENTRIES)  # accession -> class or _ABSENT
+        self._queue: "OrderedDict[ClarioRequest, None]" = OrderedDict()
+        self._in_flight: Optional[ClarioRequest] = None
+        self._resolved: Optional[ClarioRequest] = None
+        self.hits = 0
+        self.misses = 0
+        self.lookups = 0
+        self.superseded = 0
+
+    # =========================================================================
+    # Cache
+    # =========================================================================
+
+    def cached_class(self, accessions: Iterable[str]) -> Optional[str]:
+        """Cached patient class of any of a study's accessions, or None."""
+        accessions = [acc for acc in accessions if acc]
+        unknown = []
+        for acc in accessions:
+            value = self._memory.get(acc)
+            if value is None:
+                unknown.append(acc)
+            elif value is not _ABSENT:
+                with self._lock:
+                    self.hits += 1
+                return value
+        if unknown and self._store is not None:
+            try:
+                stored = self._store.get_patient_classes(unknown)
+            except Exception as e:
+                logger.debug(f"Error reading patient class cache: {e}")
+                return None
+            for acc in unknown:
+                self._memory.put(acc, stored.get(acc, _ABSENT))
+            for acc in unknown:
+                if acc in stored:
+                    with self._lock:
+                        self.hits += 1
+                    return stored[acc]
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def store(self, accessions: Iterable[str], patient_class: str):
+        """Cache patient_class for all of a study's accessions."""
+        accessions = [acc for acc in accessions if acc]
+        for acc in accessions:
+            self._memory.put(acc, patient_class)
+        if self._store is not None:
+            try:
+                self._store.store_patient_class(accessions, patient_class)
+            except Exception as e:
+                logger.debug(f"Error storing patient class: {e}")
+
+    # =========================================================================
+    # Requests
+    # =========================================================================
+
+    def request(self, accessions: Iterable[str], accession: str) -> bool:
+        """Queue a lookup of a study. Returns False if it is already queued, in flight or resolved."""
+        request = (frozenset(acc for acc in accessions if acc), accession)
+        with self._lock:
+            if request in self._queue or request == self._in_flight or request == self._resolved:
+                return False
+            self._queue[request] = None
+        return True
+
+    def forget_resolved(self):
+        """Allow the last resolved study to be requested again (it was closed; it may reopen)."""
+        with self._lock:
+            self._resolved = None
+
+    def next_request(self) -> Optional[ClarioRequest]:
+        """Take the newest queued request (dropping older ones), or None if there is none."""
+        with self._lock:
+            if not self._queue:
+                return None
+            request, _ = self._queue.popitem(last=True)
+            if self._queue:
+                self.superseded += len(self._queue)
+                self._queue.clear()
+            self._in_flight = request
+            return request
+
+    def resolve(self, request: ClarioRequest) -> Optional[Dict]:
+        """Read the Clario page for a request; a class matching one of its accessions is cached.
+
+        Returns:
+            extract_clario_patient_class()'s result (None if nothing was found)
+        """
+        all_accessions, accession = request
+        try:
+            self.lookups += 1
+            if len(all_accessions) > 1:
+                # Multi-accession: query without target, then check if result matches any
+                result = self._lookup(target_accession=None)
+            else:
+                # Single accession: query with target
+                result = self._lookup(target_accession=accession)
+            if result and result.get('patient_class'):
+                clario_accession = (result.get('accession') or '').strip()
+                if clario_accession and clario_accession in all_accessions:
+                    self.store(all_accessions, result['patient_class'])
+            return result
+        finally:
+            with self._lock:
+                if self._in_flight == request:
+                    self._in_flight = None
+                self._resolved = request
+
+    def stats(self) -> dict:
+        """Cache hit/miss and lookup counters."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "lookups": self.lookups,
+                "superseded": self.superseded,
+                "queued": len(self._queue),
+            }
+
+
+__all__ = ['ClarioResolver', 'PATIENT_CLASS_MEMORY_ENTRIES']
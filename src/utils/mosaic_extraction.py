@@ -2,54 +2,18 @@
 
 import logging
 import re
+import time
 from typing import Optional, Any, Dict, List
 
-from .window_extraction import get_cached_desktop, _window_text_with_timeout
+from .window_extraction import _window_text_with_timeout
+from .window_registry import get_window_registry, MOSAIC
 
 logger = logging.getLogger(__name__)
 
 
 def find_mosaic_window() -> Optional[Any]:
     """Find Mosaic Info Hub window - it's a WinForms app with WebView2."""
-    desktop = get_cached_desktop()
-    
-    if desktop is None:
-        return None
-    
-    try:
-        all_windows = desktop.windows(visible_only=True)
-        for window in all_windows:
-            try:
-                window_text = _window_text_with_timeout(window, timeout=1.0, element_name="Mosaic window check").lower()
-                # Exclude test/viewer windows and RVU Counter
-                if ("rvu counter" in window_text or 
-                    "test" in window_text or 
-                    "viewer" in window_text or 
-                    "ui elements" in window_text or
-                    "diagnostic" in window_text):
-                    continue
-                
-                # Look for Mosaic Info Hub window - handle variations:
-                # "MosaicInfoHub", "Mosaic Info Hub", "Mosaic InfoHub", "Mosaic Reporting"
-                is_mosaic = ("mosaicinfohub" in window_text or 
-                            ("mosaic" in window_text and "info" in window_text and "hub" in window_text) or
-                            ("mosaic" in window_text and "reporting" in window_text))
-                if is_mosaic:
-                    # Verify it has the MainForm automation ID
-                    try:
-                        automation_id = window.element_info.automation_id
-                        if automation_id == "MainForm":
-                            return window
-                    except Exception as e:
-                        logger.debug(f"Error checking Mosaic automation ID: {e}")
-                        # If we can't check automation ID, still return it if it matches
-                        return window
-            except:
-                continue
-    except:
-        pass
-    
-    return None
+    return get_window_registry().get(MOSAIC)
 
 
 def find_mosaic_webview_element(main_window) -> Optional[Any]:
@@ -128,7 +92,8 @@ def get_mosaic_elements(webview_element, depth=0, max_depth=20) -> List[Dict]:
             name = ""
         
         try:
-            text = _window_text_with_timeout(webview_element, timeout=0.5, element_name="mosaic element") or ""
+            text = _window_text_with_timeout(webview_element, timeout=0.5, element_name="mosaic element",
+                                             source=MOSAIC) or ""
         except:
             text = ""
         
@@ -167,7 +132,7 @@ def get_mosaic_elements(webview_element, depth=0, max_depth=20) -> List[Dict]:
     return elements
 
 
-def get_mosaic_elements_via_descendants(main_window, max_elements=5000) -> List[Dict]:
+def get_mosaic_elements_via_descendants(main_window, max_elements=5000, keep_elements=False) -> List[Dict]:
     """Get all Mosaic elements using descendants() - more reliable than WebView2 recursion.
     
     This is the NEW primary method for Mosaic element extraction.
@@ -176,6 +141,7 @@ def get_mosaic_elements_via_descendants(main_window, max_elements=5000) -> List[
     Args:
         main_window: The Mosaic main window (pywinauto element)
         max_elements: Maximum elements to retrieve (default 5000)
+        keep_elements: Also return the pywinauto element itself (as 'element')
     
     Returns:
         List of element dicts with: name, text, automation_id, control_type
@@ -201,18 +167,22 @@ def get_mosaic_elements_via_descendants(main_window, max_elements=5000) -> List[
                 name = ""
             
             try:
-                text = _window_text_with_timeout(elem, timeout=0.3, element_name="mosaic_descendant") or ""
+                text = _window_text_with_timeout(elem, timeout=0.3, element_name="mosaic_descendant",
+                                                 source=MOSAIC) or ""
             except:
                 text = ""
             
             # Only include elements with meaningful content
             if automation_id or name or text:
-                elements.append({
+                entry = {
                     'automation_id': automation_id,
                     'control_type': control_type,
                     'name': name,
                     'text': text[:200] if text else "",  # Limit text length
-                })
+                }
+                if keep_elements:
+                    entry['element'] = elem
+                elements.append(entry)
             
             count += 1
             if count >= max_elements:
@@ -304,6 +274,163 @@ def _is_mosaic_accession_like(s: str) -> bool:
     return False
 
 
+def _extract_accessions_from_text(text_str: str) -> List[Dict]:
+    """Extract accession(s) from a text string (Mosaic label values)."""
+    if not text_str:
+        return []
+    results = []
+    
+    # Pattern 1: "ACC1 (PROC1), ACC2 (PROC2)" format (multi-accession)
+    if ',' in text_str and '(' in text_str:
+        parts = text_str.split(',')
+        for part in parts:
+            part = part.strip()
+            if '(' in part and ')' in part:
+                acc_match = re.match(r'^([^(]+)\s*\(([^)]+)\)', part)
+                if acc_match:
+                    acc = acc_match.group(1).strip()
+                    proc = acc_match.group(2).strip()
+                    if _is_mosaic_accession_like(acc):
+                        results.append({'accession': acc, 'procedure': proc})
+            elif _is_mosaic_accession_like(part):
+                results.append({'accession': part, 'procedure': ''})
+    
+    # Pattern 2: Single accession with procedure "ACC (PROC)"
+    elif '(' in text_str and ')' in text_str:
+        acc_match = re.match(r'^([^(]+)\s*\(([^)]+)\)', text_str)
+        if acc_match:
+            acc = acc_match.group(1).strip()
+            proc = acc_match.group(2).strip()
+            if _is_mosaic_accession_like(acc):
+                results.append({'accession': acc, 'procedure': proc})
+    
+    # Pattern 3: Just an accession-like string
+    elif _is_mosaic_accession_like(text_str):
+        results.append({'accession': text_str, 'procedure': ''})
+    
+    return results
+
+
+_PROCEDURE_KEYWORDS = ['CT ', 'MR ', 'XR ', 'US ', 'NM ', 'PET', 'MRI', 'ULTRASOUND']
+
+
+def _is_procedure_keyword_name(name: str) -> bool:
+    # Skip if it looks like an accession format (has comma and parentheses)
+    return bool(name) and not (',' in name and '(' in name) and \
+        any(keyword in name.upper() for keyword in _PROCEDURE_KEYWORDS)
+
+
+# =============================================================================
+# Element locator cache
+# =============================================================================
+
+# Seconds a learned locator is trusted before the next full scan re-learns it
+MOSAIC_LOCATOR_MAX_AGE = 30.0
+
+# Elements that produced the accession/procedure in the last successful full scan.
+# 'accession': (anchor element, anchor kind, value element, value field)
+# 'procedure': None (came with the accession), or (kind, label element, value element or None)
+_mosaic_locator = {
+    'window': None,
+    'accession': None,
+    'procedure': None,
+    'method': '',
+    'learned_at': 0.0,
+}
+_mosaic_locator_stats = {'hits': 0, 'misses': 0, 'full_scans': 0}
+
+
+def invalidate_mosaic_locator():
+    """Forget the learned element locations - the next extraction does a full scan."""
+    _mosaic_locator['window'] = None
+    _mosaic_locator['accession'] = None
+    _mosaic_locator['procedure'] = None
+
+
+def get_mosaic_locator_stats() -> Dict:
+    """Locator hits (polls served from the learned elements), misses and full scans."""
+    return dict(_mosaic_locator_stats)
+
+
+def _locator_name(elem) -> str:
+    return (elem.element_info.name or '').strip()
+
+
+def _locator_text(elem) -> str:
+    text = _window_text_with_timeout(elem, timeout=0.3, element_name="mosaic_locator", source=MOSAIC) or ''
+    return text[:200].strip()
+
+
+def _extract_with_locator(main_window) -> Optional[Dict]:
+    """Re-read only the learned elements. Returns None if they no longer validate."""
+    locator = _mosaic_locator
+    if locator['window'] is not main_window or locator['accession'] is None:
+        return None
+    if time.monotonic() - locator['learned_at'] > MOSAIC_LOCATOR_MAX_AGE:
+        return None
+    
+    try:
+        anchor, anchor_kind, value_elem, field = locator['accession']
+        
+        # The label must still be the one the accession was found under
+        anchor_name = _locator_name(anchor)
+        if anchor_kind == 'current_study':
+            if 'current study' not in anchor_name.lower() and \
+                    'current study' not in f"{anchor_name} {_locator_text(anchor)}".lower():
+                return None
+        else:
+            combined = f"{anchor_name} {_locator_text(anchor)}".strip()
+            if 'accession' not in combined.lower() or ':' not in combined:
+                return None
+        
+        if not value_elem.is_visible():
+            return None
+        value = _locator_name(value_elem) if field == 'name' else _locator_text(value_elem)
+        if not value or 'mrn' in value.lower() or (anchor_kind == 'current_study' and value.endswith(':')):
+            return None
+        extracted = _extract_accessions_from_text(value)
+        if not extracted:
+            return None
+        
+        data = {
+            'procedure': extracted[0]['procedure'],
+            'accession': extracted[0]['accession'],
+            'patient_class': 'Unknown',
+            'multiple_accessions': extracted,
+            'extraction_method': f"{locator['method']} (cached)",
+        }
+        if data['procedure']:
+            return data
+        
+        # Procedure was found by the Description/keyword passes
+        procedure = locator['procedure']
+        if procedure is None:
+            return None
+        kind, label_elem, next_elem = procedure
+        label_name = _locator_name(label_elem)
+        if kind == 'keyword':
+            if not _is_procedure_keyword_name(label_name):
+                return None
+            data['procedure'] = label_name
+        else:
+            if 'description:' not in label_name.lower():
+                return None
+            inline = label_name.split(':', 1)[1].strip()
+            if kind == 'description_inline':
+                if not inline:
+                    return None
+                data['procedure'] = inline
+            else:
+                next_name = _locator_name(next_elem)
+                if inline or not next_name or next_name.endswith(':'):
+                    return None
+                data['procedure'] = next_name
+        return data
+    except Exception as e:
+        logger.debug(f"Mosaic locator validation failed: {e}")
+        return None
+
+
 def extract_mosaic_data_v2(main_window) -> Dict:
     """Extract study data from Mosaic using descendants() method.
     
@@ -315,6 +442,12 @@ def extract_mosaic_data_v2(main_window) -> Dict:
     3. Third pass: Look for "Description:" label for procedure
     4. Fourth pass: Look for procedure keywords (CT, MR, XR, etc.)
     
+    A full scan reads every descendant (thousands of UIA calls). When it finds an
+    accession, the elements involved (label, value, procedure) are remembered and
+    the following polls read just those few, as long as the labels still match
+    and the value still parses; otherwise, and at least every
+    MOSAIC_LOCATOR_MAX_AGE seconds, the full scan runs again.
+    
     Args:
         main_window: The Mosaic main window (pywinauto element)
     
@@ -325,6 +458,15 @@ def extract_mosaic_data_v2(main_window) -> Dict:
     NOTE: Multi-accession extraction is currently limited in this method.
           Will be improved in future versions.
     """
+    cached = _extract_with_locator(main_window)
+    if cached is not None:
+        _mosaic_locator_stats['hits'] += 1
+        return cached
+    if _mosaic_locator['accession'] is not None:
+        _mosaic_locator_stats['misses'] += 1
+        invalidate_mosaic_locator()
+    _mosaic_locator_stats['full_scans'] += 1
+    
     data = {
         'procedure': '',
         'accession': '',
@@ -332,10 +474,12 @@ def extract_mosaic_data_v2(main_window) -> Dict:
         'multiple_accessions': [],
         'extraction_method': ''  # For debugging which method found data
     }
+    accession_source = None
+    procedure_source = None
     
     try:
         # Get all elements using descendants (the working method from testMosaic.py)
-        all_elements = get_mosaic_elements_via_descendants(main_window, max_elements=5000)
+        all_elements = get_mosaic_elements_via_descendants(main_window, max_elements=5000, keep_elements=True)
         
         # Filter to meaningful elements
         element_data = []
@@ -349,47 +493,11 @@ def extract_mosaic_data_v2(main_window) -> Dict:
                     'name': name,
                     'text': text,
                     'automation_id': auto_id,
+                    'element': elem.get('element'),
                 })
         
         logger.debug(f"Mosaic v2: Found {len(element_data)} meaningful elements")
         
-        # Helper to extract accession from text
-        def extract_accession_from_text(text_str):
-            """Extract accession(s) from a text string."""
-            if not text_str:
-                return []
-            results = []
-            
-            # Pattern 1: "ACC1 (PROC1), ACC2 (PROC2)" format (multi-accession)
-            if ',' in text_str and '(' in text_str:
-                parts = text_str.split(',')
-                for part in parts:
-                    part = part.strip()
-                    if '(' in part and ')' in part:
-                        acc_match = re.match(r'^([^(]+)\s*\(([^)]+)\)', part)
-                        if acc_match:
-                            acc = acc_match.group(1).strip()
-                            proc = acc_match.group(2).strip()
-                            if _is_mosaic_accession_like(acc):
-                                results.append({'accession': acc, 'procedure': proc})
-                    elif _is_mosaic_accession_like(part):
-                        results.append({'accession': part, 'procedure': ''})
-            
-            # Pattern 2: Single accession with procedure "ACC (PROC)"
-            elif '(' in text_str and ')' in text_str:
-                acc_match = re.match(r'^([^(]+)\s*\(([^)]+)\)', text_str)
-                if acc_match:
-                    acc = acc_match.group(1).strip()
-                    proc = acc_match.group(2).strip()
-                    if _is_mosaic_accession_like(acc):
-                        results.append({'accession': acc, 'procedure': proc})
-            
-            # Pattern 3: Just an accession-like string
-            elif _is_mosaic_accession_like(text_str):
-                results.append({'accession': text_str, 'procedure': ''})
-            
-            return results
-        
         # =====================================================================
         # FIRST PASS: Look for "Current Study" label - accession is right below
         # This is the most reliable method for single accessions
@@ -407,12 +515,13 @@ def extract_mosaic_data_v2(main_window) -> Dict:
                     
                     # Skip if it looks like a label or MRN
                     if next_name and not next_name.endswith(':') and 'mrn' not in next_name.lower():
-                        extracted = extract_accession_from_text(next_name)
+                        extracted = _extract_accessions_from_text(next_name)
                         if extracted:
                             data['multiple_accessions'].extend(extracted)
                             if not data['accession']:
                                 data['accession'] = extracted[0]['accession']
                                 data['extraction_method'] = 'Current Study label'
+                                accession_source = (elem['element'], 'current_study', next_elem['element'], 'name')
                                 if extracted[0]['procedure']:
                                     data['procedure'] = extracted[0]['procedure']
                             break
@@ -441,22 +550,24 @@ def extract_mosaic_data_v2(main_window) -> Dict:
                         
                         # Try to extract from name
                         if next_name:
-                            extracted = extract_accession_from_text(next_name)
+                            extracted = _extract_accessions_from_text(next_name)
                             if extracted:
                                 data['multiple_accessions'].extend(extracted)
                                 data['accession'] = extracted[0]['accession']
                                 data['extraction_method'] = 'Accession label'
+                                accession_source = (elem['element'], 'accession_label', next_elem['element'], 'name')
                                 if extracted[0]['procedure'] and not data['procedure']:
                                     data['procedure'] = extracted[0]['procedure']
                                 break
                         
                         # Try to extract from text
                         if next_text:
-                            extracted = extract_accession_from_text(next_text)
+                            extracted = _extract_accessions_from_text(next_text)
                             if extracted:
                                 data['multiple_accessions'].extend(extracted)
                                 data['accession'] = extracted[0]['accession']
                                 data['extraction_method'] = 'Accession label (text)'
+                                accession_source = (elem['element'], 'accession_label', next_elem['element'], 'text')
                                 if extracted[0]['procedure'] and not data['procedure']:
                                     data['procedure'] = extracted[0]['procedure']
                                 break
@@ -475,12 +586,14 @@ def extract_mosaic_data_v2(main_window) -> Dict:
                         proc_value = name.split(':', 1)[1].strip()
                         if proc_value:
                             data['procedure'] = proc_value
+                            procedure_source = ('description_inline', elem['element'], None)
                             break
                     # Or look at next element
                     for j in range(i+1, min(i+3, len(element_data))):
                         next_name = element_data[j]['name'].strip()
                         if next_name and not next_name.endswith(':'):
                             data['procedure'] = next_name
+                            procedure_source = ('description_next', elem['element'], element_data[j]['element'])
                             break
                     break
         
@@ -489,14 +602,20 @@ def extract_mosaic_data_v2(main_window) -> Dict:
         # Most permissive - used if Description label not found
         # =====================================================================
         if not data['procedure']:
-            proc_keywords = ['CT ', 'MR ', 'XR ', 'US ', 'NM ', 'PET', 'MRI', 'ULTRASOUND']
             for elem in element_data:
-                name = elem['name']
-                # Skip if it looks like an accession format (has comma and parentheses)
-                if name and not (',' in name and '(' in name):
-                    if any(keyword in name.upper() for keyword in proc_keywords):
-                        data['procedure'] = name
-                        break
+                if _is_procedure_keyword_name(elem['name']):
+                    data['procedure'] = elem['name']
+                    procedure_source = ('keyword', elem['element'], None)
+                    break
+        
+        if accession_source is not None and all(e is not None for e in accession_source[::2]):
+            _mosaic_locator.update({
+                'window': main_window,
+                'accession': accession_source,
+                'procedure': procedure_source,
+                'method': data['extraction_method'],
+                'learned_at': time.monotonic(),
+            })
         
     except Exception as e:
         logger.debug(f"extract_mosaic_data_v2 error: {e}")
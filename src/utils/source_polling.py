@@ -0,0 +1,214 @@
+"""Per-source polling workers and the merge of their snapshots."""
+
+import logging
+import threading
+import time
+from typing import Callable, Dict, Optional, Union
+
+from .window_registry import POWERSCRIBE, MOSAIC, CLARIO
+
+logger = logging.getLogger(__name__)
+
+# Seconds a single poll of a source may take before its watchdog fires
+# (caches dropped, window re-detected). Mosaic's full descendants() scan and
+# Clario's tree walk are legitimately slower than PowerScribe's label reads.
+POLL_BUDGETS = {
+    POWERSCRIBE: 5.0,
+    MOSAIC: 8.0,
+    CLARIO: 15.0,
+}
+
+# Poll interval of a source whose window isn't open (the registry rescans at most every 2s anyway)
+ABSENT_POLL_INTERVAL = 2.0
+
+
+class AdaptivePollInterval:
+    """Poll interval of one source, from how recently its accession changed.
+
+    - Accession just changed: 0.5s (0.3s if the study just closed, to confirm quickly)
+    - Study open, unchanged: 1.0s
+    - No study: 0.3s for 2s after a close, then 1.5s
+    - Window not found: ABSENT_POLL_INTERVAL
+    """
+
+    def __init__(self):
+        self.last_accession = ""
+        self.changed_at = time.time()
+        self.interval = 1.0  # Start with moderate polling
+
+    def update(self, data: dict) -> float:
+        """Record a poll result; returns the delay before the next poll."""
+        if not data.get('found'):
+            accession = ""
+        else:
+            accession = (data.get('accession') or '').strip()
+
+        if accession != self.last_accession:
+            study_just_closed = bool(self.last_accession) and not accession
+            self.last_accession = accession
+            self.changed_at = time.time()
+            self.interval = 0.3 if study_just_closed else 0.5
+        elif not data.get('found'):
+            self.interval = ABSENT_POLL_INTERVAL
+        else:
+            time_since_change = time.time() - self.changed_at
+            if accession:
+                self.interval = 1.0 if time_since_change > 1.0 else 0.5
+            else:
+                self.interval = 0.3 if time_since_change < 2.0 else 1.5
+        return self.interval
+
+
+class PollSnapshot:
+    """One poll result of one source."""
+
+    __slots__ = ('source', 'data', 'taken_at', 'duration', 'changed_at')
+
+    def __init__(self, source: str, data: dict, taken_at: float, duration: float, changed_at: float):
+        self.source = source
+        self.data = data
+        self.taken_at = taken_at  # time.time() when the poll started
+        self.duration = duration
+        self.changed_at = changed_at  # time.time() of the source's last accession change
+
+    @property
+    def accession(self) -> str:
+        if not self.data.get('found'):
+            return ""
+        return (self.data.get('accession') or '').strip()
+
+
+class SourcePoller:
+    """Background thread polling one source at its own pace.
+
+    extract() returns the source's data dict (or None when there is nothing to
+    report); every result is handed to sink() as a PollSnapshot. The delay
+    between polls is either fixed or an AdaptivePollInterval, and wake() cuts
+    the current delay short.
+
+    A poll that runs over the source's budget calls on_overrun() in the
+    worker thread - the UIA reads themselves are already bounded by the UIA
+    executor, so this only resets the source's caches. A slow source never
+    holds up the others.
+    """
+
+    def __init__(self, source: str, extract: Callable[[], Optional[dict]],
+                 sink: Callable[[PollSnapshot], None],
+                 interval: Union[float, AdaptivePollInterval, None] = None,
+                 budget: Optional[float] = None,
+                 on_overrun: Optional[Callable[[float], None]] = None):
+        self.source = source
+        self._extract = extract
+        self._sink = sink
+        self._interval = interval if interval is not None else AdaptivePollInterval()
+        self.budget = budget if budget is not None else POLL_BUDGETS.get(source, 5.0)
+        self._on_overrun = on_overrun
+        self._wake = threading.Event()
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+        self.polls = 0
+        self.overruns = 0
+        self.errors = 0
+        self.total_duration = 0.0
+        self.max_duration = 0.0
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name=f"poll-{self.source.lower()}", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Ask the worker to exit after its current poll."""
+        self._running = False
+        self._wake.set()
+
+    def join(self, timeout: float = None) -> bool:
+        """Wait for the worker to exit. Returns True if it did."""
+        if self._thread is None:
+            return True
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
+
+    def wake(self):
+        """Poll now instead of at the end of the current delay."""
+        self._wake.set()
+
+    def _run(self):
+        while self._running:
+            started = time.time()
+            delay = self._interval if isinstance(self._interval, (int, float)) else self._interval.interval
+            try:
+                data = self._extract()
+                duration = time.time() - started
+                self.polls += 1
+                self.total_duration += duration
+                self.max_duration = max(self.max_duration, duration)
+                if duration > self.budget:
+                    self.overruns += 1
+                    logger.warning(f"⚠️  {self.source} poll took {duration:.1f}s (budget {self.budget:.0f}s) "
+                                   f"- UI automation may be hanging")
+                    if self._on_overrun is not None:
+                        self._on_overrun(duration)
+                if data is not None:
+                    if isinstance(self._interval, AdaptivePollInterval):
+                        delay = self._interval.update(data)
+                        changed_at = self._interval.changed_at
+                    else:
+                        changed_at = started
+                    self._sink(PollSnapshot(self.source, data, started, duration, changed_at))
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"{self.source} poller error: {e}", exc_info=True)
+            if not self._running:
+                break
+            self._wake.wait(delay)
+            self._wake.clear()
+
+    def stats(self) -> dict:
+        """Poll counts and durations."""
+        return {
+            "source": self.source,
+            "polls": self.polls,
+            "overruns": self.overruns,
+            "errors": self.errors,
+            "mean_duration": self.total_duration / self.polls if self.polls else 0.0,
+            "max_duration": self.max_duration,
+        }
+
+
+def merge_snapshots(snapshots: Dict[str, PollSnapshot], primary: str,
+                    primary_since: float = 0.0) -> Optional[PollSnapshot]:
+    """Pick the snapshot whose data is shown, from the latest snapshot of each source.
+
+    A source with an open study beats one without. Between sources that both
+    have a study, the one whose accession changed most recently wins - the
+    source that noticed the newest study first drives the display - with the
+    primary source counting as changed no earlier than primary_since (when it
+    was chosen manually) and winning ties. Without any study, the primary
+    source's snapshot is used if its window was found, else the most recent
+    one that found a window.
+
+    Returns:
+        The chosen snapshot, or None if no source has a window open
+    """
+    with_study = [snapshot for snapshot in snapshots.values() if snapshot.accession]
+    if with_study:
+        def rank(snapshot):
+            if snapshot.source == primary:
+                return max(snapshot.changed_at, primary_since), 1
+            return snapshot.changed_at, 0
+        return max(with_study, key=rank)
+
+    chosen = snapshots.get(primary)
+    if chosen is not None and chosen.data.get('found'):
+        return chosen
+    found = [snapshot for snapshot in snapshots.values() if snapshot.data.get('found')]
+    if found:
+        return max(found, key=lambda snapshot: snapshot.taken_at)
+    return None
+
+
+__all__ = ['AdaptivePollInterval', 'PollSnapshot', 'SourcePoller', 'merge_snapshots',
+           'POLL_BUDGETS', 'ABSENT_POLL_INTERVAL']
@@ -0,0 +1,230 @@
+"""Bounded executor for blocking UI Automation reads (window_text() and friends)."""
+
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Worker threads doing UIA reads - this is also the most threads hung UIs can tie up
+UIA_WORKERS = 5
+
+# Workers one group of reads (one source) may have stuck in abandoned calls. While a
+# group is at the limit its new reads are refused, so one hung application can't
+# take the whole pool from the others.
+GROUP_MAX_ORPHANED = 1
+
+# Circuit breaker: after a read of an element times out, further reads of it are
+# refused while the hung call is still running and for BREAKER_COOLDOWN seconds,
+# doubling per consecutive timeout up to BREAKER_MAX_COOLDOWN. A read that returns
+# (even the abandoned one) closes the breaker again.
+BREAKER_COOLDOWN = 2.0
+BREAKER_MAX_COOLDOWN = 30.0
+
+
+class UIATimeout(Exception):
+    """A UIA read did not finish before its deadline (or was refused by the breaker)."""
+
+
+class UIACircuitOpen(UIATimeout):
+    """A UIA read was refused because the element's (or its group's) last read hung."""
+
+
+class _Job:
+    __slots__ = ('fn', 'key', 'group', 'name', 'deadline', 'done', 'result', 'error', 'state', 'started_at')
+
+    def __init__(self, fn, key, group, name, deadline):
+        self.fn = fn
+        self.key = key
+        self.group = group
+        self.name = name
+        self.deadline = deadline
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.state = "queued"  # queued -> running -> finished, or cancelled / abandoned
+        self.started_at = None
+
+
+class UIAExecutor:
+    """Small fixed pool of worker threads with per-call deadlines.
+
+    When PowerScribe switches studies a single window_text() can block for
+    10-18 seconds. Callers wait at most their timeout; a job still queued at
+    its deadline is cancelled and never runs, and a job already running is
+    abandoned - its worker is counted as orphaned until the UIA call returns
+    and then goes back to the pool. The thread count never exceeds the pool
+    size, however often reads hang.
+
+    Reads are keyed for the circuit breaker - normally by the element read -
+    so a hung element is not hit again while the call that hung on it is
+    still tying up a worker, while its siblings in the same walk still are.
+    Reads are also grouped (normally by source), and a group may only tie up
+    GROUP_MAX_ORPHANED workers in abandoned calls.
+    """
+
+    def __init__(self, workers: int = UIA_WORKERS):
+        self.workers = workers
+        self._queue: "queue.Queue[_Job]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._threads = []
+        self._busy = 0
+        self._breakers: Dict[Hashable, list] = {}  # key -> [open_until, cooldown, job that hung]
+        self._group_orphans: Dict[Hashable, int] = {}  # group -> workers stuck in its abandoned calls
+        self.submitted = 0
+        self.completed = 0
+        self.timeouts = 0
+        self.cancelled = 0
+        self.rejected = 0
+        self.orphaned = 0  # workers currently stuck in an abandoned call
+
+    def _ensure_workers(self):
+        if len(self._threads) >= self.workers:
+            return
+        with self._lock:
+            while len(self._threads) < self.workers:
+                thread = threading.Thread(target=self._worker, name=f"uia-worker-{len(self._threads)}",
+                                          daemon=True)
+                self._threads.append(thread)
+                thread.start()
+
+    def _worker(self):
+        while True:
+            job = self._queue.get()
+            with self._lock:
+                if job.state != "queued":
+                    continue  # Caller already gave up on it
+                if time.monotonic() >= job.deadline:
+                    job.state = "cancelled"
+                    self.cancelled += 1
+                    job.done.set()
+                    continue
+                job.state = "running"
+                job.started_at = time.monotonic()
+                self._busy += 1
+            try:
+                job.result = job.fn()
+            except Exception as e:
+                job.error = e
+            with self._lock:
+                self._busy -= 1
+                if job.state == "abandoned":
+                    self.orphaned -= 1
+                    if job.group is not None:
+                        self._group_orphans[job.group] -= 1
+                    breaker = self._breakers.get(job.key)
+                    if breaker is not None and breaker[2] is job:
+                        # The element answered after all - stop refusing it (the cooldown
+                        # is kept so a repeat hang still backs off further)
+                        breaker[0] = 0.0
+                        breaker[2] = None
+                    elapsed = time.monotonic() - job.started_at
+                    logger.info(f"Abandoned UIA read for {job.name} returned after {elapsed:.1f}s")
+                else:
+                    job.state = "finished"
+                    self.completed += 1
+                    if job.error is None:
+                        self._breakers.pop(job.key, None)
+                job.done.set()
+
+    # =========================================================================
+    # Calls
+    # =========================================================================
+
+    def call(self, fn: Callable[[], Any], timeout: float, key: Hashable = None, name: str = "",
+             group: Hashable = None) -> Any:
+        """Run fn on a pool worker and return its result.
+
+        Raises:
+            UIATimeout: fn did not finish within timeout, or key's breaker is open,
+                        or group already has GROUP_MAX_ORPHANED workers stuck
+            Exception: whatever fn raised
+        """
+        now = time.monotonic()
+        with self._lock:
+            breaker = self._breakers.get(key) if key is not None else None
+            if breaker is not None and (now < breaker[0] or breaker[2] is not None):
+                self.rejected += 1
+                raise UIACircuitOpen(f"circuit open for {name or key}")
+            if group is not None and self._group_orphans.get(group, 0) >= GROUP_MAX_ORPHANED:
+                self.rejected += 1
+                raise UIACircuitOpen(f"{group} has a hung UIA read - skipping {name or 'UIA read'}")
+            self.submitted += 1
+        self._ensure_workers()
+
+        job = _Job(fn, key, group, name, now + timeout)
+        self._queue.put(job)
+        job.done.wait(timeout)
+
+        with self._lock:
+            if job.state == "finished":
+                if job.error is not None:
+                    raise job.error
+                return job.result
+            if job.state == "queued":
+                job.state = "cancelled"
+                self.cancelled += 1
+            elif job.state == "running":
+                job.state = "abandoned"
+                self.orphaned += 1
+                if group is not None:
+                    self._group_orphans[group] = self._group_orphans.get(group, 0) + 1
+            self.timeouts += 1
+            if key is not None:
+                cooldown = BREAKER_COOLDOWN if breaker is None else min(breaker[1] * 2, BREAKER_MAX_COOLDOWN)
+                self._breakers[key] = [time.monotonic() + cooldown, cooldown,
+                                       job if job.state == "abandoned" else None]
+                if len(self._breakers) > 256:
+                    # Elements no longer read - forget the long-expired breakers
+                    expired = now - BREAKER_MAX_COOLDOWN
+                    self._breakers = {k: b for k, b in self._breakers.items()
+                                      if b[0] > expired or b[2] is not None}
+            orphaned = self.orphaned
+        raise UIATimeout(f"{name or 'UIA read'} timed out after {timeout}s (orphaned workers: {orphaned})")
+
+    # =========================================================================
+    # Metrics
+    # =========================================================================
+
+    def stats(self) -> dict:
+        """Pool, queue and timeout counters."""
+        now = time.monotonic()
+        with self._lock:
+            return {
+                "workers": len(self._threads),
+                "busy": self._busy,
+                "orphaned": self.orphaned,
+                "queue_depth": self._queue.qsize(),
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "timeouts": self.timeouts,
+                "cancelled": self.cancelled,
+                "rejected": self.rejected,
+                "open_breakers": sum(1 for open_until, _, hung in self._breakers.values()
+                                     if open_until > now or hung is not None),
+                "orphaned_by_group": {group: count for group, count in self._group_orphans.items() if count},
+            }
+
+
+_uia_executor: Optional[UIAExecutor] = None
+_uia_executor_lock = threading.Lock()
+
+
+def get_uia_executor() -> UIAExecutor:
+    """The process-wide executor shared by all extractors."""
+    global _uia_executor
+    if _uia_executor is None:
+        with _uia_executor_lock:
+            if _uia_executor is None:
+                _uia_executor = UIAExecutor()
+    return _uia_executor
+
+
+def get_uia_stats() -> dict:
+    """Metrics of the shared executor (see UIAExecutor.stats)."""
+    return get_uia_executor().stats()
+
+
+__all__ = ['UIAExecutor', 'UIATimeout', 'UIACircuitOpen', 'get_uia_executor', 'get_uia_stats']
@@ -1,7 +1,7 @@
 """Window extraction utilities for pywinauto operations."""
 
 import logging
-import threading
+import time
 from typing import Dict, List, Optional, Any
 
 try:
@@ -9,71 +9,99 @@ try:
 except ImportError:
     Desktop = None
 
+from .uia_executor import get_uia_executor, UIATimeout, UIACircuitOpen
+
 logger = logging.getLogger(__name__)
 
 # Module-level globals
 _cached_desktop: Optional[Any] = None
-_timeout_thread_count = 0
-_timeout_thread_lock = threading.Lock()
 
 
-def _window_text_with_timeout(element, timeout=1.0, element_name=""):
+def _read_element_key(element):
+    """Circuit breaker key of an element that survives re-wrapping (runs on the UIA executor).
+    
+    descendants()/children() walks return fresh wrappers on every poll, so the
+    wrapper's id() would almost never see the same element twice (and could be
+    reused by an unrelated wrapper). The UIA runtime id identifies the element
+    itself; failing that, its window handle / automation id.
+    """
+    key = id(element)
+    try:
+        info = element.element_info
+        runtime_id = info.runtime_id
+        if runtime_id:
+            key = tuple(runtime_id)
+        elif info.handle or info.automation_id:
+            key = (info.handle, info.automation_id)
+    except Exception:
+        pass
+    return key
+
+
+def _element_key(element, timeout, element_name="", source=None):
+    """Circuit breaker key of an element (see _read_element_key).
+    
+    Reading the runtime id is itself a cross-process UIA call that can block on
+    a hung element, so it goes through the executor like the read it guards.
+    The key is kept on the wrapper, so a cached element is only asked once.
+    
+    Raises:
+        UIATimeout: the key could not be read within timeout
+    """
+    key = getattr(element, '_breaker_key', None)
+    if key is not None:
+        return key
+    key = get_uia_executor().call(lambda: _read_element_key(element), timeout,
+                                  name=element_name, group=source)
+    try:
+        element._breaker_key = key
+    except Exception:
+        pass
+    return key
+
+
+def _window_text_with_timeout(element, timeout=1.0, element_name="", breaker_key=None, source=None):
     """Read window_text() with a timeout to prevent blocking.
     
     When PowerScribe transitions between studies, window_text() can block for
-    extended periods (10-18 seconds). This wrapper prevents the worker thread
-    from freezing by timing out after the specified duration.
-    
-    Note: When timeout occurs, the spawned thread becomes orphaned (blocking on 
-    the UI call). These are daemon threads so they won't prevent app exit, but 
-    they consume resources until the blocking call eventually returns or the 
-    app exits. We track the count for monitoring purposes.
+    extended periods (10-18 seconds). The read runs on the shared UIA executor
+    (see uia_executor), which gives up on it after the specified duration
+    without spawning a thread per call, and refuses further reads of an
+    element whose last read hung until its breaker cools down.
     
     Args:
         element: The UI element to read text from
         timeout: Maximum time to wait in seconds (default 1.0)
         element_name: Name/ID of element for logging (optional)
+        breaker_key: Circuit breaker key - defaults to the element's identity (see
+                     _element_key), so a hung element doesn't get its siblings refused
+        source: Source (application) the element belongs to - each source may only
+                tie up one executor worker in hung reads
     
     Returns:
         str: The window text, or empty string if timeout/failure occurs
     """
-    global _timeout_thread_count
-    import time
-    result = [None]
-    exception = [None]
-    start = time.time()
-    
-    def read_text():
-        global _timeout_thread_count
-        try:
-            result[0] = element.window_text()
-        except Exception as e:
-            exception[0] = e
-        finally:
-            # If we were an orphan thread that finally completed, decrement count
-            with _timeout_thread_lock:
-                if _timeout_thread_count > 0:
-                    _timeout_thread_count -= 1
-    
-    thread = threading.Thread(target=read_text, daemon=True)
-    thread.start()
-    thread.join(timeout=timeout)
-    elapsed = time.time() - start
-    
-    if thread.is_alive():
-        # Thread is still running - window_text() is blocking
-        # Track orphan thread count for monitoring
-        with _timeout_thread_lock:
-            _timeout_thread_count += 1
-            orphan_count = _timeout_thread_count
-        logger.warning(f"window_text() call timed out after {timeout}s for {element_name} (orphan threads: {orphan_count})")
+    try:
+        # Identifying the element and reading it share one deadline
+        deadline = time.monotonic() + timeout
+        if breaker_key is None:
+            breaker_key = _element_key(element, timeout, element_name, source)
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise UIATimeout(f"{element_name or 'UIA read'} timed out after {timeout}s")
+        result = get_uia_executor().call(element.window_text, remaining,
+                                         key=breaker_key, name=element_name, group=source)
+    except UIACircuitOpen as e:
+        logger.debug(f"window_text() call skipped: {e}")
         return ""
+    except UIATimeout as e:
+        logger.warning(f"window_text() call timed out: {e}")
+        return ""
+    except Exception as e:
+        logger.debug(f"window_text() exception for {element_name}: {e}")
+        raise
     
-    if exception[0]:
-        logger.debug(f"window_text() exception for {element_name}: {exception[0]}")
-        raise exception[0]
-    
-    return result[0] if result[0] else ""
+    return result if result else ""
 
 
 def get_cached_desktop():
@@ -89,7 +117,8 @@ def get_cached_desktop():
     return _cached_desktop
 
 
-def find_elements_by_automation_id(window, automation_ids: List[str], cached_elements: Dict = None) -> Dict[str, Any]:
+def find_elements_by_automation_id(window, automation_ids: List[str], cached_elements: Dict = None,
+                                   source: str = None) -> Dict[str, Any]:
     """Find elements by Automation ID - optimized for speed.
     
     Uses cached elements when available (instant).
@@ -105,7 +134,8 @@ def find_elements_by_automation_id(window, automation_ids: List[str], cached_ele
             try:
                 cached_elem = cached_elements[auto_id]['element']
                 # SHORT timeout (0.3s) - if element is stale, fail fast
-                text_content = _window_text_with_timeout(cached_elem, timeout=0.3, element_name=auto_id)
+                text_content = _window_text_with_timeout(cached_elem, timeout=0.3, element_name=auto_id,
+                                                         source=source)
                 found_elements[auto_id] = {
                     'element': cached_elem,
                     'text': text_content.strip() if text_content else '',
@@ -141,7 +171,8 @@ def find_elements_by_automation_id(window, automation_ids: List[str], cached_ele
                     elem_auto_id = element.element_info.automation_id
                     if elem_auto_id and elem_auto_id in remaining:
                         # SHORT timeout (0.3s) - fail fast on stale elements
-                        text_content = _window_text_with_timeout(element, timeout=0.3, element_name=elem_auto_id)
+                        text_content = _window_text_with_timeout(element, timeout=0.3, element_name=elem_auto_id,
+                                                                 source=source)
                         found_elements[elem_auto_id] = {
                             'element': element,
                             'text': text_content.strip() if text_content else '',
@@ -0,0 +1,209 @@
+"""Shared registry of the top-level windows of each data source (PowerScribe, Mosaic, Clario)."""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from .window_extraction import get_cached_desktop, _window_text_with_timeout
+
+logger = logging.getLogger(__name__)
+
+POWERSCRIBE = "PowerScribe"
+MOSAIC = "Mosaic"
+CLARIO = "Clario"
+
+# UIA executor group of the registry's own title reads (they span every source's windows)
+REGISTRY_GROUP = "WindowRegistry"
+
+# Minimum seconds between enumerations of the desktop when a source has no
+# (live) window - a missing source is not looked for on every poll
+WINDOW_RESCAN_INTERVAL = 2.0
+
+POWERSCRIBE_TITLES = ["PowerScribe 360 | Reporting", "PowerScribe 360", "PowerScribe 360 - Reporting",
+                      "Nuance PowerScribe 360", "Powerscribe 360"]
+
+# Titles of our own and diagnostic windows that can mention a source's name
+_EXCLUDED_TITLE_WORDS = ["rvu counter", "test", "viewer", "ui elements", "diagnostic"]
+
+try:
+    import ctypes
+    _user32 = ctypes.windll.user32
+except (ImportError, AttributeError):
+    _user32 = None
+
+
+def _match_powerscribe(window, title: str) -> int:
+    """Match rank (lower is better, -1 no match) of a PowerScribe window."""
+    if title not in POWERSCRIBE_TITLES or "RVU Counter" in title:
+        return -1
+    return POWERSCRIBE_TITLES.index(title)
+
+
+def _match_mosaic(window, title: str) -> int:
+    title = title.lower()
+    if any(word in title for word in _EXCLUDED_TITLE_WORDS):
+        return -1
+    # "MosaicInfoHub", "Mosaic Info Hub", "Mosaic InfoHub", "Mosaic Reporting"
+    if not ("mosaicinfohub" in title or
+            ("mosaic" in title and "info" in title and "hub" in title) or
+            ("mosaic" in title and "reporting" in title)):
+        return -1
+    # Verify it has the MainForm automation ID (if we can't check, still take it)
+    try:
+        if window.element_info.automation_id != "MainForm":
+            return -1
+    except Exception as e:
+        logger.debug(f"Error checking Mosaic automation ID: {e}")
+    return 0
+
+
+def _match_clario(window, title: str) -> int:
+    title = title.lower()
+    if any(word in title for word in _EXCLUDED_TITLE_WORDS):
+        return -1
+    if "clario" not in title or "worklist" not in title:
+        return -1
+    # Chrome window with the "Clario - Worklist" tab (if we can't check the class, still take it)
+    try:
+        if "chrome" not in window.element_info.class_name.lower():
+            return -1
+    except Exception as e:
+        logger.debug(f"Couldn't check Clario class name: {e}")
+    return 0
+
+
+_MATCHERS: Dict[str, Callable[[Any, str], int]] = {
+    POWERSCRIBE: _match_powerscribe,
+    MOSAIC: _match_mosaic,
+    CLARIO: _match_clario,
+}
+
+
+class WindowRegistry:
+    """Top-level windows of each source, found with one shared desktop enumeration.
+
+    A scan enumerates the visible top-level windows once, reads each title
+    once and assigns windows to every source at the same time. Found windows
+    are cached with their native handle; later lookups only check that the
+    handle is still a visible window (IsWindow/IsWindowVisible - no UI
+    Automation call), so a poll cycle normally does no enumeration at all.
+    A source whose window is missing or dead triggers a rescan, at most every
+    WINDOW_RESCAN_INTERVAL seconds.
+
+    Thread-safe: the poll worker and the Clario lookup share one registry.
+    """
+
+    def __init__(self, rescan_interval: float = WINDOW_RESCAN_INTERVAL):
+        self.rescan_interval = rescan_interval
+        self._lock = threading.RLock()
+        self._windows: Dict[str, tuple] = {}  # source -> (window, handle or None)
+        self._last_scan = 0.0
+        self.scans = 0
+        self.hits = 0
+
+    def get(self, source: str) -> Optional[Any]:
+        """The source's window, or None if it isn't open."""
+        with self._lock:
+            cached = self._windows.get(source)
+            if cached is not None:
+                if self._is_alive(*cached):
+                    self.hits += 1
+                    return cached[0]
+                logger.debug(f"Cached {source} window is gone, rescanning")
+                self._windows.pop(source, None)
+                self._last_scan = 0.0
+            if time.monotonic() - self._last_scan >= self.rescan_interval:
+                self.scan()
+            cached = self._windows.get(source)
+            return cached[0] if cached is not None else None
+
+    def is_available(self, source: str) -> bool:
+        """Whether the source has a window open (quick check for the poll loop)."""
+        return self.get(source) is not None
+
+    def invalidate(self, source: Optional[str] = None):
+        """Forget one source's window (or all) so the next lookup rescans."""
+        with self._lock:
+            if source is None:
+                self._windows.clear()
+            else:
+                self._windows.pop(source, None)
+            self._last_scan = 0.0
+
+    def scan(self):
+        """Enumerate the visible top-level windows and reassign every source."""
+        with self._lock:
+            self._last_scan = time.monotonic()
+            self.scans += 1
+            desktop = get_cached_desktop()
+            if desktop is None:
+                return
+            best: Dict[str, tuple] = {}  # source -> (rank, window)
+            try:
+                all_windows = desktop.windows(visible_only=True)
+            except Exception as e:
+                logger.debug(f"Error enumerating windows: {e}")
+                return
+            for window in all_windows:
+                try:
+                    title = _window_text_with_timeout(window, timeout=1.0, element_name="window registry scan",
+                                                      source=REGISTRY_GROUP)
+                except Exception as e:
+                    logger.debug(f"Error reading window title: {e}")
+                    continue
+                if not title:
+                    continue
+                for source, matcher in _MATCHERS.items():
+                    if source in best and best[source][0] == 0:
+                        continue
+                    rank = matcher(window, title)
+                    if rank >= 0 and (source not in best or rank < best[source][0]):
+                        best[source] = (rank, window)
+            found = {}
+            for source, (_, window) in best.items():
+                try:
+                    handle = window.handle
+                except Exception:
+                    handle = None
+                found[source] = (window, handle)
+            # A window whose title read timed out (e.g. PowerScribe mid-transition) is still there
+            for source, cached in self._windows.items():
+                if source not in found and self._is_alive(*cached):
+                    found[source] = cached
+            self._windows = found
+
+    def _is_alive(self, window, handle) -> bool:
+        if handle and _user32 is not None:
+            try:
+                return bool(_user32.IsWindow(handle)) and bool(_user32.IsWindowVisible(handle))
+            except Exception:
+                pass
+        try:
+            _window_text_with_timeout(window, timeout=0.5, element_name="window registry validation",
+                                      source=REGISTRY_GROUP)
+            return True
+        except Exception:
+            return False
+
+    def stats(self) -> dict:
+        """Scan/hit counters and the sources currently found."""
+        with self._lock:
+            return {"scans": self.scans, "hits": self.hits, "sources": sorted(self._windows)}
+
+
+_window_registry: Optional[WindowRegistry] = None
+_window_registry_lock = threading.Lock()
+
+
+def get_window_registry() -> WindowRegistry:
+    """The process-wide registry shared by the quick checks and all extractors."""
+    global _window_registry
+    if _window_registry is None:
+        with _window_registry_lock:
+            if _window_registry is None:
+                _window_registry = WindowRegistry()
+    return _window_registry
+
+
+__all__ = ['WindowRegistry', 'get_window_registry', 'POWERSCRIBE', 'MOSAIC', 'CLARIO', 'REGISTRY_GROUP']